@@ -1,88 +1,92 @@
-import openai
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from decision_backends import DecisionBackend, create_decision_backend
+from image_pipeline import image_data_url
+from prompt_builder import PromptBuilder, PromptSection, market_sections, token_summary
 from config import Config
 from utils.logger import setup_logger
+from utils.tracing import tracer
 
 logger = setup_logger("AIDecisionMaker", "AIDecisionMaker.log")
 
 
 class AIDecisionMaker:
-    def __init__(self, api_key: str = Config.OPENAI_API_KEY):
+    def __init__(self, api_key: str = Config.OPENAI_API_KEY, backend: Optional[DecisionBackend] = None):
         self.api_key = api_key
+        # 여러 사용자가 병렬로 호출하므로 백엔드(HTTP 연결 풀) 하나를 공유
+        self.backend = backend or create_decision_backend(Config.DECISION_BACKEND, api_key=api_key,
+                                                          base_url=Config.OPENAI_BASE_URL)
+        self.prompt_builder = PromptBuilder(Config.PROMPT_TOKEN_BUDGET)
+
+    def build_messages(self, user_preferences: List[str], market_data: Dict[str, Any],
+                       additional_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """결정 프롬프트 메시지"""
+        # 시계열/호가를 압축 인코딩하고 토큰 예산에 맞게 줄임 (trading_data와 중복되는 값은 한 번만)
+        sections = market_sections(market_data, additional_data)
+        if user_preferences:
+            sections.insert(0, PromptSection("User Preferences", "\n".join(f"- {p}" for p in user_preferences)))
+        prompt = self.prompt_builder.build(sections)
+        logger.info(f"Decision prompt: {token_summary(prompt)}")
+
+        messages = [
+            {
+                "role": "system",
+                "content": """You are a Bitcoin trading expert. You analyze the data provided to you and make decisions that will maximize your profitability.:
+                                    - Recent price trends and volume
+                                    - Technical indicators (RSI, MACD, BB)
+                                    - Order book depth
+                                    - Fear and Greed Index (not much important)
+                                    - Use the provided chart image for reference
+                                    - Past trade reflections
+                                    - recent news headlines about btc
+                                    
+                                    Consider these important contextual factors:
+                                    - Regular trading checks occur every 1 hours
+                                    - Consider both the technical indicators and the timing of trades                                    
+                    """
+            },
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": prompt.text
+                    }
+                ]
+            }
+        ]
+
+        # 차트 이미지가 있을 때만 첨부
+        chart_image = additional_data.get('chart_image')
+        if chart_image:
+            messages[1]["content"].append({
+                "type": "image_url",
+                "image_url": {
+                    "url": image_data_url(chart_image)
+                }
+            })
+
+        return messages
 
     def get_decision(self, user_preferences: List[str], market_data: Dict[str, Any], additional_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         AI 분석을 통해 트레이딩 결정을 내림
         """
         try:
-            # OpenAI GPT 호출
-            messages = [
-                {
-                    "role": "system",
-                    "content": """You are a Bitcoin trading expert. You analyze the data provided to you and make decisions that will maximize your profitability.:
-                                        - Recent price trends and volume
-                                        - Technical indicators (RSI, MACD, BB)
-                                        - Order book depth
-                                        - Fear and Greed Index (not much important)
-                                        - Use the provided chart image for reference
-                                        - Past trade reflections
-                                        - recent news headlines about btc
-                                        
-                                        Consider these important contextual factors:
-                                        - Regular trading checks occur every 1 hours
-                                        - Consider both the technical indicators and the timing of trades                                    
-                        """
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"""
-                                    Market Data: {market_data}\n
-                                    Technical Indicators: {additional_data.get('technical_indicators')}\n
-                                    Trading Data (Daily): {additional_data.get('trading_data').get('daily')}\n
-                                    Trading Data (Hourly): {additional_data.get('trading_data').get('hourly')}\n
-                                    News: {additional_data.get('news')}\n
-                                    Fear and Greed Index: {additional_data.get('fear_greed_index')}\n
-                                    """
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/png;base64,{additional_data.chart_image}"
-                            }
-                        }
-                    ]
-                }
-            ]
+            messages = self.build_messages(user_preferences, market_data, additional_data)
+            with tracer.span("ai_decision"):
+                return self.backend.decide(messages, {**market_data, **additional_data})
 
-            response = openai.ChatCompletion.create(
-                model="gpt-4o-2024-08-06",
-                messages=messages,
-                response_format={
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": "trading_decision",
-                        "strict": True,
-                        "schema": {
-                            "type": "object",
-                            "properties": {
-                                "decision": {"type": "string", "enum": ["buy", "sell", "hold"]},
-                                "percentage": {"type": "number"},
-                                "reason": {"type": "string"},
-                                "risk_level": {"type": "string", "enum": ["low", "medium", "high"]},
-                                "confidence": {"type": "integer"}
-                            },
-                            "required": ["decision", "percentage", "reason", "risk_level", "confidence"],
-                            "additionalProperties": False
-                        }
-                    }
-                },
-                max_tokens=500
-            )
+        except Exception as e:
+            logger.error(f"Error in AI decision-making: {e}")
+            return {"decision": "hold", "reason": "Error in decision-making process"}
 
-            return json.loads(response.choices[0].message.content)
+    async def get_decision_async(self, user_preferences: List[str], market_data: Dict[str, Any],
+                                 additional_data: Dict[str, Any]) -> Dict[str, Any]:
+        """get_decision의 asyncio 버전 (백엔드의 비동기 클라이언트 사용)"""
+        try:
+            messages = self.build_messages(user_preferences, market_data, additional_data)
+            with tracer.span("ai_decision"):
+                return await self.backend.adecide(messages, {**market_data, **additional_data})
 
         except Exception as e:
             logger.error(f"Error in AI decision-making: {e}")
@@ -0,0 +1,399 @@
+"""
+asyncio 기반 봇 런타임 (schedule + time.sleep 루프 대체).
+
+- TimerWheel: 해시 타이머 휠. 작업 수와 관계없이 틱마다 현재 슬롯만 확인하고, 반복 작업은 끝난 시각이 아니라
+  예정 시각 기준으로 다시 등록함 (실행 시간만큼 밀리지 않음)
+- SingleFlight: 키(마켓/사용자)별로 한 번에 하나만 실행. 실행 중에 같은 키로 들어온 요청은 새로 실행하지 않고
+  진행 중인 작업의 결과를 함께 기다림 (가격 트리거와 정기 사이클이 겹치지 않음)
+- 블로킹 작업은 용도별 실행기에서: io(REST, 파일), browser(Selenium, 스레드 1개), db(SQLite, 스레드 1개)
+- AsyncHttpClient: httpx.AsyncClient 연결 풀로 이벤트 루프에서 직접 요청 (스레드를 쓰지 않음)
+- 다른 스레드(WebSocket 피드 등)의 이벤트는 submit_threadsafe()로 루프에 넘김
+
+    runtime = AsyncRuntime()
+    runtime.every(3600, lambda: bot.run_cycle("schedule"), name="trading_cycle")
+    runtime.start()
+"""
+import asyncio
+import contextvars
+import functools
+import json
+import math
+import signal
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Union
+import logging
+
+import httpx
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from collection_stage import CollectionResult
+
+logger = logging.getLogger("AsyncRuntime")
+
+UPBIT_API_URL = "https://api.upbit.com/v1"
+
+Job = Callable[[], Awaitable[Any]]
+
+
+def seconds_until(hour: int, minute: int = 0, now: Optional[datetime] = None) -> float:
+    """다음 hour:minute(로컬 시각)까지 남은 초 (매일 실행 작업의 첫 지연)"""
+    now = now or datetime.now()
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+# ---------------------------------------------------------------- 타이머 휠
+class TimerHandle:
+    __slots__ = ("deadline", "callback", "interval", "name", "rounds", "cancelled")
+
+    def __init__(self, deadline: float, callback: Callable[[], None], interval: Optional[float], name: str):
+        self.deadline = deadline
+        self.callback = callback
+        self.interval = interval
+        self.name = name
+        self.rounds = 0
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Args:
+        tick: 슬롯 하나의 길이 (초). 작업은 예정 시각 이후 최대 tick초 안에 실행됨
+        slots: 슬롯 수. tick * slots보다 먼 작업은 바퀴 수(rounds)를 세며 기다림
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        self.slots = slots
+        self._wheel: List[List[TimerHandle]] = [[] for _ in range(slots)]
+        self._cursor = 0
+        self._time = time.monotonic()  # 현재 슬롯에 해당하는 시각
+
+    def __len__(self) -> int:
+        return sum(1 for bucket in self._wheel for handle in bucket if not handle.cancelled)
+
+    @property
+    def next_tick(self) -> float:
+        return self._time + self.tick
+
+    def _insert(self, handle: TimerHandle):
+        ticks = max(1, math.ceil((handle.deadline - self._time) / self.tick))
+        handle.rounds = (ticks - 1) // self.slots
+        self._wheel[(self._cursor + ticks) % self.slots].append(handle)
+
+    def schedule(self, delay: float, callback: Callable[[], None], interval: Optional[float] = None,
+                 name: str = "") -> TimerHandle:
+        """delay초 뒤에 callback 실행 (interval이 있으면 그 뒤로 반복)"""
+        handle = TimerHandle(time.monotonic() + delay, callback, interval, name or getattr(callback, "__name__", ""))
+        self._insert(handle)
+        return handle
+
+    def advance(self, now: float) -> List[TimerHandle]:
+        """now까지 슬롯을 넘기며 실행할 작업 목록을 반환 (반복 작업은 다음 예정 시각으로 다시 등록)"""
+        due = []
+        while self._time + self.tick <= now:
+            self._cursor = (self._cursor + 1) % self.slots
+            self._time += self.tick
+            bucket, self._wheel[self._cursor] = self._wheel[self._cursor], []
+            for handle in bucket:
+                if handle.cancelled:
+                    continue
+                if handle.rounds > 0:
+                    handle.rounds -= 1
+                    self._wheel[self._cursor].append(handle)
+                    continue
+                due.append(handle)
+        for handle in due:
+            if handle.interval:
+                # 루프가 밀려 여러 번 지났으면 밀린 실행은 건너뜀
+                handle.deadline += handle.interval
+                while handle.deadline <= now:
+                    handle.deadline += handle.interval
+                self._insert(handle)
+        return due
+
+
+# ---------------------------------------------------------------- 단일 실행
+class SingleFlight:
+    """키별 진행 중 작업. 같은 키로 다시 요청하면 진행 중인 작업의 결과를 함께 기다림 (이벤트 루프 안에서만 사용)"""
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self.shared = 0  # 진행 중인 작업에 합류한 요청 수
+
+    def running(self, key: Hashable) -> bool:
+        task = self._tasks.get(key)
+        return task is not None and not task.done()
+
+    async def do(self, key: Hashable, factory: Job) -> Any:
+        task = self._tasks.get(key)
+        if task is None or task.done():
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+
+            def forget(done: asyncio.Task, key=key):
+                if self._tasks.get(key) is done:
+                    del self._tasks[key]
+
+            task.add_done_callback(forget)
+        else:
+            self.shared += 1
+        # 기다리던 쪽이 취소되어도 작업은 계속 실행
+        return await asyncio.shield(task)
+
+
+# ---------------------------------------------------------------- 비동기 HTTP
+@dataclass
+class HttpResponse:
+    """requests.Response와 같은 이름의 최소 인터페이스 (market_context 파서를 그대로 사용)"""
+    status_code: int
+    content: bytes
+    headers: CaseInsensitiveDict = field(default_factory=CaseInsensitiveDict)
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} response: {self.text[:200]}")
+
+
+class AsyncHttpClient:
+    """연결 풀을 쓰는 비동기 HTTP 클라이언트 (httpx.AsyncClient, 첫 요청 시 이벤트 루프 안에서 생성)"""
+
+    def __init__(self, runtime: "AsyncRuntime", timeout: float = 10.0, pool_size: int = 32):
+        self.runtime = runtime
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _session(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+        return self._client
+
+    async def request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                      headers: Optional[Dict[str, str]] = None, json_body: Any = None,
+                      timeout: Optional[float] = None) -> HttpResponse:
+        response = await self._session().request(method, url, params=params, headers=headers, json=json_body,
+                                                 timeout=timeout or self.timeout)
+        return HttpResponse(response.status_code, response.content, CaseInsensitiveDict(response.headers))
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> HttpResponse:
+        return await self.request("GET", url, params=params, **kwargs)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class AsyncUpbitQuotation:
+    """업비트 공개 시세 API (현재가/호가)의 비동기 버전. 응답 형식은 pyupbit와 같음"""
+
+    def __init__(self, http: AsyncHttpClient, base_url: str = UPBIT_API_URL):
+        self.http = http
+        self.base_url = base_url.rstrip("/")
+
+    async def _get(self, path: str, **params) -> Any:
+        response = await self.http.get(f"{self.base_url}{path}", params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_current_price(self, markets: Union[str, List[str]]) -> Union[float, Dict[str, float], None]:
+        """마켓 하나면 가격, 목록이면 {마켓: 가격}"""
+        names = [markets] if isinstance(markets, str) else list(markets)
+        tickers = await self._get("/ticker", markets=",".join(names))
+        prices = {ticker["market"]: ticker["trade_price"] for ticker in tickers}
+        return prices.get(markets) if isinstance(markets, str) else prices
+
+    async def get_orderbook(self, market: str) -> Optional[Dict[str, Any]]:
+        orderbooks = await self._get("/orderbook", markets=market)
+        return orderbooks[0] if orderbooks else None
+
+    async def get_orderbooks(self, markets: List[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 마켓 호가를 요청 한 번으로 조회 -> {마켓: 호가}"""
+        orderbooks = await self._get("/orderbook", markets=",".join(markets))
+        return {orderbook["market"]: orderbook for orderbook in orderbooks}
+
+
+# ---------------------------------------------------------------- 런타임
+class AsyncRuntime:
+    """
+    Args:
+        tick: 타이머 휠 틱 (초)
+        io_workers: REST/파일 등 블로킹 I/O 실행기 스레드 수
+        browser_workers: 차트 캡처 실행기 스레드 수 (브라우저 세션마다 한 스레드)
+        shutdown_grace: 종료 시 진행 중인 작업을 기다리는 시간 (초)
+    """
+
+    def __init__(self, tick: float = 1.0, io_workers: int = 16, slots: int = 512, shutdown_grace: float = 30.0,
+                 browser_workers: int = 1):
+        self.wheel = TimerWheel(tick, slots)
+        self.flights = SingleFlight()
+        self.shutdown_grace = shutdown_grace
+        # Selenium 드라이버는 세션마다 한 스레드, SQLite 쓰기는 한 스레드에서만 사용
+        self.executors: Dict[str, ThreadPoolExecutor] = {
+            "io": ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="runtime-io"),
+            "browser": ThreadPoolExecutor(max_workers=browser_workers, thread_name_prefix="runtime-browser"),
+            "db": ThreadPoolExecutor(max_workers=1, thread_name_prefix="runtime-db"),
+        }
+        self.http = AsyncHttpClient(self)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopped: Optional[asyncio.Event] = None
+        self._shutdown_jobs: List[Job] = []
+
+    # ---------------------------------------------------------------- 실행기
+    async def run_blocking(self, func: Callable[..., Any], *args, executor: str = "io", **kwargs) -> Any:
+        """블로킹 함수를 실행기에서 실행 (호출한 쪽의 contextvars(사이클 추적 등)를 전달)"""
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.executors[executor], call)
+
+    async def collect(self, sources: Dict[str, Job], timeouts: Optional[Dict[str, float]] = None,
+                      defaults: Optional[Dict[str, Any]] = None, default_timeout: float = 30.0) -> CollectionResult:
+        """
+        CollectionStage.collect의 asyncio 버전. 소스를 동시에 기다리고, 실패/타임아웃이면 기본값으로 채움
+        (타임아웃된 실행기 작업은 백그라운드에서 끝까지 실행됨)
+        """
+        timeouts = timeouts or {}
+        defaults = defaults or {}
+        result = CollectionResult()
+        start = time.perf_counter()
+
+        async def timed(name: str, job: Job):
+            try:
+                result.values[name] = await asyncio.wait_for(job(), timeouts.get(name, default_timeout))
+            except asyncio.TimeoutError:
+                logger.warning(f"Collecting {name} timed out after {time.perf_counter() - start:.2f}s")
+                result.values[name] = defaults.get(name)
+                result.errors[name] = "timeout"
+            except Exception as e:
+                logger.error(f"Error collecting {name}: {e}")
+                result.values[name] = defaults.get(name)
+                result.errors[name] = str(e) or type(e).__name__
+            result.timings[name] = time.perf_counter() - start
+
+        await asyncio.gather(*(timed(name, job) for name, job in sources.items()))
+        result.values = {name: result.values[name] for name in sources}
+        result.timings = {name: result.timings[name] for name in sources}
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    # ---------------------------------------------------------------- 작업
+    def spawn(self, coro: Awaitable[Any], name: str = "") -> asyncio.Task:
+        """백그라운드 작업 시작. 예외는 로그로 남기고, 종료 시 shutdown_grace만큼 기다림"""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+
+        def done(finished: asyncio.Task):
+            self._tasks.discard(finished)
+            if not finished.cancelled() and finished.exception() is not None:
+                logger.error(f"Task {name or finished.get_name()} failed: {finished.exception()!r}")
+
+        task.add_done_callback(done)
+        return task
+
+    def submit_threadsafe(self, job: Job, name: str = "") -> Optional[Future]:
+        """다른 스레드에서 루프로 작업을 넘김 (루프가 실행 중이 아니면 버리고 None)"""
+        if self.loop is None or self.loop.is_closed():
+            logger.warning(f"Runtime is not running, dropping {name or 'job'}")
+            return None
+
+        async def run():
+            return await self.spawn(job(), name)
+        return asyncio.run_coroutine_threadsafe(run(), self.loop)
+
+    def _fire(self, job: Job, name: str, key: Optional[Hashable]):
+        if key is None:
+            self.spawn(job(), name)
+        elif self.flights.running(key):
+            logger.info(f"{name} skipped: previous run still in progress")
+        else:
+            self.spawn(self.flights.do(key, job), name)
+
+    def call_later(self, delay: float, job: Job, name: str = "") -> TimerHandle:
+        return self.wheel.schedule(delay, lambda: self._fire(job, name, None), name=name)
+
+    def every(self, interval: float, job: Job, name: str = "", key: Optional[Hashable] = None,
+              first_delay: Optional[float] = None) -> TimerHandle:
+        """
+        interval초마다 job() 실행 (첫 실행은 first_delay, 없으면 interval 뒤).
+        key를 주면 이전 실행이 아직 진행 중일 때 이번 실행은 건너뜀.
+        """
+        delay = interval if first_delay is None else first_delay
+        return self.wheel.schedule(delay, lambda: self._fire(job, name, key), interval=interval, name=name)
+
+    def on_shutdown(self, job: Job):
+        """종료 시 (진행 중인 작업이 끝난 뒤) 실행할 정리 작업 (비동기 클라이언트 닫기 등)"""
+        self._shutdown_jobs.append(job)
+
+    async def _drive(self):
+        while True:
+            await asyncio.sleep(max(0.0, self.wheel.next_tick - time.monotonic()))
+            for handle in self.wheel.advance(time.monotonic()):
+                try:
+                    handle.callback()
+                except Exception as e:
+                    logger.error(f"Timer {handle.name} failed: {e}")
+
+    # ---------------------------------------------------------------- 시작/종료
+    async def run(self, main: Optional[Callable[["AsyncRuntime"], Awaitable[Any]]] = None):
+        """stop()이나 SIGINT/SIGTERM까지 실행. main(runtime)은 시작 직후 한 번 실행 (작업 등록 등)"""
+        self.loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        signals = []
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.loop.add_signal_handler(sig, self._stopped.set)
+                signals.append(sig)
+            except (NotImplementedError, RuntimeError, ValueError):  # 메인 스레드가 아니거나 지원하지 않는 플랫폼
+                pass
+
+        driver = asyncio.create_task(self._drive())
+        try:
+            if main is not None:
+                await main(self)
+            await self._stopped.wait()
+        finally:
+            logger.info(f"Shutting down runtime ({len(self._tasks)} tasks running)")
+            driver.cancel()
+            if self._tasks:
+                _, pending = await asyncio.wait(set(self._tasks), timeout=self.shutdown_grace)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+            for job in self._shutdown_jobs:
+                try:
+                    await job()
+                except Exception as e:
+                    logger.error(f"Shutdown job failed: {e}")
+            await self.http.close()
+            for sig in signals:
+                self.loop.remove_signal_handler(sig)
+            for executor in self.executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def start(self, main: Optional[Callable[["AsyncRuntime"], Awaitable[Any]]] = None):
+        asyncio.run(self.run(main))
+
+    def stop(self):
+        """어느 스레드에서나 호출 가능"""
+        if self.loop is not None and self._stopped is not None:
+            self.loop.call_soon_threadsafe(self._stopped.set)
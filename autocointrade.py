@@ -1,33 +1,45 @@
+import asyncio
 import os
 import threading
+import atexit
 import glob
 import openai
 from dotenv import load_dotenv
-import schedule
 import time
-import requests
 from datetime import datetime
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Tuple
 import pyupbit
-from openai import OpenAI
-import json
 from dataclasses import dataclass
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 import base64
-import sqlite3
 import pandas as pd
-from ta.trend import MACD, SMAIndicator, EMAIndicator
-from ta.momentum import RSIIndicator, StochasticOscillator
-from ta.volatility import BollingerBands, AverageTrueRange
-from ta.volume import OnBalanceVolumeIndicator, VolumeWeightedAveragePrice
 from logging.handlers import RotatingFileHandler
+from candle_store import CandleStore
+from database_manager import DatabaseManager
+from trade_journal import SYNCHRONOUS_MODES, TradeJournal
+from market_snapshot import CycleSnapshot, UpbitMarketCache, parse_markets
+from indicator_engine import IndicatorEngine, add_technical_indicators
+from market_summary import prepare_trading_summary
+from orderbook_analytics import limit_buy_amount, limit_sell_volume
+from order_slicer import ExecutionReport, OrderSlicer
+from paper_exchange import PaperExchange
+from decision_cache import DecisionCache
+from decision_backends import create_decision_backend
+from prompt_builder import PromptBuilder, PromptSection, token_summary
+from chart_capture import CHART_URL_TEMPLATE, ChartBrowserPool, chrome_driver_factory
+from chart_renderer import ChartRenderer, render_processes
+from http_client import CachedHttpClient
+from market_context import (FEAR_GREED_URL, GOOGLE_NEWS_RSS_URL, fetch_fear_greed_index,
+                            fetch_fear_greed_index_async, fetch_news_headlines, fetch_news_headlines_async)
+from image_pipeline import DebugImageWriter, ImagePipeline, image_data_url, parse_crop_box
+from collection_stage import CollectionStage
+from market_feed import MarketFeed, PriceChangeDetector, UPBIT_WEBSOCKET_URL
+from market_archive import MarketArchive
+from async_runtime import AsyncRuntime, AsyncUpbitQuotation, seconds_until
+from utils.tracing import configure as configure_tracing, traced, tracer
 
 # Load environment variables
 load_dotenv()
@@ -50,23 +62,81 @@ logger.addHandler(file_handler)
 def encode_image(image_path: str) -> str:
     """이미지 파일을 Base64로 인코딩"""
     with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode("utf-8")
+        return encode_image_bytes(image_file.read())
+
+def encode_image_bytes(image: bytes) -> str:
+    """메모리상의 이미지 바이트를 Base64로 인코딩"""
+    return base64.b64encode(image).decode("utf-8")
 
 @dataclass
 class TradingConfig:
+    MARKETS: str = os.getenv('MARKETS', 'KRW-BTC')  # 거래할 마켓 (쉼표로 구분, 마켓별 사이클이 동시에 실행됨)
     MINIMUM_ORDER_AMOUNT: float = 5000.0
     TRANSACTION_FEE: float = 0.0005
+    MAX_SLIPPAGE_BPS: float = float(os.getenv('MAX_SLIPPAGE_BPS', 30))  # 호가 기준 예상 슬리피지 한도 (중간가 대비 bps), 넘으면 주문 수량을 줄임. 0이면 사용 안 함
+    ORDER_SLICING: bool = os.getenv('ORDER_SLICING', 'true').lower() == 'true'  # 큰 주문을 지정가 자식 주문으로 나눠 실행
+    SLICE_MIN_KRW: float = float(os.getenv('SLICE_MIN_KRW', 50_000_000))  # 이 금액 이상인 주문만 분할 (미만은 시장가)
+    SLICE_COUNT: int = 5  # 분할 구간 수
+    SLICE_INTERVAL: float = 30.0  # 구간 길이 (초)
+    SLICE_POLL_INTERVAL: float = 2.0  # 체결 조회 주기 (초)
     TRADING_INTERVAL: int = 1  # 4시간에서 1시간으로 변경
-    SCHEDULE_CHECK_INTERVAL: int = 60  # 5분마다 체크
+    TIMER_WHEEL_TICK: float = 1.0  # 런타임 타이머 휠 틱 (초)
+    RUNTIME_IO_WORKERS: int = int(os.getenv('RUNTIME_IO_WORKERS', 16))  # REST/파일 등 블로킹 I/O 실행기 스레드 수
     CHART_LOAD_WAIT: int = 3  # 차트 로딩 대기 시간
     CHART_WIDTH: int = 800  # 차트 캡처 너비
     CHART_HEIGHT: int = 600  # 차트 캡처 높이
+    PRICE_CHANGE_THRESHOLD: float = 1.0  # 가격 변동 트리거 기준 (%)
+    PRICE_CHANGE_WINDOW: int = 60  # 가격 변동 감지 구간 (초)
+    MARKET_FEED_URL: str = os.getenv('MARKET_FEED_URL', UPBIT_WEBSOCKET_URL)
+    MARKET_ARCHIVE_DIR: str = os.getenv('MARKET_ARCHIVE_DIR', 'market_archive')  # 호가/시세 이력 저장 위치, 비우면 기록 안 함
+    MARKET_ARCHIVE_CHUNK_ROWS: int = 5000  # 세그먼트 파일당 행 수
+    MARKET_ARCHIVE_FLUSH_SECONDS: int = 60  # 행 수가 차지 않아도 저장하는 주기
+    CHART_SOURCE: str = os.getenv('CHART_SOURCE', 'renderer')  # renderer: 로컬 렌더링, browser: 업비트 스크린샷
+    CHART_INTERVAL: str = "minute3"  # 렌더링할 캔들 간격
+    CHART_CANDLES: int = 120  # 렌더링할 캔들 개수
+    # 차트 렌더링 프로세스 수 (0: 마켓 수만큼, CPU 코어 수 이하 / 1: 프로세스 풀 없이 현재 프로세스에서)
+    CHART_RENDER_PROCESSES: int = int(os.getenv('CHART_RENDER_PROCESSES', 0))
+    TRADING_DATA_TIMEOUT: int = 30  # 데이터 수집 소스별 타임아웃 (초)
+    CHART_TIMEOUT: int = 60
+    FEAR_GREED_TIMEOUT: int = 10
+    NEWS_TIMEOUT: int = 10
+    FEAR_GREED_URL: str = os.getenv('FEAR_GREED_URL', FEAR_GREED_URL)
+    NEWS_RSS_URL: str = os.getenv('NEWS_RSS_URL', GOOGLE_NEWS_RSS_URL)
+    FEAR_GREED_CACHE_TTL: int = 3600  # 하루 한 번 바뀌므로 1시간 캐시
+    NEWS_CACHE_TTL: int = 600
+    HTTP_STALE_TTL: int = 86400  # TTL이 지난 뒤 재검증하는 동안(또는 요청 실패 시) 이전 값을 쓰는 시간
+    CHART_POOL_SIZE: int = 1  # 유지할 차트 브라우저 세션 수
+    CHART_SESSION_MAX_AGE: int = 3600  # 세션 재생성 주기 (초)
+    CHART_SESSION_MAX_USES: int = 200  # 세션당 최대 스크린샷 횟수
+    CHART_IMAGE_FORMAT: str = os.getenv('CHART_IMAGE_FORMAT', 'webp')  # AI에 첨부할 차트 형식 (png/jpeg/webp)
+    CHART_IMAGE_QUALITY: int = 80
+    CHART_IMAGE_MAX_WIDTH: int = 768  # 첨부 전 이 크기 안으로 축소
+    CHART_IMAGE_MAX_HEIGHT: int = 768
+    CHART_IMAGE_CROP: str = os.getenv('CHART_IMAGE_CROP', '')  # 'left,top,right,bottom' (비우면 여백만 자동 제거)
     DB_PATH: str = "trading_data.db"
+    CANDLE_DB_PATH: str = "candles.db"  # 로컬 캔들 저장소
+    ACCOUNT_CACHE_TTL: float = 5.0  # 잔고/평균 매수가 캐시 유지 시간 (초)
+    QUOTE_CACHE_TTL: float = 1.0  # 현재가/호가 캐시 유지 시간 (초)
+    JOURNAL_DURABILITY: str = os.getenv('JOURNAL_DURABILITY', 'async')  # async: 백그라운드 기록, sync: 커밋까지 대기
+    JOURNAL_MAX_QUEUE: int = 1000
+    JOURNAL_BATCH_SIZE: int = 100
+    JOURNAL_FLUSH_INTERVAL: float = 0.5  # 초
+    DECISION_CACHE_TTL: float = float(os.getenv('DECISION_CACHE_TTL', 900))  # 같은 시장 상태의 AI 결정 재사용 시간 (초), 0이면 사용 안 함
+    DECISION_CACHE_SIZE: int = 128
+    DECISION_CACHE_PRICE_BUCKET: float = 0.5  # 같은 상태로 보는 가격 구간 (%)
+    TRACING_ENABLED: bool = os.getenv('TRACING_ENABLED', 'true').lower() == 'true'  # 단계별 지연 시간 히스토그램
+    METRICS_PORT: int = int(os.getenv('METRICS_PORT', 0))  # Prometheus 형식 /metrics 포트, 0이면 사용 안 함
+    METRICS_DUMP_INTERVAL: float = float(os.getenv('METRICS_DUMP_INTERVAL', 3600))  # 단계별 요약을 로그에 쓰는 주기 (초), 0이면 사용 안 함
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv('PROMPT_TOKEN_BUDGET', 1500))  # 결정 프롬프트 텍스트 토큰 예산 (이미지 제외)
     ENVIRONMENT: str = os.getenv('ENVIRONMENT', 'local')
     SIMULATION_MODE: bool = os.getenv('ENVIRONMENT', 'local').lower() != 'ec2'
+    PAPER_KRW_BALANCE: float = float(os.getenv('PAPER_KRW_BALANCE', 10_000_000))  # 시뮬레이션 모드 가상 계좌 시작 잔고
+    PAPER_STATE_PATH: str = os.getenv('PAPER_STATE_PATH', 'paper_account.json')  # 가상 계좌 저장 위치, 비우면 재시작 시 초기화
     UPBIT_ACCESS_KEY: str = os.getenv('UPBIT_ACCESS_KEY', '')
     UPBIT_SECRET_KEY: str = os.getenv('UPBIT_SECRET_KEY', '')
     OPENAI_API_KEY: str = os.getenv('OPENAI_API_KEY', '')
+    OPENAI_BASE_URL: str = os.getenv('OPENAI_BASE_URL', '')  # 비우면 OpenAI 기본 주소 (로컬 대체 서버: http://127.0.0.1:8800/v1)
+    DECISION_BACKEND: str = os.getenv('DECISION_BACKEND', 'openai')  # openai / rule
     SERPAPI_API_KEY: str = os.getenv('SERPAPI_API_KEY', '')
 
     # 디버깅 파일 관리 설정
@@ -98,155 +168,82 @@ def maintain_debug_directory(directory: str, config: TradingConfig):
     """
     디버깅 디렉토리의 파일을 정리하는 함수 (오래된 파일 삭제 + 파일 개수 제한).
     """
-    cleanup_old_files(directory, "*.png", days=config.DEBUG_FILE_RETENTION_DAYS)
-    limit_files_in_directory(directory, "*.png", max_files=config.DEBUG_FILE_MAX_COUNT)
-
-class DatabaseManager:
-    def __init__(self, db_path: str):
-        self.db_path = db_path
-        self._init_db()
-
-    def _init_db(self):
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS trades (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    -- 기본 정보
-                    decision TEXT,
-                    percentage REAL,
-                    reason TEXT,
-                    -- 잔고 정보
-                    btc_balance REAL,
-                    krw_balance REAL,
-                    btc_avg_buy_price REAL,
-                    btc_krw_price REAL,
-                    -- 분석 정보
-                    reflection TEXT,
-                    strategy_analysis TEXT,
-                    key_patterns TEXT,
-                    improvement_suggestions TEXT,
-                    -- 트리거 정보
-                    trigger_type TEXT,
-                    price_change_percent REAL,
-                    chart_path TEXT
-                )
-            """)
-            conn.commit()
-        finally:
-            conn.close()
-
-    def _get_connection(self) -> sqlite3.Connection:
-        """Create and return a database connection"""
-        sqlite3.register_adapter(datetime, lambda dt: dt.isoformat())
-        sqlite3.register_converter("timestamp", lambda val: datetime.fromisoformat(val.decode()))
-        return sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-
-    def get_latest_reflection(self) -> Dict[str, Any]:
-        """최근 거래에 대한 회고 데이터 가져오기"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT 
-                    strategy_analysis, 
-                    key_patterns, 
-                    improvement_suggestions
-                FROM trades
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """)
-            row = cursor.fetchone()
-            if row:
-                return {
-                    "strategy_analysis": row[0],
-                    "key_patterns": row[1],
-                    "improvement_suggestions": row[2]
-                }
-            return {}
-        except Exception as e:
-            logger.error(f"Error fetching latest reflection: {e}")
-            return {}
-        finally:
-            conn.close()
-
-    def log_trade(self, trade_data: Dict[str, Any]):
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO trades (
-                    timestamp, decision, percentage, reason,
-                    btc_balance, krw_balance, btc_avg_buy_price,
-                    btc_krw_price, reflection, 
-                    strategy_analysis, key_patterns, improvement_suggestions,
-                    trigger_type, price_change_percent,
-                    technical_indicators, market_conditions, trading_volume,
-                    fear_greed_data, news_sentiment, confidence_score, risk_assessment, chart_path
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                datetime.now(),
-                trade_data['decision'],
-                trade_data['percentage'],
-                trade_data['reason'],
-                trade_data['btc_balance'],
-                trade_data['krw_balance'],
-                trade_data['avg_buy_price'],
-                trade_data['current_price'],
-                trade_data['reflection'],
-                trade_data.get('strategy_analysis', ''),
-                trade_data.get('key_patterns', ''),
-                trade_data.get('improvement_suggestions', ''),
-                trade_data.get('trigger_type', 'schedule'),
-                trade_data.get('price_change_percent', 0.0),
-                json.dumps(trade_data.get('technical_indicators', {})),
-                json.dumps(trade_data.get('market_conditions', {})),
-                json.dumps(trade_data.get('trading_volume', {})),
-                json.dumps(trade_data.get('fear_greed_data', {})),
-                json.dumps(trade_data.get('news_sentiment', {})),
-                trade_data.get('confidence', 0),
-                trade_data.get('risk_level', ''),
-                trade_data.get('chart_path', '')
-            ))
-            conn.commit()
-        except Exception as e:
-            logger.error(f"Error logging trade: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
-
-
-    def get_recent_trades(self, limit: int = 5) -> List[tuple]:
-        """Get recent trades from database"""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT 
-                    timestamp, 
-                    decision, 
-                    percentage, 
-                    btc_krw_price
-                FROM trades 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            """, (limit,))
-            return cursor.fetchall()
-        finally:
-            conn.close()
+    cleanup_old_files(directory, "chart_screenshot_*", days=config.DEBUG_FILE_RETENTION_DAYS)
+    limit_files_in_directory(directory, "chart_screenshot_*", max_files=config.DEBUG_FILE_MAX_COUNT)
 
 
 class TradingBot:
-    def __init__(self, config: TradingConfig):
+    def __init__(self, config: TradingConfig, runtime: Optional[AsyncRuntime] = None):
         self.config = config
-        self.db_manager = DatabaseManager(config.DB_PATH)
-        self.upbit = pyupbit.Upbit(config.UPBIT_ACCESS_KEY, config.UPBIT_SECRET_KEY)
-        self.openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
+        self.markets = parse_markets(config.MARKETS)
+        # runtime이 있으면 사이클을 이벤트 루프에서 실행 (없으면 기존 스레드 방식)
+        self.runtime = runtime
+        self.quotation = AsyncUpbitQuotation(runtime.http) if runtime else None
+        self.db_manager = DatabaseManager(config.DB_PATH,
+                                          synchronous=SYNCHRONOUS_MODES.get(config.JOURNAL_DURABILITY, "NORMAL"))
+        self.trade_journal = TradeJournal(
+            self.db_manager,
+            durability=config.JOURNAL_DURABILITY,
+            max_queue=config.JOURNAL_MAX_QUEUE,
+            batch_size=config.JOURNAL_BATCH_SIZE,
+            flush_interval=config.JOURNAL_FLUSH_INTERVAL
+        )
+        atexit.register(self.trade_journal.close)
+        self.candle_store = CandleStore(config.CANDLE_DB_PATH)
+        self.indicator_engine = IndicatorEngine()
+        # 시뮬레이션 모드에서는 최신 호가로 체결하는 가상 계좌를 같은 인터페이스로 사용
+        self.paper_exchange = None
+        if config.SIMULATION_MODE:
+            self.paper_exchange = PaperExchange(lambda ticker: self.market_cache.get_orderbook(ticker),
+                                                fee=config.TRANSACTION_FEE, quote_ttl=config.QUOTE_CACHE_TTL)
+            if config.PAPER_STATE_PATH:
+                self.paper_exchange.load(config.PAPER_STATE_PATH)
+            self.upbit = self.paper_exchange.account("local", krw=config.PAPER_KRW_BALANCE)
+        else:
+            self.upbit = pyupbit.Upbit(config.UPBIT_ACCESS_KEY, config.UPBIT_SECRET_KEY)
+        self.market_cache = UpbitMarketCache(
+            self.upbit, account_ttl=config.ACCOUNT_CACHE_TTL, quote_ttl=config.QUOTE_CACHE_TTL
+        )
+        # 결정/회고 백엔드 (openai: OpenAI 또는 OPENAI_BASE_URL의 호환 서버, rule: 지표 규칙 기반 오프라인)
+        self.decision_backend = create_decision_backend(
+            config.DECISION_BACKEND, api_key=config.OPENAI_API_KEY, base_url=config.OPENAI_BASE_URL
+        )
+        atexit.register(self.decision_backend.close)
+        self.prompt_builder = PromptBuilder(config.PROMPT_TOKEN_BUDGET)
+        # SLICE_MIN_KRW 이상인 주문은 지정가 자식 주문으로 나눠 백그라운드에서 실행
+        self.order_slicer = None
+        if config.ORDER_SLICING:
+            self.order_slicer = OrderSlicer(
+                self.upbit, self.market_cache.get_orderbook,
+                slices=config.SLICE_COUNT, interval=config.SLICE_INTERVAL,
+                poll_interval=config.SLICE_POLL_INTERVAL, max_slippage_bps=config.MAX_SLIPPAGE_BPS,
+                min_order_krw=config.MINIMUM_ORDER_AMOUNT, fee=config.TRANSACTION_FEE
+            )
+            atexit.register(self.order_slicer.shutdown, False)
+        # 분할 주문이 진행 중인 마켓 (끝날 때까지 그 마켓의 새 주문은 내지 않음)
+        self._sliced_markets: set = set()
+        self._sliced_lock = threading.Lock()
+        # 모든 마켓이 한 계좌의 KRW를 쓰므로 잔고 조회부터 주문까지를 마켓 간에 직렬화
+        self._account_lock = threading.Lock()
+        # 뉴스/공포탐욕지수는 조건부 GET + TTL 캐시 (만료 후에도 백그라운드 재검증 동안 이전 값 사용)
+        self.http_client = CachedHttpClient()
+        atexit.register(self.http_client.close)
 
         self.price_monitor_thread = None
         self.stop_monitoring = False
+        self.market_feed = None
+        # 시세 피드의 모든 ticker/호가 메시지를 날짜별 컬럼형 파일로 기록
+        self.market_archive = None
+        if config.MARKET_ARCHIVE_DIR:
+            self.market_archive = MarketArchive(
+                config.MARKET_ARCHIVE_DIR,
+                chunk_rows=config.MARKET_ARCHIVE_CHUNK_ROWS,
+                flush_interval=config.MARKET_ARCHIVE_FLUSH_SECONDS
+            )
+            atexit.register(self.market_archive.close)
+        # 마켓별 가격 변동 감지 상태와 가격 트리거 사이클 잠금
+        self.price_detectors: Dict[str, PriceChangeDetector] = {}
+        self._price_cycle_locks = {market: threading.Lock() for market in self.markets}
 
         # Define debug directory
         if self.config.ENVIRONMENT == 'EC2':
@@ -255,52 +252,119 @@ class TradingBot:
             self.debug_dir = os.path.join(os.path.expanduser("~"), "bitcoin_chart_debug")
         os.makedirs(self.debug_dir, exist_ok=True)
 
+        # 차트는 메모리에서 축소/재인코딩해 바로 첨부하고, 디버깅 사본은 백그라운드에서 저장
+        self.image_pipeline = ImagePipeline(
+            max_width=config.CHART_IMAGE_MAX_WIDTH,
+            max_height=config.CHART_IMAGE_MAX_HEIGHT,
+            image_format=config.CHART_IMAGE_FORMAT,
+            quality=config.CHART_IMAGE_QUALITY,
+            crop=parse_crop_box(config.CHART_IMAGE_CROP)
+        )
+        self.debug_writer = DebugImageWriter(
+            self.debug_dir, maintain=lambda: maintain_debug_directory(self.debug_dir, config)
+        )
+        atexit.register(self.debug_writer.close)
+        self.last_chart_paths: Dict[str, str] = {}
+
+        # 마켓별로 차트 페이지를 띄워 둔 브라우저 세션 풀 (첫 캡처 시 생성)
+        driver_factory = chrome_driver_factory(config.ENVIRONMENT, config.CHART_WIDTH, config.CHART_HEIGHT)
+        self.chart_pools: Dict[str, ChartBrowserPool] = {}
+        for index, market in enumerate(self.markets):
+            self.chart_pools[market] = ChartBrowserPool(
+                # 풀마다 슬롯 번호(디버깅 포트)가 겹치지 않게 함
+                lambda slot, base=index * config.CHART_POOL_SIZE: driver_factory(base + slot),
+                prepare_page=self.prepare_chart_page,
+                url=CHART_URL_TEMPLATE.format(market=market),
+                size=config.CHART_POOL_SIZE,
+                load_wait=config.CHART_LOAD_WAIT,
+                max_age=config.CHART_SESSION_MAX_AGE,
+                max_uses=config.CHART_SESSION_MAX_USES
+            )
+            atexit.register(self.chart_pools[market].close)
+        # 마켓별 사이클이 동시에 차트를 그리도록 렌더링은 프로세스 풀에서 (GIL/Agg 잠금을 공유하지 않음)
+        self.chart_renderer = ChartRenderer(
+            config.CHART_WIDTH, config.CHART_HEIGHT, candles=config.CHART_CANDLES,
+            processes=render_processes(config.CHART_RENDER_PROCESSES, len(self.markets))
+        )
+        atexit.register(self.chart_renderer.close)
+        self.collection_stage = CollectionStage()
+
+        # 시장 상태가 거의 같으면 AI 결정을 재사용 (가격 트리거가 정기 사이클 직후 다시 실행되는 경우 등)
+        self.decision_cache = DecisionCache(
+            max_entries=config.DECISION_CACHE_SIZE,
+            ttl=config.DECISION_CACHE_TTL,
+            price_bucket_percent=config.DECISION_CACHE_PRICE_BUCKET
+        )
+
     def start_price_monitoring(self):
-        def monitor_price():
+        """WebSocket 시세 피드로 모든 마켓의 가격을 실시간 감시하고, 급격한 변동이 생기면 그 마켓의 거래 사이클 실행"""
+        self.price_detectors = {
+            market: PriceChangeDetector(
+                threshold=self.config.PRICE_CHANGE_THRESHOLD,
+                window=self.config.PRICE_CHANGE_WINDOW
+            )
+            for market in self.markets
+        }
+        types = ("ticker", "orderbook") if self.market_archive else ("ticker",)
+        self.market_feed = MarketFeed(self.markets, url=self.config.MARKET_FEED_URL, types=types)
+        self.market_feed.add_listener(self.on_market_update)
+        if self.market_archive:
+            self.market_feed.add_listener(self.market_archive)
+        self.market_feed.start()
+        self.stop_monitoring = False
+        logger.info("Price monitoring started.")
+
+    def stop_price_monitoring(self):
+        self.stop_monitoring = True
+        if self.market_feed is not None:
+            self.market_feed.stop()
+        if self.market_archive is not None:
+            self.market_archive.flush(wait=False)
+
+    def on_market_update(self, message_type: str, market: str, message: Dict[str, Any]):
+        """피드 스레드에서 호출됨. 무거운 작업은 이벤트 루프(runtime이 없으면 별도 스레드)에서 실행"""
+        if message_type == "orderbook":
+            # 주문 크기 조정이 REST 조회 없이 최신 호가를 쓰도록 캐시 갱신
+            self.market_cache.update_orderbook(market, message)
+            return
+        current_price = message.get("trade_price")
+        if self.stop_monitoring or message_type != "ticker" or current_price is None:
+            return
+        self.market_cache.update_price(market, current_price)
+
+        detector = self.price_detectors.get(market)
+        detected = detector.update(current_price) if detector else None
+        if detected is None:
+            return
+
+        change_percent, previous_price = detected
+        logger.info(f"[{market}] Significant price change detected: {change_percent:.2f}%")
+
+        price_data = {
+            "price_change_percent": change_percent,
+            "previous_price": previous_price,
+            "current_price": current_price
+        }
+        if self.runtime is not None:
+            # 이벤트 루프로 넘김 (정기 사이클이 실행 중이면 새로 실행하지 않고 그 결과를 함께 기다림)
+            self.runtime.submit_threadsafe(lambda: self.run_cycle("price_change", price_data, market=market),
+                                           name=f"price_change_cycle {market}")
+            return
+
+        # 이미 이 마켓의 가격 변동 사이클이 실행 중이면 중복 실행하지 않음
+        lock = self._price_cycle_locks[market]
+        if not lock.acquire(blocking=False):
+            logger.info(f"[{market}] Price-triggered cycle already running, skipping.")
+            return
+
+        def run_cycle():
             try:
-                # 초기 가격 설정
-                last_price = pyupbit.get_current_price("KRW-BTC")
-                if last_price is None:
-                    logger.error("Failed to get initial price")
-                    return
-
-                logger.info(f"Price monitoring started. Initial price: {last_price}")
-
-                while not self.stop_monitoring:
-                    try:
-                        time.sleep(60)  # 1분 대기 후 가격 체크
-
-                        current_price = pyupbit.get_current_price("KRW-BTC")
-                        if current_price is None:
-                            logger.error("Failed to get current price")
-                            continue
-
-                        change_percent = abs((current_price - last_price) / last_price * 100)
-
-                        if change_percent > 1.0:  # 3% 이상 변동
-                            logger.info(f"Significant price change detected: {change_percent}%")
-                            self.trading_cycle(
-                                trigger="price_change",
-                                additional_data={
-                                    "price_change_percent": change_percent,
-                                    "previous_price": last_price,
-                                    "current_price": current_price
-                                }
-                            )
-
-                        last_price = current_price
-
-                    except Exception as e:
-                        logger.error(f"Price monitoring error: {e}")
-                        time.sleep(60)  # 에러 발생 시 1분 대기
+                self.trading_cycle(trigger="price_change", additional_data=price_data, market=market)
+            finally:
+                lock.release()
 
-            except Exception as e:
-                logger.error(f"Initial price fetch error: {e}")
-                return
-
-            self.price_monitor_thread = threading.Thread(target=monitor_price)
-            self.price_monitor_thread.daemon = True
-            self.price_monitor_thread.start()
+        self.price_monitor_thread = threading.Thread(target=run_cycle, daemon=True)
+        self.price_monitor_thread.start()
 
     def calculate_trade_result(self, trade: tuple, current_status: Dict[str, Any]) -> str:
         """거래 결과 계산
@@ -332,50 +396,7 @@ class TradingBot:
 
     def add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add technical indicators to dataframe"""
-        # 기본 지표들
-        bb = BollingerBands(close=df['close'])
-        macd = MACD(close=df['close'])
-        rsi = RSIIndicator(close=df['close'])
-        stoch = StochasticOscillator(high=df['high'], low=df['low'], close=df['close'])
-        atr = AverageTrueRange(high=df['high'], low=df['low'], close=df['close'])
-        obv = OnBalanceVolumeIndicator(close=df['close'], volume=df['volume'])
-        vwap = VolumeWeightedAveragePrice(high=df['high'], low=df['low'], close=df['close'],
-                                          volume=df['volume'])
-
-        # 이동평균선
-        df['ma5'] = SMAIndicator(close=df['close'], window=5).sma_indicator()
-        df['ma20'] = SMAIndicator(close=df['close'], window=20).sma_indicator()
-        df['ma60'] = SMAIndicator(close=df['close'], window=60).sma_indicator()
-        df['ma120'] = SMAIndicator(close=df['close'], window=120).sma_indicator()
-
-        # 볼린저 밴드
-        df['bb_upper'] = bb.bollinger_hband()
-        df['bb_middle'] = bb.bollinger_mavg()
-        df['bb_lower'] = bb.bollinger_lband()
-        df['bb_width'] = bb.bollinger_wband()
-
-        # MACD
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_diff'] = macd.macd_diff()
-
-        # RSI
-        df['rsi'] = rsi.rsi()
-
-        # Stochastic
-        df['stoch_k'] = stoch.stoch()
-        df['stoch_d'] = stoch.stoch_signal()
-
-        # ATR
-        df['atr'] = atr.average_true_range()
-
-        # OBV
-        df['obv'] = obv.on_balance_volume()
-
-        # VWAP
-        df['vwap'] = vwap.volume_weighted_average_price()
-
-        return df
+        return add_technical_indicators(df)
 
     def click_option_with_scroll(self, driver, menu_xpath: str, option_xpath: str, wait_time: int = 10):
         """
@@ -434,167 +455,108 @@ class TradingBot:
         option_xpath = "/html/body/div[1]/div[2]/div[3]/span/div/div/div[1]/div/div/cq-menu[1]/cq-menu-dropdown/cq-item[3]"
         return self.click_option_with_scroll(driver, menu_xpath, option_xpath)
 
-    def capture_chart(self) -> Optional[str]:
-        """Capture and encode chart image based on environment"""
-        if self.config.ENVIRONMENT == 'EC2':
-            chrome_options = Options()
-            chrome_options.add_argument('--headless=new')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--remote-debugging-port=9222')
-            chrome_options.add_argument('--disable-software-rasterizer')
-            chrome_options.add_argument(f"--window-size={self.config.CHART_WIDTH},{self.config.CHART_HEIGHT}")
-
-            chromedriver_path = "/home/ubuntu/.wdm/drivers/chromedriver/linux64/128.0.6613.137/chromedriver-linux64/chromedriver"
-            service = Service(executable_path=chromedriver_path)
-        else:
-            chrome_options = Options()
-            chrome_options.add_argument("--start-maximized")
-            chrome_options.add_argument("--disable-infobars")
-            chrome_options.add_argument("--disable-extensions")
-            chrome_options.add_argument(f"--window-size={self.config.CHART_WIDTH},{self.config.CHART_HEIGHT}")
-            service = Service(ChromeDriverManager().install())
-
-        try:
-            # Chrome 버전에 맞는 WebDriver 설정
-            driver = webdriver.Chrome(service=service, options=chrome_options)
+    def prepare_chart_page(self, driver):
+        """차트 세션 생성 시 한 번만 실행되는 페이지 설정 (3분봉, 볼린저 밴드)"""
+        # 3분 간격 설정
+        if not self.select_3min_interval(driver):
+            logger.error("Failed to select 3-minute interval.")
 
-            # 웹 페이지 로드 타임아웃 설정
-            driver.set_page_load_timeout(10)  # 30초 타임아웃
-            driver.get("https://upbit.com/full_chart?code=CRIX.UPBIT.KRW-BTC")
+        # 볼린저 밴드 설정
+        if not self.select_bollinger_band(driver):
+            logger.error("Failed to select Bollinger Band.")
 
-            # 명시적 대기 사용
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-
-            time.sleep(self.config.CHART_LOAD_WAIT)
-
-            # 3분 간격 설정
-            if not self.select_3min_interval(driver):
-                logger.error("Failed to select 3-minute interval.")
-
-            # 볼린저 밴드 설정
-            if not self.select_bollinger_band(driver):
-                logger.error("Failed to select Bollinger Band.")
+    def render_chart(self, market: str = "KRW-BTC") -> Optional[bytes]:
+        """로컬 캔들 데이터로 차트 PNG 렌더링 (브라우저/네트워크 없음)"""
+        df = self.candle_store.get_ohlcv(market, interval=self.config.CHART_INTERVAL, count=200)
+        if df is None or df.empty:
+            return None
+        df = self.indicator_engine.apply((market, self.config.CHART_INTERVAL), df)
+        return self.chart_renderer.render(df, title=f"{market} {self.config.CHART_INTERVAL}")
 
-            # 스크린샷 저장 (디버깅 목적)
-            if self.config.ENVIRONMENT == 'EC2':
-                debug_dir = "/home/ubuntu/bitcoin_chart_debug"
+    @traced()
+    def capture_chart(self, market: str = "KRW-BTC") -> Optional[str]:
+        """Capture and encode chart image based on environment"""
+        try:
+            if self.config.CHART_SOURCE == 'browser':
+                # 미리 띄워 둔 브라우저 세션에서 스크린샷만 가져옴
+                screenshot = self.chart_pools[market].screenshot()
             else:
-                debug_dir = os.path.join(os.path.expanduser("~"), "bitcoin_chart_debug")
-
-            os.makedirs(debug_dir, exist_ok=True)
+                screenshot = self.render_chart(market)
+            if screenshot is None:
+                logger.error("Failed to take chart screenshot.")
+                return None
 
-            # 디버깅 디렉토리 정리
-            maintain_debug_directory(self.debug_dir, self.config)
+            image = self.image_pipeline.process(screenshot)
+            logger.info(f"Chart image: {image.summary()}")
 
-            # 타임스탬프 포함 파일명
+            # 첨부한 이미지 그대로 디버깅 사본 저장 (비동기, 오래된 파일 정리도 백그라운드에서)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_path = os.path.join(debug_dir, f"chart_screenshot_{timestamp}.png")
-
-            # 스크린샷 저장
-            driver.save_screenshot(screenshot_path)
-            logger.info(f"Screenshot saved to {screenshot_path}")
-
-            # Base64로 인코딩
-            encoded_image = encode_image(screenshot_path)
+            self.last_chart_paths[market] = self.debug_writer.submit(
+                f"chart_screenshot_{market}_{timestamp}.{image.extension}", image.data
+            )
 
-            # 디버깅 로그 추가
-            logger.info(f"Screenshot saved to {screenshot_path}")
-            return encoded_image
+            return image.base64()
         except Exception as e:
             logger.error(f"Error capturing chart: {e}")
             return None
-        finally:
-            driver.quit()
 
+    @traced()
     def fetch_fear_greed_index(self) -> Optional[Dict[str, Any]]:
         """Fetch Fear and Greed Index data"""
-        url = "https://api.alternative.me/fng/"
-        params = {
-            "limit": 1,
-            "format": "json"
-        }
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            if "data" in data and len(data["data"]) > 0:
-                return {
-                    "value": int(data["data"][0]["value"]),
-                    "classification": data["data"][0]["value_classification"]
-                }
-        except Exception as e:
-            logger.error(f"Error fetching Fear and Greed Index: {e}")
-            return None
+        return fetch_fear_greed_index(
+            self.http_client, self.config.FEAR_GREED_URL, ttl=self.config.FEAR_GREED_CACHE_TTL,
+            stale_ttl=self.config.HTTP_STALE_TTL, timeout=self.config.FEAR_GREED_TIMEOUT
+        )
 
+    @traced()
     def fetch_google_news(self) -> List[Dict[str, str]]:
         """Fetch the latest BTC news headlines from Google News RSS"""
-        rss_url = "https://news.google.com/rss/search?q=btc+when:1d&hl=en-US&gl=US&ceid=US:en"
-
-        try:
-            import feedparser
-            feed = feedparser.parse(rss_url)
-
-            # 최신 뉴스 5개만 추출
-            news_results = []
-            for entry in feed.entries[:5]:
-                news_results.append({
-                    "title": entry.title,
-                    "date": entry.published
-                })
-
-            return news_results
-        except Exception as e:
-            logger.error(f"Error fetching Google News: {e}")
-            return []
-
-    def get_trading_data(self) -> Dict[str, Any]:
+        return fetch_news_headlines(
+            self.http_client, self.config.NEWS_RSS_URL, ttl=self.config.NEWS_CACHE_TTL,
+            stale_ttl=self.config.HTTP_STALE_TTL, timeout=self.config.NEWS_TIMEOUT
+        )
+
+    @traced("fetch_fear_greed_index")
+    async def fetch_fear_greed_index_async(self) -> Optional[Dict[str, Any]]:
+        """fetch_fear_greed_index의 asyncio 버전 (캐시는 공유, 요청은 runtime의 비동기 HTTP 클라이언트)"""
+        return await fetch_fear_greed_index_async(
+            self.http_client, self.runtime.http, self.config.FEAR_GREED_URL, ttl=self.config.FEAR_GREED_CACHE_TTL,
+            stale_ttl=self.config.HTTP_STALE_TTL, timeout=self.config.FEAR_GREED_TIMEOUT
+        )
+
+    @traced("fetch_google_news")
+    async def fetch_google_news_async(self) -> List[Dict[str, str]]:
+        """fetch_google_news의 asyncio 버전"""
+        return await fetch_news_headlines_async(
+            self.http_client, self.runtime.http, self.config.NEWS_RSS_URL, ttl=self.config.NEWS_CACHE_TTL,
+            stale_ttl=self.config.HTTP_STALE_TTL, timeout=self.config.NEWS_TIMEOUT
+        )
+
+    @traced()
+    def get_trading_data(self, market: str = "KRW-BTC") -> Dict[str, Any]:
         """Collect all trading-related data"""
         try:
-            # 현재 상태 조회
-            krw_balance = self.upbit.get_balance("KRW")
-            btc_balance = self.upbit.get_balance("KRW-BTC")
-            avg_buy_price = self.upbit.get_avg_buy_price("KRW-BTC")
-            current_price = pyupbit.get_current_price("KRW-BTC")
-
-            # 총 자산 계산
-            total_assets = krw_balance + (btc_balance * current_price)
-            btc_ratio = (btc_balance * current_price) / total_assets if total_assets > 0 else 0
-
-            # 수익률 계산
-            profit_loss = ((current_price - avg_buy_price) / avg_buy_price * 100) if avg_buy_price > 0 else 0
-
-            # Get basic trading data
-            investment_status = {
-                "krw_balance": krw_balance,
-                "btc_balance": btc_balance,
-                "avg_buy_price": avg_buy_price,
-                "current_price": current_price,
-                "total_assets": total_assets,
-                "btc_ratio": btc_ratio,
-                "profit_loss": profit_loss
-            }
+            # 현재 상태 조회 (잔고/평균 매수가는 계좌 조회 한 번으로 캐시)
+            investment_status = self.market_cache.investment_status(market)
 
             # Get orderbook data
-            orderbook = pyupbit.get_orderbook("KRW-BTC")
+            orderbook = self.market_cache.get_orderbook(market)
 
-            # Get and process chart data
-            daily_data = pyupbit.get_ohlcv("KRW-BTC", count=200, interval="day")
-            hourly_data = pyupbit.get_ohlcv("KRW-BTC", interval="minute60", count=200)
+            # Get and process chart data (로컬 캔들 저장소에서 새 캔들만 동기화)
+            daily_data = self.candle_store.get_ohlcv(market, interval="day", count=200)
+            hourly_data = self.candle_store.get_ohlcv(market, interval="minute60", count=200)
 
             if daily_data is not None and hourly_data is not None:
                 # Convert column names to lowercase
                 daily_data.columns = [col.lower() for col in daily_data.columns]
                 hourly_data.columns = [col.lower() for col in hourly_data.columns]
 
-                # Add technical indicators
-                daily_data = self.add_technical_indicators(daily_data)
-                hourly_data = self.add_technical_indicators(hourly_data)
+                # Add technical indicators (새 캔들만 증분 계산)
+                daily_data = self.indicator_engine.apply((market, "day"), daily_data)
+                hourly_data = self.indicator_engine.apply((market, "minute60"), hourly_data)
 
                 return {
+                    "market": market,
                     "investment_status": investment_status,
                     "orderbook": orderbook,
                     "daily_data": daily_data.tail(30).to_dict('records'),
@@ -619,6 +581,7 @@ class TradingBot:
                     }
                 }
             return {
+                "market": market,
                 "investment_status": investment_status,
                 "orderbook": orderbook,
                 "daily_data": [],
@@ -628,82 +591,144 @@ class TradingBot:
             logger.error(f"Error getting trading data: {e}")
             return {}
 
-    def execute_trade(self, decision: Dict[str, Any]) -> bool:
-        """Execute trade based on AI decision"""
+    @traced()
+    def execute_trade(self, decision: Dict[str, Any], market: str = "KRW-BTC",
+                      on_sliced: Optional[Callable[[ExecutionReport], None]] = None) -> bool:
+        """
+        Execute trade based on AI decision
+
+        Args:
+            on_sliced: 분할 주문이 끝나면 보고서로 호출 (실행 스레드에서)
+
+        Returns:
+            바로 체결한 주문이면 True. 분할 주문은 제출만 하고 False를 반환하며 결과는 on_sliced로 전달
+        """
         try:
-            if self.config.SIMULATION_MODE:
-                logger.info(f"[Simulation Mode] {decision['decision']} trade would be executed: {decision['percentage']}%")
-                return True  # 시뮬레이션 모드에서는 항상 성공으로 처리
-
-            if decision["decision"] == "buy":
-                return self._execute_buy(decision["percentage"])
-            elif decision["decision"] == "sell":
-                return self._execute_sell(decision["percentage"])
-            return True  # Hold position
+            if decision["decision"] in ("buy", "sell") and self.sliced_order_running(market):
+                logger.warning(f"[{market}] Sliced order still running, skipping {decision['decision']} decision")
+                return False
+
+            if self.config.SIMULATION_MODE and decision["decision"] in ("buy", "sell"):
+                logger.info(f"[Simulation Mode] {decision['decision']} {decision['percentage']}% of {market} on the paper account")
+
+            if decision["decision"] not in ("buy", "sell"):
+                return True  # Hold position
+
+            with self._account_lock:
+                # 다른 마켓의 주문이 방금 잔고를 바꿨을 수 있으므로 캐시된 계좌 대신 새로 조회
+                self.market_cache.invalidate_account()
+                if decision["decision"] == "buy":
+                    executed = self._execute_buy(decision["percentage"], market, on_sliced)
+                else:
+                    executed = self._execute_sell(decision["percentage"], market, on_sliced)
+            self._save_paper_account()
+            return executed
         except Exception as e:
             logger.error(f"Error executing trade: {e}")
             return False
 
-    def _execute_buy(self, percentage: float) -> bool:
-        """Execute buy order"""
-        krw_balance = self.upbit.get_balance("KRW")
+    def _save_paper_account(self):
+        if self.paper_exchange is not None and self.config.PAPER_STATE_PATH:
+            try:
+                self.paper_exchange.save(self.config.PAPER_STATE_PATH)
+            except OSError as e:
+                logger.error(f"Error saving paper account: {e}")
+
+    def _reserved_krw(self) -> float:
+        """
+        진행 중인 분할 매수가 아직 쓰지 않은 KRW (다음 구간에서 주문할 금액).
+        열려 있는 자식 주문 금액은 거래소 잔고에서도 빠져 있으므로 겹쳐 빼게 되지만, 잔고를 넘겨 주문하지는 않음
+        """
+        if not self.order_slicer:
+            return 0.0
+        return sum(max(report.remaining, 0.0) for report in self.order_slicer.running() if report.side == "buy")
+
+    def sliced_order_running(self, market: str) -> bool:
+        with self._sliced_lock:
+            return market in self._sliced_markets
+
+    def _submit_sliced(self, market: str, side: str, amount: float,
+                       on_sliced: Optional[Callable[[ExecutionReport], None]]) -> bool:
+        """분할 주문 제출. 체결이 끝나야 기록할 수 있으므로 항상 False"""
+        with self._sliced_lock:
+            if market in self._sliced_markets:
+                logger.warning(f"[{market}] Sliced order still running, skipping {side}")
+                return False
+            self._sliced_markets.add(market)
+            try:
+                self.order_slicer.submit(market, side, amount,
+                                         on_complete=lambda report: self._on_sliced_execution(report, on_sliced))
+            except Exception:
+                self._sliced_markets.discard(market)
+                raise
+        logger.info(f"[{market}] Sliced {side} order submitted, it will be logged when it finishes")
+        return False
+
+    def _execute_buy(self, percentage: float, market: str = "KRW-BTC",
+                     on_sliced: Optional[Callable[[ExecutionReport], None]] = None) -> bool:
+        """Execute buy order (execute_trade가 _account_lock을 잡은 상태에서 호출)"""
+        krw_balance = max(self.market_cache.get_balance("KRW") - self._reserved_krw(), 0.0)
         amount = krw_balance * (percentage / 100) * (1 - self.config.TRANSACTION_FEE)
+        if self.order_slicer and amount >= self.config.SLICE_MIN_KRW:
+            return self._submit_sliced(market, "buy", amount, on_sliced)
+        # 호가가 얇아 예상 슬리피지가 한도를 넘으면 주문 금액을 줄임
+        amount = limit_buy_amount(self.market_cache.get_orderbook(market), amount, self.config.MAX_SLIPPAGE_BPS)
 
         if amount < self.config.MINIMUM_ORDER_AMOUNT:
             logger.warning("Insufficient funds for buy order")
             return False
 
-        result = self.upbit.buy_market_order("KRW-BTC", amount)
+        result = self.upbit.buy_market_order(market, amount)
+        self.market_cache.invalidate_account()
         return bool(result)
 
-    def _execute_sell(self, percentage: float) -> bool:
+    def _execute_sell(self, percentage: float, market: str = "KRW-BTC",
+                      on_sliced: Optional[Callable[[ExecutionReport], None]] = None) -> bool:
         """Execute sell order"""
-        btc_balance = self.upbit.get_balance("KRW-BTC")
-        amount = btc_balance * (percentage / 100)
-
-        if amount * pyupbit.get_current_price("KRW-BTC") < self.config.MINIMUM_ORDER_AMOUNT:
-            logger.warning("Insufficient BTC for sell order")
+        balance = self.market_cache.get_balance(market)
+        amount = balance * (percentage / 100)
+        if self.order_slicer and amount * self.market_cache.get_current_price(market) >= self.config.SLICE_MIN_KRW:
+            return self._submit_sliced(market, "sell", amount, on_sliced)
+        amount = limit_sell_volume(self.market_cache.get_orderbook(market), amount, self.config.MAX_SLIPPAGE_BPS)
+
+        if amount * self.market_cache.get_current_price(market) < self.config.MINIMUM_ORDER_AMOUNT:
+            logger.warning(f"Insufficient {market} balance for sell order")
             return False
 
-        result = self.upbit.sell_market_order("KRW-BTC", amount)
+        result = self.upbit.sell_market_order(market, amount)
+        self.market_cache.invalidate_account()
         return bool(result)
 
-    def prepare_trading_summary(self, trading_data: Dict[str, Any]) -> Dict[str, str]:
-        """Prepare concise trading summary for AI"""
+    def _on_sliced_execution(self, report: ExecutionReport,
+                             on_sliced: Optional[Callable[[ExecutionReport], None]] = None):
+        """분할 주문이 끝나면 (실행 스레드에서) 계좌 캐시를 비우고 결과를 기록"""
+        self.market_cache.invalidate_account()
+        self._save_paper_account()
+        logger.info(f"Sliced order finished: {report.summary()}")
+        if report.state != "done":
+            # 남은 수량은 다시 내지 않음 (다음 사이클이 갱신된 잔고로 다시 판단)
+            logger.warning(f"[{report.market}] Sliced order {report.state}, "
+                           f"{1 - report.fill_ratio:.1%} of the requested amount was not filled")
         try:
-            orderbook = trading_data.get('orderbook', {}).get('orderbook_units', [])
-            market_depth = {
-                'bid_total': sum(item['bid_size'] for item in orderbook[:5]) if orderbook else 0,
-                'ask_total': sum(item['ask_size'] for item in orderbook[:5]) if orderbook else 0
-            }
+            if on_sliced is not None:
+                on_sliced(report)
+        finally:
+            with self._sliced_lock:
+                self._sliced_markets.discard(report.market)
 
-            return {
-                "market_status": (
-                    f"Current BTC Price: {trading_data['investment_status']['current_price']:,.0f} KRW\n"
-                    f"Position: {trading_data['investment_status']['btc_balance']:.8f} BTC\n"
-                    f"Average Buy Price: {trading_data['investment_status']['avg_buy_price']:,.0f} KRW\n"
-                ),
-                "technical_analysis": (
-                    f"Daily RSI: {trading_data['technical_summary']['daily']['rsi']:.2f}\n"
-                    f"Daily MACD: {trading_data['technical_summary']['daily']['macd']:.2f}\n"
-                    f"Hourly RSI: {trading_data['technical_summary']['hourly']['rsi']:.2f}\n"
-                    f"Hourly MACD: {trading_data['technical_summary']['hourly']['macd']:.2f}\n"
-                ),
-                "market_depth": (
-                    f"Buy Pressure: {market_depth['bid_total']:.2f} BTC\n"
-                    f"Sell Pressure: {market_depth['ask_total']:.2f} BTC\n"
-                )
-            }
-        except KeyError as e:
-            logger.error(f"Error preparing trading summary: {e}")
-            return {}
+    def prepare_trading_summary(self, trading_data: Dict[str, Any]) -> Dict[str, str]:
+        """Prepare concise trading summary for AI"""
+        return prepare_trading_summary(trading_data)
 
-    def get_trading_reflection(self) -> Dict[str, Any]:
+    @traced()
+    def get_trading_reflection(self, current_status: Optional[Dict[str, Any]] = None,
+                               market: str = "KRW-BTC") -> Dict[str, Any]:
         """Get AI analysis of past trading performance and patterns"""
         try:
-            # 거래 직후 최신 데이터 가져오기
-            current_status = self.get_trading_data()["investment_status"]
-            recent_trades = self.db_manager.get_recent_trades(6)  # 최근 6개 거래만 분석
+            # 거래 직후 최신 계좌 상태 (사이클 스냅샷이 있으면 재사용)
+            if current_status is None:
+                current_status = self.market_cache.investment_status(market)
+            recent_trades = self.db_manager.get_recent_trades(6, market=market)  # 이 마켓의 최근 6개 거래만 분석
 
 
 
@@ -721,47 +746,27 @@ class TradingBot:
                 for trade in recent_trades
             ])
 
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-2024-08-06",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """As a trading analyst, review the Bitcoin trading history and analyze:
-                           1. Characteristics of profitable trades
-                           2. Patterns in trades that resulted in losses
-                           3. Effectiveness of technical indicator usage
-                           4. Trading strategies that need improvement
-                           5. Key points to consider for future trades"""
-                    },
-                    {
-                        "role": "user",
-                        "content": f"""Recent Trading History:
-                           {trades_summary}
-                           
-                           Please analyze these trades and provide insights for future trading decisions."""
-                    }
-                ],
-                response_format={
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": "trading_reflection",
-                        "strict": True,
-                        "schema": {
-                            "type": "object",
-                            "properties": {
-                                "strategy_analysis": {"type": "string"},
-                                "key_patterns": {"type": "string"},
-                                "improvement_suggestions": {"type": "string"}
-                            },
-                            "required": ["strategy_analysis", "key_patterns", "improvement_suggestions"],
-                            "additionalProperties": False
-                        }
-                    }
+            messages = [
+                {
+                    "role": "system",
+                    "content": """As a trading analyst, review the Bitcoin trading history and analyze:
+                       1. Characteristics of profitable trades
+                       2. Patterns in trades that resulted in losses
+                       3. Effectiveness of technical indicator usage
+                       4. Trading strategies that need improvement
+                       5. Key points to consider for future trades"""
                 },
-                max_tokens=500
-            )
+                {
+                    "role": "user",
+                    "content": f"""Recent Trading History ({market}):
+                       {trades_summary}
+                       
+                       Please analyze these trades and provide insights for future trading decisions."""
+                }
+            ]
 
-            return json.loads(response.choices[0].message.content)
+            with tracer.span("ai_reflection"):
+                return self.decision_backend.reflect(messages, recent_trades)
 
         except Exception as e:
             logger.error(f"Error getting trading reflection: {e}")
@@ -773,284 +778,451 @@ class TradingBot:
                 "improvement_suggestions": f"Analysis failed: {str(e)}"
             }
 
+    @staticmethod
+    def _hold_decision(reason: str) -> Dict[str, Any]:
+        return {
+            "decision": "hold",
+            "percentage": 0,
+            "reason": reason,
+            "risk_level": "high",
+            "confidence": 0
+        }
+
+    def _decision_messages(self, trading_data: Dict[str, Any],
+                           chart_image_base64: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """결정 프롬프트 메시지와 최근 회고 (회고는 결정 캐시 키에도 사용)"""
+        market = trading_data.get('market', 'KRW-BTC')
+        # 데이터 요약 준비
+        trading_summary = self.prepare_trading_summary(trading_data)
+
+        # 트리거 정보 준비
+        current_time = datetime.now()
+        current_price = float(
+            trading_data.get('investment_status', {}).get('current_price')
+            or self.market_cache.get_current_price(market)
+        )
+
+        last_trade = self.db_manager.get_recent_trades(1, market=market)
+        last_trade_price = None
+        if last_trade and last_trade[0][3] is not None:
+            try:
+                last_trade_price = float(last_trade[0][3]) if last_trade and last_trade[0][3] is not None else None
+            except ValueError:
+                logger.error(f"Invalid last_trade_price value: {last_trade[0][3]}")
+                last_trade_price = None
+
+        # 변동성 계산
+        try:
+            if last_trade_price is not None:
+                price_change_percent = abs((current_price - last_trade_price) / last_trade_price * 100)
+            else:
+                price_change_percent = 0  # 기본값
+        except Exception as e:
+            logging.error(f"Error calculating price change: {e}")
+            price_change_percent = 0
+
+        logging.error(f"Price chage percent : {price_change_percent} {last_trade_price} {current_price}")
+
+        time_since_last_trade = None
+        if last_trade:
+            last_trade_time = last_trade[0][0]  # timestamp는 첫 번째 요소
+            if isinstance(last_trade_time, str):
+                last_trade_time = datetime.fromisoformat(last_trade_time)
+            time_since_last_trade = (current_time - last_trade_time).total_seconds() / 3600
+
+        # 거래 트리거 컨텍스트 준비
+        trading_context = {
+            "regular_interval": True if time_since_last_trade and time_since_last_trade >= 2 else False,
+            "price_volatility": price_change_percent,
+            "hours_since_last_trade": time_since_last_trade
+        }
+
+        #최근 회고 데이터 가져오기
+        latest_reflection = self.db_manager.get_latest_reflection(market)
+        if not latest_reflection:
+            latest_reflection = {
+                "strategy_analysis": "No past reflections available.",
+                "key_patterns": "No patterns identified.",
+                "improvement_suggestions": "No suggestions available."
+            }
+
+        # 토큰 예산을 넘으면 뉴스(뒤쪽 줄부터) -> 공포탐욕지수 순으로 줄임
+        news_lines = [f"- [{news['date']}] {news['title']}" for news in trading_data.get('news_headlines', [])]
+        prompt = self.prompt_builder.build([
+            PromptSection("Market", market),
+            PromptSection("Current Market Analysis", trading_summary.get('market_status', '')),
+            PromptSection("Technical Analysis", trading_summary.get('technical_analysis', '')),
+            PromptSection("Market Depth Analysis", trading_summary.get('market_depth', '')),
+            PromptSection("Trading Context", (
+                f"- Regular 2-hour interval check: {'Yes' if trading_context['regular_interval'] else 'No'}\n"
+                f"- Hours since last trade: {trading_context['hours_since_last_trade']} hours\n"
+                f"- Recent price volatility: {trading_context['price_volatility']}%"
+            )),
+            PromptSection("Fear & Greed Index", str(trading_data.get('fear_greed_index', 'Not available')),
+                          priority=5, required=False),
+            PromptSection("Recent News Headlines", lines=news_lines, priority=4, required=False),
+            PromptSection("Reflection on Previous Trades", (
+                f"- Strategy Analysis: {latest_reflection.get('strategy_analysis', 'No data available')}\n"
+                f"- Key Patterns: {latest_reflection.get('key_patterns', 'No data available')}\n"
+                f"- Improvement Suggestions: {latest_reflection.get('improvement_suggestions', 'No data available')}"
+            )),
+        ])
+        logger.info(f"Decision prompt: {token_summary(prompt)}")
+
+        #GPT에게 전달할 프롬프트
+        messages = [
+            {
+                "role": "system",
+                "content": f"""You are a {market} trading expert. You analyze the data provided to you and make decisions that will maximize your profitability.:
+                            - Recent price trends and volume
+                            - Technical indicators (RSI, MACD, BB)
+                            - Order book depth
+                            - Fear and Greed Index (not much important)
+                            - Use the provided chart image for reference
+                            - Past trade reflections
+                            - recent news headlines about btc
+                            
+                            Consider these important contextual factors:
+                            - Regular trading checks occur every 1 hours
+                            - Consider both the technical indicators and the timing of trades                                    
+            """
+            },
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": prompt.text
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": image_data_url(chart_image_base64)
+                        }
+                    }
+                ]
+            }
+        ]
+
+        return messages, latest_reflection
+
     def get_ai_decision(self, trading_data: Dict[str, Any], chart_image_base64: str) -> Dict[str, Any]:
         """Get trading decision from AI with comprehensive analysis"""
         try:
-            # 데이터 요약 준비
-            trading_summary = self.prepare_trading_summary(trading_data)
-
-            # 트리거 정보 준비
-            current_time = datetime.now()
-            current_price = float(pyupbit.get_current_price("KRW-BTC"))
-
-            last_trade = self.db_manager.get_recent_trades(1)
-            last_trade_price = None
-            if last_trade and last_trade[0][3] is not None:
-                try:
-                    last_trade_price = float(last_trade[0][3]) if last_trade and last_trade[0][3] is not None else None
-                except ValueError:
-                    logger.error(f"Invalid last_trade_price value: {last_trade[0][3]}")
-                    last_trade_price = None
-
-            # 변동성 계산
-            try:
-                if last_trade_price is not None:
-                    price_change_percent = abs((current_price - last_trade_price) / last_trade_price * 100)
-                else:
-                    price_change_percent = 0  # 기본값
-            except Exception as e:
-                logging.error(f"Error calculating price change: {e}")
-                price_change_percent = 0
-
-            logging.error(f"Price chage percent : {price_change_percent} {last_trade_price} {current_price}")
-
-            time_since_last_trade = None
-            if last_trade:
-                last_trade_time = last_trade[0][0]  # timestamp는 첫 번째 요소
-                if isinstance(last_trade_time, str):
-                    last_trade_time = datetime.fromisoformat(last_trade_time)
-                time_since_last_trade = (current_time - last_trade_time).total_seconds() / 3600
-
-            # 거래 트리거 컨텍스트 준비
-            trading_context = {
-                "regular_interval": True if time_since_last_trade and time_since_last_trade >= 2 else False,
-                "price_volatility": price_change_percent,
-                "hours_since_last_trade": time_since_last_trade
-            }
+            messages, latest_reflection = self._decision_messages(trading_data, chart_image_base64)
 
-            #최근 회고 데이터 가져오기
-            latest_reflection = self.db_manager.get_latest_reflection()
-            if not latest_reflection:
-                latest_reflection = {
-                    "strategy_analysis": "No past reflections available.",
-                    "key_patterns": "No patterns identified.",
-                    "improvement_suggestions": "No suggestions available."
-                }
+            def request_decision() -> Dict[str, Any]:
+                with tracer.span("ai_decision"):
+                    return self.decision_backend.decide(messages, trading_data)
 
+            if self.config.DECISION_CACHE_TTL <= 0:
+                return request_decision()
+
+            # 지표/가격 구간/포지션/회고가 같으면 API 호출 없이 이전 결정 재사용 (오류 응답은 캐시하지 않음)
+            cache_key = self.decision_cache.fingerprint(trading_data, latest_reflection)
             try:
-                #GPT에게 전달
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4o-2024-08-06",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": """You are a Bitcoin trading expert. You analyze the data provided to you and make decisions that will maximize your profitability.:
-                                        - Recent price trends and volume
-                                        - Technical indicators (RSI, MACD, BB)
-                                        - Order book depth
-                                        - Fear and Greed Index (not much important)
-                                        - Use the provided chart image for reference
-                                        - Past trade reflections
-                                        - recent news headlines about btc
-                                        
-                                        Consider these important contextual factors:
-                                        - Regular trading checks occur every 1 hours
-                                        - Consider both the technical indicators and the timing of trades                                    
-                        """
-                        },
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": f"""Current Market Analysis:
-                                            {trading_summary['market_status']}
-                                            
-                                            Technical Analysis:
-                                            {trading_summary['technical_analysis']}
-                                            
-                                            Market Depth Analysis:
-                                            {trading_summary['market_depth']}
-                                            
-                                             Trading Context:
-                                            - Regular 2-hour interval check: {'Yes' if trading_context['regular_interval'] else 'No'}
-                                            - Hours since last trade: {trading_context['hours_since_last_trade']} hours
-                                            - Recent price volatility: {trading_context['price_volatility']}%
-                                            
-                                            Fear & Greed Index:
-                                            {trading_data.get('fear_greed_index', 'Not available')}
-                                            
-                                            Recent News Headlines:
-                                            {chr(10).join([f"- [{news['date']}] {news['title']}" for news in trading_data.get('news_headlines', [])])}
-                                            
-                                            Reflection on Previous Trades:
-                                            - Strategy Analysis: {latest_reflection.get('strategy_analysis', 'No data available')}
-                                            - Key Patterns: {latest_reflection.get('key_patterns', 'No data available')}
-                                            - Improvement Suggestions: {latest_reflection.get('improvement_suggestions', 'No data available')}
-                                        """
-                                },
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/png;base64,{chart_image_base64}"
-                                    }
-                                }
-                            ]
-                        }
-                    ],
-                    response_format={
-                        "type": "json_schema",
-                        "json_schema": {
-                            "name": "trading_decision",
-                            "strict": True,
-                            "schema": {
-                                "type": "object",
-                                "properties": {
-                                    "decision": {"type": "string", "enum": ["buy", "sell", "hold"]},
-                                    "percentage": {"type": "number"},
-                                    "reason": {"type": "string"},
-                                    "risk_level": {"type": "string", "enum": ["low", "medium", "high"]},
-                                    "confidence": {"type": "integer"}
-                                },
-                                "required": ["decision", "percentage", "reason", "risk_level", "confidence"],
-                                "additionalProperties": False
-                            }
-                        }
-                    },
-                    max_tokens=500
-                )
+                decision, cached = self.decision_cache.get_or_compute(cache_key, request_decision)
+            except openai.BadRequestError as e:
+                logger.error(f"Error in GPT request: {e}")
+                return self._hold_decision(f"Error occurred: {str(e)}")
 
-                # 응답 내용 로그 추가
-                logger.info(f"GPT Response: {response.choices[0].message.content}")
+            if cached:
+                logger.info(f"Reusing cached AI decision ({self.decision_cache.format_stats()})")
+            return decision
+        except Exception as e:
+            logger.error(f"Error getting AI decision: {e}")
+            return self._hold_decision(f"Error: {str(e)}")
 
-            except openai.error.InvalidRequestError as e:
+    async def get_ai_decision_async(self, trading_data: Dict[str, Any], chart_image_base64: str) -> Dict[str, Any]:
+        """get_ai_decision의 asyncio 버전 (DB 조회는 db 실행기, API 호출은 비동기 클라이언트)"""
+        try:
+            messages, latest_reflection = await self.runtime.run_blocking(
+                self._decision_messages, trading_data, chart_image_base64, executor="db"
+            )
+
+            async def request_decision() -> Dict[str, Any]:
+                with tracer.span("ai_decision"):
+                    return await self.decision_backend.adecide(messages, trading_data)
+
+            if self.config.DECISION_CACHE_TTL <= 0:
+                return await request_decision()
+
+            cache_key = self.decision_cache.fingerprint(trading_data, latest_reflection)
+            try:
+                decision, cached = await self.decision_cache.get_or_compute_async(cache_key, request_decision)
+            except openai.BadRequestError as e:
                 logger.error(f"Error in GPT request: {e}")
-                return {
-                    "decision": "hold",
-                    "percentage": 0,
-                    "reason": f"Error occurred: {str(e)}",
-                    "risk_level": "high",
-                    "confidence": 0
-                }
+                return self._hold_decision(f"Error occurred: {str(e)}")
 
-            return json.loads(response.choices[0].message.content)
+            if cached:
+                logger.info(f"Reusing cached AI decision ({self.decision_cache.format_stats()})")
+            return decision
         except Exception as e:
             logger.error(f"Error getting AI decision: {e}")
-            return {
-                "decision": "hold",
-                "percentage": 0,
-                "reason": f"Error: {str(e)}",
-                "risk_level": "high",
-                "confidence": 0
-            }
+            return self._hold_decision(f"Error: {str(e)}")
+
+    def _collection_timeouts(self) -> Dict[str, float]:
+        return {
+            "trading_data": self.config.TRADING_DATA_TIMEOUT,
+            "chart": self.config.CHART_TIMEOUT,
+            "fear_greed": self.config.FEAR_GREED_TIMEOUT,
+            "news": self.config.NEWS_TIMEOUT,
+        }
 
-    def trading_cycle(self, trigger: str = "schedule", additional_data: Dict = None):
-        """
-        거래 사이클 실행
-        Args:
-            trigger: 트리거 타입 (schedule/price_change/initial)
-            additional_data: 추가 데이터 (가격 변동 등)
-        """
-        logger.info(f"Starting trading cycle. Trigger: {trigger}")
+    def _prepare_cycle(self, collected, additional_data: Optional[Dict],
+                       market: str = "KRW-BTC") -> Optional[Dict[str, Any]]:
+        """수집 결과를 확인하고 결정/기록에 쓸 사이클 데이터를 만듦 (필수 데이터가 없으면 None)"""
+        logger.info(f"[{market}] Data collected in {collected.elapsed:.2f}s: {collected.format_timings()}")
 
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            if self.config.ENVIRONMENT == 'EC2':
-                debug_dir = "/home/ubuntu/bitcoin_chart_debug"
-            else:
-                debug_dir = os.path.join(os.path.expanduser("~"), "bitcoin_chart_debug")
+        trading_data = collected.get("trading_data")
+        chart_image_base64 = collected.get("chart")
+        fgi_data = collected.get("fear_greed")
+        news_data = collected.get("news")
 
-            os.makedirs(debug_dir, exist_ok=True)
-            screenshot_path = os.path.join(debug_dir, f"chart_screenshot_{timestamp}.png")
+        if not trading_data:
+            logger.error("Failed to collect trading data.")
+            return None
+        snapshot = CycleSnapshot(trading_data, self.market_cache, market)
 
-            # 1. Collect data
-            trading_data = self.get_trading_data()
-            chart_image_base64 = self.capture_chart()
-            fgi_data = self.fetch_fear_greed_index()
-            news_data = self.fetch_google_news()
+        if not chart_image_base64:
+            logger.error("Failed to capture chart image.")
+            return None
 
-            if not chart_image_base64:
-                logger.error("Failed to capture chart image.")
-                return
+        # Add additional market data
+        trading_data['fear_greed_index'] = fgi_data
+        trading_data['news_headlines'] = news_data
 
+        return {
+            "market": market,
+            "trading_data": trading_data,
+            "chart": chart_image_base64,
+            "chart_path": self.last_chart_paths.get(market),
+            "snapshot": snapshot,
             # GPT 판단에 사용될 데이터 준비
-            technical_data = {
+            "technical_data": {
                 "daily": trading_data['technical_summary']['daily'],
                 "hourly": trading_data['technical_summary']['hourly']
-            }
-
-            market_conditions = {
+            },
+            "market_conditions": {
                 "current_price": trading_data['investment_status']['current_price'],
                 "orderbook": trading_data.get('orderbook', {}),
                 "price_change": additional_data.get('price_change_percent', 0.0) if additional_data else 0.0
-            }
-
-            trading_volume = {
+            },
+            "trading_volume": {
                 "orderbook_units": trading_data.get('orderbook', {}).get('orderbook_units', [])
-            }
+            },
+            "fear_greed": fgi_data,
+            "news": news_data,
+        }
 
-            # Add additional market data
-            trading_data['fear_greed_index'] = fgi_data
-            trading_data['news_headlines'] = news_data
+    def _log_cycle(self, cycle: Dict[str, Any], decision: Dict[str, Any], trigger: str,
+                   additional_data: Optional[Dict], report: Optional[ExecutionReport] = None):
+        """
+        거래 후 계좌 갱신, 회고 분석, 저널 기록
+
+        Args:
+            report: 분할 주문이면 끝난 뒤의 실행 보고서 (체결 결과를 함께 기록)
+        """
+        # 거래 후 바뀐 계좌 정보만 갱신 (시세/지표는 사이클 스냅샷 재사용)
+        market = cycle["market"]
+        snapshot = cycle["snapshot"]
+        if decision.get("decision") in ("buy", "sell"):
+            current_status = snapshot.refresh_account()
+        else:
+            current_status = snapshot.investment_status
+
+        # 최신 상태로 거래 회고 분석 (hold면 거래 이력이 그대로이므로 최근 회고 재사용 -> 결정 캐시 키도 유지됨)
+        reflection = {}
+        if decision.get("decision") == "hold":
+            reflection = self.db_manager.get_latest_reflection(market)
+        if not reflection:
+            reflection = self.get_trading_reflection(current_status, market)
+
+        trade_data = {
+            **decision,
+            **current_status,
+            **reflection,
+            "market": market,
+            "trigger_type": trigger,
+            "chart_path": cycle.get("chart_path"),
+            "price_change_percent": additional_data.get('price_change_percent', 0.0) if additional_data else 0.0,
+            "reflection": (f"Trade executed successfully: {decision['reason']}" if report is None
+                           else f"Sliced order {report.state} ({report.summary()}): {decision['reason']}"),
+            # GPT 판단 데이터 추가
+            "technical_indicators": cycle["technical_data"],
+            "market_conditions": cycle["market_conditions"],
+            "trading_volume": cycle["trading_volume"],
+            "fear_greed_data": cycle["fear_greed"],
+            "news_sentiment": cycle["news"]
+        }
+
+        # 디스크 기록은 저널의 백그라운드 스레드에서 처리
+        with tracer.span("log_trade"):
+            self.trade_journal.submit(trade_data)
+        logger.info(f"[{market}] Trade executed and logged. Trigger: {trigger}")
+        logger.info(f"Trading Reflection: {reflection}")
+
+    @traced(root=True)
+    def trading_cycle(self, trigger: str = "schedule", additional_data: Dict = None, market: str = "KRW-BTC"):
+        """
+        거래 사이클 실행
+        Args:
+            trigger: 트리거 타입 (schedule/price_change/initial)
+            additional_data: 추가 데이터 (가격 변동 등)
+            market: 거래할 마켓
+        """
+        logger.info(f"[{market}] Starting trading cycle. Trigger: {trigger}")
+
+        try:
+            # 1. Collect data (서로 독립적인 소스를 동시에 수집)
+            collected = self.collection_stage.collect(
+                {
+                    "trading_data": lambda: self.get_trading_data(market),
+                    "chart": lambda: self.capture_chart(market),
+                    "fear_greed": self.fetch_fear_greed_index,
+                    "news": self.fetch_google_news,
+                },
+                timeouts=self._collection_timeouts(),
+                defaults={"trading_data": {}, "news": []}
+            )
+            cycle = self._prepare_cycle(collected, additional_data, market)
+            if cycle is None:
+                return
 
             # 2. Get AI decision
-            decision = self.get_ai_decision(trading_data, chart_image_base64)
+            decision = self.get_ai_decision(cycle["trading_data"], cycle["chart"])
 
-            # 3. Execute trade
-            trade_executed = self.execute_trade(decision)
+            # 3. Execute trade (분할 주문은 체결이 끝난 뒤 실행 스레드에서 기록)
+            trade_executed = self.execute_trade(
+                decision, market,
+                on_sliced=lambda report: self._log_cycle(cycle, decision, trigger, additional_data, report)
+            )
 
             # 4. Log results
             if trade_executed:
-                # 거래 후 최신 상태 수집
-                current_status = self.get_trading_data()["investment_status"]
-
-                # 최신 상태로 거래 회고 분석
-                reflection = self.get_trading_reflection()
-
-                trade_data = {
-                    **decision,
-                    **current_status,
-                    **reflection,
-                    "trigger_type": trigger,
-                    "chart_path": screenshot_path,
-                    "price_change_percent": additional_data.get('price_change_percent', 0.0) if additional_data else 0.0,
-                    "reflection": f"Trade executed successfully: {decision['reason']}",
-                    # GPT 판단 데이터 추가
-                    "technical_indicators": technical_data,
-                    "market_conditions": market_conditions,
-                    "trading_volume": trading_volume,
-                    "fear_greed_data": fgi_data,
-                    "news_sentiment": news_data
-                }
+                self._log_cycle(cycle, decision, trigger, additional_data)
+
+        except Exception as e:
+            logger.error(f"[{market}] Error in trading cycle: {e}")
 
-                self.db_manager.log_trade(trade_data)
-                logger.info(f"Trade executed and logged. Trigger: {trigger}")
-                logger.info(f"Trading Reflection: {reflection}")
+    async def refresh_quotes(self, markets: List[str]):
+        """
+        여러 마켓의 현재가/호가를 요청 두 번(ticker, orderbook)으로 함께 갱신.
+        캐시가 비어 있는 마켓만 요청하므로 WebSocket 피드가 채워 둔 마켓은 REST 조회 없음
+        """
+        stale = [market for market in markets if not self.market_cache.quotes_fresh(market)]
+        if not stale:
+            return
+        prices, orderbooks = await asyncio.gather(
+            self.quotation.get_current_price(stale), self.quotation.get_orderbooks(stale)
+        )
+        for market, price in prices.items():
+            self.market_cache.update_price(market, price)
+        for market, orderbook in orderbooks.items():
+            self.market_cache.update_orderbook(market, orderbook)
+
+    @traced("trading_cycle", root=True)
+    async def trading_cycle_async(self, trigger: str = "schedule", additional_data: Dict = None,
+                                  market: str = "KRW-BTC"):
+        """
+        trading_cycle의 asyncio 버전.
+        시세는 비동기 HTTP, 차트는 browser 실행기, 주문/파일/REST는 io 실행기, DB 조회는 db 실행기에서 실행
+        """
+        logger.info(f"[{market}] Starting trading cycle. Trigger: {trigger}")
+        runtime = self.runtime
+
+        try:
+            # 1. Collect data (run_cycles가 모든 마켓 시세를 미리 받아 두었으면 REST 조회 생략)
+            try:
+                await self.refresh_quotes([market])
+            except Exception as e:
+                logger.warning(f"[{market}] Async quote refresh failed, falling back to REST: {e}")
+
+            collected = await runtime.collect(
+                {
+                    "trading_data": lambda: runtime.run_blocking(self.get_trading_data, market),
+                    "chart": lambda: runtime.run_blocking(self.capture_chart, market, executor="browser"),
+                    "fear_greed": self.fetch_fear_greed_index_async,
+                    "news": self.fetch_google_news_async,
+                },
+                timeouts=self._collection_timeouts(),
+                defaults={"trading_data": {}, "news": []}
+            )
+            cycle = self._prepare_cycle(collected, additional_data, market)
+            if cycle is None:
+                return
+
+            # 2. Get AI decision
+            decision = await self.get_ai_decision_async(cycle["trading_data"], cycle["chart"])
+
+            # 3. Execute trade (분할 주문은 체결이 끝난 뒤 실행 스레드에서 기록)
+            trade_executed = await runtime.run_blocking(
+                self.execute_trade, decision, market,
+                lambda report: self._log_cycle(cycle, decision, trigger, additional_data, report)
+            )
+
+            # 4. Log results
+            if trade_executed:
+                await runtime.run_blocking(self._log_cycle, cycle, decision, trigger, additional_data)
 
         except Exception as e:
-            logger.error(f"Error in trading cycle: {e}")
+            logger.error(f"[{market}] Error in trading cycle: {e}")
 
+    async def run_cycle(self, trigger: str = "schedule", additional_data: Dict = None, market: str = "KRW-BTC"):
+        """
+        마켓별 단일 실행 거래 사이클. 그 마켓의 사이클이 진행 중이면 새로 실행하지 않고 그 결과를 함께 기다림
+        (가격 트리거와 정기 사이클이 겹쳐 같은 시장 상태로 두 번 주문하지 않음)
+        """
+        key = ("cycle", market)
+        if self.runtime.flights.running(key):
+            logger.info(f"[{market}] Trading cycle already running, joining it. Trigger: {trigger}")
+        return await self.runtime.flights.do(
+            key, lambda: self.trading_cycle_async(trigger, additional_data, market=market)
+        )
+
+    async def run_cycles(self, trigger: str = "schedule"):
+        """모든 마켓의 사이클을 동시에 실행 (시세는 먼저 모든 마켓을 한 번에 조회)"""
+        try:
+            await self.refresh_quotes(self.markets)
+        except Exception as e:
+            logger.warning(f"Batched quote refresh failed: {e}")
+        await asyncio.gather(*(self.run_cycle(trigger, market=market) for market in self.markets))
 
 def main():
     """Main function to initialize and run the trading bot"""
     config = TradingConfig()
-    bot = TradingBot(config)
+    # 단계별 지연 시간 계측 (METRICS_PORT가 있으면 /metrics 제공, METRICS_DUMP_INTERVAL마다 로그 요약)
+    configure_tracing(config.TRACING_ENABLED, config.METRICS_PORT, config.METRICS_DUMP_INTERVAL, logger)
+    # 정기 사이클/가격 트리거/정리 작업을 한 이벤트 루프에서 실행
+    # 마켓별 사이클이 동시에 차트를 캡처하도록 browser 실행기는 마켓 수만큼
+    runtime = AsyncRuntime(tick=config.TIMER_WHEEL_TICK, io_workers=config.RUNTIME_IO_WORKERS,
+                           browser_workers=len(parse_markets(config.MARKETS)))
+    bot = TradingBot(config, runtime=runtime)
 
     print(f"ENVIRONMENT={os.getenv('ENVIRONMENT')}")
     print(f"Simulation Mode: {os.getenv('ENVIRONMENT', 'local').lower() != 'ec2'}")
 
-    # 가격 모니터링 시작
-    bot.start_price_monitoring()
+    async def start(runtime: AsyncRuntime):
+        # 가격 모니터링 시작 (피드 스레드의 가격 트리거는 루프로 넘어옴)
+        bot.start_price_monitoring()
+        runtime.on_shutdown(bot.decision_backend.aclose)
 
-    # Schedule trading cycles
-    schedule.every(config.TRADING_INTERVAL).hours.do(bot.trading_cycle, trigger="schedule")
+        # Schedule trading cycles
+        runtime.every(config.TRADING_INTERVAL * 3600, lambda: bot.run_cycles(trigger="schedule"), name="trading_cycle")
 
-    # # 첫 거래 분석 실행
-    bot.trading_cycle(trigger="initial")
+        # 매일 정리 스케줄
+        runtime.every(86400, lambda: runtime.run_blocking(maintain_debug_directory, bot.debug_dir, config),
+                      name="maintain_debug_directory", first_delay=seconds_until(0))
 
-    logger.info(f"Trading bot started. Running every {config.TRADING_INTERVAL} hours")
+        # # 첫 거래 분석 실행
+        runtime.spawn(bot.run_cycles(trigger="initial"), name="initial_cycle")
 
-    # 매일 정리 스케줄
-    schedule.every().day.at("00:00").do(lambda: maintain_debug_directory(bot.debug_dir, config))
+        logger.info(f"Trading bot started for {', '.join(bot.markets)}. Running every {config.TRADING_INTERVAL} hours")
 
-    # Keep the script running
-    while True:
-        try:
-            schedule.run_pending()
-            time.sleep(config.SCHEDULE_CHECK_INTERVAL)  # 1분마다 체크
-        except Exception as e:
-            logger.error(f"Error in main loop: {e}")
-            time.sleep(300)  # 에러 발생 시 5분 대기
+    try:
+        runtime.start(start)
+    finally:
+        bot.stop_price_monitoring()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,310 @@
+"""
+과거 캔들로 거래 사이클(지표 계산 -> 요약 -> 결정 -> 체결)을 재생하는 백테스터.
+
+지표는 add_technical_indicators로 전체 구간을 한 번에 계산해 두고, 봉마다
+미리 계산된 값으로 trading_data를 만들어 결정 함수에 넘김 (봉마다 DataFrame을 다시 만들지 않음).
+
+    python backtester.py --sync --hours 26280 --strategy rsi
+"""
+import argparse
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import logging
+
+from candle_store import CandleStore, INTERVAL_SECONDS
+from indicator_engine import add_technical_indicators
+from market_snapshot import build_investment_status
+from market_summary import SUMMARY_INDICATORS, prepare_trading_summary
+from config import Config
+
+logger = logging.getLogger("Backtester")
+
+# decision_fn(trading_data, trading_summary) -> {"decision": "buy"|"sell"|"hold", "percentage": 0~100, ...}
+DecisionFn = Callable[[Dict[str, Any], Dict[str, str]], Dict[str, Any]]
+
+
+@dataclass
+class BacktestTrade:
+    timestamp: pd.Timestamp
+    decision: str
+    percentage: float
+    price: float
+    btc_amount: float
+    krw_amount: float
+    fee: float
+    reason: str = ""
+
+
+@dataclass
+class BacktestResult:
+    initial_capital: float
+    final_equity: float
+    max_drawdown: float  # %
+    trades: List[BacktestTrade] = field(default_factory=list)
+    rejected: int = 0  # 최소 주문 금액 미달로 체결되지 않은 결정 수
+    fees: float = 0.0
+    equity: Optional[pd.Series] = None
+    bars: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def pnl(self) -> float:
+        return self.final_equity - self.initial_capital
+
+    @property
+    def return_pct(self) -> float:
+        return self.pnl / self.initial_capital * 100 if self.initial_capital else 0.0
+
+    @property
+    def trade_count(self) -> int:
+        return len(self.trades)
+
+    def summary(self) -> str:
+        return (
+            f"Bars: {self.bars:,} ({self.elapsed:.2f}s)\n"
+            f"Final Equity: {self.final_equity:,.0f} KRW\n"
+            f"PnL: {self.pnl:,.0f} KRW ({self.return_pct:+.2f}%)\n"
+            f"Max Drawdown: {self.max_drawdown:.2f}%\n"
+            f"Trades: {self.trade_count} (rejected {self.rejected}), Fees: {self.fees:,.0f} KRW"
+        )
+
+
+def max_drawdown(equity: np.ndarray) -> float:
+    """최대 낙폭 (%)"""
+    if len(equity) == 0:
+        return 0.0
+    peak = np.maximum.accumulate(equity)
+    drawdown = (peak - equity) / np.where(peak > 0, peak, 1)
+    return float(drawdown.max() * 100)
+
+
+def hold_decision(trading_data: Dict[str, Any], trading_summary: Dict[str, str]) -> Dict[str, Any]:
+    return {"decision": "hold", "percentage": 0, "reason": "hold"}
+
+
+def rsi_decision(trading_data: Dict[str, Any], trading_summary: Dict[str, str],
+                 oversold: float = 30.0, overbought: float = 70.0, percentage: float = 50.0) -> Dict[str, Any]:
+    """시간봉 RSI 기준 단순 규칙 (백테스트 기준선용)"""
+    rsi = trading_data["technical_summary"]["hourly"]["rsi"]
+    if rsi < oversold:
+        return {"decision": "buy", "percentage": percentage, "reason": f"hourly RSI {rsi:.1f} < {oversold}"}
+    if rsi > overbought:
+        return {"decision": "sell", "percentage": percentage, "reason": f"hourly RSI {rsi:.1f} > {overbought}"}
+    return {"decision": "hold", "percentage": 0, "reason": f"hourly RSI {rsi:.1f}"}
+
+
+STRATEGIES: Dict[str, DecisionFn] = {
+    "hold": hold_decision,
+    "rsi": rsi_decision,
+}
+
+
+class Backtester:
+    """
+    시간봉 기준 백테스터.
+
+    각 시간봉 종가 시점에 결정하고 종가로 체결함. 일봉 지표는 그 시점에 이미 마감된 일봉만 사용하므로
+    미래 데이터를 보지 않음. 체결은 실거래와 같이 매수 시 KRW * 비율 * (1 - 수수료)를 주문하고,
+    최소 주문 금액 미만이면 체결하지 않음.
+    """
+
+    def __init__(self, hourly: pd.DataFrame, daily: Optional[pd.DataFrame] = None,
+                 decision_fn: DecisionFn = rsi_decision,
+                 initial_krw: float = 1_000_000.0,
+                 fee: float = Config.TRANSACTION_FEE,
+                 minimum_order: float = Config.MINIMUM_ORDER_AMOUNT,
+                 decision_interval: int = 1,
+                 warmup: int = 50,
+                 history: int = 0,
+                 summarize: bool = True,
+                 price_change_threshold: Optional[float] = None,
+                 indicator_windows: Optional[Dict[str, float]] = None,
+                 precomputed: bool = False):
+        """
+        Args:
+            hourly: 시간봉 OHLCV
+            daily: 일봉 OHLCV. 없으면 시간봉을 KST 09:00 기준으로 묶어 만듦
+            decision_fn: 결정 함수
+            decision_interval: 몇 봉마다 결정할지 (TRADING_INTERVAL 시간)
+            warmup: 지표가 안정될 때까지 건너뛸 봉 수
+            history: 0보다 크면 trading_data에 최근 봉 기록(hourly_data/daily_data)을 넣음 (느림)
+            summarize: prepare_trading_summary 결과를 만들어 결정 함수에 넘길지 여부
+            price_change_threshold: 지정하면 직전 봉 대비 종가 변동률(%)이 기준 이상인 봉에서도 결정
+                (실시간 PRICE_CHANGE_THRESHOLD 트리거를 시간봉 단위로 근사)
+            indicator_windows: add_technical_indicators에 넘길 지표 기간
+            precomputed: hourly/daily에 이미 지표 컬럼이 있으면 True (스윕에서 재사용)
+        """
+        self.hourly = self._normalize(hourly)
+        self.daily = self._normalize(daily) if daily is not None else self._resample_daily(self.hourly)
+        self.decision_fn = decision_fn
+        self.initial_krw = initial_krw
+        self.fee = fee
+        self.minimum_order = minimum_order
+        self.decision_interval = max(1, decision_interval)
+        self.warmup = warmup
+        self.history = history
+        self.summarize = summarize
+        self.price_change_threshold = price_change_threshold
+        self.indicator_windows = indicator_windows
+        self.precomputed = precomputed
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        df.columns = [col.lower() for col in df.columns]
+        return df.sort_index()
+
+    @staticmethod
+    def _resample_daily(hourly: pd.DataFrame) -> pd.DataFrame:
+        # 업비트 일봉은 KST 09:00에 시작
+        daily = hourly.resample("24h", offset="9h").agg({
+            "open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"
+        })
+        return daily.dropna()
+
+    def _daily_positions(self) -> np.ndarray:
+        """각 시간봉 종가 시점에 마감되어 있는 마지막 일봉 위치 (-1이면 없음)"""
+        hourly_close = self.hourly.index + timedelta(seconds=INTERVAL_SECONDS["minute60"])
+        daily_close = self.daily.index + timedelta(days=1)
+        return np.searchsorted(daily_close.values, hourly_close.values, side="right") - 1
+
+    @staticmethod
+    def _columns(df: pd.DataFrame) -> Dict[str, list]:
+        # 봉마다 iloc 하지 않도록 파이썬 리스트로 꺼내 둠
+        return {col: df[col].to_numpy(dtype=float).tolist() for col in SUMMARY_INDICATORS}
+
+    def run(self) -> BacktestResult:
+        start = time.perf_counter()
+
+        # 전체 구간 지표를 한 번에 계산
+        if self.precomputed:
+            hourly, daily = self.hourly, self.daily
+        else:
+            hourly = add_technical_indicators(self.hourly, self.indicator_windows)
+            daily = add_technical_indicators(self.daily, self.indicator_windows)
+        hourly_ind = self._columns(hourly)
+        daily_ind = self._columns(daily)
+        daily_pos = self._daily_positions().tolist()
+        closes = hourly["close"].to_numpy(dtype=float).tolist()
+        timestamps = hourly.index
+
+        # 결정 시점: 정기 (decision_interval 봉마다) + 가격 급변 봉
+        scheduled = (np.arange(len(closes)) - self.warmup) % self.decision_interval == 0
+        triggers = np.where(scheduled, "schedule", "").astype(object)
+        if self.price_change_threshold is not None:
+            change = np.abs(hourly["close"].pct_change().to_numpy()) * 100
+            triggers = np.where(~scheduled & (change >= self.price_change_threshold), "price_change", triggers)
+        triggers = triggers.tolist()
+
+        krw, btc, avg_buy_price = self.initial_krw, 0.0, 0.0
+        equity = np.empty(len(closes))
+        result = BacktestResult(initial_capital=self.initial_krw, final_equity=self.initial_krw, max_drawdown=0.0)
+
+        for i, price in enumerate(closes):
+            j = daily_pos[i]
+            if i >= self.warmup and j >= 0 and triggers[i]:
+                trading_data = {
+                    "trigger_type": triggers[i],
+                    "investment_status": build_investment_status(krw, btc, avg_buy_price, price),
+                    "orderbook": {},
+                    "technical_summary": {
+                        "daily": {col: values[j] for col, values in daily_ind.items()},
+                        "hourly": {col: values[i] for col, values in hourly_ind.items()},
+                    }
+                }
+                if self.history:
+                    trading_data["hourly_data"] = hourly.iloc[max(0, i - self.history + 1):i + 1].to_dict('records')
+                    trading_data["daily_data"] = daily.iloc[max(0, j - self.history + 1):j + 1].to_dict('records')
+                trading_summary = prepare_trading_summary(trading_data) if self.summarize else {}
+
+                decision = self.decision_fn(trading_data, trading_summary)
+                action = decision.get("decision", "hold")
+                percentage = float(decision.get("percentage", 0))
+
+                if action == "buy" and percentage > 0:
+                    amount = krw * (percentage / 100) * (1 - self.fee)
+                    if amount < self.minimum_order:
+                        result.rejected += 1
+                    else:
+                        fee = amount * self.fee
+                        quantity = amount / price
+                        avg_buy_price = (btc * avg_buy_price + quantity * price) / (btc + quantity)
+                        krw -= amount + fee
+                        btc += quantity
+                        result.fees += fee
+                        result.trades.append(BacktestTrade(timestamps[i], action, percentage, price,
+                                                           quantity, amount, fee, decision.get("reason", "")))
+                elif action == "sell" and percentage > 0:
+                    quantity = btc * (percentage / 100)
+                    value = quantity * price
+                    if value < self.minimum_order:
+                        result.rejected += 1
+                    else:
+                        fee = value * self.fee
+                        krw += value - fee
+                        btc -= quantity
+                        if btc <= 1e-12:
+                            btc, avg_buy_price = 0.0, 0.0
+                        result.fees += fee
+                        result.trades.append(BacktestTrade(timestamps[i], action, percentage, price,
+                                                           quantity, value, fee, decision.get("reason", "")))
+
+            equity[i] = krw + btc * price
+
+        if len(equity):
+            result.final_equity = float(equity[-1])
+        result.max_drawdown = max_drawdown(equity)
+        result.equity = pd.Series(equity, index=timestamps, name="equity")
+        result.bars = len(closes)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+
+def load_history(store: CandleStore, market: str, hours: int, sync: bool = False):
+    """
+    캔들 저장소에서 시간봉/일봉 히스토리 로드.
+    sync=True면 최신 캔들을 받고, 저장된 캔들이 부족하면 이전 구간까지 받아 둠.
+    요청보다 적게 로드되면 경고를 남기므로 호출하는 쪽에서 len()으로 확인할 것.
+    """
+    days = hours // 24 + 1
+    if sync:
+        for interval, count in (("minute60", hours), ("day", days)):
+            store.sync(market, interval, count=count)
+            store.backfill(market, interval, count=count)
+
+    hourly = store.load(market, "minute60", count=hours)
+    daily = store.load(market, "day", count=days)
+    loaded = 0 if hourly is None else len(hourly)
+    if 0 < loaded < hours:
+        logger.warning(f"Loaded {loaded} of {hours} hourly candles for {market}")
+    return hourly, daily
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the trading cycle over stored candles")
+    parser.add_argument("--market", default="KRW-BTC")
+    parser.add_argument("--db", default="candles.db")
+    parser.add_argument("--hours", type=int, default=24 * 365)
+    parser.add_argument("--sync", action="store_true", help="업비트에서 부족한 캔들을 먼저 받아 둠")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="rsi")
+    parser.add_argument("--initial-krw", type=float, default=1_000_000.0)
+    parser.add_argument("--interval", type=int, default=1, help="결정 간격 (시간)")
+    args = parser.parse_args()
+
+    store = CandleStore(args.db)
+    hourly, daily = load_history(store, args.market, args.hours, sync=args.sync)
+    if hourly is None:
+        parser.error(f"No hourly candles for {args.market} in {args.db} (use --sync)")
+
+    result = Backtester(hourly, daily, decision_fn=STRATEGIES[args.strategy],
+                        initial_krw=args.initial_krw, decision_interval=args.interval).run()
+    print(result.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+ChartRenderer 프레임당 렌더링 시간 벤치마크.
+
+    python benchmarks/bench_chart_renderer.py --frames 50 --output chart.png
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_indicators import make_ohlcv
+from chart_renderer import ChartRenderer
+from indicator_engine import IndicatorEngine
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=600)
+    parser.add_argument("--candles", type=int, default=120)
+    parser.add_argument("--output", help="마지막 프레임을 저장할 PNG 경로")
+    args = parser.parse_args()
+
+    df = IndicatorEngine().apply("bench", make_ohlcv(200))
+    renderer = ChartRenderer(args.width, args.height, candles=args.candles)
+
+    # 폰트 캐시 등 첫 렌더링 비용 제외
+    renderer.render(df)
+
+    timings = []
+    for _ in range(args.frames):
+        start = time.perf_counter()
+        png = renderer.render(df)
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    print(f"frames      : {args.frames}")
+    print(f"size        : {args.width}x{args.height}, {args.candles} candles")
+    print(f"png bytes   : {len(png):,}")
+    print(f"mean        : {sum(timings) / len(timings) * 1e3:.1f} ms/frame")
+    print(f"p50 / p95   : {timings[len(timings) // 2] * 1e3:.1f} / {timings[int(len(timings) * 0.95) - 1] * 1e3:.1f} ms")
+
+    if args.output:
+        with open(args.output, "wb") as image_file:
+            image_file.write(png)
+        print(f"saved       : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
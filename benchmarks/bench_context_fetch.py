@@ -0,0 +1,72 @@
+"""
+뉴스/공포탐욕지수 수집이 사이클을 막는 시간 벤치마크 (네트워크 없음).
+
+로컬 대체 서버(지연 주입)에 대해 캐시 없이 매번 요청하는 경우와 CachedHttpClient를 비교함.
+TTL을 짧게 잡아 사이클 중간중간 재검증(304)이 일어나도록 함.
+
+    python benchmarks/bench_context_fetch.py --latency 0.3 --cycles 50
+"""
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_client import CachedHttpClient
+from market_context import fetch_fear_greed_index, fetch_news_headlines, parse_fear_greed, parse_news
+from simulators.http_fixture_server import HttpFixtureServer
+
+
+def run_uncached(server: HttpFixtureServer, cycles: int) -> list:
+    timings = []
+    for _ in range(cycles):
+        start = time.perf_counter()
+        parse_fear_greed(requests.get(server.fear_greed_url, params={"limit": 1, "format": "json"}))
+        parse_news(requests.get(server.news_url))
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_cached(server: HttpFixtureServer, cycles: int, ttl: float, interval: float) -> list:
+    client = CachedHttpClient()
+    timings = []
+    for _ in range(cycles):
+        start = time.perf_counter()
+        fetch_fear_greed_index(client, server.fear_greed_url, ttl=ttl)
+        fetch_news_headlines(client, server.news_url, ttl=ttl)
+        timings.append(time.perf_counter() - start)
+        time.sleep(interval)
+    client.close()
+    return timings
+
+
+def report(name: str, timings: list):
+    timings = sorted(timings)
+    print(f"{name:<10} mean {sum(timings) / len(timings) * 1e3:8.2f} ms   "
+          f"p50 {timings[len(timings) // 2] * 1e3:8.2f} ms   max {timings[-1] * 1e3:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.3, help="대체 서버 응답 지연 (초)")
+    parser.add_argument("--cycles", type=int, default=50)
+    parser.add_argument("--ttl", type=float, default=0.2, help="캐시 TTL (초)")
+    parser.add_argument("--interval", type=float, default=0.05, help="사이클 간격 (초)")
+    args = parser.parse_args()
+
+    server = HttpFixtureServer(latency=args.latency).start()
+    try:
+        report("uncached", run_uncached(server, args.cycles))
+        before = dict(server.requests)
+        report("cached", run_cached(server, args.cycles, args.ttl, args.interval))
+        cached_requests = {path: count - before.get(path, 0) for path, count in server.requests.items()}
+        print(f"cached run: {cached_requests} requests, {server.not_modified} answered 304")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+DatabaseManager 조회 벤치마크 (trades 테이블 1M 행).
+
+기존 방식(호출마다 sqlite3.connect + 어댑터 등록, timestamp 인덱스 없음)과
+현재 방식(크기 제한 연결 풀, WAL, 인덱스)을 같은 데이터로 비교.
+
+    python benchmarks/bench_database.py --rows 1000000 --repeat 200
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_manager import DatabaseManager
+
+
+def populate(db: DatabaseManager, rows: int, batch: int = 50000):
+    start = datetime(2020, 1, 1)
+    triggers = ("schedule", "price_change", "initial")
+    with db._connection() as conn:
+        for offset in range(0, rows, batch):
+            conn.executemany("""
+                INSERT INTO trades (timestamp, decision, percentage, reason, btc_krw_price,
+                                    strategy_analysis, key_patterns, improvement_suggestions, trigger_type)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (start + timedelta(minutes=i), ("buy", "sell", "hold")[i % 3], 10.0, "benchmark",
+                 90000000.0 + i, "analysis", "patterns", "suggestions", triggers[i % 3])
+                for i in range(offset, min(offset + batch, rows))
+            ])
+            conn.commit()
+
+
+def legacy_query(db_path: str, sql: str, params=()):
+    """기존 DatabaseManager와 같이 호출마다 연결을 새로 만듦"""
+    sqlite3.register_adapter(datetime, lambda dt: dt.isoformat())
+    sqlite3.register_converter("timestamp", lambda val: datetime.fromisoformat(val.decode()))
+    conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def timeit(func, repeat: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--legacy-repeat", type=int, default=5, help="인덱스 없는 조회는 느리므로 반복 횟수를 따로 지정")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        db = DatabaseManager(db_path)
+
+        start = time.perf_counter()
+        populate(db, args.rows)
+        print(f"populated {args.rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+        results = {}
+
+        # 기존 방식: 인덱스 없음 + 호출마다 연결
+        with db._connection() as conn:
+            conn.execute("DROP INDEX idx_trades_timestamp")
+            conn.execute("DROP INDEX idx_trades_trigger_type")
+            conn.commit()
+        results["legacy get_latest_reflection"] = timeit(
+            lambda: legacy_query(db_path, DatabaseManager.LATEST_REFLECTION_SQL), args.legacy_repeat)
+        results["legacy get_recent_trades"] = timeit(
+            lambda: legacy_query(db_path, DatabaseManager.RECENT_TRADES_SQL, (6,)), args.legacy_repeat)
+
+        # 현재 방식: 인덱스 + 상시 연결
+        db.close()
+        db = DatabaseManager(db_path)
+        results["get_latest_reflection"] = timeit(db.get_latest_reflection, args.repeat)
+        results["get_recent_trades"] = timeit(lambda: db.get_recent_trades(6), args.repeat)
+        results["log_trade"] = timeit(lambda: db.log_trade({
+            "decision": "hold", "percentage": 0, "reason": "benchmark",
+            "btc_balance": 0.0, "krw_balance": 0.0, "avg_buy_price": 0.0,
+            "current_price": 90000000.0, "reflection": "",
+        }), args.repeat)
+        db.close()
+
+    print()
+    for name, seconds in results.items():
+        print(f"{name:<32} {seconds * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+결정 백엔드 지연/처리량 벤치마크 (네트워크 없음).
+
+OpenAIBackend는 로컬 chat completions 대체 서버(지연 주입)를, RuleBasedBackend는 프로세스 안에서 바로 결정함.
+
+    python benchmarks/bench_decision_backends.py --latency 1.0 --requests 200 --concurrency 32
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from decision_backends import OpenAIBackend, RuleBasedBackend
+from market_summary import prepare_trading_summary
+from simulators.chat_completions_server import ChatCompletionsServer
+
+
+def make_trading_data(rsi: float) -> dict:
+    indicators = {"rsi": rsi, "macd": 150000.0, "macd_signal": 120000.0,
+                  "bb_width": 4.2, "stoch_k": 35.0, "stoch_d": 30.0}
+    return {
+        "investment_status": {"krw_balance": 1_000_000.0, "btc_balance": 0.01, "avg_buy_price": 95_000_000.0,
+                              "current_price": 96_000_000.0, "total_assets": 1_960_000.0,
+                              "btc_ratio": 0.49, "profit_loss": 1.05},
+        "orderbook": {},
+        "technical_summary": {"daily": dict(indicators), "hourly": dict(indicators)},
+    }
+
+
+def make_messages(trading_data: dict) -> list:
+    summary = prepare_trading_summary(trading_data)
+    return [
+        {"role": "system", "content": "You are a Bitcoin trading expert."},
+        {"role": "user", "content": [{"type": "text", "text": "\n".join(summary.values())}]},
+    ]
+
+
+def run(backend, requests: int, concurrency: int) -> dict:
+    samples = [make_trading_data(20 + (i * 7) % 60) for i in range(requests)]
+    latencies = []
+
+    def one(trading_data):
+        start = time.perf_counter()
+        backend.decide(make_messages(trading_data), trading_data)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, samples))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "throughput": requests / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=1.0, help="대체 서버 응답 지연 (초)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    server = ChatCompletionsServer(latency=args.latency).start()
+    try:
+        backends = {
+            f"openai (stand-in, {args.latency:.1f}s)": OpenAIBackend(base_url=server.base_url),
+            "rule": RuleBasedBackend(),
+        }
+        for name, backend in backends.items():
+            result = run(backend, args.requests, args.concurrency)
+            print(f"{name:<28} {result['throughput']:10.1f} req/s   "
+                  f"p50 {result['p50'] * 1e3:9.2f} ms   p99 {result['p99'] * 1e3:9.2f} ms")
+            backend.close()
+        print(f"stand-in served {server.requests} requests")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
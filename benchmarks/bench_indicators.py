@@ -0,0 +1,91 @@
+"""
+add_technical_indicators(ta 전체 재계산)와 IndicatorEngine(증분 계산) 비교 벤치마크.
+
+    python benchmarks/bench_indicators.py --rows 200 --updates 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicator_engine import INDICATOR_COLUMNS, IndicatorEngine, add_technical_indicators
+
+
+def make_ohlcv(rows: int, seed: int = 42) -> pd.DataFrame:
+    """랜덤 워크 기반 합성 시간봉 데이터"""
+    rng = np.random.default_rng(seed)
+    close = 1e8 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    high = close * (1 + rng.random(rows) * 0.01)
+    low = close * (1 - rng.random(rows) * 0.01)
+    open_ = np.clip(close * (1 + rng.normal(0, 0.003, rows)), low, high)
+    volume = rng.random(rows) * 10
+    index = pd.date_range("2024-01-01", periods=rows, freq="h")
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close,
+                         "volume": volume, "value": volume * close}, index=index)
+
+
+def max_relative_error(expected: pd.DataFrame, actual: pd.DataFrame) -> dict:
+    errors = {}
+    for col in INDICATOR_COLUMNS:
+        a = expected[col].to_numpy(dtype=float)
+        b = actual[col].to_numpy(dtype=float)
+        mask = ~np.isnan(a) & ~np.isnan(b)
+        if not mask.any():
+            errors[col] = 0.0
+            continue
+        errors[col] = float(np.max(np.abs(a[mask] - b[mask]) / np.maximum(np.abs(a[mask]), 1e-12)))
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200, help="사이클마다 사용하는 캔들 개수")
+    parser.add_argument("--updates", type=int, default=500, help="새 캔들 도착 횟수")
+    args = parser.parse_args()
+
+    data = make_ohlcv(args.rows + args.updates)
+
+    # 정확도: 같은 구간을 처음부터 계산하면 ta와 일치해야 함
+    window = data.iloc[:args.rows]
+    errors = max_relative_error(add_technical_indicators(window.copy()),
+                                IndicatorEngine().apply("bench", window))
+    print("max relative error (same window):")
+    for col, error in errors.items():
+        print(f"  {col:<12} {error:.2e}")
+
+    # 기존 방식: 매 캔들마다 rows개 전체 재계산
+    start = time.perf_counter()
+    for i in range(args.updates):
+        add_technical_indicators(data.iloc[i + 1:i + 1 + args.rows].copy())
+    full_elapsed = time.perf_counter() - start
+
+    # 증분 방식: 워밍업 후 새 캔들 하나씩 반영
+    engine = IndicatorEngine(history=args.rows)
+    engine.apply("bench", window)
+    state = engine.state("bench")
+    start = time.perf_counter()
+    for ts, row in data.iloc[args.rows:].iterrows():
+        state.update(ts, row["open"], row["high"], row["low"], row["close"], row["volume"])
+    update_elapsed = time.perf_counter() - start
+
+    # apply()는 DataFrame 변환 비용까지 포함
+    engine = IndicatorEngine(history=args.rows)
+    engine.apply("bench", window)
+    start = time.perf_counter()
+    for i in range(args.updates):
+        engine.apply("bench", data.iloc[i + 1:i + 1 + args.rows])
+    apply_elapsed = time.perf_counter() - start
+
+    print()
+    print(f"ta full recompute     : {full_elapsed / args.updates * 1e3:8.3f} ms/candle")
+    print(f"IndicatorState.update : {update_elapsed / args.updates * 1e3:8.3f} ms/candle")
+    print(f"IndicatorEngine.apply : {apply_elapsed / args.updates * 1e3:8.3f} ms/candle")
+
+
+if __name__ == "__main__":
+    main()
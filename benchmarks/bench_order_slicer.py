@@ -0,0 +1,73 @@
+"""
+큰 주문을 시장가 한 번에 낼 때와 OrderSlicer로 나눠 낼 때의 도착 가격 대비 슬리피지 비교 (모의 거래소, 네트워크 없음).
+
+seed마다 같은 시작 호가에서 두 방식을 각각 실행함. 분할 실행은 가격이 무작위로 움직이는 동안 진행되므로
+seed별 결과가 흩어지며, 평균과 체결률을 함께 봐야 함.
+
+    python benchmarks/bench_order_slicer.py --krw 300000000 --slices 5 --interval 0.5 --seeds 5
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from order_slicer import OrderSlicer
+from simulators.mock_exchange import MockExchange
+
+
+def run_market(seed: int, side: str, krw: float) -> tuple:
+    exchange = MockExchange(seed=seed)
+    book = exchange.get_orderbook()["orderbook_units"][0]
+    arrival = (book["ask_price"] + book["bid_price"]) / 2
+    if side == "buy":
+        order = exchange.buy_market_order("KRW-BTC", krw)
+        requested = krw
+    else:
+        order = exchange.sell_market_order("KRW-BTC", krw / arrival)
+        requested = krw / arrival
+    volume = float(order["executed_volume"])
+    funds = sum(float(trade["funds"]) for trade in order["trades"])
+    sign = 1 if side == "buy" else -1
+    slippage = sign * (funds / volume / arrival - 1) * 1e4
+    fill_ratio = (funds if side == "buy" else volume) / requested
+    return slippage, fill_ratio
+
+
+def run_sliced(seed: int, side: str, krw: float, slices: int, interval: float, tick: float) -> tuple:
+    exchange = MockExchange(seed=seed)
+    book = exchange.get_orderbook()["orderbook_units"][0]
+    arrival = (book["ask_price"] + book["bid_price"]) / 2
+    exchange.start(tick)
+    slicer = OrderSlicer(exchange, exchange.get_orderbook, slices=slices, interval=interval, poll_interval=tick)
+    report = slicer.execute("KRW-BTC", side, krw if side == "buy" else krw / arrival)
+    exchange.stop()
+    slicer.shutdown()
+    return report.slippage_bps, report.fill_ratio
+
+
+def summarize(name: str, results: list):
+    slippage = [value for value, _ in results]
+    fills = [fill for _, fill in results]
+    print(f"{name:<8} slippage mean {sum(slippage) / len(slippage):+7.2f}bps   "
+          f"min {min(slippage):+7.2f}   max {max(slippage):+7.2f}   fill {sum(fills) / len(fills):6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--side", choices=("buy", "sell"), default="buy")
+    parser.add_argument("--krw", type=float, default=300_000_000, help="주문 금액 (매도는 이 금액어치 BTC)")
+    parser.add_argument("--slices", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=0.5, help="구간 길이 (초)")
+    parser.add_argument("--tick", type=float, default=0.05, help="모의 거래소 tick 주기 (초)")
+    parser.add_argument("--seeds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.side} {args.krw:,.0f} KRW, {args.slices} slices x {args.interval}s, {args.seeds} seeds")
+    summarize("market", [run_market(seed, args.side, args.krw) for seed in range(args.seeds)])
+    summarize("sliced", [run_sliced(seed, args.side, args.krw, args.slices, args.interval, args.tick)
+                         for seed in range(args.seeds)])
+
+
+if __name__ == "__main__":
+    main()
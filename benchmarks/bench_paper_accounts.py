@@ -0,0 +1,83 @@
+"""
+가상 계좌 수백 개를 한 프로세스에서 돌릴 때의 주문 처리량과 계좌당 메모리 (네트워크 없음).
+
+모의 거래소 호가를 공유하는 PaperExchange 위에 사용자마다 TradeExecutor를 만들고,
+엔진처럼 스레드 풀에서 무작위 매수/매도 결정을 실행함.
+
+    python benchmarks/bench_paper_accounts.py --accounts 500 --rounds 20
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from paper_exchange import PaperExchange
+from simulators.mock_exchange import MockExchange
+from trade_executor import TradeExecutor
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=20, help="계좌별 결정 횟수")
+    parser.add_argument("--workers", type=int, default=Config.ENGINE_MAX_WORKERS)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    # 잔고 부족 경고는 무작위 결정에서 당연히 생기므로 숨김
+    logging.getLogger("TradeExecutor").setLevel(logging.ERROR)
+    logging.getLogger("PaperExchange").setLevel(logging.ERROR)
+
+    # 호가가 계속 바뀌면서 소진된 잔량이 회복되도록 모의 거래소를 백그라운드에서 움직임
+    market = MockExchange(seed=args.seed).start(0.01)
+    exchange = PaperExchange(market.get_orderbook, fee=Config.TRANSACTION_FEE, quote_ttl=0.05)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    executors = [
+        TradeExecutor("", "", upbit=exchange.account(f"user-{i}", krw=Config.PAPER_KRW_BALANCE))
+        for i in range(args.accounts)
+    ]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    per_account = sum(stat.size_diff for stat in after.compare_to(before, "filename")) / args.accounts
+
+    rng = random.Random(args.seed)
+    decisions = [
+        [{"decision": rng.choice(("buy", "sell", "buy", "hold")), "percentage": rng.choice((10, 25, 50))}
+         for _ in range(args.rounds)]
+        for _ in range(args.accounts)
+    ]
+
+    def run(index: int) -> int:
+        executor, executed = executors[index], 0
+        for decision in decisions[index]:
+            # 엔진처럼 공유 시세/호가를 넘겨 사용자별 REST 조회가 없도록 함
+            orderbook = exchange.get_orderbook("KRW-BTC")
+            price = orderbook["orderbook_units"][0]["bid_price"]
+            executed += bool(executor.execute_trade(decision, price, orderbook)) and decision["decision"] != "hold"
+        return executed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        executed = sum(pool.map(run, range(args.accounts)))
+    elapsed = time.perf_counter() - start
+    market.stop()
+
+    total = args.accounts * args.rounds
+    equity = [account.krw + account.holdings.get("BTC", [0.0, 0.0])[0] * market.get_current_price()
+              for account in exchange.accounts.values()]
+    print(f"{args.accounts} accounts x {args.rounds} decisions ({executed} orders filled) in {elapsed:.2f}s "
+          f"-> {total / elapsed:,.0f} decisions/s")
+    print(f"memory per account (executor + paper account): {per_account / 1024:.1f} KiB")
+    print(f"equity min {min(equity):,.0f} / max {max(equity):,.0f} KRW (start {Config.PAPER_KRW_BALANCE:,.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+계측 오버헤드 벤치마크.
+
+빈 함수를 계측 없이 / tracer 꺼짐 / 켜짐 상태로 호출해 구간 하나당 추가 비용을 재고,
+사이클 하나에 기록되는 구간 수(기본 12개)와 사이클 길이로 오버헤드 비율을 계산함.
+
+    python benchmarks/bench_tracing.py --calls 200000 --cycle-seconds 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.tracing import Tracer, traced
+
+
+def measure(func, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--spans-per-cycle", type=int, default=12)
+    parser.add_argument("--cycle-seconds", type=float, default=5.0, help="비교할 사이클 길이 (초)")
+    args = parser.parse_args()
+
+    enabled, disabled = Tracer(), Tracer(enabled=False)
+
+    def plain():
+        return None
+
+    baseline = measure(plain, args.calls)
+    off = measure(traced("stage", target=disabled)(plain), args.calls)
+    on = measure(traced("stage", target=enabled)(plain), args.calls)
+
+    def cycle():
+        with enabled.trace("cycle", log_threshold=float("inf")):
+            for _ in range(args.spans_per_cycle):
+                with enabled.span("stage"):
+                    pass
+
+    per_cycle = measure(cycle, args.calls // args.spans_per_cycle)
+
+    print(f"plain call        {baseline * 1e9:8.0f} ns")
+    print(f"tracer disabled   {(off - baseline) * 1e9:8.0f} ns per span")
+    print(f"tracer enabled    {(on - baseline) * 1e9:8.0f} ns per span")
+    print(f"traced cycle      {per_cycle * 1e6:8.1f} µs for {args.spans_per_cycle} spans "
+          f"-> {per_cycle / args.cycle_seconds:.5%} of a {args.cycle_seconds:g}s cycle")
+    print(enabled.format_summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""
+거래 사이클 벤치마크 모음 (네트워크 없음).
+
+- e2e: TradingBot.trading_cycle, TradingBot.run_cycles(마켓 3개 동시), Scheduler.run_trading_cycle을 로컬 대체 서버
+  (업비트 REST, OpenAI, Google News RSS, alternative.me)에 대해 처음부터 끝까지 실행. 서버마다 응답 지연을 따로 줄 수 있음
+- micro: add_technical_indicators, prepare_trading_summary, DatabaseManager.log_trade, encode_image
+
+결과는 JSON(--output)으로 저장하고, --baseline으로 이전 결과와 비교해 --threshold보다 느려진 항목이 있으면
+종료 코드 1을 돌려줌. 대체 서버의 시세는 실행 시각과 관계없이 같으므로 AI 결정/주문 경로도 실행마다 같음.
+
+    python benchmarks/suite.py --output baseline.json
+    python benchmarks/suite.py --baseline baseline.json --threshold 0.2
+    python benchmarks/suite.py --only trading_cycle --upbit-latency 0.03 --openai-latency 1.0
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_indicators import make_ohlcv
+from simulators.chat_completions_server import ChatCompletionsServer
+from simulators.http_fixture_server import HttpFixtureServer
+from simulators.upbit_rest_server import UpbitRestServer, redirect_upbit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_VERSION = 1
+# JWT 서명 경고가 나지 않도록 32바이트 이상 (대체 서버는 인증을 확인하지 않음)
+DUMMY_ACCESS_KEY = "bench-access-key-0000000000000000"
+DUMMY_SECRET_KEY = "bench-secret-key-0000000000000000"
+MULTI_MARKETS = ("KRW-BTC", "KRW-ETH", "KRW-XRP")
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """초 단위 표본 요약"""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "min": ordered[0],
+        "p50": statistics.median(ordered),
+        "p90": ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))],
+        "max": ordered[-1],
+    }
+
+
+def time_calls(func: Callable[[], Any], number: int, repeat: int) -> List[float]:
+    """func를 number번 실행한 평균 시간을 repeat개 (첫 묶음은 예열로 버림)"""
+    samples = []
+    for i in range(repeat + 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if i:
+            samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+class StandIns:
+    """
+    대체 서버들과 임시 작업 디렉터리. 안에서는 cwd/HOME이 작업 디렉터리라서
+    로그, SQLite, 디버깅 차트 사본이 저장소나 홈 디렉터리에 남지 않음.
+    """
+
+    def __init__(self, upbit_latency: float = 0.0, openai_latency: float = 0.0,
+                 news_latency: float = 0.0, fear_greed_latency: float = 0.0):
+        self.upbit = UpbitRestServer(latency=upbit_latency)
+        self.chat = ChatCompletionsServer(latency=openai_latency)
+        self.news = HttpFixtureServer(latency=news_latency)
+        self.fear_greed = HttpFixtureServer(latency=fear_greed_latency)
+        self.workdir = ""
+        self._cwd = ""
+        self._home: Optional[str] = None
+        self._redirect = None
+
+    def __enter__(self) -> "StandIns":
+        for server in (self.upbit, self.chat, self.news, self.fear_greed):
+            server.start()
+        self.workdir = tempfile.mkdtemp(prefix="autotrade-bench-")
+        self._cwd, self._home = os.getcwd(), os.environ.get("HOME")
+        os.chdir(self.workdir)
+        os.environ["HOME"] = self.workdir
+        self._redirect = redirect_upbit(self.upbit.base_url)
+        self._redirect.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self._redirect.__exit__(*exc)
+        for server in (self.upbit, self.chat, self.news, self.fear_greed):
+            server.stop()
+        os.chdir(self._cwd)
+        if self._home is None:
+            os.environ.pop("HOME", None)
+        else:
+            os.environ["HOME"] = self._home
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    @property
+    def latencies(self) -> Dict[str, float]:
+        return {"upbit": self.upbit.latency, "openai": self.chat.latency,
+                "news": self.news.latency, "fear_greed": self.fear_greed.latency}
+
+
+# ---------------------------------------------------------------- 종단 간
+def run_cycles(cycle: Callable[[], Any], warmup: int, repeat: int) -> Dict[str, Any]:
+    """예열 뒤 사이클 시간과 단계별 지연 (tracer 히스토그램)"""
+    from utils.tracing import tracer
+
+    tracer.enabled = True
+    for _ in range(warmup):
+        cycle()
+    tracer.reset()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cycle()
+        samples.append(time.perf_counter() - start)
+    return {"samples": samples, "stages": tracer.summary()}
+
+
+def bench_trading_cycle(env: StandIns, warmup: int, repeat: int) -> Dict[str, Any]:
+    """autocointrade.TradingBot 단일 계좌 사이클 (실거래 경로, 주문은 대체 서버로)"""
+    from autocointrade import TradingBot, TradingConfig
+
+    config = TradingConfig(
+        UPBIT_ACCESS_KEY=DUMMY_ACCESS_KEY, UPBIT_SECRET_KEY=DUMMY_SECRET_KEY,
+        OPENAI_API_KEY="bench", OPENAI_BASE_URL=env.chat.base_url, DECISION_BACKEND="openai",
+        FEAR_GREED_URL=env.fear_greed.fear_greed_url, NEWS_RSS_URL=env.news.news_url,
+        SIMULATION_MODE=False, ORDER_SLICING=False, CHART_SOURCE="renderer", MARKET_ARCHIVE_DIR="",
+        DECISION_CACHE_TTL=0, DB_PATH="trading_cycle.db", CANDLE_DB_PATH="trading_cycle_candles.db",
+    )
+    bot = TradingBot(config)
+    try:
+        return run_cycles(lambda: bot.trading_cycle(trigger="schedule"), warmup, repeat)
+    finally:
+        bot.trade_journal.close()
+        bot.debug_writer.close()
+        bot.http_client.close()
+        bot.decision_backend.close()
+
+
+def bench_multi_market_cycle(env: StandIns, warmup: int, repeat: int) -> Dict[str, Any]:
+    """TradingBot.run_cycles로 여러 마켓 사이클을 AsyncRuntime에서 동시에 실행 (trading_cycle과 비교하면 마켓 추가 비용)"""
+    from async_runtime import AsyncRuntime
+    from autocointrade import TradingBot, TradingConfig
+
+    config = TradingConfig(
+        MARKETS=",".join(MULTI_MARKETS),
+        UPBIT_ACCESS_KEY=DUMMY_ACCESS_KEY, UPBIT_SECRET_KEY=DUMMY_SECRET_KEY,
+        OPENAI_API_KEY="bench", OPENAI_BASE_URL=env.chat.base_url, DECISION_BACKEND="openai",
+        FEAR_GREED_URL=env.fear_greed.fear_greed_url, NEWS_RSS_URL=env.news.news_url,
+        SIMULATION_MODE=False, ORDER_SLICING=False, CHART_SOURCE="renderer", MARKET_ARCHIVE_DIR="",
+        DECISION_CACHE_TTL=0, DB_PATH="multi_market.db", CANDLE_DB_PATH="multi_market_candles.db",
+    )
+    runtime = AsyncRuntime(browser_workers=len(MULTI_MARKETS))
+    bot = TradingBot(config, runtime=runtime)
+    started = threading.Event()
+
+    async def register(runtime: AsyncRuntime):
+        runtime.on_shutdown(bot.decision_backend.aclose)
+        started.set()
+
+    # 런타임은 백그라운드 스레드의 이벤트 루프에서 실행하고 사이클마다 작업을 넘김
+    thread = threading.Thread(target=runtime.start, args=(register,), daemon=True)
+    thread.start()
+    started.wait()
+    try:
+        return run_cycles(lambda: runtime.submit_threadsafe(lambda: bot.run_cycles("schedule")).result(),
+                          warmup, repeat)
+    finally:
+        runtime.stop()
+        thread.join()
+        bot.trade_journal.close()
+        bot.debug_writer.close()
+        bot.http_client.close()
+        bot.decision_backend.close()
+
+
+def bench_scheduler_cycle(env: StandIns, warmup: int, repeat: int) -> Dict[str, Any]:
+    """main.py 구성 (DataCollector + AIDecisionMaker + TradingEngine)의 사용자 한 명 사이클"""
+    from ai_decision_maker import AIDecisionMaker
+    from candle_store import CandleStore
+    from config import Config
+    from data_collector import DataCollector
+    from decision_backends import create_decision_backend
+    from scheduler import Scheduler
+    from trade_executor import TradeExecutor
+    from user_manager import User, UserManager
+
+    class BenchConfig(Config):
+        FEAR_GREED_URL = env.fear_greed.fear_greed_url
+        NEWS_RSS_URL = env.news.news_url
+        CHART_SOURCE = "renderer"
+        ORDER_SLICING = False
+
+    user_manager = UserManager()
+    user_manager.add_user(User("bench", DUMMY_ACCESS_KEY, DUMMY_SECRET_KEY, 1, ["Prefer small positions"]))
+    data_collector = DataCollector(config=BenchConfig, candle_store=CandleStore("scheduler_candles.db"))
+    backend = create_decision_backend("openai", api_key="bench", base_url=env.chat.base_url)
+    scheduler = Scheduler(user_manager, data_collector, None, AIDecisionMaker(backend=backend))
+    scheduler.engine.executor_factory = lambda user: TradeExecutor(
+        user.api_key, user.secret_key, config=BenchConfig, market=data_collector.market)
+    try:
+        return run_cycles(lambda: scheduler.run_trading_cycle("bench"), warmup, repeat)
+    finally:
+        scheduler.engine.shutdown()
+        data_collector.debug_writer.close()
+        data_collector.http_client.close()
+        backend.close()
+
+
+# ---------------------------------------------------------------- 마이크로
+def sample_trading_data(env: StandIns) -> Dict[str, Any]:
+    """TradingBot.get_trading_data와 같은 모양의 데이터 (합성 캔들 + 대체 거래소 호가)"""
+    from indicator_engine import add_technical_indicators
+
+    daily = add_technical_indicators(make_ohlcv(200, seed=1))
+    hourly = add_technical_indicators(make_ohlcv(200, seed=2))
+
+    def technical(df):
+        last = df.iloc[-1]
+        return {name: float(last[name]) for name in ("rsi", "macd", "macd_signal", "bb_width", "stoch_k", "stoch_d")}
+
+    price = float(hourly["close"].iloc[-1])
+    return {
+        "investment_status": {"krw_balance": 5_000_000.0, "btc_balance": 0.05, "avg_buy_price": price * 0.98,
+                              "current_price": price, "total_value": 5_000_000.0 + 0.05 * price},
+        "orderbook": env.upbit.exchange.get_orderbook("KRW-BTC"),
+        "daily_data": daily.tail(30).to_dict("records"),
+        "hourly_data": hourly.tail(24).to_dict("records"),
+        "technical_summary": {"daily": technical(daily), "hourly": technical(hourly)},
+    }
+
+
+def bench_add_technical_indicators(env: StandIns, number: int, repeat: int) -> Dict[str, Any]:
+    from indicator_engine import add_technical_indicators
+
+    data = make_ohlcv(200)
+    return {"samples": time_calls(lambda: add_technical_indicators(data.copy()), number, repeat)}
+
+
+def bench_prepare_trading_summary(env: StandIns, number: int, repeat: int) -> Dict[str, Any]:
+    from market_summary import prepare_trading_summary
+
+    trading_data = sample_trading_data(env)
+    return {"samples": time_calls(lambda: prepare_trading_summary(trading_data), number, repeat)}
+
+
+def bench_log_trade(env: StandIns, number: int, repeat: int) -> Dict[str, Any]:
+    """거래 한 건 기록 (JSON 직렬화 + INSERT + 커밋)"""
+    from database_manager import DatabaseManager
+
+    trading_data = sample_trading_data(env)
+    trade = {
+        "decision": "buy", "percentage": 10.0, "reason": "benchmark", **trading_data["investment_status"],
+        "reflection": "Trade executed successfully: benchmark", "strategy_analysis": "analysis",
+        "key_patterns": "patterns", "improvement_suggestions": "suggestions", "trigger_type": "schedule",
+        "technical_indicators": trading_data["technical_summary"],
+        "market_conditions": {"current_price": trading_data["investment_status"]["current_price"],
+                              "orderbook": trading_data["orderbook"], "price_change": 0.0},
+        "trading_volume": {"orderbook_units": trading_data["orderbook"]["orderbook_units"]},
+        "fear_greed_data": {"value": 45, "classification": "Fear"},
+        "news_sentiment": [{"title": f"Bitcoin headline {i}", "date": "today"} for i in range(5)],
+    }
+    db = DatabaseManager("log_trade.db")
+    return {"samples": time_calls(lambda: db.log_trade(trade), number, repeat)}
+
+
+def bench_encode_image(env: StandIns, number: int, repeat: int) -> Dict[str, Any]:
+    """렌더링한 차트 PNG 파일을 Base64로 인코딩"""
+    from autocointrade import encode_image
+    from chart_renderer import ChartRenderer
+    from indicator_engine import add_technical_indicators
+
+    path = os.path.join(env.workdir, "chart.png")
+    with open(path, "wb") as f:
+        f.write(ChartRenderer(800, 600).render(add_technical_indicators(make_ohlcv(200))))
+    return {"samples": time_calls(lambda: encode_image(path), number, repeat)}
+
+
+E2E_CASES = {
+    "trading_cycle": bench_trading_cycle,
+    "multi_market_cycle": bench_multi_market_cycle,
+    "scheduler_cycle": bench_scheduler_cycle,
+}
+MICRO_CASES = {
+    # 이름 -> (함수, 표본당 호출 수)
+    "add_technical_indicators": (bench_add_technical_indicators, 5),
+    "prepare_trading_summary": (bench_prepare_trading_summary, 200),
+    "log_trade": (bench_log_trade, 50),
+    "encode_image": (bench_encode_image, 200),
+}
+
+
+# ---------------------------------------------------------------- 결과
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], metric: str, threshold: float) -> List[Dict[str, Any]]:
+    """두 결과에 모두 있는 항목의 metric 비율. ratio > 1 + threshold면 regression"""
+    rows = []
+    for name, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous or not previous["stats"].get(metric):
+            continue
+        ratio = current["stats"][metric] / previous["stats"][metric]
+        rows.append({"case": name, "baseline": previous["stats"][metric], "current": current["stats"][metric],
+                     "ratio": ratio, "regression": ratio > 1 + threshold})
+    return rows
+
+
+def format_seconds(value: float) -> str:
+    if value >= 1:
+        return f"{value:.3f}s"
+    if value >= 1e-3:
+        return f"{value * 1e3:.2f}ms"
+    return f"{value * 1e6:.1f}us"
+
+
+def print_results(results: Dict[str, Any]):
+    print(f"{'case':<28}{'kind':>6}{'n':>6}{'p50':>12}{'mean':>12}{'stdev':>12}{'min':>12}{'max':>12}")
+    for name, case in results["cases"].items():
+        stats = case["stats"]
+        print(f"{name:<28}{case['kind']:>6}{stats['count']:>6}" + "".join(
+            f"{format_seconds(stats[key]):>12}" for key in ("p50", "mean", "stdev", "min", "max")))
+        for stage, stage_stats in case.get("stages", {}).items():
+            print(f"  {stage:<32}{stage_stats['count']:>6}{format_seconds(stage_stats['p50']):>12}"
+                  f"{format_seconds(stage_stats['p90']):>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", nargs="*", help=f"실행할 항목 ({', '.join([*E2E_CASES, *MICRO_CASES])})")
+    parser.add_argument("--warmup", type=int, default=1, help="종단 간 항목의 예열 사이클 수")
+    parser.add_argument("--repeat", type=int, default=5, help="종단 간 사이클 수 / 마이크로 표본 수")
+    parser.add_argument("--micro-scale", type=float, default=1.0, help="마이크로 표본당 호출 수 배율")
+    parser.add_argument("--upbit-latency", type=float, default=0.03, help="업비트 REST 응답 지연 (초)")
+    parser.add_argument("--openai-latency", type=float, default=0.5, help="OpenAI 응답 지연 (초)")
+    parser.add_argument("--news-latency", type=float, default=0.2, help="Google News RSS 응답 지연 (초)")
+    parser.add_argument("--fear-greed-latency", type=float, default=0.2, help="alternative.me 응답 지연 (초)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--metric", default="p50", choices=("p50", "mean", "min"), help="비교 기준 통계")
+    parser.add_argument("--threshold", type=float, default=0.2, help="이 비율보다 느려지면 regression (0.2 = 20%%)")
+    parser.add_argument("--verbose", action="store_true", help="애플리케이션 INFO 로그 출력")
+    args = parser.parse_args()
+
+    selected = set(args.only or [*E2E_CASES, *MICRO_CASES])
+    unknown = selected - set(E2E_CASES) - set(MICRO_CASES)
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(sorted(unknown))}")
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    output = os.path.abspath(args.output) if args.output else None
+
+    results: Dict[str, Any] = {"schema": SCHEMA_VERSION, "cases": {}}
+    with StandIns(args.upbit_latency, args.openai_latency, args.news_latency, args.fear_greed_latency) as env:
+        results["meta"] = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "latency": env.latencies,
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+            "micro_scale": args.micro_scale,
+        }
+        for name, bench in E2E_CASES.items():
+            if name in selected:
+                print(f"running {name} ...", file=sys.stderr)
+                run = bench(env, args.warmup, args.repeat)
+                results["cases"][name] = {"kind": "e2e", "stats": summarize(run["samples"]), **run}
+        for name, (bench, number) in MICRO_CASES.items():
+            if name in selected:
+                print(f"running {name} ...", file=sys.stderr)
+                run = bench(env, max(1, int(number * args.micro_scale)), args.repeat)
+                results["cases"][name] = {"kind": "micro", "stats": summarize(run["samples"]), **run}
+        results["upbit_requests"] = dict(env.upbit.requests)
+
+    print_results(results)
+
+    exit_code = 0
+    if baseline is not None:
+        if baseline.get("meta", {}).get("latency") != results["meta"]["latency"]:
+            print("warning: baseline was recorded with different stand-in latencies", file=sys.stderr)
+        rows = compare(results, baseline, args.metric, args.threshold)
+        results["comparison"] = {"baseline": args.baseline, "metric": args.metric,
+                                 "threshold": args.threshold, "cases": rows}
+        print(f"\nvs {args.baseline} ({args.metric}, threshold +{args.threshold:.0%})")
+        for row in rows:
+            flag = "REGRESSION" if row["regression"] else "ok"
+            print(f"{row['case']:<28}{format_seconds(row['baseline']):>12}{format_seconds(row['current']):>12}"
+                  f"{row['ratio']:>9.2f}x  {flag}")
+        if any(row["regression"] for row in rows):
+            exit_code = 1
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+import pyupbit
+import logging
+
+logger = logging.getLogger("CandleStore")
+
+# 업비트 캔들 시간은 KST 기준
+KST = timezone(timedelta(hours=9))
+
+# interval 문자열별 캔들 길이 (초)
+INTERVAL_SECONDS = {
+    "minute1": 60,
+    "minute3": 180,
+    "minute5": 300,
+    "minute10": 600,
+    "minute15": 900,
+    "minute30": 1800,
+    "minute60": 3600,
+    "minute240": 14400,
+    "day": 86400,
+    "days": 86400,
+    "week": 604800,
+    "weeks": 604800,
+    "month": 2678400,
+    "months": 2678400,
+}
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume", "value"]
+
+
+class CandleStore:
+    """
+    (market, interval) 단위로 OHLCV 캔들을 SQLite에 저장하고,
+    마지막으로 저장된 캔들 이후의 데이터만 업비트에서 가져오는 로컬 캔들 저장소.
+    같은 (market, interval)의 동시 동기화는 한 번만 요청하고, 다른 키의 요청은 서로 기다리지 않음.
+    """
+
+    def __init__(self, db_path: str = "candles.db", min_refresh_seconds: float = 5.0):
+        self.db_path = db_path
+        self.min_refresh_seconds = min_refresh_seconds
+        self._lock = threading.RLock()  # SQLite 연결 보호
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._last_sync: Dict[Tuple[str, str], float] = {}
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_db()
+
+    def _init_db(self):
+        with self._lock:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS candles (
+                    market TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    ts TEXT NOT NULL,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume REAL,
+                    value REAL,
+                    PRIMARY KEY (market, interval, ts)
+                ) WITHOUT ROWID
+            """)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _key_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def last_timestamp(self, market: str, interval: str) -> Optional[datetime]:
+        """저장된 마지막 캔들의 시각 (KST, naive)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(ts) FROM candles WHERE market = ? AND interval = ?",
+                (market, interval)
+            ).fetchone()
+        if row and row[0]:
+            return datetime.fromisoformat(row[0])
+        return None
+
+    def first_timestamp(self, market: str, interval: str) -> Optional[datetime]:
+        """저장된 가장 오래된 캔들의 시각 (KST, naive)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(ts) FROM candles WHERE market = ? AND interval = ?",
+                (market, interval)
+            ).fetchone()
+        if row and row[0]:
+            return datetime.fromisoformat(row[0])
+        return None
+
+    def stored_count(self, market: str, interval: str) -> int:
+        """저장된 캔들 개수"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM candles WHERE market = ? AND interval = ?",
+                (market, interval)
+            ).fetchone()
+        return int(row[0]) if row else 0
+
+    def _missing_count(self, market: str, interval: str, count: int) -> int:
+        """마지막 저장 캔들 이후 새로 받아야 할 캔들 개수 계산"""
+        last_ts = self.last_timestamp(market, interval)
+        if last_ts is None:
+            return count
+
+        seconds = INTERVAL_SECONDS.get(interval)
+        if seconds is None:
+            return count
+
+        now = datetime.now(KST).replace(tzinfo=None)
+        elapsed = max((now - last_ts).total_seconds(), 0)
+        # 진행 중인 마지막 캔들을 갱신하기 위해 1개를 겹쳐서 받음
+        return min(int(elapsed // seconds) + 1, count)
+
+    def sync(self, market: str, interval: str, count: int = 200) -> int:
+        """
+        새로운 캔들만 업비트에서 받아 저장.
+
+        Returns:
+            저장(갱신)된 캔들 개수
+        """
+        key = (market, interval)
+        # 같은 키를 먼저 요청한 스레드가 받는 동안 기다렸다가, 방금 동기화됐으면 요청하지 않음
+        with self._key_lock(key):
+            last_sync = self._last_sync.get(key)
+            if last_sync is not None and time.monotonic() - last_sync < self.min_refresh_seconds:
+                return 0
+
+            fetch_count = self._missing_count(market, interval, count)
+            df = pyupbit.get_ohlcv(market, interval=interval, count=fetch_count)
+            if df is None or df.empty:
+                logger.error(f"Failed to fetch OHLCV for {market} ({interval})")
+                return 0
+
+            self.upsert(market, interval, df)
+            self._last_sync[key] = time.monotonic()
+            return len(df)
+
+    def backfill(self, market: str, interval: str, count: int) -> int:
+        """
+        저장된 캔들이 count개보다 적으면 가장 오래된 캔들 이전 구간을 업비트에서 받아 채움.
+        sync()는 마지막 캔들 이후만 받으므로 백테스트처럼 긴 히스토리가 필요할 때 사용.
+
+        Returns:
+            새로 저장된 캔들 개수
+        """
+        key = (market, interval)
+        with self._key_lock(key):
+            missing = count - self.stored_count(market, interval)
+            oldest = self.first_timestamp(market, interval)
+            if missing <= 0 or oldest is None:
+                return 0
+
+            # 저장 시각은 KST, pyupbit은 to를 그대로(UTC로 해석) 넘기므로 변환. to 시각은 포함되지 않음
+            df = pyupbit.get_ohlcv(market, interval=interval, count=missing, to=oldest - timedelta(hours=9))
+            if df is None or df.empty:
+                logger.warning(f"No older OHLCV for {market} ({interval}) before {oldest}")
+                return 0
+
+            self.upsert(market, interval, df)
+            return len(df)
+
+    def upsert(self, market: str, interval: str, df: pd.DataFrame):
+        """DataFrame(index=캔들 시각)을 저장소에 기록. 같은 시각의 캔들은 덮어씀"""
+        df = df.copy()
+        df.columns = [col.lower() for col in df.columns]
+        rows = [
+            (market, interval, pd.Timestamp(ts).isoformat(),
+             *(float(row[col]) if col in df.columns else None for col in OHLCV_COLUMNS))
+            for ts, row in df.iterrows()
+        ]
+        with self._lock:
+            self._conn.executemany("""
+                INSERT OR REPLACE INTO candles (market, interval, ts, open, high, low, close, volume, value)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            self._conn.commit()
+
+    def load(self, market: str, interval: str, count: int = 200) -> Optional[pd.DataFrame]:
+        """로컬에 저장된 최근 count개 캔들을 DataFrame으로 반환 (네트워크 사용 없음)"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT ts, open, high, low, close, volume, value
+                FROM candles
+                WHERE market = ? AND interval = ?
+                ORDER BY ts DESC
+                LIMIT ?
+            """, (market, interval, count)).fetchall()
+
+        if not rows:
+            return None
+
+        rows.reverse()
+        index = pd.DatetimeIndex([row[0] for row in rows])
+        return pd.DataFrame([row[1:] for row in rows], index=index, columns=OHLCV_COLUMNS)
+
+    def get_ohlcv(self, market: str = "KRW-BTC", interval: str = "day", count: int = 200) -> Optional[pd.DataFrame]:
+        """
+        pyupbit.get_ohlcv 대체 함수.
+        증분 동기화 후 로컬 데이터를 반환하므로 같은 주기 안의 반복 호출은 네트워크를 거의 사용하지 않음.
+        """
+        try:
+            self.sync(market, interval, count)
+        except Exception as e:
+            logger.error(f"Error syncing candles for {market} ({interval}): {e}")
+        return self.load(market, interval, count)
@@ -0,0 +1,199 @@
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from webdriver_manager.chrome import ChromeDriverManager
+import logging
+
+logger = logging.getLogger("ChartCapture")
+
+CHART_URL_TEMPLATE = "https://upbit.com/full_chart?code=CRIX.UPBIT.{market}"
+CHART_URL = CHART_URL_TEMPLATE.format(market="KRW-BTC")
+EC2_CHROMEDRIVER_PATH = "/home/ubuntu/.wdm/drivers/chromedriver/linux64/128.0.6613.137/chromedriver-linux64/chromedriver"
+
+
+def chrome_driver_factory(environment: str, width: int, height: int) -> Callable[[int], webdriver.Chrome]:
+    """
+    환경에 맞는 Chrome WebDriver 생성 함수를 반환.
+    ChromeDriverManager().install()은 처음 한 번만 호출하고 경로를 재사용함.
+    """
+    driver_path = {}
+
+    def create(slot: int = 0) -> webdriver.Chrome:
+        chrome_options = Options()
+        if environment == 'EC2':
+            chrome_options.add_argument('--headless=new')
+            chrome_options.add_argument('--no-sandbox')
+            chrome_options.add_argument('--disable-dev-shm-usage')
+            chrome_options.add_argument('--disable-gpu')
+            # 풀의 세션마다 디버깅 포트를 다르게 사용
+            chrome_options.add_argument(f'--remote-debugging-port={9222 + slot}')
+            chrome_options.add_argument('--disable-software-rasterizer')
+            chrome_options.add_argument(f"--window-size={width},{height}")
+            service = Service(executable_path=EC2_CHROMEDRIVER_PATH)
+        else:
+            chrome_options.add_argument("--start-maximized")
+            chrome_options.add_argument("--disable-infobars")
+            chrome_options.add_argument("--disable-extensions")
+            chrome_options.add_argument(f"--window-size={width},{height}")
+            if "path" not in driver_path:
+                driver_path["path"] = ChromeDriverManager().install()
+            service = Service(driver_path["path"])
+
+        return webdriver.Chrome(service=service, options=chrome_options)
+
+    return create
+
+
+class ChartBrowserSession:
+    """차트 페이지를 띄워 둔 상태로 유지하는 브라우저 세션"""
+
+    def __init__(self, driver, max_age: float, max_uses: int):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.max_age = max_age
+        self.max_uses = max_uses
+        self.uses = 0
+
+    def is_healthy(self) -> bool:
+        """수명/사용 횟수 초과 여부와 페이지 응답 여부 확인"""
+        if time.monotonic() - self.created_at > self.max_age or self.uses >= self.max_uses:
+            return False
+        try:
+            return self.driver.execute_script("return document.readyState") == "complete"
+        except Exception as e:
+            logger.warning(f"Chart session health check failed: {e}")
+            return False
+
+    def screenshot(self) -> bytes:
+        self.uses += 1
+        return self.driver.get_screenshot_as_png()
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing chart session: {e}")
+
+
+class ChartBrowserPool:
+    """
+    차트 페이지(3분봉, 볼린저 밴드 적용)를 미리 띄워 둔 브라우저 세션 풀.
+    세션은 처음 필요할 때 만들어지며, 상태 확인에 실패하거나 수명이 다하면 새로 만듦.
+    """
+
+    def __init__(self, driver_factory: Callable[[int], object], prepare_page: Callable[[object], None],
+                 url: str = CHART_URL, size: int = 1, load_wait: float = 3,
+                 max_age: float = 3600, max_uses: int = 200, acquire_timeout: float = 60):
+        self.driver_factory = driver_factory
+        self.prepare_page = prepare_page
+        self.url = url
+        self.size = max(size, 1)
+        self.load_wait = load_wait
+        self.max_age = max_age
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = queue.LifoQueue()
+        self._free_slots = queue.Queue()
+        for slot in range(self.size):
+            self._free_slots.put(slot)
+        self._slots = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _open_session(self, slot: int) -> ChartBrowserSession:
+        """브라우저를 띄우고 차트 페이지를 준비 (느린 경로, 세션 생성 시에만 실행)"""
+        driver = self.driver_factory(slot)
+        try:
+            driver.set_page_load_timeout(10)
+            driver.get(self.url)
+
+            # 명시적 대기
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.TAG_NAME, "body"))
+            )
+            time.sleep(self.load_wait)
+
+            self.prepare_page(driver)
+        except Exception:
+            driver.quit()
+            raise
+
+        logger.info(f"Chart browser session {slot} ready")
+        session = ChartBrowserSession(driver, self.max_age, self.max_uses)
+        with self._lock:
+            self._slots[id(session)] = slot
+        return session
+
+    def _discard(self, session: ChartBrowserSession):
+        session.quit()
+        with self._lock:
+            slot = self._slots.pop(id(session), None)
+        if slot is not None:
+            self._free_slots.put(slot)
+
+    def acquire(self) -> ChartBrowserSession:
+        """유휴 세션을 가져오거나, 여유 슬롯이 있으면 새 세션을 만듦"""
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                slot = self._free_slots.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("No chart browser session available")
+                try:
+                    return self._idle.get(timeout=min(remaining, 1.0))
+                except queue.Empty:
+                    continue
+            try:
+                return self._open_session(slot)
+            except Exception:
+                self._free_slots.put(slot)
+                raise
+
+    def release(self, session: ChartBrowserSession, healthy: bool = True):
+        if self._closed or not healthy:
+            self._discard(session)
+        else:
+            self._idle.put(session)
+
+    def screenshot(self) -> Optional[bytes]:
+        """준비된 차트 페이지의 PNG 스크린샷 반환. 세션이 비정상이면 한 번 재생성 후 재시도"""
+        for attempt in range(2):
+            session = self.acquire()
+            if not session.is_healthy():
+                logger.info("Recycling chart browser session")
+                self._discard(session)
+                continue
+            try:
+                png = session.screenshot()
+            except Exception as e:
+                logger.error(f"Error taking chart screenshot (attempt {attempt + 1}): {e}")
+                self.release(session, healthy=False)
+                continue
+            self.release(session)
+            return png
+        return None
+
+    def close(self):
+        """모든 세션 종료"""
+        self._closed = True
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(session)
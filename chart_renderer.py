@@ -0,0 +1,144 @@
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger("ChartRenderer")
+
+# 업비트 차트 색상 (상승: 빨강, 하락: 파랑)
+UP_COLOR = "#c84a31"
+DOWN_COLOR = "#1261c4"
+MA_COLORS = {"ma5": "#f5a623", "ma20": "#7b61ff", "ma60": "#2e9e5b"}
+
+
+def render_png(df: pd.DataFrame, width: int, height: int, dpi: int, title: str) -> bytes:
+    """캔들/볼린저 밴드/이동평균/거래량 차트를 PNG 바이트로 렌더링 (프로세스 풀에서도 호출되는 최상위 함수)"""
+    x = np.arange(len(df))
+    open_ = df["open"].to_numpy(dtype=float)
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    close = df["close"].to_numpy(dtype=float)
+    volume = df["volume"].to_numpy(dtype=float)
+    colors = np.where(close >= open_, UP_COLOR, DOWN_COLOR)
+
+    fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    grid = fig.add_gridspec(4, 1, hspace=0.05)
+    price_ax = fig.add_subplot(grid[:3, 0])
+    volume_ax = fig.add_subplot(grid[3, 0], sharex=price_ax)
+
+    # 볼린저 밴드
+    if {"bb_upper", "bb_lower", "bb_middle"}.issubset(df.columns):
+        upper = df["bb_upper"].to_numpy(dtype=float)
+        lower = df["bb_lower"].to_numpy(dtype=float)
+        price_ax.fill_between(x, lower, upper, color="#9aa5b1", alpha=0.15, linewidth=0)
+        price_ax.plot(x, upper, color="#9aa5b1", linewidth=0.8)
+        price_ax.plot(x, lower, color="#9aa5b1", linewidth=0.8)
+        price_ax.plot(x, df["bb_middle"].to_numpy(dtype=float), color="#9aa5b1",
+                      linewidth=0.8, linestyle="--")
+
+    # 이동평균선
+    for column, color in MA_COLORS.items():
+        if column in df.columns:
+            price_ax.plot(x, df[column].to_numpy(dtype=float), color=color,
+                          linewidth=1.0, label=column.upper())
+
+    # 캔들 (꼬리 + 몸통). 막대 패치 대신 LineCollection 하나로 그려 렌더링 비용을 줄임
+    body_width = max(width * 0.88 / max(len(df), 1) * 0.7 * 72 / dpi, 0.5)
+    price_ax.vlines(x, low, high, colors=colors, linewidth=0.8)
+    price_ax.vlines(x, np.minimum(open_, close), np.maximum(open_, close),
+                    colors=colors, linewidth=body_width)
+
+    # 거래량
+    volume_ax.vlines(x, 0, volume, colors=colors, linewidth=body_width)
+    volume_ax.set_ylim(bottom=0)
+
+    price_ax.set_title(f"{title}  {close[-1]:,.0f}" if len(close) else title, fontsize=10, loc="left")
+    price_ax.grid(True, linewidth=0.3, alpha=0.5)
+    price_ax.tick_params(labelbottom=False, labelsize=8)
+    price_ax.yaxis.tick_right()
+    price_ax.yaxis.set_major_formatter(FuncFormatter(lambda value, _: f"{value:,.0f}"))
+    if any(column in df.columns for column in MA_COLORS):
+        price_ax.legend(loc="upper left", fontsize=7, frameon=False)
+    volume_ax.grid(True, linewidth=0.3, alpha=0.5)
+    volume_ax.tick_params(labelsize=8)
+    volume_ax.yaxis.tick_right()
+
+    # x축 라벨은 캔들 시각
+    if len(df):
+        ticks = np.linspace(0, len(df) - 1, num=min(6, len(df)), dtype=int)
+        volume_ax.set_xticks(ticks)
+        volume_ax.set_xticklabels([pd.Timestamp(df.index[i]).strftime("%m-%d %H:%M") for i in ticks])
+    volume_ax.set_xlim(-1, len(df))
+
+    fig.subplots_adjust(left=0.05, right=0.86, top=0.95, bottom=0.07)
+    buffer = io.BytesIO()
+    canvas.print_png(buffer)
+    return buffer.getvalue()
+
+
+class ChartRenderer:
+    """
+    add_technical_indicators 결과 DataFrame으로 캔들/볼린저 밴드/이동평균/거래량 차트를
+    메모리상의 PNG로 그리는 렌더러. 브라우저나 네트워크를 사용하지 않음.
+
+    Args:
+        processes: 렌더링 프로세스 수. 1 이하면 현재 프로세스에서 렌더링 (Agg는 스레드 안전하지 않아 직렬화됨).
+            2 이상이면 프로세스 풀에서 렌더링하므로 여러 마켓의 차트를 동시에 그릴 수 있음
+    """
+
+    # 렌더링에 쓰는 컬럼 (프로세스로 넘기는 데이터를 줄임)
+    COLUMNS = ["open", "high", "low", "close", "volume", "bb_upper", "bb_lower", "bb_middle", *MA_COLORS]
+
+    def __init__(self, width: int = 800, height: int = 600, dpi: int = 100, candles: int = 120,
+                 processes: int = 1):
+        self.width = width
+        self.height = height
+        self.dpi = dpi
+        self.candles = candles
+        self.processes = processes
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if processes > 1:
+            # 스레드가 여러 개인 프로세스에서 fork하지 않도록 spawn 사용
+            self._pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+
+    def render(self, df: pd.DataFrame, title: str = "KRW-BTC") -> bytes:
+        """DataFrame의 최근 candles개 캔들을 PNG 바이트로 렌더링"""
+        df = df.tail(self.candles)
+        df = df[[column for column in self.COLUMNS if column in df.columns]]
+        pool = self._pool
+        if pool is not None:
+            try:
+                return pool.submit(render_png, df, self.width, self.height, self.dpi, title).result()
+            except BrokenProcessPool as e:
+                # 프로세스가 죽었으면 현재 프로세스에서 렌더링하도록 전환
+                logger.error(f"Chart render process pool failed, rendering in-process: {e}")
+                self._pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            return render_png(df, self.width, self.height, self.dpi, title)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def render_processes(setting: int, markets: int) -> int:
+    """CHART_RENDER_PROCESSES 설정값 -> 프로세스 수 (0이면 마켓 수만큼, CPU 코어 수 이하)"""
+    if setting > 0:
+        return setting
+    return max(1, min(markets, os.cpu_count() or 1))
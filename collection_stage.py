@@ -0,0 +1,110 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger("CollectionStage")
+
+
+@dataclass
+class CollectionResult:
+    """수집 단계 결과. 실패하거나 시간 초과된 소스는 기본값으로 채워짐"""
+    values: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.values.get(name, default)
+
+    @property
+    def complete(self) -> bool:
+        return not self.errors
+
+    def format_timings(self) -> str:
+        parts = []
+        for name, seconds in self.timings.items():
+            status = f" ({self.errors[name]})" if name in self.errors else ""
+            parts.append(f"{name}={seconds:.2f}s{status}")
+        return ", ".join(parts)
+
+
+class CollectionStage:
+    """
+    서로 독립적인 데이터 소스를 스레드 풀에서 동시에 수집.
+    소스별 타임아웃이 지나면 기다리지 않고 기본값으로 진행하므로
+    사이클 지연 시간은 소스 지연 시간의 합이 아니라 가장 느린 소스(또는 타임아웃)로 제한됨.
+    """
+
+    def __init__(self, max_workers: int = 8, default_timeout: float = 30.0):
+        self.default_timeout = default_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="collect")
+
+    @staticmethod
+    def _timed(func: Callable[[], Any]):
+        start = time.perf_counter()
+        value = func()
+        return value, time.perf_counter() - start
+
+    def collect(self, sources: Dict[str, Callable[[], Any]],
+                timeouts: Optional[Dict[str, float]] = None,
+                defaults: Optional[Dict[str, Any]] = None) -> CollectionResult:
+        """
+        Args:
+            sources: 소스 이름 -> 인자 없는 수집 함수
+            timeouts: 소스 이름 -> 타임아웃(초). 없으면 default_timeout
+            defaults: 소스 이름 -> 실패/타임아웃 시 사용할 값. 없으면 None
+
+        Returns:
+            CollectionResult (부분 결과 허용)
+        """
+        timeouts = timeouts or {}
+        defaults = defaults or {}
+        result = CollectionResult()
+        start = time.perf_counter()
+
+        futures = {}
+        deadlines = {}
+        for name, func in sources.items():
+            # 호출한 쪽의 contextvars(사이클 추적 등)를 작업 스레드에도 전달
+            futures[self._executor.submit(contextvars.copy_context().run, self._timed, func)] = name
+            deadlines[name] = start + timeouts.get(name, self.default_timeout)
+
+        pending = set(futures)
+        while pending:
+            now = time.perf_counter()
+            next_deadline = min(deadlines[futures[future]] for future in pending)
+            done, pending = wait(pending, timeout=max(next_deadline - now, 0), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = futures[future]
+                try:
+                    value, elapsed = future.result()
+                    result.values[name] = value
+                    result.timings[name] = elapsed
+                except Exception as e:
+                    logger.error(f"Error collecting {name}: {e}")
+                    result.values[name] = defaults.get(name)
+                    result.timings[name] = time.perf_counter() - start
+                    result.errors[name] = str(e) or type(e).__name__
+
+            # 타임아웃된 소스는 결과를 기다리지 않음 (작업은 백그라운드에서 끝까지 실행됨)
+            now = time.perf_counter()
+            for future in [f for f in pending if deadlines[futures[f]] <= now]:
+                name = futures[future]
+                logger.warning(f"Collecting {name} timed out after {now - start:.2f}s")
+                pending.discard(future)
+                result.values[name] = defaults.get(name)
+                result.timings[name] = now - start
+                result.errors[name] = "timeout"
+
+        # 소스 순서대로 정렬
+        result.values = {name: result.values[name] for name in sources}
+        result.timings = {name: result.timings[name] for name in sources}
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
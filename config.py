@@ -7,6 +7,52 @@ class Config:
     ENVIRONMENT = os.getenv("ENVIRONMENT", "local")
     TRADING_INTERVAL = int(os.getenv("TRADING_INTERVAL", 2))  # 기본 2시간 간격
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None  # OpenAI 호환 서버 주소 (로컬 대체 서버 등)
+    DECISION_BACKEND = os.getenv("DECISION_BACKEND", "openai")  # openai / rule
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"  # 단계별 지연 시간 히스토그램
+    METRICS_PORT = int(os.getenv("METRICS_PORT", 0))  # Prometheus 형식 /metrics 포트, 0이면 사용 안 함
+    METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", 3600))  # 단계별 요약을 로그에 쓰는 주기 (초), 0이면 사용 안 함
+    PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 2000))  # 결정 프롬프트 텍스트 토큰 예산 (이미지 제외)
     UPBIT_API_KEY = os.getenv("UPBIT_API_KEY")
     UPBIT_SECRET_KEY = os.getenv("UPBIT_SECRET_KEY")
+    ENGINE_MARKET = os.getenv("ENGINE_MARKET", "KRW-BTC")  # 다중 사용자 엔진이 거래할 마켓 (엔진은 마켓 하나만 거래)
     MINIMUM_ORDER_AMOUNT = float(os.getenv("MINIMUM_ORDER_AMOUNT", 5000))  # 최소 주문 금액
+    TRANSACTION_FEE = float(os.getenv("TRANSACTION_FEE", 0.0005))  # 거래 수수료 (0.05%)
+    MAX_SLIPPAGE_BPS = float(os.getenv("MAX_SLIPPAGE_BPS", 30))  # 예상 슬리피지 한도 (중간가 대비 bps), 넘으면 주문 수량을 줄임. 0이면 사용 안 함
+    ORDER_SLICING = os.getenv("ORDER_SLICING", "true").lower() == "true"  # 큰 주문을 지정가 자식 주문으로 나눠 실행
+    SLICE_MIN_KRW = float(os.getenv("SLICE_MIN_KRW", 50_000_000))  # 이 금액 이상인 주문만 분할 (미만은 시장가)
+    SLICE_COUNT = int(os.getenv("SLICE_COUNT", 5))  # 분할 구간 수
+    SLICE_INTERVAL = float(os.getenv("SLICE_INTERVAL", 30))  # 구간 길이 (초)
+    SLICE_POLL_INTERVAL = float(os.getenv("SLICE_POLL_INTERVAL", 2))  # 체결 조회 주기 (초)
+    PAPER_TRADING = os.getenv("PAPER_TRADING", "false").lower() == "true"  # 사용자별 가상 계좌로 주문 (실제 주문 없음)
+    PAPER_KRW_BALANCE = float(os.getenv("PAPER_KRW_BALANCE", 10_000_000))  # 가상 계좌 시작 잔고
+    ACCOUNT_CACHE_TTL = float(os.getenv("ACCOUNT_CACHE_TTL", 5))  # 잔고 조회 캐시 유지 시간 (초)
+    ENGINE_TICK_SECONDS = int(os.getenv("ENGINE_TICK_SECONDS", 1))  # 엔진이 실행할 사용자를 확인하는 주기
+    ENGINE_MAX_WORKERS = int(os.getenv("ENGINE_MAX_WORKERS", 32))  # 사용자별 결정/주문 동시 실행 수
+    TIMER_WHEEL_TICK = float(os.getenv("TIMER_WHEEL_TICK", 1))  # 런타임 타이머 휠 틱 (초)
+    RUNTIME_IO_WORKERS = int(os.getenv("RUNTIME_IO_WORKERS", 16))  # REST/파일 등 블로킹 I/O 실행기 스레드 수
+    TRADING_DATA_TIMEOUT = int(os.getenv("TRADING_DATA_TIMEOUT", 30))  # 데이터 수집 소스별 타임아웃 (초)
+    CHART_TIMEOUT = int(os.getenv("CHART_TIMEOUT", 60))
+    FEAR_GREED_TIMEOUT = int(os.getenv("FEAR_GREED_TIMEOUT", 10))
+    NEWS_TIMEOUT = int(os.getenv("NEWS_TIMEOUT", 10))
+    FEAR_GREED_URL = os.getenv("FEAR_GREED_URL", "https://api.alternative.me/fng/")
+    NEWS_RSS_URL = os.getenv("NEWS_RSS_URL", "https://news.google.com/rss/search?q=btc+when:1d&hl=en-US&gl=US&ceid=US:en")
+    FEAR_GREED_CACHE_TTL = int(os.getenv("FEAR_GREED_CACHE_TTL", 3600))  # 하루 한 번 바뀌므로 1시간 캐시
+    NEWS_CACHE_TTL = int(os.getenv("NEWS_CACHE_TTL", 600))
+    HTTP_STALE_TTL = int(os.getenv("HTTP_STALE_TTL", 86400))  # TTL이 지난 뒤 재검증하는 동안(또는 요청 실패 시) 이전 값을 쓰는 시간
+    CHART_LOAD_WAIT = int(os.getenv("CHART_LOAD_WAIT", 3))  # 차트 로딩 대기 시간
+    CHART_WIDTH = int(os.getenv("CHART_WIDTH", 800))  # 차트 캡처 너비
+    CHART_HEIGHT = int(os.getenv("CHART_HEIGHT", 600))  # 차트 캡처 높이
+    CHART_SOURCE = os.getenv("CHART_SOURCE", "renderer")  # renderer: 로컬 렌더링, browser: 업비트 스크린샷
+    CHART_INTERVAL = os.getenv("CHART_INTERVAL", "minute3")  # 렌더링할 캔들 간격
+    CHART_CANDLES = int(os.getenv("CHART_CANDLES", 120))  # 렌더링할 캔들 개수
+    # 차트 렌더링 프로세스 수 (0: 마켓 수만큼, CPU 코어 수 이하 / 1: 프로세스 풀 없이 현재 프로세스에서)
+    CHART_RENDER_PROCESSES = int(os.getenv("CHART_RENDER_PROCESSES", 0))
+    CHART_POOL_SIZE = int(os.getenv("CHART_POOL_SIZE", 1))  # 유지할 차트 브라우저 세션 수
+    CHART_SESSION_MAX_AGE = int(os.getenv("CHART_SESSION_MAX_AGE", 3600))  # 세션 재생성 주기 (초)
+    CHART_SESSION_MAX_USES = int(os.getenv("CHART_SESSION_MAX_USES", 200))  # 세션당 최대 스크린샷 횟수
+    CHART_IMAGE_FORMAT = os.getenv("CHART_IMAGE_FORMAT", "webp")  # AI에 첨부할 차트 형식 (png/jpeg/webp)
+    CHART_IMAGE_QUALITY = int(os.getenv("CHART_IMAGE_QUALITY", 80))
+    CHART_IMAGE_MAX_WIDTH = int(os.getenv("CHART_IMAGE_MAX_WIDTH", 768))  # 첨부 전 이 크기 안으로 축소
+    CHART_IMAGE_MAX_HEIGHT = int(os.getenv("CHART_IMAGE_MAX_HEIGHT", 768))
+    CHART_IMAGE_CROP = os.getenv("CHART_IMAGE_CROP", "")  # 'left,top,right,bottom' (비우면 여백만 자동 제거)
@@ -1,155 +1,153 @@
-from email import feedparser
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime
 import base64
 import os
 import pandas as pd
 import time
-from ta.trend import MACD, SMAIndicator, EMAIndicator
-from ta.momentum import RSIIndicator, StochasticOscillator
-from ta.volatility import BollingerBands, AverageTrueRange
-from ta.volume import OnBalanceVolumeIndicator, VolumeWeightedAveragePrice
 from typing import Optional
 import pyupbit
-import requests
 from typing import Dict, Any, List, Optional
 import logging
+from candle_store import CandleStore
+from indicator_engine import IndicatorEngine, add_technical_indicators
+from chart_capture import CHART_URL_TEMPLATE, ChartBrowserPool, chrome_driver_factory
+from chart_renderer import ChartRenderer, render_processes
+from http_client import CachedHttpClient
+from market_context import (fetch_fear_greed_index, fetch_fear_greed_index_async, fetch_news_headlines,
+                            fetch_news_headlines_async)
+from image_pipeline import DebugImageWriter, ImagePipeline, parse_crop_box
+from market_snapshot import UpbitMarketCache, build_investment_status
+from config import Config
+from utils.tracing import traced
 
 logger = logging.getLogger("DataCollector")
 
 class DataCollector:
+    def __init__(self, config=Config, candle_store: Optional[CandleStore] = None, market: Optional[str] = None):
+        """
+        Args:
+            market: 시세/차트를 수집할 마켓 (기본값 config.ENGINE_MARKET)
+        """
+        self.config = config
+        self.market = market or config.ENGINE_MARKET
+        self.candle_store = candle_store or CandleStore()
+        self.indicator_engine = IndicatorEngine()
+
+        # 차트 페이지를 띄워 둔 브라우저 세션 풀 (첫 캡처 시 생성)
+        self.chart_pool = ChartBrowserPool(
+            chrome_driver_factory(config.ENVIRONMENT, config.CHART_WIDTH, config.CHART_HEIGHT),
+            prepare_page=self.prepare_chart_page,
+            url=CHART_URL_TEMPLATE.format(market=self.market),
+            size=config.CHART_POOL_SIZE,
+            load_wait=config.CHART_LOAD_WAIT,
+            max_age=config.CHART_SESSION_MAX_AGE,
+            max_uses=config.CHART_SESSION_MAX_USES
+        )
+        # 엔진은 틱당 차트를 하나만 그리므로 프로세스 풀은 CHART_RENDER_PROCESSES를 지정했을 때만 사용
+        self.chart_renderer = ChartRenderer(
+            config.CHART_WIDTH, config.CHART_HEIGHT, candles=config.CHART_CANDLES,
+            processes=render_processes(config.CHART_RENDER_PROCESSES, 1)
+        )
+
+        # 차트는 메모리에서 축소/재인코딩해 바로 첨부하고, 디버깅 사본은 백그라운드에서 저장
+        self.image_pipeline = ImagePipeline(
+            max_width=config.CHART_IMAGE_MAX_WIDTH,
+            max_height=config.CHART_IMAGE_MAX_HEIGHT,
+            image_format=config.CHART_IMAGE_FORMAT,
+            quality=config.CHART_IMAGE_QUALITY,
+            crop=parse_crop_box(config.CHART_IMAGE_CROP)
+        )
+        if config.ENVIRONMENT == 'EC2':
+            debug_dir = "/home/ubuntu/bitcoin_chart_debug"
+        else:
+            debug_dir = os.path.join(os.path.expanduser("~"), "bitcoin_chart_debug")
+        self.debug_writer = DebugImageWriter(debug_dir)
+
+        # 뉴스/공포탐욕지수는 조건부 GET + TTL 캐시 (모든 사용자가 공유)
+        self.http_client = CachedHttpClient()
+
+    @traced()
     def collect_fear_greed_index(self) -> str:
-        try:
-            response = requests.get("https://api.alternative.me/fng/")  # 공포와 탐욕 지수 API
-            if response.status_code == 200:
-                data = response.json()
-                return data["data"][0]["value_classification"]
-            return "Unknown"
-        except Exception as e:
-            print(f"Error fetching fear and greed index: {e}")
-            return "Error"
+        index = fetch_fear_greed_index(
+            self.http_client, self.config.FEAR_GREED_URL, ttl=self.config.FEAR_GREED_CACHE_TTL,
+            stale_ttl=self.config.HTTP_STALE_TTL, timeout=self.config.FEAR_GREED_TIMEOUT
+        )
+        return index["classification"] if index else "Error"
 
+    @traced()
     def fetch_google_news(self) -> List[Dict[str, str]]:
         """
         Fetch the latest BTC news headlines from Google News RSS
         """
-        rss_url = "https://news.google.com/rss/search?q=btc+when:1d&hl=en-US&gl=US&ceid=US:en"
-
-        try:
-            # RSS 피드 파싱
-            feed = feedparser.parse(rss_url)
-
-            # 최신 뉴스 5개만 추출
-            news_results = []
-            for entry in feed.entries[:5]:
-                news_results.append({
-                    "title": entry.title,
-                    "date": entry.published
-                })
-
-            return news_results
-        except Exception as e:
-            logger.error(f"Error fetching Google News: {e}")
-            return []
+        return fetch_news_headlines(
+            self.http_client, self.config.NEWS_RSS_URL, ttl=self.config.NEWS_CACHE_TTL,
+            stale_ttl=self.config.HTTP_STALE_TTL, timeout=self.config.NEWS_TIMEOUT
+        )
+
+    @traced("collect_fear_greed_index")
+    async def collect_fear_greed_index_async(self, http) -> str:
+        """collect_fear_greed_index의 asyncio 버전 (http: async_runtime.AsyncHttpClient)"""
+        index = await fetch_fear_greed_index_async(
+            self.http_client, http, self.config.FEAR_GREED_URL, ttl=self.config.FEAR_GREED_CACHE_TTL,
+            stale_ttl=self.config.HTTP_STALE_TTL, timeout=self.config.FEAR_GREED_TIMEOUT
+        )
+        return index["classification"] if index else "Error"
+
+    @traced("fetch_google_news")
+    async def fetch_google_news_async(self, http) -> List[Dict[str, str]]:
+        """fetch_google_news의 asyncio 버전"""
+        return await fetch_news_headlines_async(
+            self.http_client, http, self.config.NEWS_RSS_URL, ttl=self.config.NEWS_CACHE_TTL,
+            stale_ttl=self.config.HTTP_STALE_TTL, timeout=self.config.NEWS_TIMEOUT
+        )
 
     def add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Add technical indicators (RSI, MACD, Bollinger Bands, Stochastic) to the DataFrame.
         """
-        # 기본 지표들
-        bb = BollingerBands(close=df['close'])
-        macd = MACD(close=df['close'])
-        rsi = RSIIndicator(close=df['close'])
-        stoch = StochasticOscillator(high=df['high'], low=df['low'], close=df['close'])
-        atr = AverageTrueRange(high=df['high'], low=df['low'], close=df['close'])
-        obv = OnBalanceVolumeIndicator(close=df['close'], volume=df['volume'])
-        vwap = VolumeWeightedAveragePrice(high=df['high'], low=df['low'], close=df['close'],
-                                          volume=df['volume'])
-
-        # 이동평균선
-        df['ma5'] = SMAIndicator(close=df['close'], window=5).sma_indicator()
-        df['ma20'] = SMAIndicator(close=df['close'], window=20).sma_indicator()
-        df['ma60'] = SMAIndicator(close=df['close'], window=60).sma_indicator()
-        df['ma120'] = SMAIndicator(close=df['close'], window=120).sma_indicator()
-
-        # 볼린저 밴드
-        df['bb_upper'] = bb.bollinger_hband()
-        df['bb_middle'] = bb.bollinger_mavg()
-        df['bb_lower'] = bb.bollinger_lband()
-        df['bb_width'] = bb.bollinger_wband()
-
-        # MACD
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_diff'] = macd.macd_diff()
-
-        # RSI
-        df['rsi'] = rsi.rsi()
-
-        # Stochastic
-        df['stoch_k'] = stoch.stoch()
-        df['stoch_d'] = stoch.stoch_signal()
-
-        # ATR
-        df['atr'] = atr.average_true_range()
-
-        # OBV
-        df['obv'] = obv.on_balance_volume()
-
-        # VWAP
-        df['vwap'] = vwap.volume_weighted_average_price()
-
-        return df
-
-    def get_trading_data(self) -> Dict[str, Any]:
+        return add_technical_indicators(df)
+
+    @traced()
+    def get_investment_status(self, market_cache: UpbitMarketCache, current_price: Optional[float] = None) -> Dict[str, Any]:
+        """
+        사용자 계좌 기준 투자 상태 (잔고는 사용자별, 현재가는 공유 시세 사용)
+        """
+        if current_price is None:
+            current_price = market_cache.get_current_price(self.market)
+        return build_investment_status(
+            market_cache.get_balance("KRW"),
+            market_cache.get_balance(self.market),
+            market_cache.get_avg_buy_price(self.market),
+            current_price
+        )
+
+    @traced()
+    def get_market_data(self) -> Dict[str, Any]:
         """
-        Collect all trading-related data including OHLCV and technical indicators.
+        Collect account-independent market data (price, orderbook, OHLCV, technical indicators).
+        모든 사용자가 공유하므로 틱당 한 번만 수집함.
         """
         try:
-            # 현재 상태 조회
-            krw_balance = self.upbit.get_balance("KRW")
-            btc_balance = self.upbit.get_balance("KRW-BTC")
-            avg_buy_price = self.upbit.get_avg_buy_price("KRW-BTC")
-            current_price = pyupbit.get_current_price("KRW-BTC")
-            orderbook = pyupbit.get_orderbook("KRW-BTC")["orderbook_units"]
-
-            # 총 자산 계산
-            total_assets = krw_balance + (btc_balance * current_price)
-            btc_ratio = (btc_balance * current_price) / total_assets if total_assets > 0 else 0
-            profit_loss = ((current_price - avg_buy_price) / avg_buy_price * 100) if avg_buy_price > 0 else 0
-
-            # 기본 투자 상태
-            investment_status = {
-                "krw_balance": krw_balance,
-                "btc_balance": btc_balance,
-                "avg_buy_price": avg_buy_price,
-                "current_price": current_price,
-                "total_assets": total_assets,
-                "btc_ratio": btc_ratio,
-                "profit_loss": profit_loss
-            }
-
-            # OHLCV 데이터 가져오기
-            daily_data = pyupbit.get_ohlcv("KRW-BTC", count=200, interval="day")
-            hourly_data = pyupbit.get_ohlcv("KRW-BTC", interval="minute60", count=200)
+            current_price = pyupbit.get_current_price(self.market)
+            orderbook = pyupbit.get_orderbook(self.market)["orderbook_units"]
+
+            # OHLCV 데이터 가져오기 (로컬 캔들 저장소에서 새 캔들만 동기화)
+            daily_data = self.candle_store.get_ohlcv(self.market, interval="day", count=200)
+            hourly_data = self.candle_store.get_ohlcv(self.market, interval="minute60", count=200)
 
             if daily_data is not None and hourly_data is not None:
                 # 컬럼 이름을 소문자로 변환
                 daily_data.columns = [col.lower() for col in daily_data.columns]
                 hourly_data.columns = [col.lower() for col in hourly_data.columns]
 
-                # 기술적 지표 추가
-                daily_data = self.add_technical_indicators(daily_data)
-                hourly_data = self.add_technical_indicators(hourly_data)
+                # 기술적 지표 추가 (새 캔들만 증분 계산)
+                daily_data = self.indicator_engine.apply((self.market, "day"), daily_data)
+                hourly_data = self.indicator_engine.apply((self.market, "minute60"), hourly_data)
 
                 return {
-                    "investment_status": investment_status,
+                    "current_price": current_price,
                     "orderbook": orderbook,
                     "daily_data": daily_data.tail(30).to_dict('records'),
                     "hourly_data": hourly_data.tail(24).to_dict('records'),
@@ -174,80 +172,71 @@ class DataCollector:
                 }
             else:
                 logger.error("Failed to fetch OHLCV data.")
-                return {"investment_status": investment_status, "orderbook": orderbook}
+                return {"current_price": current_price, "orderbook": orderbook}
         except Exception as e:
-            logger.error(f"Error fetching trading data: {e}")
+            logger.error(f"Error fetching market data: {e}")
             return {}
 
-    def capture_chart(self) -> Optional[str]:
+    def get_trading_data(self, market_cache: UpbitMarketCache) -> Dict[str, Any]:
         """
-        Capture and encode chart image based on environment
+        Collect all trading-related data for one account: shared market data + investment status.
         """
-        # Chrome WebDriver 설정
-        if self.config.ENVIRONMENT == 'EC2':
-            chrome_options = Options()
-            chrome_options.add_argument('--headless=new')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--remote-debugging-port=9222')
-            chrome_options.add_argument('--disable-software-rasterizer')
-            chrome_options.add_argument(f"--window-size={self.config.CHART_WIDTH},{self.config.CHART_HEIGHT}")
-
-            chromedriver_path = "/home/ubuntu/.wdm/drivers/chromedriver/linux64/128.0.6613.137/chromedriver-linux64/chromedriver"
-            service = Service(executable_path=chromedriver_path)
-        else:
-            chrome_options = Options()
-            chrome_options.add_argument("--start-maximized")
-            chrome_options.add_argument("--disable-infobars")
-            chrome_options.add_argument("--disable-extensions")
-            chrome_options.add_argument(f"--window-size={self.config.CHART_WIDTH},{self.config.CHART_HEIGHT}")
-            service = Service(ChromeDriverManager().install())
-
+        market_data = self.get_market_data()
         try:
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            driver.set_page_load_timeout(10)
-            driver.get("https://upbit.com/full_chart?code=CRIX.UPBIT.KRW-BTC")
+            investment_status = self.get_investment_status(market_cache, market_data.get("current_price"))
+        except Exception as e:
+            logger.error(f"Error fetching investment status: {e}")
+            return market_data
+        return {**market_data, "investment_status": investment_status}
 
-            # 명시적 대기
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            time.sleep(self.config.CHART_LOAD_WAIT)
+    def prepare_chart_page(self, driver):
+        """
+        차트 세션 생성 시 한 번만 실행되는 페이지 설정 (3분봉, 볼린저 밴드)
+        """
+        # 3분 간격 설정
+        if not self.select_3min_interval(driver):
+            logger.error("Failed to select 3-minute interval.")
 
-            # 3분 간격 설정
-            if not self.select_3min_interval(driver):
-                logger.error("Failed to select 3-minute interval.")
+        # 볼린저 밴드 설정
+        if not self.select_bollinger_band(driver):
+            logger.error("Failed to select Bollinger Band.")
 
-            # 볼린저 밴드 설정
-            if not self.select_bollinger_band(driver):
-                logger.error("Failed to select Bollinger Band.")
+    def render_chart(self) -> Optional[bytes]:
+        """
+        로컬 캔들 데이터로 차트 PNG 렌더링 (브라우저/네트워크 없음)
+        """
+        df = self.candle_store.get_ohlcv(self.market, interval=self.config.CHART_INTERVAL, count=200)
+        if df is None or df.empty:
+            return None
+        df = self.indicator_engine.apply((self.market, self.config.CHART_INTERVAL), df)
+        return self.chart_renderer.render(df, title=f"{self.market} {self.config.CHART_INTERVAL}")
 
-            # 디버깅 디렉토리 설정
-            if self.config.ENVIRONMENT == 'EC2':
-                debug_dir = "/home/ubuntu/bitcoin_chart_debug"
+    @traced()
+    def capture_chart(self) -> Optional[str]:
+        """
+        Capture and encode chart image based on environment
+        """
+        try:
+            if self.config.CHART_SOURCE == 'browser':
+                # 미리 띄워 둔 브라우저 세션에서 스크린샷만 가져옴
+                screenshot = self.chart_pool.screenshot()
             else:
-                debug_dir = os.path.join(os.path.expanduser("~"), "bitcoin_chart_debug")
+                screenshot = self.render_chart()
+            if screenshot is None:
+                logger.error("Failed to take chart screenshot.")
+                return None
 
-            os.makedirs(debug_dir, exist_ok=True)
+            image = self.image_pipeline.process(screenshot)
+            logger.info(f"Chart image: {image.summary()}")
 
-            # 타임스탬프 기반 파일명 생성
+            # 첨부한 이미지 그대로 디버깅 사본 저장 (비동기)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_path = os.path.join(debug_dir, f"chart_screenshot_{timestamp}.png")
-
-            # 스크린샷 저장
-            driver.save_screenshot(screenshot_path)
-            logger.info(f"Screenshot saved to {screenshot_path}")
+            self.debug_writer.submit(f"chart_screenshot_{timestamp}.{image.extension}", image.data)
 
-            # Base64로 인코딩
-            encoded_image = self.encode_image(screenshot_path)
-
-            return encoded_image
+            return image.base64()
         except Exception as e:
             logger.error(f"Error capturing chart: {e}")
             return None
-        finally:
-            driver.quit()
 
     def encode_image(self, file_path: str) -> str:
         """
@@ -255,11 +244,17 @@ class DataCollector:
         """
         try:
             with open(file_path, "rb") as image_file:
-                return base64.b64encode(image_file.read()).decode('utf-8')
+                return self.encode_image_bytes(image_file.read())
         except Exception as e:
             logger.error(f"Error encoding image to Base64: {e}")
             return ""
 
+    def encode_image_bytes(self, image: bytes) -> str:
+        """
+        Encode in-memory image bytes to Base64
+        """
+        return base64.b64encode(image).decode('utf-8')
+
     def select_bollinger_band(self, driver):
         """
         볼린저 밴드 설정을 위한 함수.
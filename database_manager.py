@@ -0,0 +1,292 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger("DatabaseManager")
+
+# 어댑터/컨버터는 프로세스 전역 설정이므로 한 번만 등록
+sqlite3.register_adapter(datetime, lambda dt: dt.isoformat())
+sqlite3.register_converter("timestamp", lambda val: datetime.fromisoformat(val.decode()))
+
+
+class DatabaseManager:
+    # _init_db 이후 추가된 컬럼 (log_trade가 기록하는 GPT 판단 데이터)
+    MIGRATION_COLUMNS = [
+        ("technical_indicators", "TEXT"),
+        ("market_conditions", "TEXT"),
+        ("trading_volume", "TEXT"),
+        ("fear_greed_data", "TEXT"),
+        ("news_sentiment", "TEXT"),
+        ("confidence_score", "INTEGER"),
+        ("risk_assessment", "TEXT"),
+        # 다중 마켓 이전 기록은 모두 KRW-BTC 거래
+        ("market", "TEXT DEFAULT 'KRW-BTC'"),
+    ]
+
+    # 문장을 고정해 두어 sqlite3 statement cache에서 준비된 문장을 재사용
+    LATEST_REFLECTION_SQL = """
+        SELECT
+            strategy_analysis,
+            key_patterns,
+            improvement_suggestions
+        FROM trades
+        ORDER BY timestamp DESC
+        LIMIT 1
+    """
+
+    MARKET_REFLECTION_SQL = """
+        SELECT
+            strategy_analysis,
+            key_patterns,
+            improvement_suggestions
+        FROM trades
+        WHERE market = ?
+        ORDER BY timestamp DESC
+        LIMIT 1
+    """
+
+    INSERT_TRADE_SQL = """
+        INSERT INTO trades (
+            timestamp, decision, percentage, reason,
+            btc_balance, krw_balance, btc_avg_buy_price,
+            btc_krw_price, reflection,
+            strategy_analysis, key_patterns, improvement_suggestions,
+            trigger_type, price_change_percent,
+            technical_indicators, market_conditions, trading_volume,
+            fear_greed_data, news_sentiment, confidence_score, risk_assessment, chart_path, market
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    RECENT_TRADES_SQL = """
+        SELECT
+            timestamp,
+            decision,
+            percentage,
+            btc_krw_price
+        FROM trades
+        ORDER BY timestamp DESC
+        LIMIT ?
+    """
+
+    MARKET_TRADES_SQL = """
+        SELECT
+            timestamp,
+            decision,
+            percentage,
+            btc_krw_price
+        FROM trades
+        WHERE market = ?
+        ORDER BY timestamp DESC
+        LIMIT ?
+    """
+
+    def __init__(self, db_path: str, synchronous: str = "NORMAL", pool_size: int = 4):
+        self.db_path = db_path
+        self.synchronous = synchronous
+        # 크기가 제한된 연결 풀 (트리거마다 생기는 단명 스레드가 연결을 남기지 않도록
+        # 스레드가 아닌 호출 단위로 빌려 쓰고 반납)
+        self.pool_size = max(1, pool_size)
+        self._connections: List[sqlite3.Connection] = []
+        self._idle: List[sqlite3.Connection] = []
+        self._pool_count = 0
+        self._pool_cond = threading.Condition()
+        # 연결별로 적용된 synchronous 모드 (set_synchronous 이후 빌려 줄 때 다시 적용)
+        self._applied_synchronous: Dict[int, str] = {}
+        self._init_db()
+
+    def _init_db(self):
+        with self._connection() as conn:
+            self._create_schema(conn)
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS trades (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                -- 기본 정보
+                decision TEXT,
+                percentage REAL,
+                reason TEXT,
+                -- 잔고 정보
+                btc_balance REAL,
+                krw_balance REAL,
+                btc_avg_buy_price REAL,
+                btc_krw_price REAL,
+                -- 분석 정보
+                reflection TEXT,
+                strategy_analysis TEXT,
+                key_patterns TEXT,
+                improvement_suggestions TEXT,
+                -- 트리거 정보
+                trigger_type TEXT,
+                price_change_percent REAL,
+                chart_path TEXT
+            )
+        """)
+        self._migrate(cursor)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades (timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_trigger_type ON trades (trigger_type, timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_market ON trades (market, timestamp)")
+        conn.commit()
+
+    def _migrate(self, cursor: sqlite3.Cursor):
+        """기존 DB에 없는 컬럼 추가"""
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(trades)")}
+        for name, column_type in self.MIGRATION_COLUMNS:
+            if name not in existing:
+                logger.info(f"Adding column trades.{name}")
+                cursor.execute(f"ALTER TABLE trades ADD COLUMN {name} {column_type}")
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            cached_statements=64,
+            check_same_thread=False
+        )
+        # WAL: 읽기와 쓰기가 서로를 막지 않음
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def set_synchronous(self, synchronous: str):
+        """SQLite synchronous 모드 변경. 이미 열린 연결에도 다음에 빌려 줄 때 적용"""
+        with self._pool_cond:
+            self.synchronous = synchronous
+
+    def _apply_synchronous(self, conn: sqlite3.Connection):
+        mode = self.synchronous
+        if self._applied_synchronous.get(id(conn)) != mode:
+            conn.execute(f"PRAGMA synchronous={mode}")
+            self._applied_synchronous[id(conn)] = mode
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """풀에서 연결을 빌려 쓰고 반납 (풀이 가득 차면 반납될 때까지 대기)"""
+        with self._pool_cond:
+            while not self._idle and self._pool_count >= self.pool_size:
+                self._pool_cond.wait()
+            conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                # 자리만 먼저 잡고 연결은 락 밖에서 생성
+                self._pool_count += 1
+        if conn is None:
+            try:
+                conn = self._open_connection()
+            except Exception:
+                with self._pool_cond:
+                    self._pool_count -= 1
+                    self._pool_cond.notify()
+                raise
+            with self._pool_cond:
+                self._connections.append(conn)
+        try:
+            self._apply_synchronous(conn)
+            yield conn
+        finally:
+            with self._pool_cond:
+                if any(c is conn for c in self._connections):
+                    self._idle.append(conn)
+                else:
+                    # close() 이후 반납된 연결 (close()에서 세지 않았으므로 여기서 자리 반환)
+                    self._applied_synchronous.pop(id(conn), None)
+                    self._pool_count -= 1
+                    conn.close()
+                self._pool_cond.notify()
+
+    def close(self):
+        """풀의 모든 연결 종료 (사용 중인 연결은 반납 시점에 닫힘)"""
+        with self._pool_cond:
+            for conn in self._idle:
+                try:
+                    conn.close()
+                except Exception as e:
+                    logger.error(f"Error closing database connection: {e}")
+            for conn in self._idle:
+                self._applied_synchronous.pop(id(conn), None)
+            # 사용 중인 연결은 반납될 때 닫히며 그때 자리를 반환
+            self._pool_count -= len(self._idle)
+            self._idle.clear()
+            self._connections.clear()
+            self._pool_cond.notify_all()
+
+    def get_latest_reflection(self, market: Optional[str] = None) -> Dict[str, Any]:
+        """최근 거래에 대한 회고 데이터 가져오기 (market을 주면 그 마켓 거래만)"""
+        try:
+            with self._connection() as conn:
+                if market is None:
+                    row = conn.execute(self.LATEST_REFLECTION_SQL).fetchone()
+                else:
+                    row = conn.execute(self.MARKET_REFLECTION_SQL, (market,)).fetchone()
+            if row:
+                return {
+                    "strategy_analysis": row[0],
+                    "key_patterns": row[1],
+                    "improvement_suggestions": row[2]
+                }
+            return {}
+        except Exception as e:
+            logger.error(f"Error fetching latest reflection: {e}")
+            return {}
+
+    @staticmethod
+    def trade_row(trade_data: Dict[str, Any]) -> tuple:
+        """log_trade에 넘기는 dict를 INSERT_TRADE_SQL 파라미터로 변환 (JSON 직렬화 포함)"""
+        return (
+            trade_data.get('timestamp') or datetime.now(),
+            trade_data['decision'],
+            trade_data['percentage'],
+            trade_data['reason'],
+            trade_data['btc_balance'],
+            trade_data['krw_balance'],
+            trade_data['avg_buy_price'],
+            trade_data['current_price'],
+            trade_data['reflection'],
+            trade_data.get('strategy_analysis', ''),
+            trade_data.get('key_patterns', ''),
+            trade_data.get('improvement_suggestions', ''),
+            trade_data.get('trigger_type', 'schedule'),
+            trade_data.get('price_change_percent', 0.0),
+            json.dumps(trade_data.get('technical_indicators', {})),
+            json.dumps(trade_data.get('market_conditions', {})),
+            json.dumps(trade_data.get('trading_volume', {})),
+            json.dumps(trade_data.get('fear_greed_data', {})),
+            json.dumps(trade_data.get('news_sentiment', {})),
+            trade_data.get('confidence', 0),
+            trade_data.get('risk_level', ''),
+            trade_data.get('chart_path', ''),
+            trade_data.get('market', 'KRW-BTC')
+        )
+
+    def log_trade(self, trade_data: Dict[str, Any]):
+        self.log_trades([trade_data])
+
+    def log_trades(self, trades: List[Dict[str, Any]]) -> bool:
+        """여러 거래를 하나의 트랜잭션으로 기록"""
+        rows = []
+        for trade_data in trades:
+            try:
+                rows.append(self.trade_row(trade_data))
+            except Exception as e:
+                logger.error(f"Error serializing trade: {e}")
+        with self._connection() as conn:
+            try:
+                conn.executemany(self.INSERT_TRADE_SQL, rows)
+                conn.commit()
+                return True
+            except Exception as e:
+                logger.error(f"Error logging trade: {e}")
+                conn.rollback()
+                return False
+
+    def get_recent_trades(self, limit: int = 5, market: Optional[str] = None) -> List[tuple]:
+        """Get recent trades from database (market을 주면 그 마켓 거래만)"""
+        with self._connection() as conn:
+            if market is None:
+                return conn.execute(self.RECENT_TRADES_SQL, (limit,)).fetchall()
+            return conn.execute(self.MARKET_TRADES_SQL, (market, limit)).fetchall()
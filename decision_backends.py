@@ -0,0 +1,248 @@
+import asyncio
+import json
+import math
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from openai import AsyncOpenAI, OpenAI
+
+logger = logging.getLogger("DecisionBackend")
+
+DEFAULT_MODEL = "gpt-4o-2024-08-06"
+
+# chat completions response_format (OpenAI 백엔드와 로컬 대체 서버가 같은 스키마 사용)
+TRADING_DECISION_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "trading_decision",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "decision": {"type": "string", "enum": ["buy", "sell", "hold"]},
+                "percentage": {"type": "number"},
+                "reason": {"type": "string"},
+                "risk_level": {"type": "string", "enum": ["low", "medium", "high"]},
+                "confidence": {"type": "integer"}
+            },
+            "required": ["decision", "percentage", "reason", "risk_level", "confidence"],
+            "additionalProperties": False
+        }
+    }
+}
+
+TRADING_REFLECTION_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "trading_reflection",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "strategy_analysis": {"type": "string"},
+                "key_patterns": {"type": "string"},
+                "improvement_suggestions": {"type": "string"}
+            },
+            "required": ["strategy_analysis", "key_patterns", "improvement_suggestions"],
+            "additionalProperties": False
+        }
+    }
+}
+
+
+class DecisionBackend:
+    """
+    거래 결정/회고를 만드는 백엔드 인터페이스.
+    messages는 OpenAI chat 형식 프롬프트, trading_data는 get_trading_data 결과 (규칙 기반 백엔드가 사용).
+    """
+    name = "base"
+
+    def decide(self, messages: List[Dict[str, Any]], trading_data: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def reflect(self, messages: List[Dict[str, Any]], recent_trades: List[tuple]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def adecide(self, messages: List[Dict[str, Any]], trading_data: Dict[str, Any]) -> Dict[str, Any]:
+        """decide의 asyncio 버전 (기본: 스레드에서 decide 실행)"""
+        return await asyncio.to_thread(self.decide, messages, trading_data)
+
+    async def areflect(self, messages: List[Dict[str, Any]], recent_trades: List[tuple]) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.reflect, messages, recent_trades)
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        self.close()
+
+
+class OpenAIBackend(DecisionBackend):
+    """OpenAI chat completions (base_url로 로컬 대체 서버를 가리킬 수 있음)"""
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 model: str = DEFAULT_MODEL, timeout: float = 60.0, max_retries: int = 2):
+        self.model = model
+        # 로컬 대체 서버는 키를 확인하지 않지만 클라이언트는 키가 필요함
+        self._client_options = dict(api_key=api_key or "local", base_url=base_url or None,
+                                    timeout=timeout, max_retries=max_retries)
+        self.client = OpenAI(**self._client_options)
+        # 비동기 클라이언트는 이벤트 루프 안에서 처음 사용할 때 생성 (연결 풀이 루프에 묶임)
+        self._async_client: Optional[AsyncOpenAI] = None
+
+    def complete_json(self, messages: List[Dict[str, Any]], response_format: Dict[str, Any],
+                      max_tokens: int = 500) -> Dict[str, Any]:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            response_format=response_format,
+            max_tokens=max_tokens
+        )
+        content = response.choices[0].message.content
+        logger.info(f"GPT Response: {content}")
+        return json.loads(content)
+
+    async def complete_json_async(self, messages: List[Dict[str, Any]], response_format: Dict[str, Any],
+                                  max_tokens: int = 500) -> Dict[str, Any]:
+        """응답을 기다리는 동안 스레드를 잡지 않음 (많은 사용자의 결정을 한 루프에서 동시에 요청)"""
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(**self._client_options)
+        response = await self._async_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            response_format=response_format,
+            max_tokens=max_tokens
+        )
+        content = response.choices[0].message.content
+        logger.info(f"GPT Response: {content}")
+        return json.loads(content)
+
+    def decide(self, messages: List[Dict[str, Any]], trading_data: Dict[str, Any]) -> Dict[str, Any]:
+        return self.complete_json(messages, TRADING_DECISION_FORMAT)
+
+    def reflect(self, messages: List[Dict[str, Any]], recent_trades: List[tuple]) -> Dict[str, Any]:
+        return self.complete_json(messages, TRADING_REFLECTION_FORMAT)
+
+    async def adecide(self, messages: List[Dict[str, Any]], trading_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.complete_json_async(messages, TRADING_DECISION_FORMAT)
+
+    async def areflect(self, messages: List[Dict[str, Any]], recent_trades: List[tuple]) -> Dict[str, Any]:
+        return await self.complete_json_async(messages, TRADING_REFLECTION_FORMAT)
+
+    def close(self):
+        self.client.close()
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+        self.close()
+
+
+def _value(values: Dict[str, Any], name: str) -> Optional[float]:
+    try:
+        value = float(values.get(name))
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+class RuleBasedBackend(DecisionBackend):
+    """
+    technical_summary 지표만으로 결정하는 결정적(deterministic) 백엔드.
+    네트워크를 쓰지 않으므로 오프라인 테스트, 부하 테스트, API 장애 시 대체용으로 사용.
+    """
+    name = "rule"
+
+    def __init__(self, oversold: float = 30.0, overbought: float = 70.0,
+                 threshold: int = 2, step_percentage: float = 25.0):
+        self.oversold = oversold
+        self.overbought = overbought
+        self.threshold = threshold
+        self.step_percentage = step_percentage
+
+    def score(self, technical_summary: Dict[str, Dict[str, Any]]) -> Tuple[int, List[str]]:
+        """매수 신호 +1, 매도 신호 -1"""
+        score, signals = 0, []
+        hourly = technical_summary.get("hourly", {}) or {}
+        daily = technical_summary.get("daily", {}) or {}
+
+        for label, values in (("hourly", hourly), ("daily", daily)):
+            rsi = _value(values, "rsi")
+            if rsi is not None and rsi < self.oversold:
+                score += 1
+                signals.append(f"{label} RSI {rsi:.1f} oversold")
+            elif rsi is not None and rsi > self.overbought:
+                score -= 1
+                signals.append(f"{label} RSI {rsi:.1f} overbought")
+
+            macd, macd_signal = _value(values, "macd"), _value(values, "macd_signal")
+            if macd is not None and macd_signal is not None:
+                if macd > macd_signal:
+                    score += 1
+                    signals.append(f"{label} MACD above signal")
+                elif macd < macd_signal:
+                    score -= 1
+                    signals.append(f"{label} MACD below signal")
+
+        stoch_k, stoch_d = _value(hourly, "stoch_k"), _value(hourly, "stoch_d")
+        if stoch_k is not None and stoch_d is not None:
+            if stoch_k < 20 and stoch_k > stoch_d:
+                score += 1
+                signals.append("hourly stochastic bullish cross")
+            elif stoch_k > 80 and stoch_k < stoch_d:
+                score -= 1
+                signals.append("hourly stochastic bearish cross")
+        return score, signals
+
+    def decide(self, messages: List[Dict[str, Any]], trading_data: Dict[str, Any]) -> Dict[str, Any]:
+        score, signals = self.score(trading_data.get("technical_summary", {}) or {})
+        status = trading_data.get("investment_status", {}) or {}
+
+        decision = "hold"
+        if score >= self.threshold and status.get("krw_balance", 0) > 0:
+            decision = "buy"
+        elif score <= -self.threshold and status.get("btc_balance", 0) > 0:
+            decision = "sell"
+
+        bb_width = _value((trading_data.get("technical_summary", {}) or {}).get("daily", {}) or {}, "bb_width")
+        risk_level = "low" if bb_width is not None and bb_width < 5 else "high" if bb_width and bb_width > 15 else "medium"
+
+        return {
+            "decision": decision,
+            "percentage": min(100.0, self.step_percentage * abs(score)) if decision != "hold" else 0,
+            "reason": f"Rule score {score:+d}: " + (", ".join(signals) or "no signals"),
+            "risk_level": risk_level,
+            "confidence": min(100, 50 + 10 * abs(score))
+        }
+
+    async def adecide(self, messages: List[Dict[str, Any]], trading_data: Dict[str, Any]) -> Dict[str, Any]:
+        # 네트워크 없이 바로 계산하므로 스레드로 넘기지 않음
+        return self.decide(messages, trading_data)
+
+    def reflect(self, messages: List[Dict[str, Any]], recent_trades: List[tuple]) -> Dict[str, Any]:
+        actions = [trade[1] for trade in recent_trades]
+        counts = {action: actions.count(action) for action in ("buy", "sell", "hold")}
+        return {
+            "strategy_analysis": f"Rule-based backend: {len(actions)} recent decisions "
+                                 f"({counts['buy']} buy, {counts['sell']} sell, {counts['hold']} hold)",
+            "key_patterns": "Decisions follow RSI, MACD and stochastic signals only",
+            "improvement_suggestions": "Compare against the backtester before changing rule thresholds"
+        }
+
+
+DECISION_BACKENDS = {
+    OpenAIBackend.name: OpenAIBackend,
+    RuleBasedBackend.name: RuleBasedBackend,
+}
+
+
+def create_decision_backend(name: str = "openai", api_key: Optional[str] = None,
+                            base_url: Optional[str] = None, model: str = DEFAULT_MODEL) -> DecisionBackend:
+    """설정 이름(openai/rule)으로 백엔드 생성"""
+    if name == OpenAIBackend.name:
+        return OpenAIBackend(api_key=api_key, base_url=base_url, model=model)
+    if name == RuleBasedBackend.name:
+        return RuleBasedBackend()
+    raise ValueError(f"Unknown decision backend: {name} (available: {', '.join(DECISION_BACKENDS)})")
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import logging
+
+logger = logging.getLogger("DecisionCache")
+
+# technical_summary 지표별 양자화 간격 (이 간격 안의 변화는 같은 상태로 봄)
+INDICATOR_STEPS = {
+    "rsi": 5.0,
+    "stoch_k": 10.0,
+    "stoch_d": 10.0,
+    "bb_width": 0.5,
+}
+# MACD는 가격 단위라서 현재가 대비 % 로 바꿔 양자화
+MACD_STEP_PERCENT = 0.05
+
+
+def _bucket(value: Any, step: float) -> Optional[int]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(value) or math.isinf(value):
+        return None
+    return math.floor(value / step)
+
+
+def _log_bucket(value: Any, step_percent: float) -> Optional[int]:
+    """가격처럼 배율로 움직이는 값은 step_percent % 간격의 로그 구간으로 나눔"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not value > 0:
+        return None
+    return math.floor(math.log(value) / math.log1p(step_percent / 100))
+
+
+class DecisionCache:
+    """
+    AI 결정 캐시.
+    시장 상태(지표, 가격 구간, 포지션, 회고)를 양자화한 지문을 키로 결정을 저장하고,
+    같은 지문이면 TTL 안에서 API 호출 없이 이전 결정을 재사용함. 최대 개수를 넘으면 가장 오래 안 쓴 항목부터 삭제.
+    같은 키를 동시에 요청하면 한 번만 호출함.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float = 900.0,
+                 price_bucket_percent: float = 0.5, position_step: float = 0.05):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.price_bucket_percent = price_bucket_percent
+        self.position_step = position_step
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.latency_saved = 0.0  # 재사용으로 아낀 API 호출 시간 합계 (초)
+
+    def fingerprint(self, trading_data: Dict[str, Any], reflection: Optional[Dict[str, Any]] = None) -> str:
+        """시장 상태 지문. 양자화 간격 안의 작은 변화는 같은 지문이 됨"""
+        status = trading_data.get("investment_status", {}) or {}
+        price = status.get("current_price")
+
+        indicators = {}
+        for timeframe, values in sorted((trading_data.get("technical_summary") or {}).items()):
+            quantized = {}
+            for name, value in sorted((values or {}).items()):
+                if name in ("macd", "macd_signal"):
+                    try:
+                        relative = float(value) / float(price) * 100
+                    except (TypeError, ValueError, ZeroDivisionError):
+                        relative = None
+                    quantized[name] = _bucket(relative, MACD_STEP_PERCENT)
+                else:
+                    quantized[name] = _bucket(value, INDICATOR_STEPS.get(name, 1.0))
+            indicators[timeframe] = quantized
+
+        state = {
+            "market": trading_data.get("market"),
+            "price": _log_bucket(price, self.price_bucket_percent),
+            "position": {
+                "holding": bool(status.get("btc_balance")),
+                "btc_ratio": _bucket(status.get("btc_ratio", 0), self.position_step),
+                "avg_buy_price": _log_bucket(status.get("avg_buy_price"), self.price_bucket_percent),
+            },
+            "indicators": indicators,
+            "reflection": reflection or {},
+        }
+        encoded = json.dumps(state, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha1(encoded).hexdigest()
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _drop_key_lock(self, key: Hashable):
+        """항목이 사라진 키의 락 정리 (_lock을 잡은 상태에서 호출). 계산 중인 키의 락은 남김"""
+        lock = self._key_locks.get(key)
+        if lock is not None and not lock.locked():
+            del self._key_locks[key]
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, decision, latency = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._drop_key_lock(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.latency_saved += latency
+            return dict(decision)
+
+    def put(self, key: Hashable, decision: Dict[str, Any], latency: float = 0.0):
+        """
+        Args:
+            latency: 결정을 얻는 데 걸린 시간. 캐시 적중 시 절약한 시간으로 집계
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, dict(decision), latency)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._key_locks.pop(evicted, None)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+        """
+        캐시된 결정을 반환하거나 compute()로 새로 구함. compute가 예외를 던지면 캐시하지 않음.
+
+        Returns:
+            (결정, 캐시 적중 여부)
+        """
+        decision = self.get(key)
+        if decision is not None:
+            return decision, True
+
+        try:
+            with self._key_lock(key):
+                # 같은 키를 먼저 요청한 스레드가 결과를 넣었을 수 있음
+                decision = self.get(key)
+                if decision is not None:
+                    return decision, True
+                with self._lock:
+                    self.misses += 1
+                start = time.perf_counter()
+                decision = compute()
+                self.put(key, decision, time.perf_counter() - start)
+                return dict(decision), False
+        except Exception:
+            # 캐시되지 않은 키의 락이 남지 않도록 정리
+            with self._lock:
+                if key not in self._entries:
+                    self._drop_key_lock(key)
+            raise
+
+    async def get_or_compute_async(self, key: Hashable,
+                                   compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[Dict[str, Any], bool]:
+        """get_or_compute의 asyncio 버전 (같은 키 동시 요청은 호출한 쪽의 SingleFlight로 막음)"""
+        decision = self.get(key)
+        if decision is not None:
+            return decision, True
+        with self._lock:
+            self.misses += 1
+        start = time.perf_counter()
+        decision = await compute()
+        self.put(key, decision, time.perf_counter() - start)
+        return dict(decision), False
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            for key in list(self._key_locks):
+                self._drop_key_lock(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "latency_saved": self.latency_saved,
+            }
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        return (f"hits={stats['hits']}, misses={stats['misses']}, hit_rate={stats['hit_rate']:.0%}, "
+                f"entries={stats['entries']}, latency_saved={stats['latency_saved']:.1f}s")
@@ -0,0 +1,244 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("HttpClient")
+
+Parser = Callable[[requests.Response], Any]
+
+
+def parse_json(response: requests.Response) -> Any:
+    return response.json()
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    stale_until: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class CachedHttpClient:
+    """
+    연결 풀을 쓰는 requests.Session 위에 조건부 GET과 TTL 캐시를 얹은 HTTP 클라이언트.
+
+    - TTL 안: 네트워크 없이 캐시된 값 반환
+    - TTL이 지났지만 stale_ttl 안: 캐시된 값을 바로 반환하고 백그라운드에서 재검증 (stale-while-revalidate)
+    - 재검증은 ETag/Last-Modified로 조건부 요청을 보내고, 304면 본문을 다시 파싱하지 않음
+    - 요청이 실패하면 stale_ttl 안의 이전 값을 반환 (없으면 예외)
+    같은 URL을 동시에 요청하면 한 번만 보냄.
+    get_async()는 같은 캐시를 쓰고 요청만 비동기 HTTP 클라이언트(async_runtime.AsyncHttpClient)로 보냄.
+    """
+
+    def __init__(self, timeout: float = 10.0, pool_size: int = 10, revalidate_workers: int = 2,
+                 session: Optional[requests.Session] = None):
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._revalidator = ThreadPoolExecutor(max_workers=revalidate_workers, thread_name_prefix="HttpRevalidate")
+
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._revalidating: set = set()
+        self._async_fetches: Dict[Hashable, "asyncio.Future"] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.errors = 0
+
+    @staticmethod
+    def _key(url: str, params: Optional[Dict[str, Any]]) -> Hashable:
+        return url, tuple(sorted((params or {}).items()))
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, ttl: float = 60.0, stale_ttl: float = 3600.0,
+            parse: Parser = parse_json, timeout: Optional[float] = None) -> Any:
+        """
+        파싱된 응답을 반환 (parse는 200 응답일 때만 호출).
+
+        Args:
+            ttl: 재검증 없이 캐시를 쓰는 시간 (초)
+            stale_ttl: TTL이 지난 뒤에도 이전 값을 쓸 수 있는 시간 (초)
+        """
+        key = self._key(url, params)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None and now < entry.expires_at:
+            self.hits += 1
+            return entry.value
+
+        if entry is not None and now < entry.stale_until:
+            self.stale_hits += 1
+            self._schedule_revalidate(key, url, params, ttl, stale_ttl, parse, timeout)
+            return entry.value
+
+        with self._key_lock(key):
+            # 같은 키를 먼저 요청한 스레드가 값을 채웠을 수 있음
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry.expires_at:
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+            return self._fetch(key, url, params, ttl, stale_ttl, parse, timeout)
+
+    def _schedule_revalidate(self, key, url, params, ttl, stale_ttl, parse, timeout):
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def revalidate():
+            try:
+                with self._key_lock(key):
+                    self._fetch(key, url, params, ttl, stale_ttl, parse, timeout)
+            except Exception as e:
+                logger.warning(f"Background revalidation failed for {url}: {e}")
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        try:
+            self._revalidator.submit(revalidate)
+        except RuntimeError:  # close() 이후
+            with self._lock:
+                self._revalidating.discard(key)
+
+    @staticmethod
+    def _conditional_headers(entry: Optional[_Entry]) -> Dict[str, str]:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def _fetch(self, key, url, params, ttl, stale_ttl, parse, timeout) -> Any:
+        entry = self._entries.get(key)
+        try:
+            response = self.session.get(url, params=params, headers=self._conditional_headers(entry),
+                                        timeout=timeout or self.timeout)
+            return self._apply_response(key, entry, response, ttl, stale_ttl, parse)
+        except Exception as e:
+            return self._fallback(url, entry, e)
+
+    def _apply_response(self, key, entry: Optional[_Entry], response, ttl, stale_ttl, parse) -> Any:
+        """304면 캐시된 값의 TTL만 연장하고, 200이면 파싱해서 저장"""
+        now = time.monotonic()
+        if response.status_code == 304 and entry is not None:
+            self.not_modified += 1
+            entry.expires_at = now + ttl
+            entry.stale_until = now + ttl + stale_ttl
+            return entry.value
+
+        response.raise_for_status()
+        value = parse(response)
+        self._entries[key] = _Entry(
+            value=value,
+            expires_at=now + ttl,
+            stale_until=now + ttl + stale_ttl,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return value
+
+    def _fallback(self, url: str, entry: Optional[_Entry], error: Exception) -> Any:
+        """실패하면 아직 쓸 수 있는 이전 값 반환 (없으면 예외)"""
+        self.errors += 1
+        if entry is not None and time.monotonic() < entry.stale_until:
+            logger.warning(f"Request to {url} failed ({error}), serving cached response")
+            return entry.value
+        raise error
+
+    # ---------------------------------------------------------------- asyncio
+    async def get_async(self, http, url: str, params: Optional[Dict[str, Any]] = None, ttl: float = 60.0,
+                        stale_ttl: float = 3600.0, parse: Parser = parse_json,
+                        timeout: Optional[float] = None) -> Any:
+        """
+        get()의 asyncio 버전 (이벤트 루프에서만 호출).
+
+        Args:
+            http: 요청을 보낼 비동기 클라이언트 (async_runtime.AsyncHttpClient)
+        """
+        key = self._key(url, params)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None and now < entry.expires_at:
+            self.hits += 1
+            return entry.value
+
+        async def fetch() -> Any:
+            entry = self._entries.get(key)
+            try:
+                response = await http.get(url, params=params, headers=self._conditional_headers(entry),
+                                          timeout=timeout or self.timeout)
+                return self._apply_response(key, entry, response, ttl, stale_ttl, parse)
+            except Exception as e:
+                return self._fallback(url, entry, e)
+
+        if entry is not None and now < entry.stale_until:
+            # 재검증은 기다리지 않음
+            self.stale_hits += 1
+            self._fetch_once(key, url, fetch)
+            return entry.value
+
+        self.misses += 1
+        # 한 호출자가 취소되어도 같은 키를 기다리는 다른 호출자의 요청은 계속 진행
+        return await asyncio.shield(self._fetch_once(key, url, fetch))
+
+    def _fetch_once(self, key: Hashable, url: str, fetch: Callable[[], Awaitable[Any]]) -> "asyncio.Future":
+        """같은 키의 요청이 진행 중이면 그 요청을 함께 기다림"""
+        task = self._async_fetches.get(key)
+        if task is None:
+            task = self._async_fetches[key] = asyncio.ensure_future(fetch())
+
+            def done(task: "asyncio.Future"):
+                self._async_fetches.pop(key, None)
+                if not task.cancelled() and task.exception() is not None:
+                    logger.warning(f"Request to {url} failed: {task.exception()}")
+
+            task.add_done_callback(done)
+        return task
+
+    def invalidate(self, url: Optional[str] = None, params: Optional[Dict[str, Any]] = None):
+        """url을 지정하지 않으면 전체 삭제"""
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._key(url, params), None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+        }
+
+    def close(self):
+        self._revalidator.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
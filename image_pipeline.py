@@ -0,0 +1,180 @@
+import base64
+import io
+import os
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+import logging
+
+from PIL import Image, ImageChops
+
+logger = logging.getLogger("ImagePipeline")
+
+# 포맷 -> (Pillow 포맷 이름, MIME 타입, 확장자)
+IMAGE_FORMATS = {
+    "png": ("PNG", "image/png", "png"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+    "webp": ("WEBP", "image/webp", "webp"),
+}
+
+# base64 앞부분으로 포맷 판별 (PNG: \x89PNG, JPEG: \xff\xd8\xff, WebP: RIFF)
+_BASE64_SIGNATURES = {
+    "iVBOR": "image/png",
+    "/9j/": "image/jpeg",
+    "UklGR": "image/webp",
+}
+
+
+def image_data_url(encoded: str) -> str:
+    """base64 이미지 문자열을 image_url용 data URL로 변환 (포맷은 시그니처로 판별, 모르면 PNG)"""
+    mime_type = next((mime for prefix, mime in _BASE64_SIGNATURES.items() if encoded.startswith(prefix)),
+                     "image/png")
+    return f"data:{mime_type};base64,{encoded}"
+
+
+def parse_crop_box(value: str) -> Optional[Tuple[int, int, int, int]]:
+    """'left,top,right,bottom' 문자열을 crop 박스로 변환. 비어 있으면 None"""
+    if not value:
+        return None
+    left, top, right, bottom = (int(part) for part in value.split(","))
+    return left, top, right, bottom
+
+
+@dataclass
+class ProcessedImage:
+    data: bytes
+    mime_type: str
+    extension: str
+    width: int
+    height: int
+    original_bytes: int
+    original_size: Tuple[int, int]
+
+    def base64(self) -> str:
+        return base64.b64encode(self.data).decode("utf-8")
+
+    def summary(self) -> str:
+        ow, oh = self.original_size
+        return (f"{self.original_bytes:,} B {ow}x{oh} -> {len(self.data):,} B {self.width}x{self.height} "
+                f"{self.extension} (base64 {4 * ((len(self.data) + 2) // 3):,} B)")
+
+
+class ImagePipeline:
+    """
+    차트 스크린샷/렌더링 PNG를 메모리에서 잘라내고(crop) 축소해 JPEG/WebP로 다시 인코딩.
+    디스크를 거치지 않고 바로 base64로 프롬프트에 첨부할 수 있음.
+
+    Args:
+        max_width/max_height: 비율을 유지하며 이 크기 안으로 축소 (확대는 하지 않음)
+        image_format: png / jpeg / webp
+        crop: (left, top, right, bottom) 고정 영역. None이면 trim_border만 적용
+        trim_border: 가장자리의 단색 여백을 자동으로 잘라냄
+    """
+
+    def __init__(self, max_width: int = 768, max_height: int = 768, image_format: str = "webp",
+                 quality: int = 80, crop: Optional[Tuple[int, int, int, int]] = None, trim_border: bool = True):
+        image_format = image_format.lower()
+        if image_format == "jpg":
+            image_format = "jpeg"
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {image_format} (available: {', '.join(IMAGE_FORMATS)})")
+        self.max_width = max_width
+        self.max_height = max_height
+        self.image_format = image_format
+        self.quality = quality
+        self.crop = crop
+        self.trim_border = trim_border
+
+    @staticmethod
+    def _trim(image: Image.Image) -> Image.Image:
+        """왼쪽 위 픽셀 색과 같은 가장자리 여백 제거"""
+        background = Image.new(image.mode, image.size, image.getpixel((0, 0)))
+        box = ImageChops.difference(image, background).getbbox()
+        return image.crop(box) if box else image
+
+    def process(self, png: bytes) -> ProcessedImage:
+        with Image.open(io.BytesIO(png)) as source:
+            original_size = source.size
+            # JPEG는 알파 채널을 지원하지 않으므로 RGB로 통일
+            image = source.convert("RGB")
+
+        if self.crop:
+            image = image.crop(self.crop)
+        if self.trim_border:
+            image = self._trim(image)
+        # 축소만 (thumbnail은 비율 유지, 원본보다 크게 만들지 않음)
+        image.thumbnail((self.max_width, self.max_height), Image.Resampling.LANCZOS)
+
+        pil_format, mime_type, extension = IMAGE_FORMATS[self.image_format]
+        if self.image_format == "webp":
+            options = {"quality": self.quality, "method": 4}
+        elif self.image_format == "jpeg":
+            options = {"quality": self.quality, "optimize": True}
+        else:
+            options = {"optimize": True}
+
+        buffer = io.BytesIO()
+        image.save(buffer, format=pil_format, **options)
+        return ProcessedImage(
+            data=buffer.getvalue(),
+            mime_type=mime_type,
+            extension=extension,
+            width=image.width,
+            height=image.height,
+            original_bytes=len(png),
+            original_size=original_size,
+        )
+
+
+class DebugImageWriter:
+    """
+    디버깅용 차트 사본을 백그라운드 스레드에서 저장 (거래 사이클이 디스크 쓰기를 기다리지 않음).
+    큐가 가득 차면 해당 사본은 버림.
+
+    Args:
+        maintain: 저장 후 호출할 정리 함수 (오래된 파일 삭제 등)
+    """
+
+    def __init__(self, directory: str, maintain: Optional[Callable[[], None]] = None, max_queue: int = 16):
+        self.directory = directory
+        self.maintain = maintain
+        self._queue: "queue.Queue[Optional[Tuple[str, bytes]]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="DebugImageWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, filename: str, data: bytes) -> Optional[str]:
+        """저장을 예약하고 저장될 경로를 반환 (큐가 가득 차면 None)"""
+        path = os.path.join(self.directory, filename)
+        try:
+            self._queue.put_nowait((path, data))
+        except queue.Full:
+            logger.warning(f"Debug image queue full, dropping {filename}")
+            return None
+        return path
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, data = item
+                os.makedirs(self.directory, exist_ok=True)
+                with open(path, "wb") as image_file:
+                    image_file.write(data)
+                logger.info(f"Chart image saved to {path}")
+                if self.maintain:
+                    self.maintain()
+            except Exception as e:
+                logger.error(f"Error saving debug image: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        """남은 파일을 모두 저장한 뒤 종료"""
+        self._queue.put(None)
+        self._thread.join()
@@ -0,0 +1,435 @@
+import math
+import threading
+from collections import deque
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+import pandas as pd
+from ta.trend import MACD, SMAIndicator
+from ta.momentum import RSIIndicator, StochasticOscillator
+from ta.volatility import BollingerBands, AverageTrueRange
+from ta.volume import OnBalanceVolumeIndicator, VolumeWeightedAveragePrice
+import logging
+
+logger = logging.getLogger("IndicatorEngine")
+
+NAN = float("nan")
+
+INDICATOR_COLUMNS = [
+    "ma5", "ma20", "ma60", "ma120",
+    "bb_upper", "bb_middle", "bb_lower", "bb_width",
+    "macd", "macd_signal", "macd_diff",
+    "rsi",
+    "stoch_k", "stoch_d",
+    "atr",
+    "obv",
+    "vwap",
+]
+
+# add_technical_indicators 기본 기간 (ta 기본값과 같음). 파라미터 스윕에서 일부만 바꿔 넘김
+INDICATOR_WINDOWS = {
+    "bb_window": 20,
+    "bb_dev": 2,
+    "macd_slow": 26,
+    "macd_fast": 12,
+    "macd_sign": 9,
+    "rsi_window": 14,
+    "stoch_window": 14,
+    "stoch_smooth": 3,
+    "atr_window": 14,
+    "vwap_window": 14,
+}
+
+
+def add_technical_indicators(df: pd.DataFrame, windows: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    Add technical indicators (RSI, MACD, Bollinger Bands, Stochastic) to the DataFrame.
+    ta 라이브러리로 전체 구간을 다시 계산하는 방식 (백테스트, 검증용 기준 구현)
+
+    Args:
+        windows: INDICATOR_WINDOWS 중 바꿀 기간만 지정
+    """
+    w = {**INDICATOR_WINDOWS, **(windows or {})}
+
+    # 기본 지표들
+    bb = BollingerBands(close=df['close'], window=int(w["bb_window"]), window_dev=w["bb_dev"])
+    macd = MACD(close=df['close'], window_slow=int(w["macd_slow"]), window_fast=int(w["macd_fast"]),
+                window_sign=int(w["macd_sign"]))
+    rsi = RSIIndicator(close=df['close'], window=int(w["rsi_window"]))
+    stoch = StochasticOscillator(high=df['high'], low=df['low'], close=df['close'],
+                                 window=int(w["stoch_window"]), smooth_window=int(w["stoch_smooth"]))
+    atr = AverageTrueRange(high=df['high'], low=df['low'], close=df['close'], window=int(w["atr_window"]))
+    obv = OnBalanceVolumeIndicator(close=df['close'], volume=df['volume'])
+    vwap = VolumeWeightedAveragePrice(high=df['high'], low=df['low'], close=df['close'],
+                                      volume=df['volume'], window=int(w["vwap_window"]))
+
+    # 이동평균선
+    df['ma5'] = SMAIndicator(close=df['close'], window=5).sma_indicator()
+    df['ma20'] = SMAIndicator(close=df['close'], window=20).sma_indicator()
+    df['ma60'] = SMAIndicator(close=df['close'], window=60).sma_indicator()
+    df['ma120'] = SMAIndicator(close=df['close'], window=120).sma_indicator()
+
+    # 볼린저 밴드
+    df['bb_upper'] = bb.bollinger_hband()
+    df['bb_middle'] = bb.bollinger_mavg()
+    df['bb_lower'] = bb.bollinger_lband()
+    df['bb_width'] = bb.bollinger_wband()
+
+    # MACD
+    df['macd'] = macd.macd()
+    df['macd_signal'] = macd.macd_signal()
+    df['macd_diff'] = macd.macd_diff()
+
+    # RSI
+    df['rsi'] = rsi.rsi()
+
+    # Stochastic
+    df['stoch_k'] = stoch.stoch()
+    df['stoch_d'] = stoch.stoch_signal()
+
+    # ATR
+    df['atr'] = atr.average_true_range()
+
+    # OBV
+    df['obv'] = obv.on_balance_volume()
+
+    # VWAP
+    df['vwap'] = vwap.volume_weighted_average_price()
+
+    return df
+
+
+class _RollingWindow:
+    """고정 길이 링 버퍼 + 누적 합계"""
+
+    # 부동소수점 누적 오차를 막기 위해 주기적으로 합계를 다시 계산
+    RESYNC_EVERY = 1024
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self._pushes = 0
+
+    def push(self, value: float):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        self._pushes += 1
+        if self._pushes % self.RESYNC_EVERY == 0:
+            self.total = math.fsum(self.values)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    def sum(self) -> float:
+        return self.total if self.full else NAN
+
+    def mean(self) -> float:
+        return self.total / self.window if self.full else NAN
+
+    def std(self) -> float:
+        """모집단 표준편차 (ddof=0, ta BollingerBands와 동일)"""
+        if not self.full:
+            return NAN
+        mean = self.total / self.window
+        return math.sqrt(sum((v - mean) ** 2 for v in self.values) / self.window)
+
+    def clone(self) -> "_RollingWindow":
+        other = _RollingWindow.__new__(_RollingWindow)
+        other.window = self.window
+        other.values = self.values.copy()
+        other.total = self.total
+        other._pushes = self._pushes
+        return other
+
+
+class _RollingExtreme:
+    """모노토닉 덱 기반 이동 최댓값/최솟값 (분할 상환 O(1))"""
+
+    def __init__(self, window: int, is_max: bool):
+        self.window = window
+        self.is_max = is_max
+        self.items = deque()
+        self.count = 0
+
+    def push(self, value: float) -> float:
+        index = self.count
+        self.count += 1
+        if self.is_max:
+            while self.items and self.items[-1][1] <= value:
+                self.items.pop()
+        else:
+            while self.items and self.items[-1][1] >= value:
+                self.items.pop()
+        self.items.append((index, value))
+        while self.items[0][0] <= index - self.window:
+            self.items.popleft()
+        return self.items[0][1] if self.count >= self.window else NAN
+
+    def clone(self) -> "_RollingExtreme":
+        other = _RollingExtreme.__new__(_RollingExtreme)
+        other.window = self.window
+        other.is_max = self.is_max
+        other.items = self.items.copy()
+        other.count = self.count
+        return other
+
+
+class _EMA:
+    """pandas ewm(adjust=False, min_periods=...) 와 동일한 재귀식 EMA"""
+
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value: Optional[float] = None
+        self.count = 0
+
+    def push(self, x: float) -> float:
+        if self.value is None:
+            self.value = x
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+        self.count += 1
+        return self.value if self.count >= self.min_periods else NAN
+
+    def clone(self) -> "_EMA":
+        other = _EMA(self.alpha, self.min_periods)
+        other.value = self.value
+        other.count = self.count
+        return other
+
+
+class IndicatorState:
+    """
+    한 시계열(market, interval)의 지표 상태.
+    새 캔들 하나가 들어올 때마다 상수 시간에 add_technical_indicators와 같은 컬럼을 계산.
+
+    Note:
+        같은 데이터로 처음부터 계산하면 ta 결과와 일치함. 이후 구간이 밀리면 EMA 계열은
+        ta(창 시작점부터 재계산)와 아주 작은 차이가 생기고, OBV는 누적 시작점만 다름.
+    """
+
+    def __init__(self, history: int = 200):
+        self.history = history
+        self.last_ts = None
+        self.rows = {col: deque(maxlen=history) for col in INDICATOR_COLUMNS}
+        self.index = deque(maxlen=history)
+        self._core = self._new_core()
+        self._before_last = None
+
+    @staticmethod
+    def _new_core() -> Dict[str, object]:
+        return {
+            "prev_close": None,
+            "count": 0,
+            "ma5": _RollingWindow(5),
+            "ma20": _RollingWindow(20),
+            "ma60": _RollingWindow(60),
+            "ma120": _RollingWindow(120),
+            "ema_fast": _EMA(2 / (12 + 1), 12),
+            "ema_slow": _EMA(2 / (26 + 1), 26),
+            "ema_signal": _EMA(2 / (9 + 1), 9),
+            "rsi_up": _EMA(1 / 14, 14),
+            "rsi_down": _EMA(1 / 14, 14),
+            "stoch_high": _RollingExtreme(14, is_max=True),
+            "stoch_low": _RollingExtreme(14, is_max=False),
+            "stoch_k": deque(maxlen=3),
+            "atr_seed": [],
+            "atr": 0.0,
+            "obv": 0.0,
+            "vwap_pv": _RollingWindow(14),
+            "vwap_volume": _RollingWindow(14),
+        }
+
+    @staticmethod
+    def _clone_core(core: Dict[str, object]) -> Dict[str, object]:
+        cloned = {}
+        for name, value in core.items():
+            if hasattr(value, "clone"):
+                cloned[name] = value.clone()
+            elif isinstance(value, (deque, list)):
+                cloned[name] = value.copy()
+            else:
+                cloned[name] = value
+        return cloned
+
+    def update(self, ts, open_: float, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """
+        캔들 하나를 반영. ts가 직전 캔들과 같으면 진행 중인 캔들의 갱신으로 보고 덮어씀.
+        """
+        if self.last_ts is not None and ts == self.last_ts:
+            # 진행 중 캔들 갱신: 직전 캔들 반영 이전 상태로 되돌린 뒤 다시 계산
+            self._core = self._clone_core(self._before_last)
+            for col in INDICATOR_COLUMNS:
+                self.rows[col].pop()
+            self.index.pop()
+        else:
+            self._before_last = self._clone_core(self._core)
+
+        values = self._step(self._core, high, low, close, volume)
+        for col in INDICATOR_COLUMNS:
+            self.rows[col].append(values[col])
+        self.index.append(ts)
+        self.last_ts = ts
+        return values
+
+    @staticmethod
+    def _step(core: Dict[str, object], high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        prev_close = core["prev_close"]
+        index = core["count"]
+        core["count"] = index + 1
+
+        # 이동평균선 / 볼린저 밴드 (20, 2σ)
+        for name in ("ma5", "ma20", "ma60", "ma120"):
+            core[name].push(close)
+        bb_window = core["ma20"]
+        bb_middle = bb_window.mean()
+        bb_std = bb_window.std()
+        bb_upper = bb_middle + 2 * bb_std
+        bb_lower = bb_middle - 2 * bb_std
+
+        # MACD (12, 26, 9)
+        fast = core["ema_fast"].push(close)
+        slow = core["ema_slow"].push(close)
+        macd = fast - slow
+        macd_signal = core["ema_signal"].push(macd) if not math.isnan(macd) else NAN
+
+        # RSI (Wilder, 14)
+        diff = close - prev_close if prev_close is not None else 0.0
+        up = core["rsi_up"].push(diff if diff > 0 else 0.0)
+        down = core["rsi_down"].push(-diff if diff < 0 else 0.0)
+        if math.isnan(down):
+            rsi = NAN
+        elif down == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - 100 / (1 + up / down)
+
+        # Stochastic (14, 3)
+        highest = core["stoch_high"].push(high)
+        lowest = core["stoch_low"].push(low)
+        if math.isnan(highest) or highest == lowest:
+            stoch_k = NAN
+        else:
+            stoch_k = 100 * (close - lowest) / (highest - lowest)
+        k_window = core["stoch_k"]
+        k_window.append(stoch_k)
+        if len(k_window) == 3 and not any(math.isnan(k) for k in k_window):
+            stoch_d = sum(k_window) / 3
+        else:
+            stoch_d = NAN
+
+        # ATR (Wilder, 14) - ta와 같이 초기 구간은 0
+        if prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        if index < 14:
+            core["atr_seed"].append(true_range)
+            if index == 13:
+                core["atr"] = sum(core["atr_seed"]) / 14
+        else:
+            core["atr"] = (core["atr"] * 13 + true_range) / 14
+
+        # OBV
+        if prev_close is not None and close < prev_close:
+            core["obv"] -= volume
+        else:
+            core["obv"] += volume
+
+        # VWAP (14)
+        core["vwap_pv"].push((high + low + close) / 3.0 * volume)
+        core["vwap_volume"].push(volume)
+        total_volume = core["vwap_volume"].sum()
+        vwap = core["vwap_pv"].sum() / total_volume if total_volume else NAN
+
+        core["prev_close"] = close
+
+        return {
+            "ma5": core["ma5"].mean(),
+            "ma20": bb_middle,
+            "ma60": core["ma60"].mean(),
+            "ma120": core["ma120"].mean(),
+            "bb_upper": bb_upper,
+            "bb_middle": bb_middle,
+            "bb_lower": bb_lower,
+            "bb_width": (bb_upper - bb_lower) / bb_middle * 100 if bb_middle else NAN,
+            "macd": macd,
+            "macd_signal": macd_signal,
+            "macd_diff": macd - macd_signal,
+            "rsi": rsi,
+            "stoch_k": stoch_k,
+            "stoch_d": stoch_d,
+            "atr": core["atr"],
+            "obv": core["obv"],
+            "vwap": vwap,
+        }
+
+    def frame(self) -> pd.DataFrame:
+        """보관 중인 지표 이력을 DataFrame으로 반환"""
+        values = np.array([self.rows[col] for col in INDICATOR_COLUMNS], dtype=float).T
+        return pd.DataFrame(values, index=pd.Index(self.index), columns=INDICATOR_COLUMNS)
+
+
+class IndicatorEngine:
+    """
+    시계열 키(예: (market, interval))별 IndicatorState를 관리하는 스트리밍 지표 엔진.
+    add_technical_indicators 대신 apply()를 호출하면 새로 들어온 캔들만 계산함.
+    키마다 잠금이 따로 있어 여러 마켓을 동시에 계산해도 서로 기다리지 않음.
+    """
+
+    def __init__(self, history: int = 200):
+        self.history = history
+        self._states: Dict[Hashable, IndicatorState] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+    def reset(self, key: Hashable = None):
+        with self._lock:
+            if key is None:
+                self._states.clear()
+            else:
+                self._states.pop(key, None)
+
+    def state(self, key: Hashable) -> IndicatorState:
+        with self._lock:
+            if key not in self._states:
+                self._states[key] = IndicatorState(self.history)
+            return self._states[key]
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def apply(self, key: Hashable, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        OHLCV DataFrame에서 아직 반영하지 않은 캔들만 상태에 반영하고,
+        add_technical_indicators와 같은 컬럼이 추가된 DataFrame을 반환.
+        """
+        with self._key_lock(key):
+            return self._apply(key, df)
+
+    def _apply(self, key: Hashable, df: pd.DataFrame) -> pd.DataFrame:
+        state = self.state(key)
+        if state.last_ts is not None and len(df) and df.index[-1] < state.last_ts:
+            # 과거 데이터가 들어오면 상태를 새로 만듦
+            logger.warning(f"Out-of-order candles for {key}, rebuilding indicator state")
+            self.reset(key)
+            state = self.state(key)
+
+        new_rows = df if state.last_ts is None else df[df.index >= state.last_ts]
+        columns: List[str] = ["open", "high", "low", "close", "volume"]
+        for ts, open_, high, low, close, volume in zip(new_rows.index, *(new_rows[col].to_numpy() for col in columns)):
+            state.update(ts, float(open_), float(high), float(low), float(close), float(volume))
+
+        indicators = state.frame()
+        if not indicators.index.equals(df.index):
+            indicators = indicators.reindex(df.index)
+        base = df.drop(columns=[col for col in INDICATOR_COLUMNS if col in df.columns])
+        return pd.concat([base, indicators], axis=1)
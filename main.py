@@ -4,15 +4,17 @@ from trade_executor import TradeExecutor
 from ai_decision_maker import AIDecisionMaker
 from scheduler import Scheduler
 from config import Config
-import schedule
-import time
 from utils.logger import setup_logger
+from utils.tracing import configure as configure_tracing
 
 logger = setup_logger("Main", "application.log")
 
 def main():
+    # 단계별 지연 시간 계측 (METRICS_PORT가 있으면 /metrics 제공, METRICS_DUMP_INTERVAL마다 로그 요약)
+    configure_tracing(Config.TRACING_ENABLED, Config.METRICS_PORT, Config.METRICS_DUMP_INTERVAL, logger)
     user_manager = UserManager()
     data_collector = DataCollector()
+    # 사용자별 API 키가 없을 때 사용하는 공용 계좌
     trade_executor = TradeExecutor(api_key=Config.UPBIT_API_KEY, secret_key=Config.UPBIT_SECRET_KEY)
     ai_decision_maker = AIDecisionMaker()
 
@@ -21,18 +23,9 @@ def main():
     # Load users from JSON file
     user_manager.load_users_from_file("users.json")
 
-    # Schedule trading
-    scheduler.schedule_trading()
-
-    # Keep the scheduler running
+    # Schedule trading (SIGINT/SIGTERM을 받으면 진행 중인 사이클을 기다린 뒤 종료)
     logger.info("Trading bot started. Waiting for scheduled tasks...")
-    while True:
-        try:
-            schedule.run_pending()  # Check and execute pending tasks
-            time.sleep(1)  # Sleep for 1 second to optimize CPU usage
-        except Exception as e:
-            logger.error(f"Unexpected error occurred in the main loop: {e}", exc_info=True)
-            time.sleep(5)  # Wait before retrying to avoid rapid failure loops
+    scheduler.start()
 
 if __name__ == "__main__":
     main()
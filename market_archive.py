@@ -0,0 +1,292 @@
+"""
+호가/체결 시세 컬럼형 아카이브.
+
+MarketFeed 리스너로 붙이면 모든 ticker/orderbook 메시지를 메모리 버퍼에 모았다가
+chunk_rows개(또는 flush_interval초)마다 압축된 .npz 세그먼트로 저장함.
+
+    {root}/{market}/{kind}/{YYYY-MM-DD}/{first_ts}-{last_ts}.npz   (날짜는 UTC, ts는 거래소 타임스탬프 ms)
+
+세그먼트 파일 이름에 시간 범위가 있으므로 구간 조회 시 겹치지 않는 파일은 열지 않음.
+거래 DB(trading_data.db)와 분리되어 있어 몇 달치 호가 이력을 쌓아도 DB가 커지지 않음.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("MarketArchive")
+
+ORDERBOOK_LEVELS = 15  # 업비트 기본 호가 단계 (부족하면 NaN)
+
+# 종류별 1차원 컬럼 (메시지 키와 같은 이름)
+TICKER_COLUMNS = ("trade_price", "trade_volume", "acc_trade_volume_24h", "acc_trade_price_24h",
+                  "signed_change_rate")
+ORDERBOOK_COLUMNS = ("total_ask_size", "total_bid_size")
+# 호가 단계별 컬럼 (rows x ORDERBOOK_LEVELS 행렬)
+LEVEL_COLUMNS = ("ask_price", "ask_size", "bid_price", "bid_size")
+
+KINDS = {
+    "ticker": TICKER_COLUMNS,
+    "orderbook": ORDERBOOK_COLUMNS + LEVEL_COLUMNS,
+}
+
+
+def _day(timestamp_ms: int) -> str:
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _to_ms(value: Any) -> int:
+    """ms 정수, datetime, 문자열을 거래소 타임스탬프(ms)로 변환 (타임존이 없으면 UTC)"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    stamp = pd.Timestamp(value)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize("UTC")
+    return int(stamp.timestamp() * 1000)
+
+
+class _Buffer:
+    """한 (마켓, 종류)의 아직 저장하지 않은 행"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.day: Optional[str] = None
+        self.timestamps: List[int] = []
+        self.values: Dict[str, list] = {column: [] for column in KINDS[kind]}
+        self.started_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {"timestamp": np.asarray(self.timestamps, dtype=np.int64)}
+        for column, values in self.values.items():
+            arrays[column] = np.asarray(values, dtype=np.float64)
+        return arrays
+
+
+class MarketArchive:
+    """
+    Args:
+        root: 아카이브 디렉토리
+        chunk_rows: 세그먼트 하나의 최대 행 수
+        flush_interval: 행 수가 차지 않아도 이 시간(초)이 지나면 저장
+        levels: 저장할 호가 단계 수
+    """
+
+    def __init__(self, root: str, chunk_rows: int = 5000, flush_interval: float = 60.0,
+                 levels: int = ORDERBOOK_LEVELS):
+        self.root = root
+        self.chunk_rows = chunk_rows
+        self.flush_interval = flush_interval
+        self.levels = levels
+        self.rows_written = 0
+        self.segments_written = 0
+        self._closed = False
+
+        self._buffers: Dict[Tuple[str, str], _Buffer] = {}
+        self._lock = threading.Lock()
+        # 압축/쓰기는 피드 스레드를 막지 않도록 별도 스레드에서 실행
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="MarketArchive")
+
+    # ---------------------------------------------------------------- 기록
+    def __call__(self, message_type: str, market: str, message: Dict[str, Any]):
+        """MarketFeed 리스너"""
+        if message_type in KINDS and not self._closed:
+            self.append(message_type, market, message)
+
+    def _row(self, kind: str, message: Dict[str, Any]) -> Dict[str, Any]:
+        if kind == "ticker":
+            return {column: message.get(column, np.nan) for column in TICKER_COLUMNS}
+
+        row = {column: message.get(column, np.nan) for column in ORDERBOOK_COLUMNS}
+        units = (message.get("orderbook_units") or [])[:self.levels]
+        for column in LEVEL_COLUMNS:
+            level_values = np.full(self.levels, np.nan)
+            level_values[:len(units)] = [unit.get(column, np.nan) for unit in units]
+            row[column] = level_values
+        return row
+
+    def append(self, kind: str, market: str, message: Dict[str, Any]):
+        timestamp = message.get("timestamp")
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        row = self._row(kind, message)
+        day = _day(timestamp)
+
+        with self._lock:
+            key = (market, kind)
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._buffers[key] = _Buffer(kind)
+            # 날짜가 바뀌면 이전 날짜 파티션을 먼저 닫음
+            if buffer.day is not None and buffer.day != day and len(buffer):
+                self._flush_locked(key)
+                buffer = self._buffers[key]
+            buffer.day = day
+            buffer.timestamps.append(int(timestamp))
+            for column, value in row.items():
+                buffer.values[column].append(value)
+
+            if len(buffer) >= self.chunk_rows or time.monotonic() - buffer.started_at >= self.flush_interval:
+                self._flush_locked(key)
+
+    def _flush_locked(self, key: Tuple[str, str]):
+        buffer = self._buffers.get(key)
+        if self._closed or buffer is None or not len(buffer):
+            return
+        self._buffers[key] = _Buffer(buffer.kind)
+        market, kind = key
+        self._writer.submit(self._write_segment, market, kind, buffer.day, buffer.arrays())
+
+    def _write_segment(self, market: str, kind: str, day: str, arrays: Dict[str, np.ndarray]):
+        try:
+            directory = os.path.join(self.root, market, kind, day)
+            os.makedirs(directory, exist_ok=True)
+            timestamps = arrays["timestamp"]
+            path = os.path.join(directory, f"{timestamps[0]}-{timestamps[-1]}.npz")
+            if os.path.exists(path):
+                path = path[:-4] + f"-{int(time.time() * 1e6)}.npz"
+            temp_path = path + ".tmp"
+            # 쓰는 중인 파일을 읽지 않도록 임시 파일에 쓴 뒤 이름 변경
+            with open(temp_path, "wb") as segment:
+                np.savez_compressed(segment, **arrays)
+            os.replace(temp_path, path)
+            self.rows_written += len(timestamps)
+            self.segments_written += 1
+        except Exception as e:
+            logger.error(f"Error writing {market} {kind} segment: {e}")
+
+    def flush(self, wait: bool = True):
+        """버퍼를 모두 저장 (wait=True면 쓰기가 끝날 때까지 대기)"""
+        with self._lock:
+            for key in list(self._buffers):
+                self._flush_locked(key)
+        if wait and not self._closed:
+            self._writer.submit(lambda: None).result()
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush(wait=False)
+        self._closed = True
+        self._writer.shutdown(wait=True)
+
+    # ---------------------------------------------------------------- 조회
+    def segments(self, market: str, kind: str, start_ms: int, end_ms: int) -> List[str]:
+        """[start_ms, end_ms] 구간과 겹치는 세그먼트 파일 (시간 순)"""
+        paths = []
+        day = datetime.fromtimestamp(start_ms / 1000, tz=timezone.utc).date()
+        last_day = datetime.fromtimestamp(end_ms / 1000, tz=timezone.utc).date()
+        while day <= last_day:
+            directory = os.path.join(self.root, market, kind, day.isoformat())
+            if os.path.isdir(directory):
+                for name in os.listdir(directory):
+                    if not name.endswith(".npz"):
+                        continue
+                    first, last = (int(part) for part in name[:-4].split("-")[:2])
+                    if last >= start_ms and first <= end_ms:
+                        paths.append((first, os.path.join(directory, name)))
+            day += timedelta(days=1)
+        return [path for _, path in sorted(paths)]
+
+    def read(self, market: str, kind: str, start: Any, end: Any,
+             columns: Optional[Sequence[str]] = None, include_buffer: bool = True) -> Dict[str, np.ndarray]:
+        """
+        구간 [start, end]의 행을 컬럼별 배열로 반환 (timestamp 포함, 시간 순).
+        호가 단계 컬럼은 (행 수, levels) 행렬.
+
+        Args:
+            start/end: ms 타임스탬프, datetime 또는 문자열 (타임존이 없으면 UTC)
+            include_buffer: 아직 저장하지 않은 최근 행도 포함
+        """
+        start_ms, end_ms = _to_ms(start), _to_ms(end)
+        columns = list(columns or KINDS[kind])
+        chunks: List[Dict[str, np.ndarray]] = []
+
+        for path in self.segments(market, kind, start_ms, end_ms):
+            with np.load(path) as segment:
+                timestamps = segment["timestamp"]
+                mask = (timestamps >= start_ms) & (timestamps <= end_ms)
+                if mask.all():
+                    chunks.append({"timestamp": timestamps, **{column: segment[column] for column in columns}})
+                elif mask.any():
+                    chunks.append({"timestamp": timestamps[mask],
+                                   **{column: segment[column][mask] for column in columns}})
+
+        if include_buffer:
+            with self._lock:
+                buffer = self._buffers.get((market, kind))
+                arrays = buffer.arrays() if buffer is not None and len(buffer) else None
+            if arrays is not None:
+                mask = (arrays["timestamp"] >= start_ms) & (arrays["timestamp"] <= end_ms)
+                if mask.any():
+                    chunks.append({"timestamp": arrays["timestamp"][mask],
+                                   **{column: arrays[column][mask] for column in columns}})
+
+        if not chunks:
+            empty = {"timestamp": np.empty(0, dtype=np.int64)}
+            for column in columns:
+                shape = (0, self.levels) if column in LEVEL_COLUMNS else (0,)
+                empty[column] = np.empty(shape, dtype=np.float64)
+            return empty
+
+        result = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in ["timestamp", *columns]}
+        # 세그먼트/버퍼 경계에서 순서가 섞였을 수 있으므로 안정 정렬
+        order = np.argsort(result["timestamp"], kind="stable")
+        if not np.all(order[:-1] < order[1:]):
+            result = {name: values[order] for name, values in result.items()}
+        return result
+
+    def read_frame(self, market: str, kind: str, start: Any, end: Any,
+                   columns: Optional[Sequence[str]] = None, levels: int = 1) -> pd.DataFrame:
+        """
+        read 결과를 DataFrame으로 (인덱스: KST 기준 naive 시각, pyupbit 캔들과 같은 형식).
+        호가 단계 컬럼은 상위 levels단계만 ask_price_0, ask_price_1 ... 로 펼침.
+        """
+        arrays = self.read(market, kind, start, end, columns)
+        index = (pd.to_datetime(arrays.pop("timestamp"), unit="ms", utc=True)
+                 .tz_convert("Asia/Seoul").tz_localize(None))
+        data = {}
+        for column, values in arrays.items():
+            if values.ndim == 2:
+                for level in range(min(levels, values.shape[1])):
+                    data[f"{column}_{level}"] = values[:, level]
+            else:
+                data[column] = values
+        return pd.DataFrame(data, index=index)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from market_feed import MarketFeed
+
+    parser = argparse.ArgumentParser(description="업비트 ticker/호가 기록 또는 조회")
+    parser.add_argument("root", help="아카이브 디렉토리")
+    parser.add_argument("--markets", default="KRW-BTC")
+    parser.add_argument("--seconds", type=float, default=60, help="기록 시간")
+    parser.add_argument("--read", nargs=2, metavar=("START", "END"), help="기록하지 않고 구간 조회 (예: 2024-01-01 2024-01-02)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    archive = MarketArchive(args.root)
+    if args.read:
+        for market in args.markets.split(","):
+            for kind in KINDS:
+                print(market, kind)
+                print(archive.read_frame(market, kind, *args.read).describe().T)
+    else:
+        feed = MarketFeed(args.markets.split(","), types=tuple(KINDS))
+        feed.add_listener(archive)
+        feed.start()
+        time.sleep(args.seconds)
+        feed.stop()
+        archive.close()
+        print(f"{archive.rows_written} rows in {archive.segments_written} segments")
@@ -0,0 +1,76 @@
+from typing import Any, Dict, List, Optional
+import logging
+
+import feedparser
+import requests
+
+from http_client import CachedHttpClient
+
+logger = logging.getLogger("MarketContext")
+
+FEAR_GREED_URL = "https://api.alternative.me/fng/"
+GOOGLE_NEWS_RSS_URL = "https://news.google.com/rss/search?q=btc+when:1d&hl=en-US&gl=US&ceid=US:en"
+
+
+def parse_fear_greed(response: requests.Response) -> Dict[str, Any]:
+    """alternative.me 응답 -> {"value": 45, "classification": "Fear"} (형식이 다르면 예외 -> 캐시하지 않음)"""
+    latest = response.json()["data"][0]
+    return {
+        "value": int(latest["value"]),
+        "classification": latest["value_classification"]
+    }
+
+
+def parse_news(response: requests.Response, limit: int = 5) -> List[Dict[str, str]]:
+    """RSS 응답 -> 최신 뉴스 limit개 [{"title", "date"}]"""
+    feed = feedparser.parse(response.content)
+    if feed.bozo and not feed.entries:
+        raise ValueError(f"Invalid RSS feed: {feed.bozo_exception}")
+    return [{"title": entry.title, "date": entry.get("published", "")} for entry in feed.entries[:limit]]
+
+
+def fetch_fear_greed_index(client: CachedHttpClient, url: str = FEAR_GREED_URL, ttl: float = 3600,
+                           stale_ttl: float = 86400, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """공포탐욕지수 (하루 한 번 바뀌므로 TTL 동안 캐시, 이후에도 재검증하는 동안 이전 값 사용)"""
+    try:
+        index = client.get(url, params={"limit": 1, "format": "json"}, ttl=ttl, stale_ttl=stale_ttl,
+                           parse=parse_fear_greed, timeout=timeout)
+        return dict(index)
+    except Exception as e:
+        logger.error(f"Error fetching Fear and Greed Index: {e}")
+        return None
+
+
+async def fetch_fear_greed_index_async(client: CachedHttpClient, http, url: str = FEAR_GREED_URL, ttl: float = 3600,
+                                       stale_ttl: float = 86400,
+                                       timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """fetch_fear_greed_index의 asyncio 버전 (http: async_runtime.AsyncHttpClient)"""
+    try:
+        index = await client.get_async(http, url, params={"limit": 1, "format": "json"}, ttl=ttl,
+                                       stale_ttl=stale_ttl, parse=parse_fear_greed, timeout=timeout)
+        return dict(index)
+    except Exception as e:
+        logger.error(f"Error fetching Fear and Greed Index: {e}")
+        return None
+
+
+def fetch_news_headlines(client: CachedHttpClient, url: str = GOOGLE_NEWS_RSS_URL, ttl: float = 600,
+                         stale_ttl: float = 3600, timeout: Optional[float] = None) -> List[Dict[str, str]]:
+    """Google News RSS의 최신 BTC 뉴스 5개"""
+    try:
+        return list(client.get(url, ttl=ttl, stale_ttl=stale_ttl, parse=parse_news, timeout=timeout))
+    except Exception as e:
+        logger.error(f"Error fetching Google News: {e}")
+        return []
+
+
+async def fetch_news_headlines_async(client: CachedHttpClient, http, url: str = GOOGLE_NEWS_RSS_URL, ttl: float = 600,
+                                     stale_ttl: float = 3600,
+                                     timeout: Optional[float] = None) -> List[Dict[str, str]]:
+    """fetch_news_headlines의 asyncio 버전 (http: async_runtime.AsyncHttpClient)"""
+    try:
+        return list(await client.get_async(http, url, ttl=ttl, stale_ttl=stale_ttl, parse=parse_news,
+                                           timeout=timeout))
+    except Exception as e:
+        logger.error(f"Error fetching Google News: {e}")
+        return []
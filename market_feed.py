@@ -0,0 +1,254 @@
+import json
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import websocket
+import logging
+
+logger = logging.getLogger("MarketFeed")
+
+UPBIT_WEBSOCKET_URL = "wss://api.upbit.com/websocket/v1"
+
+Listener = Callable[[str, str, Dict[str, Any]], None]
+
+
+@dataclass
+class MarketState:
+    """마켓별 실시간 상태 (피드 스레드가 갱신)"""
+    price: Optional[float] = None
+    trade_volume: Optional[float] = None
+    orderbook: Optional[Dict[str, Any]] = None
+    timestamp: Optional[int] = None  # 거래소 타임스탬프 (ms)
+    updated_at: float = field(default_factory=time.monotonic)
+
+
+class MarketFeed:
+    """
+    업비트 WebSocket ticker/trade/orderbook 구독 클라이언트.
+    연결이 끊기면 지수 백오프(지터 포함)로 재접속하고, 마켓별 최신 상태를 메모리에 유지함.
+    """
+
+    def __init__(self, markets: Iterable[str], url: str = UPBIT_WEBSOCKET_URL,
+                 types: Iterable[str] = ("ticker", "trade", "orderbook"),
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 60.0,
+                 ping_interval: float = 30.0, recv_timeout: float = 1.0):
+        self.markets = list(markets)
+        self.url = url
+        self.types = list(types)
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ping_interval = ping_interval
+        self.recv_timeout = recv_timeout
+
+        self.states: Dict[str, MarketState] = {market: MarketState() for market in self.markets}
+        self.connected = threading.Event()
+        self.reconnects = 0
+        self._listeners: List[Listener] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ws = None
+
+    def add_listener(self, listener: Listener):
+        """listener(message_type, market, message) 형태로 메시지마다 호출됨 (피드 스레드에서 실행)"""
+        self._listeners.append(listener)
+
+    def price(self, market: str) -> Optional[float]:
+        state = self.states.get(market)
+        return state.price if state else None
+
+    def subscription(self) -> List[Dict[str, Any]]:
+        request: List[Dict[str, Any]] = [{"ticket": str(uuid.uuid4())}]
+        for message_type in self.types:
+            request.append({"type": message_type, "codes": self.markets})
+        request.append({"format": "DEFAULT"})
+        return request
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="market-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        if self._thread:
+            self._thread.join(timeout)
+
+    def wait_until_connected(self, timeout: Optional[float] = None) -> bool:
+        return self.connected.wait(timeout)
+
+    def _run(self):
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            try:
+                self._ws = websocket.create_connection(self.url, timeout=10)
+                self._ws.send(json.dumps(self.subscription()))
+                self._ws.settimeout(self.recv_timeout)
+                self.connected.set()
+                delay = self.reconnect_delay
+                logger.info(f"Market feed connected: {self.url} {self.markets}")
+                self._receive_loop(self._ws)
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning(f"Market feed disconnected: {e}")
+            finally:
+                self.connected.clear()
+                if self._ws is not None:
+                    try:
+                        self._ws.close()
+                    except Exception:
+                        pass
+                    self._ws = None
+
+            if self._stop.is_set():
+                break
+
+            # 지수 백오프 + 지터
+            wait = delay * (0.5 + random.random() / 2)
+            logger.info(f"Reconnecting market feed in {wait:.1f}s")
+            self.reconnects += 1
+            if self._stop.wait(wait):
+                break
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _receive_loop(self, ws):
+        last_activity = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                raw = ws.recv()
+            except websocket.WebSocketTimeoutException:
+                if time.monotonic() - last_activity > self.ping_interval:
+                    ws.ping()
+                    last_activity = time.monotonic()
+                continue
+
+            if not raw:
+                raise ConnectionError("Connection closed by server")
+            last_activity = time.monotonic()
+            self.handle_message(raw)
+
+    def handle_message(self, raw):
+        """수신 메시지(bytes/str JSON)를 상태에 반영하고 리스너에 전달"""
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            logger.warning(f"Invalid market feed message: {raw[:100]!r}")
+            return
+
+        message_type = message.get("type") or message.get("ty")
+        market = message.get("code") or message.get("cd")
+        state = self.states.get(market)
+        if state is None:
+            return
+
+        if message_type in ("ticker", "trade"):
+            state.price = message.get("trade_price")
+            state.trade_volume = message.get("trade_volume")
+        elif message_type == "orderbook":
+            state.orderbook = message
+        state.timestamp = message.get("timestamp")
+        state.updated_at = time.monotonic()
+
+        for listener in self._listeners:
+            try:
+                listener(message_type, market, message)
+            except Exception as e:
+                logger.error(f"Market feed listener error: {e}")
+
+
+class PriceChangeDetector:
+    """
+    최근 window초 안의 최고가/최저가 대비 변동률이 threshold(%)를 넘으면 감지.
+    모노토닉 덱을 사용하므로 틱마다 분할 상환 O(1).
+    """
+
+    def __init__(self, threshold: float = 1.0, window: float = 60.0):
+        self.threshold = threshold
+        self.window = window
+        self._max = deque()
+        self._min = deque()
+
+    def reset(self):
+        self._max.clear()
+        self._min.clear()
+
+    def update(self, price: float, now: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        """
+        Returns:
+            임계값을 넘으면 (변동률 %, 기준 가격), 아니면 None
+        """
+        now = time.monotonic() if now is None else now
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((now, price))
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((now, price))
+
+        cutoff = now - self.window
+        while self._max[0][0] < cutoff:
+            self._max.popleft()
+        while self._min[0][0] < cutoff:
+            self._min.popleft()
+
+        highest, lowest = self._max[0][1], self._min[0][1]
+        rise = (price - lowest) / lowest * 100 if lowest else 0.0
+        drop = (highest - price) / highest * 100 if highest else 0.0
+        if rise > self.threshold and rise >= drop:
+            self.reset()
+            return rise, lowest
+        if drop > self.threshold:
+            self.reset()
+            return drop, highest
+        return None
+
+
+class MessageRecorder:
+    """피드 메시지를 ws_replay_server가 재생할 수 있는 JSONL 형식으로 기록하는 리스너"""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a")
+        self._last = None
+        self._lock = threading.Lock()
+
+    def __call__(self, message_type: str, market: str, message: Dict[str, Any]):
+        now = time.monotonic()
+        with self._lock:
+            delay = 0.0 if self._last is None else now - self._last
+            self._last = now
+            self._file.write(json.dumps({"delay": round(delay, 4), "message": message}) + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="업비트 WebSocket 메시지 녹화")
+    parser.add_argument("output", help="저장할 JSONL 파일")
+    parser.add_argument("--markets", default="KRW-BTC")
+    parser.add_argument("--seconds", type=float, default=60)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    recorder = MessageRecorder(args.output)
+    feed = MarketFeed(args.markets.split(","))
+    feed.add_listener(recorder)
+    feed.start()
+    time.sleep(args.seconds)
+    feed.stop()
+    recorder.close()
@@ -0,0 +1,131 @@
+from typing import Any, Dict, List, Optional
+
+import pyupbit
+import logging
+
+from utils.helpers import TTLCache
+
+logger = logging.getLogger("MarketSnapshot")
+
+
+def parse_markets(value: str) -> List[str]:
+    """'KRW-BTC, krw-eth' -> ['KRW-BTC', 'KRW-ETH'] (중복 제거, 순서 유지)"""
+    markets = [market.strip().upper() for market in value.split(",") if market.strip()]
+    return list(dict.fromkeys(markets))
+
+
+def build_investment_status(krw_balance: float, btc_balance: float, avg_buy_price: float,
+                            current_price: float) -> Dict[str, Any]:
+    """잔고/현재가로 투자 상태 계산"""
+    # 총 자산 계산
+    total_assets = krw_balance + (btc_balance * current_price)
+    btc_ratio = (btc_balance * current_price) / total_assets if total_assets > 0 else 0
+
+    # 수익률 계산
+    profit_loss = ((current_price - avg_buy_price) / avg_buy_price * 100) if avg_buy_price > 0 else 0
+
+    return {
+        "krw_balance": krw_balance,
+        "btc_balance": btc_balance,
+        "avg_buy_price": avg_buy_price,
+        "current_price": current_price,
+        "total_assets": total_assets,
+        "btc_ratio": btc_ratio,
+        "profit_loss": profit_loss
+    }
+
+
+class UpbitMarketCache:
+    """
+    봇이 사용하는 업비트 조회 API 위의 TTL 캐시.
+    잔고/평균 매수가는 /v1/accounts 한 번으로 함께 가져오고, 체결 후에는 계좌 정보만 무효화함.
+    """
+
+    def __init__(self, upbit, account_ttl: float = 5.0, quote_ttl: float = 1.0):
+        self.upbit = upbit
+        self.account_ttl = account_ttl
+        self.quote_ttl = quote_ttl
+        self.cache = TTLCache()
+
+    def get_balances(self) -> List[Dict[str, Any]]:
+        balances = self.cache.get_or_load("balances", self.upbit.get_balances, self.account_ttl)
+        return balances if isinstance(balances, list) else []
+
+    def _account(self, ticker: str) -> Optional[Dict[str, Any]]:
+        # "KRW-BTC" -> (KRW, BTC), "KRW" -> (KRW, KRW)
+        fiat, currency = ticker.split("-") if "-" in ticker else ("KRW", ticker)
+        for account in self.get_balances():
+            if account.get("currency") == currency and account.get("unit_currency", fiat) == fiat:
+                return account
+        return None
+
+    def get_balance(self, ticker: str = "KRW") -> float:
+        account = self._account(ticker)
+        return float(account["balance"]) if account else 0.0
+
+    def get_avg_buy_price(self, ticker: str = "KRW-BTC") -> float:
+        account = self._account(ticker)
+        return float(account["avg_buy_price"]) if account else 0.0
+
+    def get_current_price(self, ticker: str = "KRW-BTC") -> Optional[float]:
+        return self.cache.get_or_load(("price", ticker), lambda: pyupbit.get_current_price(ticker), self.quote_ttl)
+
+    def get_orderbook(self, ticker: str = "KRW-BTC") -> Optional[Dict[str, Any]]:
+        return self.cache.get_or_load(("orderbook", ticker), lambda: pyupbit.get_orderbook(ticker), self.quote_ttl)
+
+    def update_price(self, ticker: str, price: float):
+        """실시간 피드에서 받은 현재가로 캐시 갱신"""
+        self.cache.set(("price", ticker), price, self.quote_ttl)
+
+    def update_orderbook(self, ticker: str, orderbook: Dict[str, Any]):
+        """실시간 피드에서 받은 호가로 캐시 갱신"""
+        self.cache.set(("orderbook", ticker), orderbook, self.quote_ttl)
+
+    def quotes_fresh(self, ticker: str = "KRW-BTC") -> bool:
+        """현재가와 호가가 모두 캐시에 있는지 (피드나 비동기 조회로 채워졌으면 REST 조회 생략)"""
+        return self.cache.peek(("price", ticker)) is not None and self.cache.peek(("orderbook", ticker)) is not None
+
+    def invalidate_account(self):
+        """체결 후 호출: 잔고/평균 매수가만 다시 조회하도록 함"""
+        self.cache.invalidate("balances")
+
+    def invalidate_quotes(self, ticker: str = "KRW-BTC"):
+        self.cache.invalidate(("price", ticker), ("orderbook", ticker))
+
+    def investment_status(self, ticker: str = "KRW-BTC") -> Dict[str, Any]:
+        return build_investment_status(
+            self.get_balance("KRW"),
+            self.get_balance(ticker),
+            self.get_avg_buy_price(ticker),
+            self.get_current_price(ticker)
+        )
+
+
+class CycleSnapshot:
+    """
+    한 거래 사이클 동안 재사용하는 데이터 묶음.
+    사이클 시작 시 한 번 수집한 trading_data를 결정/회고/기록 단계가 함께 사용하고,
+    체결 후에는 refresh_account()로 바뀐 계좌 정보만 갱신함.
+    """
+
+    def __init__(self, trading_data: Dict[str, Any], market_cache: UpbitMarketCache, ticker: str = "KRW-BTC"):
+        self.trading_data = trading_data
+        self.market_cache = market_cache
+        self.ticker = ticker
+
+    @property
+    def investment_status(self) -> Dict[str, Any]:
+        return self.trading_data.get("investment_status", {})
+
+    @property
+    def current_price(self) -> Optional[float]:
+        return self.investment_status.get("current_price")
+
+    def refresh_account(self) -> Dict[str, Any]:
+        """체결 후 잔고/평균 매수가만 다시 조회해 investment_status 갱신 (OHLCV/지표는 재사용)"""
+        self.market_cache.invalidate_account()
+        try:
+            self.trading_data["investment_status"] = self.market_cache.investment_status(self.ticker)
+        except Exception as e:
+            logger.error(f"Error refreshing account snapshot: {e}")
+        return self.investment_status
@@ -0,0 +1,43 @@
+from typing import Any, Dict
+import logging
+
+from orderbook_analytics import OrderbookAnalytics, format_metrics
+
+logger = logging.getLogger("MarketSummary")
+
+# technical_summary에 포함하는 지표
+SUMMARY_INDICATORS = ["rsi", "macd", "macd_signal", "bb_width", "stoch_k", "stoch_d"]
+
+
+def prepare_trading_summary(trading_data: Dict[str, Any]) -> Dict[str, str]:
+    """Prepare concise trading summary for AI"""
+    try:
+        # "KRW-ETH" -> ETH (이전 형식의 trading_data에는 market이 없음)
+        coin = trading_data.get('market', 'KRW-BTC').split('-')[-1]
+        # 호가를 한 번 배열로 바꿔 잔량 합계/불균형/스프레드/슬리피지를 계산
+        analytics = OrderbookAnalytics.from_orderbook(trading_data.get('orderbook'))
+        bid_total, ask_total = analytics.depth(5) if analytics else (0, 0)
+        market_depth = (
+            f"Buy Pressure: {bid_total:.2f} {coin}\n"
+            f"Sell Pressure: {ask_total:.2f} {coin}\n"
+        )
+        if analytics:
+            market_depth += "".join(f"{line}\n" for line in format_metrics(analytics.metrics()))
+
+        return {
+            "market_status": (
+                f"Current {coin} Price: {trading_data['investment_status']['current_price']:,.0f} KRW\n"
+                f"Position: {trading_data['investment_status']['btc_balance']:.8f} {coin}\n"
+                f"Average Buy Price: {trading_data['investment_status']['avg_buy_price']:,.0f} KRW\n"
+            ),
+            "technical_analysis": (
+                f"Daily RSI: {trading_data['technical_summary']['daily']['rsi']:.2f}\n"
+                f"Daily MACD: {trading_data['technical_summary']['daily']['macd']:.2f}\n"
+                f"Hourly RSI: {trading_data['technical_summary']['hourly']['rsi']:.2f}\n"
+                f"Hourly MACD: {trading_data['technical_summary']['hourly']['macd']:.2f}\n"
+            ),
+            "market_depth": market_depth
+        }
+    except KeyError as e:
+        logger.error(f"Error preparing trading summary: {e}")
+        return {}
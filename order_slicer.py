@@ -0,0 +1,301 @@
+"""
+큰 주문을 여러 개의 지정가 자식 주문으로 나눠 실행 (TWAP + 아이스버그).
+
+- 전체 수량을 slices개 구간에 나눠 interval초마다 자식 주문을 냄 (남은 수량 / 남은 구간)
+- 자식 주문은 호가에 보이는 잔량의 display_fraction까지만 냄 (아이스버그)
+- 자식 주문 가격은 현재 호가에서 해당 수량이 체결되는 가격, 단 도착 가격(arrival mid) 대비 max_slippage_bps를 넘지 않음
+- 구간이 끝날 때 남은 자식 주문은 취소하고, 못 채운 수량은 다음 구간에 넘김
+- 백그라운드 스레드에서 체결을 추적하고, 끝나면 도착 가격 대비 실현 슬리피지를 보고함
+
+exchange는 pyupbit.Upbit과 같은 buy_limit_order/sell_limit_order/get_order/cancel_order를 가진 객체
+(로컬 테스트: simulators.mock_exchange.MockExchange).
+"""
+import threading
+import time
+import uuid as uuid_lib
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+import pyupbit
+
+from orderbook_analytics import OrderbookAnalytics
+
+logger = logging.getLogger("OrderSlicer")
+
+VOLUME_PRECISION = 8  # 업비트 주문 수량 소수 자릿수
+
+
+@dataclass
+class ChildOrder:
+    uuid: str
+    price: float
+    volume: float
+    executed_volume: float = 0.0
+    funds: float = 0.0  # 체결 금액 (KRW)
+    paid_fee: float = 0.0
+    state: str = "wait"
+
+
+@dataclass
+class ExecutionReport:
+    execution_id: str
+    market: str
+    side: str  # buy/sell
+    requested: float  # 매수: KRW, 매도: BTC
+    arrival_price: float  # 시작 시점 중간가
+    filled_volume: float = 0.0
+    filled_funds: float = 0.0
+    paid_fee: float = 0.0
+    children: List[ChildOrder] = field(default_factory=list)
+    state: str = "running"  # running/done/partial/failed
+    error: Optional[str] = None
+    started_at: float = field(default_factory=time.monotonic)
+    elapsed: float = 0.0
+
+    @property
+    def average_price(self) -> Optional[float]:
+        return self.filled_funds / self.filled_volume if self.filled_volume else None
+
+    @property
+    def slippage_bps(self) -> Optional[float]:
+        """도착 가격 대비 실현 슬리피지 (양수면 불리하게 체결)"""
+        average = self.average_price
+        if average is None or not self.arrival_price:
+            return None
+        sign = 1 if self.side == "buy" else -1
+        return sign * (average / self.arrival_price - 1) * 1e4
+
+    @property
+    def remaining(self) -> float:
+        """아직 체결되지 않은 수량 (매수: KRW, 매도: BTC)"""
+        if self.side == "buy":
+            return self.requested - self.filled_funds - self.paid_fee
+        return self.requested - self.filled_volume
+
+    @property
+    def fill_ratio(self) -> float:
+        filled = self.filled_funds if self.side == "buy" else self.filled_volume
+        return filled / self.requested if self.requested else 0.0
+
+    def summary(self) -> str:
+        average = f"{self.average_price:,.0f}" if self.average_price else "-"
+        slippage = f"{self.slippage_bps:+.2f}bps" if self.slippage_bps is not None else "-"
+        return (f"{self.side} {self.market} {self.state}: filled {self.fill_ratio:.1%} "
+                f"({self.filled_volume:.8f} BTC / {self.filled_funds:,.0f} KRW) in {len(self.children)} orders, "
+                f"avg {average} vs arrival {self.arrival_price:,.0f} ({slippage}), {self.elapsed:.1f}s")
+
+
+class OrderSlicer:
+    """
+    Args:
+        exchange: pyupbit.Upbit 호환 주문 API
+        get_orderbook: market -> 호가 (market_cache.get_orderbook 등)
+        slices: 나눌 구간 수
+        interval: 구간 길이 (초)
+        display_fraction: 자식 주문 크기를 호가 잔량의 이 비율로 제한 (0이면 제한 없음)
+        depth_levels: display_fraction을 적용할 상위 호가 단계 수
+        max_slippage_bps: 도착 가격 대비 지정가 한도 (0이면 제한 없음)
+        poll_interval: 체결 조회 주기 (초)
+        min_order_krw: 이보다 작은 자식 주문은 내지 않음 (업비트 최소 주문 금액)
+    """
+
+    def __init__(self, exchange, get_orderbook: Callable[[str], Any], slices: int = 5, interval: float = 10.0,
+                 display_fraction: float = 0.5, depth_levels: int = 5, max_slippage_bps: float = 30.0,
+                 poll_interval: float = 1.0, min_order_krw: float = 5000.0, fee: float = 0.0005,
+                 max_workers: int = 4):
+        self.exchange = exchange
+        self.get_orderbook = get_orderbook
+        self.slices = max(1, slices)
+        self.interval = interval
+        self.display_fraction = display_fraction
+        self.depth_levels = depth_levels
+        self.max_slippage_bps = max_slippage_bps
+        self.poll_interval = poll_interval
+        self.min_order_krw = min_order_krw
+        self.fee = fee
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="OrderSlicer")
+        self.reports: Dict[str, ExecutionReport] = {}
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------------- 공개 API
+    def submit(self, market: str, side: str, amount: float,
+               on_complete: Optional[Callable[[ExecutionReport], None]] = None) -> Future:
+        """
+        백그라운드에서 실행 시작. Future.result()는 ExecutionReport.
+
+        Args:
+            side: buy면 amount는 KRW, sell이면 BTC 수량
+            on_complete: 끝나면 보고서로 호출 (실행 스레드에서)
+        """
+        if side not in ("buy", "sell"):
+            raise ValueError(f"Unknown side: {side}")
+        analytics = OrderbookAnalytics.from_orderbook(self.get_orderbook(market))
+        if analytics is None:
+            raise ValueError(f"No orderbook for {market}")
+
+        report = ExecutionReport(uuid_lib.uuid4().hex[:12], market, side, amount, arrival_price=analytics.mid)
+        with self._lock:
+            self.reports[report.execution_id] = report
+        logger.info(f"[{report.execution_id}] Slicing {side} {market} {amount:,.8g} into {self.slices} slices "
+                    f"every {self.interval}s (arrival {report.arrival_price:,.0f})")
+
+        def run() -> ExecutionReport:
+            try:
+                self._run(report)
+            except Exception as e:
+                logger.error(f"[{report.execution_id}] Sliced execution failed: {e}")
+                # 실패해도 호가에 남은 자식 주문이 잔고를 묶어 두지 않도록 취소
+                self._cancel_open(report)
+                report.state = "failed"
+                report.error = str(e)
+            report.elapsed = time.monotonic() - report.started_at
+            logger.info(f"[{report.execution_id}] {report.summary()}")
+            try:
+                if on_complete:
+                    try:
+                        on_complete(report)
+                    except Exception as e:
+                        logger.error(f"[{report.execution_id}] on_complete error: {e}")
+            finally:
+                # 끝난 보고서는 보관하지 않음 (결과는 Future/on_complete로 전달)
+                with self._lock:
+                    self.reports.pop(report.execution_id, None)
+            return report
+
+        return self._pool.submit(run)
+
+    def running(self) -> List[ExecutionReport]:
+        """진행 중인 실행 보고서"""
+        with self._lock:
+            return [report for report in self.reports.values() if report.state == "running"]
+
+    def execute(self, market: str, side: str, amount: float) -> ExecutionReport:
+        """끝날 때까지 기다리는 실행"""
+        return self.submit(market, side, amount).result()
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+    # ---------------------------------------------------------------- 실행
+    def _remaining(self, report: ExecutionReport) -> float:
+        return report.remaining
+
+    def _limit_price(self, report: ExecutionReport, analytics: OrderbookAnalytics, volume: float) -> float:
+        """volume이 현재 호가에서 체결되는 가장 나쁜 가격, 도착 가격 대비 한도로 제한"""
+        if self.max_slippage_bps <= 0:
+            price = analytics.sweep_price(volume, buy=report.side == "buy")
+            return pyupbit.get_tick_size(price, method="floor" if report.side == "buy" else "ceil")
+        if report.side == "buy":
+            cap = report.arrival_price * (1 + self.max_slippage_bps / 1e4)
+            return pyupbit.get_tick_size(min(analytics.sweep_price(volume, buy=True), cap), method="floor")
+        cap = report.arrival_price * (1 - self.max_slippage_bps / 1e4)
+        return pyupbit.get_tick_size(max(analytics.sweep_price(volume, buy=False), cap), method="ceil")
+
+    def _child_volume(self, report: ExecutionReport, analytics: OrderbookAnalytics, slices_left: int) -> float:
+        remaining = self._remaining(report)
+        share = remaining / slices_left
+        reference = analytics.best_ask if report.side == "buy" else analytics.best_bid
+        volume = share / reference / (1 + self.fee) if report.side == "buy" else share
+        if self.display_fraction > 0:
+            bid_depth, ask_depth = analytics.depth(self.depth_levels)
+            visible = ask_depth if report.side == "buy" else bid_depth
+            volume = min(volume, visible * self.display_fraction)
+        return round(volume, VOLUME_PRECISION)
+
+    def _run(self, report: ExecutionReport):
+        for slice_index in range(self.slices):
+            slice_end = time.monotonic() + self.interval
+            slices_left = self.slices - slice_index
+            analytics = OrderbookAnalytics.from_orderbook(self.get_orderbook(report.market))
+            if analytics is None:
+                logger.warning(f"[{report.execution_id}] No orderbook, skipping slice {slice_index + 1}")
+            else:
+                child = self._place_child(report, analytics, slices_left)
+                if child is not None:
+                    self._track(report, child, slice_end)
+
+            if self._remaining_krw(report) < self.min_order_krw:
+                break
+            # 다음 구간까지 대기 (마지막 구간이면 바로 종료)
+            if slice_index < self.slices - 1:
+                time.sleep(max(0.0, slice_end - time.monotonic()))
+
+        report.state = "done" if self._remaining_krw(report) < self.min_order_krw else "partial"
+
+    def _remaining_krw(self, report: ExecutionReport) -> float:
+        remaining = self._remaining(report)
+        return remaining if report.side == "buy" else remaining * report.arrival_price
+
+    def _place_child(self, report: ExecutionReport, analytics: OrderbookAnalytics,
+                     slices_left: int) -> Optional[ChildOrder]:
+        volume = self._child_volume(report, analytics, slices_left)
+        price = self._limit_price(report, analytics, volume)
+        if volume * price < self.min_order_krw:
+            # 마지막 자투리가 최소 주문 금액보다 작으면 남은 구간에 합침
+            if self._remaining_krw(report) >= self.min_order_krw and slices_left > 1:
+                return None
+            volume = round(max(volume, self.min_order_krw / price), VOLUME_PRECISION)
+            if report.side == "sell":
+                volume = min(volume, self._remaining(report))
+            if volume * price < self.min_order_krw:
+                return None
+
+        if report.side == "buy":
+            response = self.exchange.buy_limit_order(report.market, price, volume)
+        else:
+            response = self.exchange.sell_limit_order(report.market, price, volume)
+        if not response or "uuid" not in response:
+            raise RuntimeError(f"Order rejected: {response}")
+
+        child = ChildOrder(response["uuid"], price, volume)
+        report.children.append(child)
+        return child
+
+    def _apply(self, report: ExecutionReport, child: ChildOrder, order: Dict[str, Any]):
+        """주문 조회 결과를 자식 주문과 보고서에 반영 (이전 조회 대비 증가분만 더함)"""
+        executed = float(order.get("executed_volume") or 0)
+        trades = order.get("trades") or []
+        funds = sum(float(trade.get("funds") or 0) for trade in trades) if trades else executed * child.price
+        fee = float(order.get("paid_fee") or 0)
+
+        report.filled_volume += executed - child.executed_volume
+        report.filled_funds += funds - child.funds
+        report.paid_fee += fee - child.paid_fee
+        child.executed_volume, child.funds, child.paid_fee = executed, funds, fee
+        child.state = order.get("state", child.state)
+
+    def _track(self, report: ExecutionReport, child: ChildOrder, deadline: float):
+        """구간이 끝날 때까지 체결을 조회하고, 남은 수량은 취소 (조회 중 오류가 나도 취소)"""
+        try:
+            while True:
+                order = self.exchange.get_order(child.uuid)
+                if order:
+                    self._apply(report, child, order)
+                if child.state in ("done", "cancel"):
+                    return
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+        finally:
+            if child.state not in ("done", "cancel"):
+                self._cancel_child(report, child)
+
+    def _cancel_child(self, report: ExecutionReport, child: ChildOrder):
+        self.exchange.cancel_order(child.uuid)
+        child.state = "cancel"
+        # 취소 직전에 체결된 수량 반영
+        order = self.exchange.get_order(child.uuid)
+        if order:
+            self._apply(report, child, order)
+
+    def _cancel_open(self, report: ExecutionReport):
+        """끝나지 않은 자식 주문을 모두 취소 (취소도 실패하면 로그만 남김)"""
+        for child in report.children:
+            if child.state in ("done", "cancel"):
+                continue
+            try:
+                self._cancel_child(report, child)
+            except Exception as e:
+                logger.error(f"[{report.execution_id}] Failed to cancel child order {child.uuid}: {e}")
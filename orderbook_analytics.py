@@ -0,0 +1,234 @@
+"""
+호가 분석 (NumPy).
+
+orderbook_units를 한 번 배열로 바꾼 뒤 스프레드, 다단계 잔량 불균형, 가중 중간가, 마이크로프라이스,
+주문 크기별 예상 슬리피지를 계산함. 15단계 호가 기준 수십 마이크로초라서 WebSocket 호가 갱신마다 실행할 수 있음.
+
+슬리피지는 중간가(mid) 대비 평균 체결가 차이(bps)로, 스프레드 절반을 포함함.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger("OrderbookAnalytics")
+
+IMBALANCE_LEVELS = (1, 5, 15)
+# 프롬프트에 보여줄 예상 슬리피지 주문 크기 (KRW)
+SLIPPAGE_PROBE_KRW = (1_000_000, 10_000_000, 100_000_000)
+
+
+@dataclass
+class OrderbookMetrics:
+    best_bid: float
+    best_ask: float
+    mid: float
+    spread: float
+    spread_bps: float
+    microprice: float
+    weighted_mid: float
+    imbalance: Dict[int, float] = field(default_factory=dict)  # 단계 수 -> (bid - ask) / (bid + ask)
+    bid_depth: float = 0.0  # 전체 매수 잔량 (BTC)
+    ask_depth: float = 0.0
+    buy_slippage_bps: Dict[float, float] = field(default_factory=dict)  # 주문 금액(KRW) -> 슬리피지 (호가 부족이면 inf)
+    sell_slippage_bps: Dict[float, float] = field(default_factory=dict)
+
+
+class OrderbookAnalytics:
+    """
+    한 시점의 호가. units는 업비트 orderbook_units (0번이 최우선 호가)
+    """
+
+    def __init__(self, units: Sequence[Dict[str, Any]]):
+        if not units:
+            raise ValueError("Empty orderbook")
+        table = np.array([(unit["ask_price"], unit["ask_size"], unit["bid_price"], unit["bid_size"])
+                          for unit in units], dtype=np.float64)
+        self.ask_price, self.ask_size, self.bid_price, self.bid_size = table.T
+        # 단계별 누적 잔량/금액 (슬리피지 계산용)
+        self._ask_qty = np.cumsum(self.ask_size)
+        self._ask_krw = np.cumsum(self.ask_price * self.ask_size)
+        self._bid_qty = np.cumsum(self.bid_size)
+        self._bid_krw = np.cumsum(self.bid_price * self.bid_size)
+
+    @classmethod
+    def from_orderbook(cls, orderbook: Any) -> Optional["OrderbookAnalytics"]:
+        """pyupbit.get_orderbook 결과(dict), WebSocket 메시지, orderbook_units 목록을 모두 받음. 비어 있으면 None"""
+        if isinstance(orderbook, list) and orderbook and "orderbook_units" in orderbook[0]:
+            orderbook = orderbook[0]  # 여러 마켓 조회 결과
+        units = orderbook.get("orderbook_units") if isinstance(orderbook, dict) else orderbook
+        if not units:
+            return None
+        return cls(units)
+
+    @property
+    def best_bid(self) -> float:
+        return float(self.bid_price[0])
+
+    @property
+    def best_ask(self) -> float:
+        return float(self.ask_price[0])
+
+    @property
+    def mid(self) -> float:
+        return (self.best_bid + self.best_ask) / 2
+
+    @property
+    def spread(self) -> float:
+        return self.best_ask - self.best_bid
+
+    def depth(self, levels: int = 5) -> Tuple[float, float]:
+        """상위 levels단계 (매수 잔량, 매도 잔량) BTC"""
+        return (float(self._bid_qty[min(levels, len(self._bid_qty)) - 1]),
+                float(self._ask_qty[min(levels, len(self._ask_qty)) - 1]))
+
+    def imbalance(self, levels: int = 5) -> float:
+        """상위 levels단계 잔량 불균형 (-1: 매도 우위 ~ +1: 매수 우위)"""
+        bid, ask = self.depth(levels)
+        total = bid + ask
+        return (bid - ask) / total if total else 0.0
+
+    def microprice(self) -> float:
+        """최우선 호가 잔량으로 가중한 가격 (매수 잔량이 많을수록 매도 호가 쪽으로 치우침)"""
+        bid_size, ask_size = self.bid_size[0], self.ask_size[0]
+        total = bid_size + ask_size
+        if not total:
+            return self.mid
+        return float((self.best_bid * ask_size + self.best_ask * bid_size) / total)
+
+    def weighted_mid(self, levels: int = 5) -> float:
+        """상위 levels단계의 매수/매도 평균가(VWAP)를 반대편 잔량으로 가중한 중간가"""
+        n = min(levels, len(self.ask_price))
+        bid_qty, ask_qty = self._bid_qty[n - 1], self._ask_qty[n - 1]
+        if not bid_qty or not ask_qty:
+            return self.mid
+        bid_vwap = self._bid_krw[n - 1] / bid_qty
+        ask_vwap = self._ask_krw[n - 1] / ask_qty
+        return float((bid_vwap * ask_qty + ask_vwap * bid_qty) / (bid_qty + ask_qty))
+
+    def buy_cost(self, krw_amount: float) -> Optional[float]:
+        """krw_amount만큼 시장가 매수할 때 평균 체결가 (호가 잔량이 부족하면 None)"""
+        if krw_amount <= 0:
+            return self.best_ask
+        level = int(np.searchsorted(self._ask_krw, krw_amount))
+        if level >= len(self._ask_krw):
+            return None
+        previous_krw = self._ask_krw[level - 1] if level else 0.0
+        previous_qty = self._ask_qty[level - 1] if level else 0.0
+        qty = previous_qty + (krw_amount - previous_krw) / self.ask_price[level]
+        return float(krw_amount / qty)
+
+    def sell_proceeds(self, volume: float) -> Optional[float]:
+        """volume(BTC)만큼 시장가 매도할 때 평균 체결가 (호가 잔량이 부족하면 None)"""
+        if volume <= 0:
+            return self.best_bid
+        level = int(np.searchsorted(self._bid_qty, volume))
+        if level >= len(self._bid_qty):
+            return None
+        previous_krw = self._bid_krw[level - 1] if level else 0.0
+        previous_qty = self._bid_qty[level - 1] if level else 0.0
+        krw = previous_krw + (volume - previous_qty) * self.bid_price[level]
+        return float(krw / volume)
+
+    def sweep_price(self, volume: float, buy: bool) -> float:
+        """volume(BTC)을 다 채우려면 닿아야 하는 가장 나쁜 호가 (잔량이 부족하면 마지막 단계 가격)"""
+        prices, cum_qty = (self.ask_price, self._ask_qty) if buy else (self.bid_price, self._bid_qty)
+        level = min(int(np.searchsorted(cum_qty, volume)), len(prices) - 1)
+        return float(prices[level])
+
+    def buy_slippage_bps(self, krw_amount: float) -> float:
+        price = self.buy_cost(krw_amount)
+        return float("inf") if price is None else (price / self.mid - 1) * 1e4
+
+    def sell_slippage_bps(self, volume: float) -> float:
+        price = self.sell_proceeds(volume)
+        return float("inf") if price is None else (1 - price / self.mid) * 1e4
+
+    def max_buy_amount(self, max_slippage_bps: float) -> float:
+        """평균 체결가가 mid 대비 max_slippage_bps 안에 머무는 최대 매수 금액 (KRW)"""
+        limit = self.mid * (1 + max_slippage_bps / 1e4)
+        return self._max_fill(self.ask_price, self._ask_qty, self._ask_krw, limit, buy=True)
+
+    def max_sell_volume(self, max_slippage_bps: float) -> float:
+        """평균 체결가가 mid 대비 max_slippage_bps 안에 머무는 최대 매도 수량 (BTC)"""
+        limit = self.mid * (1 - max_slippage_bps / 1e4)
+        return self._max_fill(self.bid_price, self._bid_qty, self._bid_krw, limit, buy=False)
+
+    @staticmethod
+    def _max_fill(prices: np.ndarray, cum_qty: np.ndarray, cum_krw: np.ndarray, limit: float, buy: bool) -> float:
+        # 단계를 다 먹었을 때의 평균가가 한도를 처음 넘는 단계를 찾고, 그 단계 안에서 한도에 닿는 수량을 풂
+        average = cum_krw / cum_qty
+        exceeded = average > limit if buy else average < limit
+        if not exceeded.any():
+            return float(cum_krw[-1] if buy else cum_qty[-1])
+        level = int(np.argmax(exceeded))
+        previous_qty = cum_qty[level - 1] if level else 0.0
+        previous_krw = cum_krw[level - 1] if level else 0.0
+        # (previous_krw + p * q) / (previous_qty + q) = limit
+        qty = max(0.0, (limit * previous_qty - previous_krw) / (prices[level] - limit))
+        if buy:
+            return float(previous_krw + prices[level] * qty)
+        return float(previous_qty + qty)
+
+    def metrics(self, levels: Iterable[int] = IMBALANCE_LEVELS,
+                probe_amounts: Iterable[float] = SLIPPAGE_PROBE_KRW) -> OrderbookMetrics:
+        mid = self.mid
+        return OrderbookMetrics(
+            best_bid=self.best_bid,
+            best_ask=self.best_ask,
+            mid=mid,
+            spread=self.spread,
+            spread_bps=self.spread / mid * 1e4 if mid else 0.0,
+            microprice=self.microprice(),
+            weighted_mid=self.weighted_mid(),
+            imbalance={level: self.imbalance(level) for level in levels},
+            bid_depth=float(self._bid_qty[-1]),
+            ask_depth=float(self._ask_qty[-1]),
+            buy_slippage_bps={amount: self.buy_slippage_bps(amount) for amount in probe_amounts},
+            sell_slippage_bps={amount: self.sell_slippage_bps(amount / mid) for amount in probe_amounts},
+        )
+
+
+def format_metrics(metrics: OrderbookMetrics) -> List[str]:
+    """프롬프트용 요약 줄"""
+    def bps(value: float) -> str:
+        return "beyond book" if value == float("inf") else f"{value:.1f}bps"
+
+    imbalance = ", ".join(f"top{level} {value:+.2f}" for level, value in metrics.imbalance.items())
+    slippage = ", ".join(
+        f"{amount / 1e6:g}M KRW buy {bps(metrics.buy_slippage_bps[amount])} / sell {bps(metrics.sell_slippage_bps[amount])}"
+        for amount in metrics.buy_slippage_bps
+    )
+    return [
+        f"Spread: {metrics.spread:,.0f} KRW ({metrics.spread_bps:.2f}bps), Mid: {metrics.mid:,.0f} KRW",
+        f"Microprice: {metrics.microprice:,.0f} KRW, Weighted Mid (top5): {metrics.weighted_mid:,.0f} KRW",
+        f"Depth Imbalance (bid-ask)/(bid+ask): {imbalance}",
+        f"Estimated Slippage vs mid: {slippage}",
+    ]
+
+
+def limit_buy_amount(orderbook: Any, amount: float, max_slippage_bps: float) -> float:
+    """매수 금액을 예상 슬리피지 한도 안으로 줄임 (호가가 없거나 한도가 0 이하면 그대로)"""
+    analytics = OrderbookAnalytics.from_orderbook(orderbook) if max_slippage_bps > 0 else None
+    if analytics is None:
+        return amount
+    cap = analytics.max_buy_amount(max_slippage_bps)
+    if amount > cap:
+        logger.info(f"Buy amount {amount:,.0f} KRW reduced to {cap:,.0f} KRW "
+                    f"(expected slippage {analytics.buy_slippage_bps(amount):.1f}bps > {max_slippage_bps}bps)")
+        return cap
+    return amount
+
+
+def limit_sell_volume(orderbook: Any, volume: float, max_slippage_bps: float) -> float:
+    """매도 수량을 예상 슬리피지 한도 안으로 줄임 (호가가 없거나 한도가 0 이하면 그대로)"""
+    analytics = OrderbookAnalytics.from_orderbook(orderbook) if max_slippage_bps > 0 else None
+    if analytics is None:
+        return volume
+    cap = analytics.max_sell_volume(max_slippage_bps)
+    if volume > cap:
+        logger.info(f"Sell volume {volume:.8f} BTC reduced to {cap:.8f} BTC "
+                    f"(expected slippage {analytics.sell_slippage_bps(volume):.1f}bps > {max_slippage_bps}bps)")
+        return cap
+    return volume
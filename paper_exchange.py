@@ -0,0 +1,321 @@
+"""
+모의 투자용 거래소 (실제 주문 없음).
+
+PaperAccount는 봇이 pyupbit.Upbit에서 쓰는 메소드(get_balances, get_balance, get_avg_buy_price,
+buy_market_order, sell_market_order, buy/sell_limit_order, get_order, cancel_order)를 같은 형식으로 제공하고,
+가상 잔고로 최신 호가에 대해 수수료를 포함해 체결함. 지정가 주문은 즉시 체결 가능한 만큼만 체결되고 나머지는 취소됨 (IOC).
+
+여러 계좌가 PaperExchange 하나를 공유함:
+- 호가는 마켓별로 한 번만 가져오고 (quote_ttl 캐시, 또는 update_orderbook/피드 리스너로 갱신)
+- 같은 호가 스냅샷에서 먼저 체결된 계좌가 소진한 잔량은 다른 계좌가 다시 쓰지 못함 (새 호가가 오면 초기화)
+- 계좌는 잔고 dict와 최근 주문 몇 개만 가지므로 수백 개를 한 프로세스에서 돌려도 부담이 적음
+"""
+import json
+import os
+import tempfile
+import threading
+import uuid as uuid_lib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+import pyupbit
+
+from utils.helpers import TTLCache
+
+logger = logging.getLogger("PaperExchange")
+
+MAX_RECENT_ORDERS = 50  # 계좌별로 get_order 조회용으로 남겨두는 주문 수
+
+
+def _units(orderbook: Any) -> List[Dict[str, Any]]:
+    if isinstance(orderbook, list) and orderbook and "orderbook_units" in orderbook[0]:
+        orderbook = orderbook[0]  # 여러 마켓 조회 결과
+    if isinstance(orderbook, dict):
+        return orderbook.get("orderbook_units") or []
+    return orderbook or []
+
+
+def _split(ticker: str) -> Tuple[str, str]:
+    # "KRW-BTC" -> (KRW, BTC), "KRW" -> (KRW, KRW)
+    return tuple(ticker.split("-")) if "-" in ticker else ("KRW", ticker)
+
+
+class PaperExchange:
+    """
+    Args:
+        get_orderbook: market -> 호가 (없으면 pyupbit.get_orderbook을 quote_ttl 동안 캐시해 사용)
+        fee: 체결 금액 대비 수수료율
+        quote_ttl: 호가 캐시 유지 시간 (초)
+    """
+
+    def __init__(self, get_orderbook: Optional[Callable[[str], Any]] = None, fee: float = 0.0005,
+                 quote_ttl: float = 1.0):
+        self.fee = fee
+        self.quote_ttl = quote_ttl
+        self._fetch_orderbook = get_orderbook or pyupbit.get_orderbook
+        self._quotes = TTLCache()
+        self.accounts: Dict[str, "PaperAccount"] = {}
+        self._accounts_lock = threading.Lock()
+        # 마켓별 (호가 스냅샷 키, {"bid": {가격: 소진량}, "ask": {...}})
+        self._consumed: Dict[str, Tuple[Any, Dict[str, Dict[float, float]]]] = {}
+        self._book_lock = threading.Lock()
+
+    # ---------------------------------------------------------------- 호가
+    def get_orderbook(self, market: str = "KRW-BTC") -> Any:
+        return self._quotes.get_or_load(market, lambda: self._fetch_orderbook(market), self.quote_ttl)
+
+    def update_orderbook(self, market: str, orderbook: Dict[str, Any]):
+        """실시간 피드에서 받은 호가로 갱신"""
+        self._quotes.set(market, orderbook, self.quote_ttl)
+
+    def __call__(self, message_type: str, market: str, message: Dict[str, Any]):
+        """MarketFeed 리스너"""
+        if message_type == "orderbook":
+            self.update_orderbook(market, message)
+
+    def take(self, market: str, side: str, krw: Optional[float] = None, volume: Optional[float] = None,
+             limit_price: Optional[float] = None) -> List[Tuple[float, float]]:
+        """
+        최신 호가에서 유동성을 가져감. side가 bid(매수)면 매도 호가를, ask(매도)면 매수 호가를 소진.
+
+        Args:
+            krw: 매수 금액 한도 (수수료 제외)
+            volume: 수량 한도 (BTC)
+            limit_price: 이 가격보다 나쁜 호가는 건너뜀
+        Returns:
+            [(가격, 수량)] 체결 목록 (호가가 부족하면 일부만)
+        """
+        orderbook = self.get_orderbook(market)
+        units = _units(orderbook)
+        if not units:
+            raise ValueError(f"No orderbook for {market}")
+        key = orderbook.get("timestamp") if isinstance(orderbook, dict) and orderbook.get("timestamp") else id(units)
+        price_field, size_field = ("ask_price", "ask_size") if side == "bid" else ("bid_price", "bid_size")
+
+        fills = []
+        with self._book_lock:
+            book_key, consumed = self._consumed.get(market, (None, None))
+            if book_key != key:
+                consumed = {"bid": {}, "ask": {}}
+                self._consumed[market] = (key, consumed)
+            used = consumed[side]
+
+            for unit in units:
+                price = float(unit[price_field])
+                if limit_price is not None and (price > limit_price if side == "bid" else price < limit_price):
+                    break
+                available = float(unit[size_field]) - used.get(price, 0.0)
+                if available <= 0:
+                    continue
+                wanted = krw / price if krw is not None else volume
+                filled = min(available, wanted)
+                if filled <= 0:
+                    break
+                used[price] = used.get(price, 0.0) + filled
+                fills.append((price, filled))
+                if krw is not None:
+                    krw -= price * filled
+                    if krw <= 1e-8:
+                        break
+                else:
+                    volume -= filled
+                    if volume <= 1e-12:
+                        break
+        return fills
+
+    # ---------------------------------------------------------------- 계좌
+    def account(self, account_id: str, krw: float = 10_000_000, holdings: Optional[Dict[str, Tuple[float, float]]] = None
+                ) -> "PaperAccount":
+        """계좌가 없으면 시작 잔고로 만들고, 있으면 그대로 돌려줌
+
+        Args:
+            holdings: {"BTC": (수량, 평균 매수가)}
+        """
+        with self._accounts_lock:
+            account = self.accounts.get(account_id)
+            if account is None:
+                account = self.accounts[account_id] = PaperAccount(self, account_id, krw, holdings)
+            return account
+
+    def save(self, path: str):
+        """모든 계좌 잔고를 JSON으로 저장 (임시 파일에 쓴 뒤 교체)"""
+        with self._accounts_lock:
+            state = {account_id: account.state() for account_id, account in self.accounts.items()}
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+            json.dump(state, f)
+        os.replace(f.name, path)
+
+    def load(self, path: str) -> int:
+        """save()로 저장한 계좌를 불러옴. 불러온 계좌 수"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r") as f:
+            state = json.load(f)
+        with self._accounts_lock:
+            for account_id, saved in state.items():
+                self.accounts[account_id] = PaperAccount(
+                    self, account_id, saved["KRW"],
+                    {currency: tuple(value) for currency, value in saved.get("holdings", {}).items()}
+                )
+        return len(state)
+
+
+class PaperAccount:
+    """pyupbit.Upbit 대신 쓰는 가상 계좌"""
+
+    __slots__ = ("exchange", "account_id", "krw", "holdings", "orders", "_lock")
+
+    def __init__(self, exchange: PaperExchange, account_id: str, krw: float,
+                 holdings: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.exchange = exchange
+        self.account_id = account_id
+        self.krw = float(krw)
+        # 통화 -> [수량, 평균 매수가]
+        self.holdings: Dict[str, List[float]] = {currency: [float(volume), float(avg)]
+                                                 for currency, (volume, avg) in (holdings or {}).items()}
+        self.orders: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"KRW": self.krw, "holdings": {currency: list(value) for currency, value in self.holdings.items()}}
+
+    # ---------------------------------------------------------------- 조회
+    def get_balances(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            balances = [{"currency": "KRW", "balance": str(self.krw), "locked": "0", "avg_buy_price": "0",
+                         "avg_buy_price_modified": False, "unit_currency": "KRW"}]
+            balances.extend(
+                {"currency": currency, "balance": str(volume), "locked": "0", "avg_buy_price": str(avg),
+                 "avg_buy_price_modified": False, "unit_currency": "KRW"}
+                for currency, (volume, avg) in self.holdings.items() if volume > 0
+            )
+        return balances
+
+    def get_balance(self, ticker: str = "KRW") -> float:
+        fiat, currency = _split(ticker)
+        with self._lock:
+            if currency == "KRW":
+                return self.krw
+            return self.holdings.get(currency, [0.0, 0.0])[0]
+
+    def get_avg_buy_price(self, ticker: str = "KRW-BTC") -> float:
+        fiat, currency = _split(ticker)
+        with self._lock:
+            return self.holdings.get(currency, [0.0, 0.0])[1]
+
+    def get_order(self, ticker_or_uuid: str, state: str = "wait", **kwargs) -> Any:
+        """uuid면 개별 주문 (체결 내역 포함), 마켓이면 해당 상태 주문 목록 (IOC라 wait 주문은 없음)"""
+        with self._lock:
+            if ticker_or_uuid in self.orders:
+                return dict(self.orders[ticker_or_uuid])
+            return [dict(order) for order in self.orders.values()
+                    if order["market"] == ticker_or_uuid and order["state"] == state]
+
+    def get_individual_order(self, uuid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            order = self.orders.get(uuid)
+            return dict(order) if order else None
+
+    def cancel_order(self, uuid: str) -> Optional[Dict[str, Any]]:
+        # 남는 주문이 없으므로 취소할 것도 없음 (업비트의 order_not_found와 같이 None)
+        return None
+
+    # ---------------------------------------------------------------- 주문
+    def _order(self, ticker: str, side: str, ord_type: str, price: Optional[float], volume: Optional[float],
+               fills: List[Tuple[float, float]], complete: bool) -> Dict[str, Any]:
+        executed = sum(filled for _, filled in fills)
+        funds = sum(price * filled for price, filled in fills)
+        now = datetime.now().astimezone().isoformat(timespec="seconds")
+        order = {
+            "uuid": str(uuid_lib.uuid4()),
+            "side": side,
+            "ord_type": ord_type,
+            "price": None if price is None else str(price),
+            "state": "done" if complete else "cancel",
+            "market": ticker,
+            "created_at": now,
+            "volume": None if volume is None else str(volume),
+            "remaining_volume": None if volume is None else str(max(0.0, volume - executed)),
+            "executed_volume": str(executed),
+            "paid_fee": str(funds * self.exchange.fee),
+            "trades_count": len(fills),
+            "trades": [{"market": ticker, "price": str(fill_price), "volume": str(filled),
+                        "funds": str(fill_price * filled), "side": side, "created_at": now}
+                       for fill_price, filled in fills],
+        }
+        self.orders[order["uuid"]] = order
+        if len(self.orders) > MAX_RECENT_ORDERS:
+            self.orders.popitem(last=False)
+        return order
+
+    def _settle(self, currency: str, side: str, fills: List[Tuple[float, float]]):
+        volume = sum(filled for _, filled in fills)
+        funds = sum(price * filled for price, filled in fills)
+        fee = funds * self.exchange.fee
+        holding = self.holdings.setdefault(currency, [0.0, 0.0])
+        if side == "bid":
+            self.krw -= funds + fee
+            # 업비트와 같이 평균 매수가에는 수수료를 넣지 않음
+            if volume > 0:
+                holding[1] = (holding[0] * holding[1] + funds) / (holding[0] + volume)
+            holding[0] += volume
+        else:
+            self.krw += funds - fee
+            holding[0] -= volume
+            if holding[0] <= 1e-12:
+                holding[0], holding[1] = 0.0, 0.0
+
+    def buy_market_order(self, ticker: str, price: float) -> Optional[Dict[str, Any]]:
+        """price(KRW)만큼 시장가 매수 (수수료 별도). 잔고가 부족하면 pyupbit와 같이 None"""
+        fiat, currency = _split(ticker)
+        with self._lock:
+            if price * (1 + self.exchange.fee) > self.krw + 1e-6:
+                logger.warning(f"[{self.account_id}] Insufficient KRW for buy: {price:,.0f} > {self.krw:,.0f}")
+                return None
+            fills = self.exchange.take(ticker, "bid", krw=price)
+            if not fills:
+                logger.warning(f"[{self.account_id}] No ask liquidity left for {ticker}")
+                return None
+            self._settle(currency, "bid", fills)
+            spent = sum(fill_price * filled for fill_price, filled in fills)
+            return self._order(ticker, "bid", "price", price, None, fills, complete=price - spent <= 1e-6)
+
+    def sell_market_order(self, ticker: str, volume: float) -> Optional[Dict[str, Any]]:
+        fiat, currency = _split(ticker)
+        with self._lock:
+            if volume > self.holdings.get(currency, [0.0, 0.0])[0] + 1e-12:
+                logger.warning(f"[{self.account_id}] Insufficient {currency} for sell: {volume:.8f}")
+                return None
+            fills = self.exchange.take(ticker, "ask", volume=volume)
+            if not fills:
+                logger.warning(f"[{self.account_id}] No bid liquidity left for {ticker}")
+                return None
+            self._settle(currency, "ask", fills)
+            executed = sum(filled for _, filled in fills)
+            return self._order(ticker, "ask", "market", None, volume, fills, complete=volume - executed <= 1e-12)
+
+    def buy_limit_order(self, ticker: str, price: float, volume: float) -> Optional[Dict[str, Any]]:
+        fiat, currency = _split(ticker)
+        with self._lock:
+            if price * volume * (1 + self.exchange.fee) > self.krw + 1e-6:
+                logger.warning(f"[{self.account_id}] Insufficient KRW for limit buy: {price * volume:,.0f}")
+                return None
+            fills = self.exchange.take(ticker, "bid", volume=volume, limit_price=price)
+            self._settle(currency, "bid", fills)
+            executed = sum(filled for _, filled in fills)
+            return self._order(ticker, "bid", "limit", price, volume, fills, complete=volume - executed <= 1e-12)
+
+    def sell_limit_order(self, ticker: str, price: float, volume: float) -> Optional[Dict[str, Any]]:
+        fiat, currency = _split(ticker)
+        with self._lock:
+            if volume > self.holdings.get(currency, [0.0, 0.0])[0] + 1e-12:
+                logger.warning(f"[{self.account_id}] Insufficient {currency} for limit sell: {volume:.8f}")
+                return None
+            fills = self.exchange.take(ticker, "ask", volume=volume, limit_price=price)
+            self._settle(currency, "ask", fills)
+            executed = sum(filled for _, filled in fills)
+            return self._order(ticker, "ask", "limit", price, volume, fills, complete=volume - executed <= 1e-12)
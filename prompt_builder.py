@@ -0,0 +1,268 @@
+"""
+토큰 예산을 지키는 프롬프트 빌더.
+
+시계열은 to_dict('records')를 그대로 넣는 대신 필요한 컬럼만 고정 소수점 CSV로 인코딩하고,
+보내기 전에 토큰 수를 추정해 예산을 넘으면 우선순위가 낮은 섹션부터 줄임
+(시계열은 오래된 행부터 잘라내고, 그래도 넘으면 선택 섹션을 뺌).
+"""
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+logger = logging.getLogger("PromptBuilder")
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:  # 설치되어 있지 않으면 추정치 사용
+    _ENCODING = None
+
+# 숫자는 3자리씩, 영단어는 대략 한 토큰, 기호/한글은 글자당 한 토큰으로 근사
+_TOKEN_PATTERN = re.compile(r"\d{1,3}|[A-Za-z]+|[^\sA-Za-z\d]")
+
+# 시계열에서 보낼 컬럼과 소수 자릿수 (ma*, bb_middle, macd_diff 등 다른 컬럼으로 알 수 있는 값은 제외)
+SERIES_COLUMNS: Dict[str, int] = {
+    "open": 0,
+    "high": 0,
+    "low": 0,
+    "close": 0,
+    "volume": 2,
+    "rsi": 1,
+    "macd": 0,
+    "macd_signal": 0,
+    "bb_upper": 0,
+    "bb_lower": 0,
+    "stoch_k": 1,
+    "stoch_d": 1,
+}
+PRICE_COLUMNS = ("open", "high", "low", "close", "bb_upper", "bb_lower")
+CANDLE_NOTE = "t=0 is latest; price columns after the first row are changes from the previous row"
+
+
+def estimate_tokens(text: str) -> int:
+    """프롬프트 토큰 수 추정 (tiktoken이 있으면 정확한 값)"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    count = 0
+    for token in _TOKEN_PATTERN.findall(text):
+        count += math.ceil(len(token) / 6) if token.isalpha() and token.isascii() else 1
+    return count
+
+
+def _format(value: Any, precision: int) -> str:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return ""
+    if math.isnan(value) or math.isinf(value):
+        return ""
+    return f"{value:.{precision}f}"
+
+
+def encode_series(rows: Sequence[Dict[str, Any]], columns: Optional[Dict[str, int]] = None,
+                  delta: bool = False) -> str:
+    """
+    행 목록을 CSV로 인코딩. 첫 컬럼 t는 마지막 행 기준 상대 위치 (-2, -1, 0).
+
+    Args:
+        columns: 컬럼 -> 소수 자릿수. 행에 없는 컬럼은 제외
+        delta: True면 가격 컬럼을 첫 행만 절대값, 이후는 직전 행 대비 차이로 인코딩
+    """
+    if not rows:
+        return ""
+    columns = columns or SERIES_COLUMNS
+    names = [name for name in columns if name in rows[0]]
+    lines = [",".join(["t", *names])]
+    previous: Dict[str, float] = {}
+    for offset, row in enumerate(rows, start=1 - len(rows)):
+        values = []
+        for name in names:
+            value = row.get(name)
+            if delta and name in PRICE_COLUMNS and previous.get(name) is not None and value is not None:
+                text = _format(float(value) - previous[name], columns[name])
+                values.append(text if text.startswith("-") or not text else "+" + text)
+            else:
+                values.append(_format(value, columns[name]))
+            try:
+                previous[name] = float(value)
+            except (TypeError, ValueError):
+                previous[name] = None
+        lines.append(",".join([str(offset), *values]))
+    return "\n".join(lines)
+
+
+def encode_orderbook(orderbook: Any, levels: int = 5) -> str:
+    """호가 상위 levels단계를 'ask_price:ask_size bid_price:bid_size' 형식으로 인코딩"""
+    units = orderbook.get("orderbook_units", []) if isinstance(orderbook, dict) else (orderbook or [])
+    if not units:
+        return ""
+    lines = ["ask_price,ask_size,bid_price,bid_size"]
+    for unit in units[:levels]:
+        lines.append(",".join([
+            _format(unit.get("ask_price"), 0), _format(unit.get("ask_size"), 4),
+            _format(unit.get("bid_price"), 0), _format(unit.get("bid_size"), 4),
+        ]))
+    bid_total = sum(unit.get("bid_size", 0) for unit in units[:levels])
+    ask_total = sum(unit.get("ask_size", 0) for unit in units[:levels])
+    lines.append(f"top{levels} bid_total={bid_total:.4f} ask_total={ask_total:.4f}")
+    return "\n".join(lines)
+
+
+def encode_mapping(values: Dict[str, Any], precision: int = 2) -> str:
+    """{"rsi": 45.123, ...} -> 'rsi=45.12 ...' (중첩 dict는 'daily.rsi=' 형식)"""
+    parts = []
+    for key, value in values.items():
+        if isinstance(value, dict):
+            parts.extend(f"{key}.{item}" for item in encode_mapping(value, precision).split(" ") if item)
+        elif isinstance(value, (int, float)):
+            parts.append(f"{key}={_format(value, precision)}")
+        elif value is not None:
+            parts.append(f"{key}={value}")
+    return " ".join(parts)
+
+
+@dataclass
+class PromptSection:
+    """
+    Args:
+        priority: 작을수록 중요 (예산 초과 시 큰 값부터 줄임)
+        rows/columns: 시계열 섹션이면 원본 행 (오래된 행부터 잘라냄)
+        min_rows: 시계열을 이보다 적게는 자르지 않음
+        required: False면 예산 초과 시 통째로 뺄 수 있음
+    """
+    title: str
+    text: str = ""
+    priority: int = 0
+    rows: Optional[List[Dict[str, Any]]] = None
+    columns: Optional[Dict[str, int]] = None
+    delta: bool = False
+    min_rows: int = 3
+    required: bool = True
+    lines: Optional[List[str]] = None  # 줄 단위로 줄일 수 있는 섹션 (뉴스 등)
+    min_lines: int = 1
+
+    def __post_init__(self):
+        items = self.rows if self.rows is not None else self.lines
+        self.original_count = len(items) if items is not None else 0
+
+    def render(self) -> str:
+        if self.rows is not None:
+            body = encode_series(self.rows, self.columns, self.delta)
+        elif self.lines is not None:
+            body = "\n".join(self.lines)
+        else:
+            body = self.text
+        return f"{self.title}:\n{body}" if self.title else body
+
+
+@dataclass
+class BuiltPrompt:
+    text: str
+    tokens: int
+    original_tokens: int
+    trimmed: List[str] = field(default_factory=list)
+
+
+class PromptBuilder:
+    def __init__(self, token_budget: int = 2000):
+        self.token_budget = token_budget
+
+    def build(self, sections: List[PromptSection], budget: Optional[int] = None) -> BuiltPrompt:
+        """섹션을 합쳐 프롬프트 생성. 예산을 넘으면 우선순위가 낮은 섹션부터 줄이거나 뺌 (priority 0은 그대로)"""
+        budget = budget or self.token_budget
+        sections = [section for section in sections if section.render().strip()]
+        rendered = {id(section): section.render() for section in sections}
+        tokens = {id(section): estimate_tokens(text) for section, text in
+                  ((section, rendered[id(section)]) for section in sections)}
+        original = total = sum(tokens.values())
+        trimmed: List[str] = []
+
+        def shrink(section: PromptSection) -> bool:
+            """시계열은 오래된 행(앞), 줄 목록은 뒤에서 한 개 제거"""
+            nonlocal total
+            if section.rows is not None and len(section.rows) > section.min_rows:
+                section.rows = section.rows[1:]
+            elif section.lines is not None and len(section.lines) > section.min_lines:
+                section.lines = section.lines[:-1]
+            else:
+                return False
+            key = id(section)
+            rendered[key] = section.render()
+            new_tokens = estimate_tokens(rendered[key])
+            total += new_tokens - tokens[key]
+            tokens[key] = new_tokens
+            return True
+
+        # 우선순위가 낮은 그룹부터, 같은 우선순위끼리는 번갈아 한 개씩 줄이고 그래도 넘으면 선택 섹션을 뺌
+        for priority in sorted({section.priority for section in sections if section.priority > 0}, reverse=True):
+            group = [section for section in sections if section.priority == priority]
+            shrinking = list(group)
+            while total > budget and shrinking:
+                for section in list(shrinking):
+                    if total <= budget:
+                        break
+                    if not shrink(section):
+                        shrinking.remove(section)
+            for section in group:
+                if section.rows is not None or section.lines is not None:
+                    count = len(section.rows if section.rows is not None else section.lines)
+                    if count < section.original_count:
+                        trimmed.append(f"{section.title}({count})")
+            for section in group:
+                if total > budget and not section.required:
+                    total -= tokens.pop(id(section))
+                    rendered.pop(id(section))
+                    trimmed.append(f"-{section.title}")
+            if total <= budget:
+                break
+
+        text = "\n\n".join(rendered[id(section)] for section in sections if id(section) in rendered)
+        if total > budget:
+            logger.warning(f"Prompt still over budget after trimming: ~{total} > {budget} tokens")
+        return BuiltPrompt(text=text, tokens=total, original_tokens=original, trimmed=trimmed)
+
+
+def market_sections(market_data: Dict[str, Any], additional_data: Optional[Dict[str, Any]] = None,
+                    daily_rows: int = 30, hourly_rows: int = 24) -> List[PromptSection]:
+    """
+    get_trading_data/get_market_data 결과와 추가 데이터를 중복 없이 섹션으로 변환.
+    (additional_data의 trading_data/technical_indicators는 market_data와 같은 값이므로 한 번만 넣음)
+    """
+    additional_data = additional_data or {}
+    trading_data = additional_data.get("trading_data") or {}
+    daily = market_data.get("daily_data") or trading_data.get("daily") or []
+    hourly = market_data.get("hourly_data") or trading_data.get("hourly") or []
+    technical = market_data.get("technical_summary") or additional_data.get("technical_indicators") or {}
+    status = dict(market_data.get("investment_status") or {})
+    if "current_price" not in status and market_data.get("current_price") is not None:
+        status["current_price"] = market_data["current_price"]
+
+    sections = [
+        PromptSection("Investment Status", encode_mapping(status, 2), priority=0),
+        PromptSection("Technical Summary", encode_mapping(technical, 2), priority=0),
+        PromptSection("Orderbook", encode_orderbook(market_data.get("orderbook")), priority=3, required=False),
+        PromptSection(f"Hourly Candles ({CANDLE_NOTE})", rows=list(hourly)[-hourly_rows:], delta=True,
+                      priority=2, min_rows=6),
+        PromptSection(f"Daily Candles ({CANDLE_NOTE})", rows=list(daily)[-daily_rows:], delta=True,
+                      priority=2, min_rows=7),
+    ]
+
+    fear_greed = additional_data.get("fear_greed_index")
+    if fear_greed:
+        sections.append(PromptSection("Fear and Greed Index", str(fear_greed), priority=5, required=False))
+
+    news = additional_data.get("news") or []
+    if news:
+        sections.append(PromptSection(
+            "News",
+            lines=[f"- [{item.get('date', '')}] {item.get('title', '')}" for item in news],
+            priority=4, required=False
+        ))
+    return sections
+
+
+def token_summary(prompt: BuiltPrompt) -> str:
+    trimmed = f", trimmed {', '.join(prompt.trimmed)}" if prompt.trimmed else ""
+    return f"~{prompt.tokens} tokens (from ~{prompt.original_tokens}{trimmed})"
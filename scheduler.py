@@ -1,19 +1,37 @@
-import schedule
-import time
+from typing import Optional
 from user_manager import UserManager
 from data_collector import DataCollector
 from trade_executor import TradeExecutor
 from ai_decision_maker import AIDecisionMaker
+from trading_engine import TradingEngine
+from async_runtime import AsyncRuntime
+from paper_exchange import PaperExchange
+from config import Config
 from utils.logger import setup_logger
 
 logger = setup_logger("Scheduler", "scheduler.log")
 
 class Scheduler:
-    def __init__(self, user_manager: UserManager, data_collector: DataCollector, trade_executor: TradeExecutor, ai_decision_maker: AIDecisionMaker):
+    def __init__(self, user_manager: UserManager, data_collector: DataCollector,
+                 trade_executor: Optional[TradeExecutor], ai_decision_maker: AIDecisionMaker):
         self.user_manager = user_manager
         self.data_collector = data_collector
-        self.trade_executor = trade_executor
         self.ai_decision_maker = ai_decision_maker
+        # trade_executor가 있으면 API 키가 없는 사용자는 공용 계좌를 사용 (None이면 사용 안 함)
+        self.trade_executor = trade_executor
+        # PAPER_TRADING이면 사용자마다 가상 계좌를 만들어 하나의 호가를 함께 소진하며 체결
+        self.paper_exchange = PaperExchange(fee=Config.TRANSACTION_FEE) if Config.PAPER_TRADING else None
+        self.engine = TradingEngine(user_manager, data_collector, ai_decision_maker,
+                                    executor_factory=self._create_executor)
+
+    def _create_executor(self, user) -> TradeExecutor:
+        if self.paper_exchange is not None:
+            account = self.paper_exchange.account(user.user_id, krw=Config.PAPER_KRW_BALANCE)
+            return TradeExecutor(user.api_key, user.secret_key, upbit=account, market=self.data_collector.market)
+        if (not user.api_key or not user.secret_key) and self.trade_executor is not None:
+            logger.warning(f"User {user.user_id} has no API keys, using the default executor.")
+            return self.trade_executor
+        return TradeExecutor(user.api_key, user.secret_key, market=self.data_collector.market)
 
     def run_trading_cycle(self, user_id: str):
         user = self.user_manager.get_user(user_id)
@@ -22,47 +40,23 @@ class Scheduler:
             return
 
         logger.info(f"Running trading cycle for user {user_id}.")
+        self.engine.run_users([user])
 
-        try:
-            # Step 1: Data Collection
-            market_data = self.data_collector.get_trading_data()
-            news = self.data_collector.fetch_google_news()
-            fear_greed_index = self.data_collector.collect_fear_greed_index()
-            chart_image = self.data_collector.capture_chart()
-            technical_indicators = market_data.get("technical_summary", {})
-            trading_data = {
-                "daily": market_data.get("daily_data", []),
-                "hourly": market_data.get("hourly_data", []),
-            }
-
-            # Step 2: AI Decision
-            decision = self.ai_decision_maker.get_decision(
-                user_preferences=user.gpt_preferences,
-                market_data=market_data,
-                additional_data={
-                    "news": news,
-                    "fear_greed_index": fear_greed_index,
-                    "chart_image": chart_image,
-                    "technical_indicators": technical_indicators,
-                    "trading_data": trading_data,
-                }
-            )
-
-            # Step 3: Execute Trade
-            if decision["decision"] in ["buy", "sell"]:
-                self.trade_executor.execute_trade(decision)
-                logger.info(f"Executed trade: {decision}.")
-            else:
-                logger.info("No trade executed (decision: hold).")
+    def schedule_trading(self, runtime: AsyncRuntime):
+        # 사용자별 작업 대신 엔진 틱 하나만 등록 (실행 시점이 된 사용자를 모아 시장 데이터를 한 번만 수집)
+        # 이전 틱이 아직 실행 중이면 이번 틱은 건너뜀
+        runtime.every(Config.ENGINE_TICK_SECONDS, lambda: self.engine.tick_async(runtime),
+                      name="engine_tick", key="engine_tick", first_delay=0)
+        runtime.on_shutdown(self.ai_decision_maker.backend.aclose)
 
-        except Exception as e:
-            logger.error(f"Error in trading cycle: {e}")
+    def start(self, runtime: Optional[AsyncRuntime] = None):
+        """runtime을 종료(SIGINT/SIGTERM 또는 stop())할 때까지 실행"""
+        runtime = runtime or AsyncRuntime(tick=Config.TIMER_WHEEL_TICK, io_workers=Config.RUNTIME_IO_WORKERS)
 
-    def schedule_trading(self):
-        for user_id, user in self.user_manager.users.items():
-            schedule.every(user.trading_interval).hours.do(self.run_trading_cycle, user_id)
+        async def register(runtime: AsyncRuntime):
+            self.schedule_trading(runtime)
 
-    def start(self):
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
+        try:
+            runtime.start(register)
+        finally:
+            self.engine.shutdown()
@@ -0,0 +1,204 @@
+"""
+OpenAI chat completions API를 대신하는 로컬 서버.
+POST /v1/chat/completions 요청의 response_format(json_schema)에 맞는 JSON을 돌려주므로
+OpenAI 클라이언트의 base_url만 바꾸면 네트워크 없이 전체 사이클을 실행/벤치마크할 수 있음.
+
+- trading_decision 스키마: 프롬프트의 "Hourly RSI: 25.3"(또는 "hourly.rsi=25.3") 값을 읽어 결정적으로 buy/sell/hold 결정
+- 그 외 스키마: 스키마 기본값(enum 첫 값, 빈 문자열 대신 "stub", 숫자 0)으로 채움
+- latency/jitter로 원격 API 지연을 흉내냄
+
+    python -m simulators.chat_completions_server --port 8800 --latency 1.5
+    OPENAI_BASE_URL=http://127.0.0.1:8800/v1 python autocointrade.py
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+# "Hourly RSI: 25.3" (TradingBot) 또는 "hourly.rsi=25.30" (AIDecisionMaker의 압축 프롬프트)
+RSI_PATTERN = re.compile(r"(Daily|Hourly)[ .]RSI[:=]\s*(-?[\d.]+)", re.IGNORECASE)
+
+
+def sample_from_schema(schema: Dict[str, Any]) -> Any:
+    """JSON 스키마를 만족하는 기본 값"""
+    if "enum" in schema:
+        return schema["enum"][0]
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), "null")
+    if schema_type == "object":
+        return {name: sample_from_schema(prop) for name, prop in schema.get("properties", {}).items()}
+    if schema_type == "array":
+        return [sample_from_schema(schema.get("items", {}))]
+    if schema_type == "string":
+        return "stub"
+    if schema_type == "integer":
+        return 0
+    if schema_type == "number":
+        return 0.0
+    if schema_type == "boolean":
+        return False
+    return None
+
+
+def message_text(messages: List[Dict[str, Any]]) -> str:
+    """문자열/멀티파트(content 목록) 메시지에서 텍스트만 모음"""
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(part.get("text", "") for part in content if part.get("type") == "text")
+    return "\n".join(parts)
+
+
+def trading_decision(text: str, oversold: float = 30.0, overbought: float = 70.0) -> Dict[str, Any]:
+    rsi = {label.lower(): float(value) for label, value in RSI_PATTERN.findall(text)}
+    hourly = rsi.get("hourly")
+    if hourly is not None and hourly < oversold:
+        decision, percentage = "buy", 30
+    elif hourly is not None and hourly > overbought:
+        decision, percentage = "sell", 30
+    else:
+        decision, percentage = "hold", 0
+    return {
+        "decision": decision,
+        "percentage": percentage,
+        "reason": f"Local stand-in: hourly RSI {hourly if hourly is not None else 'n/a'}",
+        "risk_level": "medium",
+        "confidence": 50
+    }
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict[str, Any]):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        server: "ChatCompletionsServer" = self.server.chat  # type: ignore[attr-defined]
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+        if "model" not in request or not request.get("messages"):
+            self._send_json(400, {"error": {"message": "model and messages are required",
+                                            "type": "invalid_request_error"}})
+            return
+
+        server.record(request)
+        delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        text = message_text(request["messages"])
+        json_schema = (request.get("response_format") or {}).get("json_schema") or {}
+        if json_schema.get("name") == "trading_decision":
+            content = trading_decision(text)
+        elif json_schema:
+            content = sample_from_schema(json_schema.get("schema", {}))
+        else:
+            content = "stub"
+
+        content_text = content if isinstance(content, str) else json.dumps(content)
+        prompt_tokens = len(text) // 4
+        completion_tokens = len(content_text) // 4
+        self._send_json(200, {
+            "id": f"chatcmpl-local-{server.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content_text},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+
+class _ThreadingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # 동시 연결이 많은 부하 테스트에서 backlog가 차면 클라이언트가 SYN 재전송(1초)을 기다림
+    request_queue_size = 256
+
+
+class ChatCompletionsServer:
+    """
+    Args:
+        latency: 응답마다 기다리는 시간 (초)
+        jitter: 추가로 0~jitter초 랜덤 지연
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self.last_request: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._server = _ThreadingServer((host, port), _ChatHandler)
+        self._server.chat = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, request: Dict[str, Any]):
+        with self._lock:
+            self.requests += 1
+            self.last_request = request
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "ChatCompletionsServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = ChatCompletionsServer(args.host, args.port, args.latency, args.jitter).start()
+    print(f"Serving chat completions on {server.base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+공포탐욕지수(api.alternative.me/fng/)와 Google News RSS를 대신하는 로컬 HTTP 서버.
+ETag/Last-Modified를 붙여 응답하고 조건부 요청에는 304를 돌려주므로,
+CachedHttpClient의 캐시/재검증 동작을 네트워크 없이 확인할 수 있음.
+
+    python -m simulators.http_fixture_server --port 8801 --latency 0.5
+    FEAR_GREED_URL=http://127.0.0.1:8801/fng/ NEWS_RSS_URL=http://127.0.0.1:8801/rss python autocointrade.py
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+
+def render_fear_greed(value: int, classification: str) -> bytes:
+    return json.dumps({
+        "name": "Fear and Greed Index",
+        "data": [{"value": str(value), "value_classification": classification,
+                  "timestamp": str(int(time.time()))}],
+        "metadata": {"error": None}
+    }).encode()
+
+
+def render_rss(titles: List[str]) -> bytes:
+    published = formatdate(usegmt=True)
+    items = "".join(
+        f"<item><title>{escape(title)}</title><pubDate>{published}</pubDate></item>" for title in titles
+    )
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>btc - Google News</title>{items}</channel></rss>").encode()
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server: "HttpFixtureServer" = self.server.fixture  # type: ignore[attr-defined]
+        path = self.path.split("?", 1)[0].rstrip("/")
+        resource = server.resource(path)
+        server.record(path)
+
+        if server.latency > 0:
+            time.sleep(server.latency)
+
+        if resource is None or server.fail:
+            status = 404 if resource is None else 503
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body, content_type, etag, last_modified = resource
+        if self.headers.get("If-None-Match") == etag or (
+                "If-None-Match" not in self.headers and self.headers.get("If-Modified-Since") == last_modified):
+            server.record_not_modified()
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _ThreadingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class HttpFixtureServer:
+    """
+    /fng 와 /rss 를 제공. set_fear_greed/set_news로 내용을 바꾸면 ETag가 바뀜.
+
+    Args:
+        latency: 응답마다 기다리는 시간 (초)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        self.latency = latency
+        self.fail = False  # True면 503 응답 (원격 장애 흉내)
+        self.requests: Dict[str, int] = {}
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._resources: Dict[str, Tuple[bytes, str, str, str]] = {}
+        self.set_fear_greed(45, "Fear")
+        self.set_news([f"Bitcoin headline {i}" for i in range(1, 6)])
+
+        self._server = _ThreadingServer((host, port), _FixtureHandler)
+        self._server.fixture = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    def _set(self, path: str, body: bytes, content_type: str):
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        with self._lock:
+            self._resources[path] = (body, content_type, etag, formatdate(usegmt=True))
+
+    def set_fear_greed(self, value: int, classification: str):
+        self._set("/fng", render_fear_greed(value, classification), "application/json")
+
+    def set_news(self, titles: List[str]):
+        self._set("/rss", render_rss(titles), "application/rss+xml")
+
+    def resource(self, path: str) -> Optional[Tuple[bytes, str, str, str]]:
+        with self._lock:
+            return self._resources.get(path)
+
+    def record(self, path: str):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def fear_greed_url(self) -> str:
+        return f"{self.base_url}/fng/"
+
+    @property
+    def news_url(self) -> str:
+        return f"{self.base_url}/rss"
+
+    def start(self) -> "HttpFixtureServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8801)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    args = parser.parse_args()
+
+    server = HttpFixtureServer(args.host, args.port, args.latency).start()
+    print(f"Serving {server.fear_greed_url} and {server.news_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+업비트 주문 API를 대신하는 프로세스 내 모의 거래소 (단일 마켓).
+
+pyupbit.Upbit과 같은 이름/인자/응답 형식(buy_limit_order, sell_limit_order, buy_market_order,
+sell_market_order, get_order, cancel_order, get_balance)을 제공하고, 호가는 pyupbit.get_orderbook 형식으로 돌려줌.
+
+- 호가를 가로지르는 주문은 즉시 호가 잔량을 소진하며 체결 (소진된 잔량은 tick마다 resilience 비율로 회복)
+- 남은 지정가 주문은 호가에 걸려 있다가 tick()마다 가격이 움직이거나 반대편 시장가 흐름(flow)이 들어오면 체결
+- start()로 백그라운드에서 interval마다 tick()을 돌리거나, 테스트에서는 직접 tick()을 호출
+
+    exchange = MockExchange(seed=7).start(0.05)
+    slicer = OrderSlicer(exchange, exchange.get_orderbook, slices=5, interval=1)
+"""
+import random
+import threading
+import time
+import uuid as uuid_lib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+
+def krw_tick(price: float) -> float:
+    """업비트 KRW 마켓 호가 단위"""
+    for floor, tick in ((2_000_000, 1000), (1_000_000, 500), (500_000, 100), (100_000, 50), (10_000, 10),
+                        (1_000, 1), (100, 0.1), (10, 0.01), (1, 0.001)):
+        if price >= floor:
+            return tick
+    return 0.0001
+
+
+def _now() -> str:
+    return datetime.now().astimezone().isoformat(timespec="seconds")
+
+
+class MockExchange:
+    """
+    Args:
+        price: 시작 중간가
+        levels: 호가 단계 수
+        level_size: 단계별 기본 잔량 (BTC)
+        volatility_bps: tick마다 중간가가 움직이는 표준편차 (bps)
+        resilience: tick마다 소진된 잔량이 기본 잔량으로 돌아가는 비율
+        flow: tick마다 양쪽에 들어오는 시장가 흐름 평균 (BTC), 걸려 있는 최우선 주문부터 체결
+        krw, btc: 시작 잔고
+        latency: API 호출마다 기다리는 시간 (초)
+    """
+
+    def __init__(self, market: str = "KRW-BTC", price: float = 95_000_000, levels: int = 15,
+                 level_size: float = 0.2, volatility_bps: float = 0.5, resilience: float = 0.3,
+                 flow: float = 0.02, krw: float = 1e9, btc: float = 10.0, fee: float = 0.0005,
+                 latency: float = 0.0, seed: Optional[int] = None):
+        self.market = market
+        self.levels = levels
+        self.level_size = level_size
+        self.volatility_bps = volatility_bps
+        self.resilience = resilience
+        self.flow = flow
+        self.fee = fee
+        self.latency = latency
+        self.random = random.Random(seed)
+        self.balances: Dict[str, float] = {"KRW": krw, "BTC": btc}
+        self.locked: Dict[str, float] = {"KRW": 0.0, "BTC": 0.0}
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.tick_count = 0
+
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.mid = price
+        self.asks: List[List[float]] = []  # [가격, 잔량], 낮은 가격부터
+        self.bids: List[List[float]] = []  # 높은 가격부터
+        self._rebuild()
+
+    # ---------------------------------------------------------------- 호가
+    def _rebuild(self):
+        """중간가 주변으로 호가를 다시 그림. 같은 가격의 잔량은 유지하고 기본 잔량 쪽으로 회복시킴"""
+        tick = krw_tick(self.mid)
+        best_ask = (int(self.mid // tick) + 1) * tick
+        best_bid = best_ask - tick
+
+        def side(start: float, step: float, previous: List[List[float]]) -> List[List[float]]:
+            sizes = {price: size for price, size in previous}
+            book = []
+            for i in range(self.levels):
+                price = start + step * i
+                size = sizes.get(price, self.level_size)
+                size += (self.level_size - size) * self.resilience
+                book.append([price, size])
+            return book
+
+        self.asks = side(best_ask, tick, self.asks)
+        self.bids = side(best_bid, -tick, self.bids)
+
+    def get_orderbook(self, ticker: str = "KRW-BTC") -> Dict[str, Any]:
+        with self._lock:
+            units = [{"ask_price": ask[0], "bid_price": bid[0], "ask_size": ask[1], "bid_size": bid[1]}
+                     for ask, bid in zip(self.asks, self.bids)]
+            return {
+                "market": self.market,
+                "timestamp": int(time.time() * 1000),
+                "total_ask_size": sum(size for _, size in self.asks),
+                "total_bid_size": sum(size for _, size in self.bids),
+                "orderbook_units": units,
+            }
+
+    def get_current_price(self, ticker: str = "KRW-BTC") -> float:
+        with self._lock:
+            return self.bids[0][0] if self.bids else self.mid
+
+    # ---------------------------------------------------------------- 시뮬레이션
+    def tick(self):
+        """가격을 한 번 움직이고, 걸려 있는 주문을 체결"""
+        with self._lock:
+            self.tick_count += 1
+            top_ask = next((price for price, size in self.asks if size > 0), self.asks[0][0])
+            top_bid = next((price for price, size in self.bids if size > 0), self.bids[0][0])
+            self.mid = (top_ask + top_bid) / 2 * (1 + self.random.gauss(0, self.volatility_bps / 1e4))
+            self._rebuild()
+
+            for order in self._open_orders():
+                # 가격이 움직여 호가를 가로지르게 된 주문
+                self._match(order)
+            for side in ("bid", "ask"):
+                self._absorb_flow(side, self.random.expovariate(1 / self.flow) if self.flow > 0 else 0.0)
+
+    def _absorb_flow(self, side: str, volume: float):
+        """반대편 시장가 흐름이 최우선 호가 이상에 걸린 주문부터 체결"""
+        if side == "bid":
+            touch = self.bids[0][0]
+            resting = sorted((o for o in self._open_orders() if o["side"] == "bid" and o["_price"] >= touch),
+                             key=lambda o: -o["_price"])
+        else:
+            touch = self.asks[0][0]
+            resting = sorted((o for o in self._open_orders() if o["side"] == "ask" and o["_price"] <= touch),
+                             key=lambda o: o["_price"])
+        for order in resting:
+            if volume <= 0:
+                break
+            filled = min(volume, order["_remaining"])
+            self._fill(order, order["_price"], filled)
+            volume -= filled
+
+    def start(self, interval: float = 0.1) -> "MockExchange":
+        def loop():
+            while not self._stop.wait(interval):
+                self.tick()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, daemon=True, name="MockExchange")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    # ---------------------------------------------------------------- 주문
+    def _wait(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _open_orders(self) -> List[Dict[str, Any]]:
+        return [order for order in self.orders.values() if order["state"] == "wait"]
+
+    def _new_order(self, side: str, ord_type: str, price: Optional[float], volume: Optional[float]) -> Dict[str, Any]:
+        order = {
+            "uuid": str(uuid_lib.uuid4()),
+            "side": side,
+            "ord_type": ord_type,
+            "price": None if price is None else str(price),
+            "state": "wait",
+            "market": self.market,
+            "created_at": _now(),
+            "volume": None if volume is None else str(volume),
+            "trades": [],
+            # 내부 상태
+            "_price": price,
+            "_remaining": volume or 0.0,
+            "_executed": 0.0,
+            "_paid_fee": 0.0,
+        }
+        self.orders[order["uuid"]] = order
+        return order
+
+    def _fill(self, order: Dict[str, Any], price: float, volume: float):
+        funds = price * volume
+        fee = funds * self.fee
+        if order["side"] == "bid":
+            self.balances["BTC"] += volume
+            self.balances["KRW"] -= funds + fee
+            if order["ord_type"] == "limit":
+                self.locked["KRW"] -= funds * (1 + self.fee)
+        else:
+            self.balances["BTC"] -= volume
+            self.balances["KRW"] += funds - fee
+            self.locked["BTC"] -= volume
+        order["_remaining"] -= volume
+        order["_executed"] += volume
+        order["_paid_fee"] += fee
+        order["trades"].append({"market": self.market, "uuid": str(uuid_lib.uuid4()), "price": str(price),
+                                "volume": str(volume), "funds": str(funds), "side": order["side"],
+                                "created_at": _now()})
+        if order["ord_type"] == "limit" and order["_remaining"] <= 1e-12:
+            order["_remaining"] = 0.0
+            order["state"] = "done"
+
+    def _match(self, order: Dict[str, Any]):
+        """지정가 주문을 반대편 호가와 가능한 만큼 체결 (호가 잔량 소진)"""
+        book = self.asks if order["side"] == "bid" else self.bids
+        for level in book:
+            if order["_remaining"] <= 0:
+                break
+            price, size = level
+            crosses = price <= order["_price"] if order["side"] == "bid" else price >= order["_price"]
+            if not crosses:
+                break
+            filled = min(size, order["_remaining"])
+            if filled > 0:
+                # 걸려 있던 주문이 가격 개선으로 체결되면 주문 가격이 아닌 호가 가격으로 체결
+                if order["side"] == "bid":
+                    self.locked["KRW"] -= (order["_price"] - price) * filled * (1 + self.fee)
+                self._fill(order, price, filled)
+                level[1] -= filled
+
+    def _reject(self, name: str, message: str) -> Dict[str, Any]:
+        return {"error": {"name": name, "message": message}}
+
+    def _free(self, currency: str) -> float:
+        return self.balances[currency] - self.locked[currency]
+
+    def buy_limit_order(self, ticker: str, price: float, volume: float) -> Dict[str, Any]:
+        self._wait()
+        with self._lock:
+            cost = price * volume * (1 + self.fee)
+            if cost > self._free("KRW") + 1e-6:
+                return self._reject("insufficient_funds_bid", "주문가능한 금액(KRW)이 부족합니다.")
+            order = self._new_order("bid", "limit", price, volume)
+            self.locked["KRW"] += cost
+            self._match(order)
+            return self._public(order)
+
+    def sell_limit_order(self, ticker: str, price: float, volume: float) -> Dict[str, Any]:
+        self._wait()
+        with self._lock:
+            if volume > self._free("BTC") + 1e-12:
+                return self._reject("insufficient_funds_ask", "주문가능한 금액(BTC)이 부족합니다.")
+            order = self._new_order("ask", "limit", price, volume)
+            self.locked["BTC"] += volume
+            self._match(order)
+            return self._public(order)
+
+    def buy_market_order(self, ticker: str, price: float) -> Dict[str, Any]:
+        """price(KRW)만큼 시장가 매수 (수수료 별도)"""
+        self._wait()
+        with self._lock:
+            if price * (1 + self.fee) > self._free("KRW") + 1e-6:
+                return self._reject("insufficient_funds_bid", "주문가능한 금액(KRW)이 부족합니다.")
+            order = self._new_order("bid", "price", price, None)
+            budget = price
+            for level in self.asks:
+                if budget <= 1e-9:
+                    break
+                filled = min(level[1], budget / level[0])
+                if filled > 0:
+                    self._fill(order, level[0], filled)
+                    level[1] -= filled
+                    budget -= level[0] * filled
+            order["state"] = "cancel" if budget > 1e-9 else "done"  # 업비트도 시장가 잔여분은 cancel
+            return self._public(order)
+
+    def sell_market_order(self, ticker: str, volume: float) -> Dict[str, Any]:
+        self._wait()
+        with self._lock:
+            if volume > self._free("BTC") + 1e-12:
+                return self._reject("insufficient_funds_ask", "주문가능한 금액(BTC)이 부족합니다.")
+            order = self._new_order("ask", "market", None, volume)
+            self.locked["BTC"] += volume
+            for level in self.bids:
+                if order["_remaining"] <= 1e-12:
+                    break
+                filled = min(level[1], order["_remaining"])
+                if filled > 0:
+                    self._fill(order, level[0], filled)
+                    level[1] -= filled
+            self.locked["BTC"] -= order["_remaining"]
+            order["state"] = "cancel" if order["_remaining"] > 1e-12 else "done"
+            return self._public(order)
+
+    def cancel_order(self, uuid: str) -> Dict[str, Any]:
+        self._wait()
+        with self._lock:
+            order = self.orders.get(uuid)
+            if order is None:
+                return self._reject("order_not_found", "주문을 찾지 못했습니다.")
+            if order["state"] != "wait":
+                return self._reject("order_not_found", "주문을 찾지 못했습니다.")
+            if order["side"] == "bid":
+                self.locked["KRW"] -= order["_price"] * order["_remaining"] * (1 + self.fee)
+            else:
+                self.locked["BTC"] -= order["_remaining"]
+            order["state"] = "cancel"
+            return self._public(order)
+
+    def get_order(self, ticker_or_uuid: str, state: str = "wait", **kwargs) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """pyupbit처럼 uuid면 개별 주문(체결 내역 포함), 마켓이면 해당 상태 주문 목록"""
+        self._wait()
+        with self._lock:
+            if ticker_or_uuid in self.orders:
+                return self._public(self.orders[ticker_or_uuid])
+            return [self._public(order, trades=False) for order in self.orders.values() if order["state"] == state]
+
+    def get_individual_order(self, uuid: str) -> Dict[str, Any]:
+        return self.get_order(uuid)
+
+    def _public(self, order: Dict[str, Any], trades: bool = True) -> Dict[str, Any]:
+        public = {key: value for key, value in order.items() if not key.startswith("_") and key != "trades"}
+        public.update({
+            "remaining_volume": str(order["_remaining"]) if order["volume"] is not None else None,
+            "executed_volume": str(order["_executed"]),
+            "paid_fee": str(order["_paid_fee"]),
+            "trades_count": len(order["trades"]),
+        })
+        if trades:
+            public["trades"] = [dict(trade) for trade in order["trades"]]
+        return public
+
+    # ---------------------------------------------------------------- 잔고
+    def get_balance(self, ticker: str = "KRW") -> float:
+        """주문 가능 잔고 (pyupbit와 같이 묶인 금액 제외)"""
+        currency = ticker.split("-")[-1]
+        with self._lock:
+            return self._free(currency) if currency in self.balances else 0.0
+
+    def get_balances(self) -> List[Dict[str, str]]:
+        with self._lock:
+            return [{"currency": currency, "balance": str(self._free(currency)),
+                     "locked": str(self.locked[currency]), "avg_buy_price": "0", "unit_currency": "KRW"}
+                    for currency in self.balances]
+
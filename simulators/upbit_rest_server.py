@@ -0,0 +1,308 @@
+"""
+업비트 REST API(api.upbit.com/v1)를 대신하는 로컬 서버.
+
+- 시세: /v1/candles/days, /v1/candles/minutes/<unit>, /v1/candles/weeks, /v1/orderbook, /v1/ticker
+- 주문/계좌: /v1/accounts, POST /v1/orders, GET/DELETE /v1/order (인증은 확인하지 않음)
+- 호가/주문/잔고는 MockExchange가 처리하고 (다른 마켓의 시세는 마켓별 MockExchange를 만들어 응답, 주문은 기본 마켓만), 캔들은 서버를 만든 시각 기준 상대 위치에서 결정적으로 만들어
+  언제 실행해도 같은 시세 (벤치마크의 AI 결정/주문 경로가 실행마다 같음)
+- 모든 응답에 Remaining-Req 헤더를 붙임 (pyupbit가 파싱함)
+- latency로 원격 API 지연을 흉내냄
+
+pyupbit는 주소가 코드에 박혀 있으므로 redirect_upbit()로 requests/httpx 호출의 https://api.upbit.com 을 이 서버로 바꿔서 사용함.
+
+    server = UpbitRestServer(latency=0.05).start()
+    with redirect_upbit(server.base_url):
+        pyupbit.get_ohlcv("KRW-BTC", interval="minute60", count=200)
+"""
+import argparse
+import contextlib
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import requests
+
+from simulators.mock_exchange import MockExchange, krw_tick
+
+UPBIT_API_URL = "https://api.upbit.com"
+KST = timedelta(hours=9)
+REMAINING_REQ = "group=default; min=1800; sec=29"
+
+# 캔들 경로 -> (길이 초, 캔들 시작 시각 오프셋 초). 일/주봉은 KST 자정(주봉은 월요일) 기준
+_DAY = 86400
+CANDLE_UNITS = {
+    "days": (_DAY, -9 * 3600),
+    "weeks": (7 * _DAY, 4 * _DAY - 9 * 3600),
+    **{f"minutes/{unit}": (unit * 60, 0) for unit in (1, 3, 5, 10, 15, 30, 60, 240)},
+}
+
+
+def _parse_to(value: Optional[str]) -> float:
+    """to 파라미터 (UTC, 'YYYY-MM-DD HH:MM:SS' 또는 ISO 형식) -> epoch 초. 없으면 현재 시각"""
+    if not value:
+        return time.time()
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00").replace(" ", "T"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class _UpbitHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _params(self) -> Dict[str, str]:
+        """쿼리 문자열 + 본문 (pyupbit는 GET에도 폼 본문, POST/DELETE는 JSON 본문을 보냄)"""
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode()
+            if body.lstrip().startswith("{"):
+                params.update({key: str(value) for key, value in json.loads(body).items()})
+            else:
+                params.update({key: values[-1] for key, values in parse_qs(body).items()})
+        return params
+
+    def _handle(self, method: str):
+        server: "UpbitRestServer" = self.server.upbit  # type: ignore[attr-defined]
+        path = urlsplit(self.path).path.rstrip("/")
+        params = self._params()
+        server.record(f"{method} {path}")
+
+        if server.latency > 0:
+            time.sleep(server.latency)
+
+        try:
+            status, payload = server.dispatch(method, path, params)
+        except (KeyError, ValueError) as e:
+            status, payload = 400, {"error": {"name": "invalid_parameter", "message": str(e)}}
+
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Remaining-Req", REMAINING_REQ)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+class _ThreadingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class UpbitRestServer:
+    """
+    Args:
+        exchange: 호가/주문/잔고를 처리할 MockExchange (없으면 price/seed로 생성)
+        latency: 응답마다 기다리는 시간 (초)
+        price: 캔들과 호가의 기준 가격
+        seed: 캔들 잡음 시드
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 exchange: Optional[MockExchange] = None, price: float = 95_000_000, seed: int = 0):
+        self.latency = latency
+        self.price = price
+        self.seed = seed
+        self.created = time.time()
+        self.exchange = exchange or MockExchange(price=price, krw=10_000_000, btc=0.1, seed=seed)
+        self.requests: Dict[str, int] = {}
+        self._quotes: Dict[str, MockExchange] = {self.exchange.market: self.exchange}
+        self._lock = threading.Lock()
+
+        self._server = _ThreadingServer((host, port), _UpbitHandler)
+        self._server.upbit = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, route: str):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    # ---------------------------------------------------------------- 라우팅
+    def dispatch(self, method: str, path: str, params: Dict[str, str]) -> Tuple[int, Any]:
+        if method == "GET" and path.startswith("/v1/candles/"):
+            unit = path[len("/v1/candles/"):]
+            if unit not in CANDLE_UNITS:
+                return 404, {"error": {"name": "not_found", "message": f"Unknown candle unit: {unit}"}}
+            return 200, self.candles(unit, params["market"], int(params.get("count", 1)), params.get("to"))
+        if method == "GET" and path == "/v1/orderbook":
+            return 200, [self.quotes(market).get_orderbook(market) for market in params["markets"].split(",")]
+        if method == "GET" and path == "/v1/ticker":
+            return 200, [self.ticker(market) for market in params["markets"].split(",")]
+        if method == "GET" and path == "/v1/accounts":
+            return 200, self.exchange.get_balances()
+        if method == "POST" and path == "/v1/orders":
+            return self._result(self.place_order(params))
+        if method == "GET" and path == "/v1/order":
+            return self._result(self.exchange.get_order(params["uuid"]))
+        if method == "GET" and path == "/v1/orders":
+            return 200, self.exchange.get_order(params["market"], state=params.get("state", "wait"))
+        if method == "DELETE" and path == "/v1/order":
+            return self._result(self.exchange.cancel_order(params["uuid"]))
+        return 404, {"error": {"name": "not_found", "message": f"{method} {path}"}}
+
+    @staticmethod
+    def _result(response: Any) -> Tuple[int, Any]:
+        if isinstance(response, dict) and "error" in response:
+            return 400, response
+        if isinstance(response, list):  # uuid가 아니라 마켓으로 해석된 경우
+            return 404, {"error": {"name": "order_not_found", "message": "주문을 찾지 못했습니다."}}
+        return 200, response
+
+    def place_order(self, params: Dict[str, str]) -> Dict[str, Any]:
+        market, side, ord_type = params["market"], params["side"], params["ord_type"]
+        if ord_type == "limit" and side == "bid":
+            return self.exchange.buy_limit_order(market, float(params["price"]), float(params["volume"]))
+        if ord_type == "limit" and side == "ask":
+            return self.exchange.sell_limit_order(market, float(params["price"]), float(params["volume"]))
+        if ord_type == "price" and side == "bid":
+            return self.exchange.buy_market_order(market, float(params["price"]))
+        if ord_type == "market" and side == "ask":
+            return self.exchange.sell_market_order(market, float(params["volume"]))
+        raise ValueError(f"Unsupported order: side={side}, ord_type={ord_type}")
+
+    # ---------------------------------------------------------------- 시세
+    def base_price(self, market: str) -> float:
+        """마켓별 기준 가격 (기본 마켓은 price, 나머지는 마켓 이름으로 정한 값)"""
+        if market == self.exchange.market:
+            return self.price
+        return self.price * random.Random(f"{self.seed}:{market}").uniform(0.0001, 0.05)
+
+    def quotes(self, market: str) -> MockExchange:
+        """마켓의 호가/현재가를 내는 MockExchange (처음 요청 시 생성)"""
+        with self._lock:
+            exchange = self._quotes.get(market)
+            if exchange is None:
+                exchange = self._quotes[market] = MockExchange(market=market, price=self.base_price(market),
+                                                               seed=self.seed)
+            return exchange
+
+    def ticker(self, market: str) -> Dict[str, Any]:
+        price = self.quotes(market).get_current_price(market)
+        return {"market": market, "trade_price": price, "opening_price": price, "high_price": price,
+                "low_price": price, "prev_closing_price": price, "change": "EVEN", "signed_change_rate": 0.0,
+                "acc_trade_volume_24h": 1000.0, "timestamp": int(time.time() * 1000)}
+
+    def _last_index(self, unit: str, at: float) -> int:
+        """at 이전에 시작한 마지막 캔들 번호"""
+        seconds, offset = CANDLE_UNITS[unit]
+        return math.ceil((at - offset) / seconds) - 1
+
+    def _close(self, unit: str, index: int, market: str) -> float:
+        """index번째 캔들 종가. 주기가 다른 사인파 합 + 작은 잡음이라 RSI/MACD가 고르게 움직임"""
+        index -= self._last_index(unit, self.created)
+        seed = self.seed if market == self.exchange.market else f"{self.seed}:{market}"
+        noise = random.Random(f"{seed}:{unit}:{index}").gauss(0, 0.002)
+        wave = 0.03 * math.sin(index * 0.21) + 0.015 * math.sin(index * 0.57 + 1.0)
+        price = self.base_price(market) * (1 + wave + noise)
+        tick = krw_tick(price)
+        return round(price / tick) * tick
+
+    def candles(self, unit: str, market: str, count: int, to: Optional[str] = None) -> List[Dict[str, Any]]:
+        """to 이전에 시작한 캔들 count개 (최신순, 업비트와 같음)"""
+        seconds, offset = CANDLE_UNITS[unit]
+        last = self._last_index(unit, _parse_to(to))
+        result = []
+        for index in range(last, last - min(count, 200), -1):
+            start = datetime.fromtimestamp(index * seconds + offset, tz=timezone.utc).replace(tzinfo=None)
+            close, open_ = self._close(unit, index, market), self._close(unit, index - 1, market)
+            spread = abs(close - open_) + close * 0.002
+            volume = 1 + random.Random(f"{self.seed}:{unit}:{index}:v").random() * 10
+            result.append({
+                "market": market,
+                "candle_date_time_utc": start.strftime("%Y-%m-%dT%H:%M:%S"),
+                "candle_date_time_kst": (start + KST).strftime("%Y-%m-%dT%H:%M:%S"),
+                "opening_price": open_,
+                "high_price": max(open_, close) + spread / 2,
+                "low_price": min(open_, close) - spread / 2,
+                "trade_price": close,
+                "timestamp": int((index + 1) * seconds + offset) * 1000,
+                "candle_acc_trade_volume": volume,
+                "candle_acc_trade_price": volume * close,
+            })
+        return result
+
+    # ---------------------------------------------------------------- 실행
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "UpbitRestServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@contextlib.contextmanager
+def redirect_upbit(base_url: str) -> Iterator[None]:
+    """
+    requests와 httpx.AsyncClient로 나가는 https://api.upbit.com 호출을 base_url로 보냄
+    (pyupbit, AsyncUpbitQuotation 포함, 다른 주소는 그대로)
+    """
+    original = requests.Session.request
+    original_async = httpx.AsyncClient.request
+
+    def redirect(url):
+        if isinstance(url, str) and url.startswith(UPBIT_API_URL):
+            return base_url + url[len(UPBIT_API_URL):]
+        return url
+
+    def request(session, method, url, *args, **kwargs):
+        return original(session, method, redirect(url), *args, **kwargs)
+
+    async def request_async(client, method, url, *args, **kwargs):
+        return await original_async(client, method, redirect(url), *args, **kwargs)
+
+    requests.Session.request = request
+    httpx.AsyncClient.request = request_async
+    try:
+        yield
+    finally:
+        requests.Session.request = original
+        httpx.AsyncClient.request = original_async
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8802)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument("--price", type=float, default=95_000_000)
+    args = parser.parse_args()
+
+    server = UpbitRestServer(args.host, args.port, args.latency, price=args.price).start()
+    print(f"Serving Upbit REST stand-in at {server.base_url}/v1")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+업비트 WebSocket을 대신하는 로컬 재생 서버.
+녹화된 메시지(JSONL)를 구독한 클라이언트에게 원래 간격대로(또는 배속으로) 다시 보냄.
+
+녹화 파일 형식 (한 줄에 하나):
+    {"delay": 0.05, "message": {"type": "ticker", "code": "KRW-BTC", "trade_price": 95000000, ...}}
+
+    python -m simulators.ws_replay_server recorded.jsonl --port 8765 --speed 10
+"""
+import argparse
+import base64
+import hashlib
+import json
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+def load_recording(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def encode_frame(payload: bytes, opcode: int = OP_BINARY) -> bytes:
+    """서버 -> 클라이언트 프레임 (마스킹 없음)"""
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 1 << 16:
+        header += bytes([126]) + struct.pack("!H", length)
+    else:
+        header += bytes([127]) + struct.pack("!Q", length)
+    return header + payload
+
+
+def read_frame(sock: socket.socket):
+    """클라이언트 -> 서버 프레임 읽기. (opcode, payload) 반환, 연결 종료 시 (None, b"")"""
+    def read_exact(size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("connection closed")
+            data += chunk
+        return data
+
+    try:
+        first, second = read_exact(2)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", read_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", read_exact(8))[0]
+        mask = read_exact(4) if second & 0x80 else None
+        payload = read_exact(length)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return opcode, payload
+    except (ConnectionError, OSError):
+        return None, b""
+
+
+class _ReplayHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server: "ReplayServer" = self.server.replay  # type: ignore[attr-defined]
+        sock = self.request
+
+        # HTTP 업그레이드 핸드셰이크
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return
+            request += chunk
+        headers = {}
+        for line in request.decode("latin-1").split("\r\n")[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        accept = base64.b64encode(
+            hashlib.sha1((headers.get("sec-websocket-key", "") + GUID).encode()).digest()
+        ).decode()
+        sock.sendall(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+
+        # 구독 메시지 수신 후 재생 시작
+        opcode, payload = read_frame(sock)
+        if opcode is None:
+            return
+        try:
+            server.subscriptions.append(json.loads(payload))
+        except ValueError:
+            pass
+
+        closed = threading.Event()
+
+        def read_control_frames():
+            while not closed.is_set():
+                opcode, payload = read_frame(sock)
+                if opcode is None or opcode == OP_CLOSE:
+                    closed.set()
+                    return
+                if opcode == OP_PING:
+                    try:
+                        sock.sendall(encode_frame(payload, OP_PONG))
+                    except OSError:
+                        closed.set()
+
+        threading.Thread(target=read_control_frames, daemon=True).start()
+
+        with server.lock:
+            server.connections += 1
+            connection_number = server.connections
+
+        try:
+            for index, entry in enumerate(server.messages):
+                if closed.is_set() or server.stopped.is_set():
+                    return
+                if server.drop_after is not None and connection_number <= server.drop_count \
+                        and index >= server.drop_after:
+                    # 재접속 테스트용: 지정한 메시지 수 이후 연결을 끊음
+                    return
+                delay = entry.get("delay", 0) / server.speed
+                if delay > 0 and closed.wait(delay):
+                    return
+                sock.sendall(encode_frame(json.dumps(entry["message"]).encode()))
+            if server.hold_open:
+                while not closed.is_set() and not server.stopped.is_set():
+                    closed.wait(0.1)
+        except OSError:
+            pass
+        finally:
+            closed.set()
+            try:
+                sock.sendall(encode_frame(b"", OP_CLOSE))
+            except OSError:
+                pass
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ReplayServer:
+    """
+    Args:
+        messages: {"delay": 초, "message": dict} 목록
+        speed: 재생 배속 (delay를 speed로 나눔)
+        hold_open: 재생이 끝나도 연결 유지
+        drop_after / drop_count: 처음 drop_count개 연결은 drop_after개 메시지 후 끊음 (재접속 검증용)
+    """
+
+    def __init__(self, messages: Iterable[Dict[str, Any]], host: str = "127.0.0.1", port: int = 0,
+                 speed: float = 1.0, hold_open: bool = True,
+                 drop_after: Optional[int] = None, drop_count: int = 1):
+        self.messages = list(messages)
+        self.speed = speed
+        self.hold_open = hold_open
+        self.drop_after = drop_after
+        self.drop_count = drop_count
+        self.subscriptions: List[Any] = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self._server = _ThreadingServer((host, port), _ReplayHandler)
+        self._server.replay = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"ws://{host}:{port}/websocket/v1"
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording", help="녹화된 메시지 JSONL 파일")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = ReplayServer(load_recording(args.recording), args.host, args.port, speed=args.speed).start()
+    print(f"Replaying {len(server.messages)} messages on {server.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
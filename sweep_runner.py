@@ -0,0 +1,331 @@
+"""
+백테스트 파라미터 스윕.
+
+파라미터 조합을 프로세스 풀에 나눠 실행하고 결과를 SQLite 결과 테이블에 바로바로 기록함.
+캔들 배열은 multiprocessing.shared_memory에 한 번 올려 두고 워커가 붙어서 읽으므로
+작업마다 DataFrame을 pickle 하지 않음.
+
+    python sweep_runner.py --hours 26280 --rsi-window 7 14 21 --price-change-threshold 0.5 1 2 \
+        --decision-interval 1 2 4 --workers 8 --run-id rsi-grid
+"""
+import argparse
+import functools
+import itertools
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import logging
+
+from backtester import STRATEGIES, Backtester, load_history
+from candle_store import CandleStore
+from indicator_engine import INDICATOR_WINDOWS, add_technical_indicators
+
+logger = logging.getLogger("SweepRunner")
+
+SHARED_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# 지표 기간 외에 Backtester에 그대로 넘기는 파라미터. 나머지는 결정 함수 인자로 넘김
+BACKTEST_PARAMS = ("decision_interval", "price_change_threshold", "warmup")
+
+
+@dataclass(frozen=True)
+class SharedFrameSpec:
+    """워커에 넘기는 공유 메모리 배열 정보 (pickle 대상은 이 작은 객체뿐)"""
+    name: str
+    rows: int
+    columns: Tuple[str, ...]
+
+
+class SharedFrame:
+    """
+    OHLCV DataFrame을 공유 메모리 한 블록에 (행 x [timestamp, 컬럼...]) float64 배열로 저장.
+    timestamp는 ns 정수를 float64로 바꾸지 않도록 int64 뷰로 따로 읽음.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, spec: SharedFrameSpec, owner: bool):
+        self.shm = shm
+        self.spec = spec
+        self.owner = owner
+
+    @classmethod
+    def create(cls, df: pd.DataFrame, columns: Iterable[str] = SHARED_COLUMNS) -> "SharedFrame":
+        columns = tuple(columns)
+        rows = len(df)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, rows * (len(columns) + 1) * 8))
+        spec = SharedFrameSpec(shm.name, rows, columns)
+        frame = cls(shm, spec, owner=True)
+        timestamps, values = frame._arrays()
+        timestamps[:] = df.index.values.astype("datetime64[ns]").astype(np.int64)
+        values[:] = df[list(columns)].to_numpy(dtype=np.float64)
+        return frame
+
+    @classmethod
+    def attach(cls, spec: SharedFrameSpec) -> "SharedFrame":
+        return cls(shared_memory.SharedMemory(name=spec.name), spec, owner=False)
+
+    def _arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        rows, width = self.spec.rows, len(self.spec.columns)
+        timestamps = np.ndarray((rows,), dtype=np.int64, buffer=self.shm.buf)
+        values = np.ndarray((rows, width), dtype=np.float64, buffer=self.shm.buf, offset=rows * 8)
+        return timestamps, values
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        공유 배열 위의 DataFrame (복사 없음). 이 SharedFrame이 닫히기 전까지만 유효하며,
+        읽기 전용으로 사용하고 컬럼을 추가하려면 copy() 후 사용
+        """
+        timestamps, values = self._arrays()
+        index = pd.DatetimeIndex(timestamps.view("datetime64[ns]"))
+        return pd.DataFrame(values, index=index, columns=list(self.spec.columns), copy=False)
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """{"rsi_window": [7, 14], "decision_interval": [1, 2]} -> 조합 목록"""
+    keys = sorted(grid)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+    # 같은 지표 기간끼리 붙여 두면 워커의 지표 캐시를 재사용함
+    combos.sort(key=lambda params: tuple(params.get(key, 0) for key in INDICATOR_WINDOWS))
+    return combos
+
+
+class ResultStore:
+    """스윕 결과 테이블. 같은 run_id에서 이미 끝난 조합은 다시 실행하지 않음"""
+
+    def __init__(self, db_path: str = "sweep_results.db"):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sweep_results (
+                run_id TEXT NOT NULL,
+                params TEXT NOT NULL,
+                strategy TEXT,
+                final_equity REAL,
+                pnl REAL,
+                return_pct REAL,
+                max_drawdown REAL,
+                trade_count INTEGER,
+                rejected INTEGER,
+                fees REAL,
+                elapsed REAL,
+                error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (run_id, params)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_sweep_return ON sweep_results (run_id, return_pct)")
+        self.conn.commit()
+
+    @staticmethod
+    def params_key(params: Dict[str, Any]) -> str:
+        return json.dumps(params, sort_keys=True)
+
+    def completed(self, run_id: str) -> set:
+        rows = self.conn.execute("SELECT params FROM sweep_results WHERE run_id = ?", (run_id,))
+        return {row[0] for row in rows}
+
+    def write(self, run_id: str, results: List[Dict[str, Any]]):
+        self.conn.executemany("""
+            INSERT OR REPLACE INTO sweep_results (
+                run_id, params, strategy, final_equity, pnl, return_pct, max_drawdown,
+                trade_count, rejected, fees, elapsed, error
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (run_id, self.params_key(r["params"]), r["strategy"], r.get("final_equity"), r.get("pnl"),
+             r.get("return_pct"), r.get("max_drawdown"), r.get("trade_count"), r.get("rejected"),
+             r.get("fees"), r.get("elapsed"), r.get("error"))
+            for r in results
+        ])
+        self.conn.commit()
+
+    def top(self, run_id: str, limit: int = 10) -> List[tuple]:
+        return self.conn.execute("""
+            SELECT params, return_pct, max_drawdown, trade_count
+            FROM sweep_results
+            WHERE run_id = ? AND error IS NULL
+            ORDER BY return_pct DESC
+            LIMIT ?
+        """, (run_id, limit)).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+# ---- 워커 프로세스 ----
+
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(hourly_spec: SharedFrameSpec, daily_spec: SharedFrameSpec, initial_krw: float):
+    hourly, daily = SharedFrame.attach(hourly_spec), SharedFrame.attach(daily_spec)
+    _worker["frames"] = (hourly, daily)
+    _worker["hourly"] = hourly.to_frame()
+    _worker["daily"] = daily.to_frame()
+    _worker["initial_krw"] = initial_krw
+    _worker["indicators"] = {}
+
+
+def _indicators(windows: Dict[str, float]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """지표 기간별 계산 결과 캐시 (최근 몇 개만 유지)"""
+    key = tuple(sorted(windows.items()))
+    cache = _worker["indicators"]
+    if key not in cache:
+        if len(cache) >= 4:
+            cache.pop(next(iter(cache)))
+        cache[key] = (
+            add_technical_indicators(_worker["hourly"].copy(), windows),
+            add_technical_indicators(_worker["daily"].copy(), windows),
+        )
+    return cache[key]
+
+
+def run_backtest(strategy: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """파라미터 조합 하나를 백테스트 (워커에서 실행)"""
+    start = time.perf_counter()
+    result = {"strategy": strategy, "params": params}
+    try:
+        windows = {key: value for key, value in params.items() if key in INDICATOR_WINDOWS}
+        backtest_kwargs = {key: value for key, value in params.items() if key in BACKTEST_PARAMS}
+        strategy_kwargs = {key: value for key, value in params.items()
+                           if key not in INDICATOR_WINDOWS and key not in BACKTEST_PARAMS}
+
+        hourly, daily = _indicators(windows)
+        backtest = Backtester(
+            hourly, daily,
+            decision_fn=functools.partial(STRATEGIES[strategy], **strategy_kwargs),
+            initial_krw=_worker["initial_krw"],
+            summarize=False,
+            precomputed=True,
+            **backtest_kwargs
+        ).run()
+        result.update(
+            final_equity=backtest.final_equity,
+            pnl=backtest.pnl,
+            return_pct=backtest.return_pct,
+            max_drawdown=backtest.max_drawdown,
+            trade_count=backtest.trade_count,
+            rejected=backtest.rejected,
+            fees=backtest.fees,
+        )
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+class SweepRunner:
+    def __init__(self, hourly: pd.DataFrame, daily: Optional[pd.DataFrame] = None,
+                 store: Optional[ResultStore] = None, workers: Optional[int] = None,
+                 initial_krw: float = 1_000_000.0, batch_size: int = 50):
+        hourly = Backtester._normalize(hourly)
+        self.hourly = hourly
+        self.daily = Backtester._normalize(daily) if daily is not None else Backtester._resample_daily(hourly)
+        self.store = store or ResultStore()
+        self.workers = workers or os.cpu_count() or 1
+        self.initial_krw = initial_krw
+        self.batch_size = batch_size
+
+    def run(self, grid: Dict[str, List[Any]], strategy: str = "rsi", run_id: Optional[str] = None) -> str:
+        """
+        그리드 전체를 실행하고 결과를 store에 기록.
+
+        Returns:
+            run_id (결과 테이블 조회용)
+        """
+        run_id = run_id or time.strftime("sweep-%Y%m%d-%H%M%S")
+        done = self.store.completed(run_id)
+        combos = [params for params in expand_grid(grid) if ResultStore.params_key(params) not in done]
+        if not combos:
+            logger.info(f"[{run_id}] Nothing to run ({len(done)} already completed)")
+            return run_id
+
+        logger.info(f"[{run_id}] Running {len(combos)} configurations on {self.workers} workers")
+        start = time.perf_counter()
+        hourly_shm = SharedFrame.create(self.hourly)
+        daily_shm = SharedFrame.create(self.daily)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(hourly_shm.spec, daily_shm.spec, self.initial_krw)
+            ) as pool:
+                chunksize = max(1, min(16, len(combos) // (self.workers * 4)))
+                batch = []
+                finished = 0
+                for result in pool.map(run_backtest, itertools.repeat(strategy), combos, chunksize=chunksize):
+                    batch.append(result)
+                    if len(batch) >= self.batch_size:
+                        self.store.write(run_id, batch)
+                        finished += len(batch)
+                        batch = []
+                        logger.info(f"[{run_id}] {finished}/{len(combos)} done "
+                                    f"({time.perf_counter() - start:.1f}s)")
+                if batch:
+                    self.store.write(run_id, batch)
+        finally:
+            hourly_shm.close()
+            daily_shm.close()
+
+        logger.info(f"[{run_id}] Finished {len(combos)} configurations in {time.perf_counter() - start:.1f}s")
+        return run_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run backtest parameter sweeps across CPU cores")
+    parser.add_argument("--market", default="KRW-BTC")
+    parser.add_argument("--db", default="candles.db")
+    parser.add_argument("--results", default="sweep_results.db")
+    parser.add_argument("--hours", type=int, default=24 * 365)
+    parser.add_argument("--sync", action="store_true")
+    parser.add_argument("--allow-short-history", action="store_true",
+                        help="저장된 캔들이 --hours보다 적어도 있는 만큼으로 진행")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="rsi")
+    parser.add_argument("--run-id")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--decision-interval", type=int, nargs="+", default=[1])
+    parser.add_argument("--price-change-threshold", type=float, nargs="+")
+    parser.add_argument("--oversold", type=float, nargs="+")
+    parser.add_argument("--overbought", type=float, nargs="+")
+    for key, default in INDICATOR_WINDOWS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(default), nargs="+")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(message)s")
+
+    hourly, daily = load_history(CandleStore(args.db), args.market, args.hours, sync=args.sync)
+    if hourly is None:
+        parser.error(f"No hourly candles for {args.market} in {args.db} (use --sync)")
+    if len(hourly) < args.hours:
+        # 짧은 히스토리로 돌린 결과가 요청한 기간의 결과처럼 보이지 않도록 기본은 중단
+        if not args.allow_short_history:
+            parser.error(f"Only {len(hourly)} of {args.hours} hourly candles available for {args.market} "
+                         f"(use --sync to backfill, or --allow-short-history)")
+        logger.warning(f"Sweeping over {len(hourly)} hourly candles instead of {args.hours}")
+
+    grid = {"decision_interval": args.decision_interval}
+    for key in ("price_change_threshold", "oversold", "overbought", *INDICATOR_WINDOWS):
+        values = getattr(args, key)
+        if values:
+            grid[key] = values
+
+    store = ResultStore(args.results)
+    run_id = SweepRunner(hourly, daily, store=store, workers=args.workers).run(grid, args.strategy, args.run_id)
+    for params, return_pct, drawdown, trades in store.top(run_id):
+        print(f"{return_pct:+8.2f}%  MDD {drawdown:6.2f}%  trades {trades:5d}  {params}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
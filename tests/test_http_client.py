@@ -0,0 +1,149 @@
+"""
+CachedHttpClient 캐시 동작 테스트 (로컬 HttpFixtureServer 대상).
+
+    python -m pytest -q tests/test_http_client.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_runtime import AsyncRuntime
+from http_client import CachedHttpClient
+from simulators.http_fixture_server import HttpFixtureServer
+
+
+@pytest.fixture
+def server():
+    server = HttpFixtureServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client():
+    client = CachedHttpClient(timeout=2.0)
+    yield client
+    client.close()
+
+
+class CountingParser:
+    """parse 호출 횟수를 세는 JSON 파서"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, response):
+        self.calls += 1
+        return response.json()
+
+
+def wait_revalidated(client: CachedHttpClient, timeout: float = 2.0):
+    """백그라운드 재검증이 끝날 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while client._revalidating:
+        if time.monotonic() > deadline:
+            raise AssertionError("background revalidation did not finish")
+        time.sleep(0.01)
+
+
+def fear_greed_value(data) -> str:
+    return data["data"][0]["value"]
+
+
+def test_ttl_hit_skips_network(server, client):
+    first = client.get(server.fear_greed_url, ttl=60, stale_ttl=0)
+    server.set_fear_greed(80, "Extreme Greed")
+    second = client.get(server.fear_greed_url, ttl=60, stale_ttl=0)
+
+    assert second == first
+    assert server.requests["/fng"] == 1
+    assert client.stats()["hits"] == 1
+    assert client.stats()["misses"] == 1
+
+
+def test_not_modified_keeps_parsed_value(server, client):
+    parse = CountingParser()
+    first = client.get(server.fear_greed_url, ttl=0.05, stale_ttl=60, parse=parse)
+    time.sleep(0.1)
+
+    # TTL이 지나면 이전 값을 반환하고 백그라운드에서 ETag로 재검증
+    stale = client.get(server.fear_greed_url, ttl=0.05, stale_ttl=60, parse=parse)
+    wait_revalidated(client)
+
+    assert stale is first
+    assert server.not_modified == 1
+    assert client.stats()["not_modified"] == 1
+    # 304 응답은 다시 파싱하지 않고 캐시된 값의 TTL만 연장
+    assert parse.calls == 1
+    assert client.get(server.fear_greed_url, ttl=60, stale_ttl=60, parse=parse) is first
+    assert server.requests["/fng"] == 2
+
+
+def test_stale_while_revalidate(server, client):
+    first = client.get(server.fear_greed_url, ttl=0.05, stale_ttl=60)
+    server.set_fear_greed(80, "Extreme Greed")
+    time.sleep(0.1)
+
+    # 재검증을 기다리지 않고 이전 값을 바로 반환
+    stale = client.get(server.fear_greed_url, ttl=60, stale_ttl=60)
+    assert fear_greed_value(stale) == fear_greed_value(first) == "45"
+    assert client.stats()["stale_hits"] == 1
+
+    wait_revalidated(client)
+    fresh = client.get(server.fear_greed_url, ttl=60, stale_ttl=60)
+    assert fear_greed_value(fresh) == "80"
+    assert server.requests["/fng"] == 2
+    assert server.not_modified == 0
+
+
+def test_stale_on_error(server, client):
+    first = client.get(server.fear_greed_url, ttl=0.05, stale_ttl=60)
+    server.fail = True
+    time.sleep(0.1)
+
+    # 원격 장애 중에도 stale_ttl 안의 이전 값을 계속 반환
+    assert client.get(server.fear_greed_url, ttl=0.05, stale_ttl=60) is first
+    wait_revalidated(client)
+    assert client.stats()["errors"] == 1
+    assert client.get(server.fear_greed_url, ttl=0.05, stale_ttl=60) is first
+
+
+def test_error_without_cached_value_raises(server, client):
+    server.fail = True
+    with pytest.raises(Exception):
+        client.get(server.fear_greed_url, ttl=60, stale_ttl=60)
+    assert client.stats()["errors"] == 1
+
+
+def test_get_async_shares_cache_and_revalidates(server, client):
+    runtime = AsyncRuntime()
+
+    async def run():
+        try:
+            # 같은 키를 동시에 요청하면 한 번만 보냄
+            first, second = await asyncio.gather(
+                client.get_async(runtime.http, server.fear_greed_url, ttl=0.05, stale_ttl=60),
+                client.get_async(runtime.http, server.fear_greed_url, ttl=0.05, stale_ttl=60),
+            )
+            assert first is second
+            assert server.requests["/fng"] == 1
+
+            # 동기 get()과 같은 캐시 사용
+            assert client.get(server.fear_greed_url, ttl=0.05, stale_ttl=60) is first
+
+            await asyncio.sleep(0.1)
+            stale = await client.get_async(runtime.http, server.fear_greed_url, ttl=60, stale_ttl=60)
+            assert stale is first
+            while client._async_fetches:
+                await asyncio.sleep(0.01)
+            assert server.not_modified == 1
+            assert client.stats()["not_modified"] == 1
+        finally:
+            await runtime.http.close()
+
+    asyncio.run(run())
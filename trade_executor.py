@@ -1,45 +1,143 @@
+import threading
 import pyupbit
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional
 import logging
 
+from market_snapshot import UpbitMarketCache
+from orderbook_analytics import limit_buy_amount, limit_sell_volume
+from order_slicer import ExecutionReport, OrderSlicer
+from config import Config
+from utils.tracing import traced
+
 logger = logging.getLogger("TradeExecutor")
 
 
 class TradeExecutor:
-    def __init__(self, api_key: str, secret_key: str):
-        self.upbit = pyupbit.Upbit(api_key, secret_key)
+    def __init__(self, api_key: str, secret_key: str, config=Config, upbit=None, market: Optional[str] = None):
+        """
+        Args:
+            upbit: pyupbit.Upbit 대신 쓸 주문 API (모의 투자용 PaperAccount 등)
+            market: 주문할 마켓 (기본값 config.ENGINE_MARKET)
+        """
+        self.config = config
+        self.market = market or config.ENGINE_MARKET
+        self.upbit = upbit or pyupbit.Upbit(api_key, secret_key)
+        # 사용자별 계좌 캐시 (시세는 엔진이 공유 데이터로 넘겨줌)
+        self.market_cache = UpbitMarketCache(self.upbit, account_ttl=config.ACCOUNT_CACHE_TTL)
+        # SLICE_MIN_KRW 이상인 주문은 지정가 자식 주문으로 나눠 백그라운드에서 실행
+        self.order_slicer = None
+        if config.ORDER_SLICING:
+            self.order_slicer = OrderSlicer(
+                self.upbit, self.market_cache.get_orderbook,
+                slices=config.SLICE_COUNT, interval=config.SLICE_INTERVAL,
+                poll_interval=config.SLICE_POLL_INTERVAL, max_slippage_bps=config.MAX_SLIPPAGE_BPS,
+                min_order_krw=config.MINIMUM_ORDER_AMOUNT, fee=config.TRANSACTION_FEE, max_workers=1
+            )
+        # 분할 주문이 진행 중인 마켓 (끝날 때까지 그 마켓의 새 주문은 내지 않음)
+        self._sliced_markets: set = set()
+        self._sliced_lock = threading.Lock()
+
+    @traced()
+    def execute_trade(self, decision: Dict[str, Any], current_price: Optional[float] = None,
+                      orderbook: Any = None,
+                      on_sliced: Optional[Callable[[ExecutionReport], None]] = None) -> bool:
+        """
+        Args:
+            orderbook: 엔진이 공유하는 호가 (없으면 슬리피지 한도 확인 시 조회)
+            on_sliced: 분할 주문이 끝나면 보고서로 호출 (실행 스레드에서)
 
-    def execute_trade(self, decision: Dict[str, Any]) -> bool:
+        Returns:
+            바로 체결한 주문이면 True. 분할 주문은 제출만 하고 False를 반환하며 결과는 on_sliced로 전달
+        """
         try:
+            if decision["decision"] in ("buy", "sell") and self.sliced_order_running(self.market):
+                logger.warning(f"Sliced order still running, skipping {decision['decision']} decision")
+                return False
             if decision["decision"] == "buy":
-                return self._execute_buy(decision["percentage"])
+                return self._execute_buy(decision["percentage"], orderbook, on_sliced)
             elif decision["decision"] == "sell":
-                return self._execute_sell(decision["percentage"])
+                return self._execute_sell(decision["percentage"], current_price, orderbook, on_sliced)
             return True # Hold position
         except Exception as e:
-            print(f"Error executing trade: {e}")
+            logger.error(f"Error executing trade: {e}")
             return False
+        finally:
+            if decision.get("decision") in ("buy", "sell"):
+                # 체결 후 잔고/평균 매수가 다시 조회
+                self.market_cache.invalidate_account()
+
+    def _orderbook(self, orderbook: Any) -> Any:
+        if orderbook is None and self.config.MAX_SLIPPAGE_BPS > 0:
+            orderbook = self.market_cache.get_orderbook(self.market)
+        return orderbook
+
+    def sliced_order_running(self, market: str) -> bool:
+        with self._sliced_lock:
+            return market in self._sliced_markets
 
-    def _execute_buy(self, percentage: float) -> bool:
+    def _submit_sliced(self, market: str, side: str, amount: float,
+                       on_sliced: Optional[Callable[[ExecutionReport], None]]) -> bool:
+        """분할 주문 제출. 체결이 끝나야 결과를 알 수 있으므로 항상 False"""
+        with self._sliced_lock:
+            if market in self._sliced_markets:
+                logger.warning(f"[{market}] Sliced order still running, skipping {side}")
+                return False
+            self._sliced_markets.add(market)
+            try:
+                self.order_slicer.submit(market, side, amount,
+                                         on_complete=lambda report: self._on_sliced_execution(report, on_sliced))
+            except Exception:
+                self._sliced_markets.discard(market)
+                raise
+        return False
+
+    def _execute_buy(self, percentage: float, orderbook: Any = None,
+                     on_sliced: Optional[Callable[[ExecutionReport], None]] = None) -> bool:
         """Execute buy order"""
-        krw_balance = self.upbit.get_balance("KRW")
+        krw_balance = self.market_cache.get_balance("KRW")
         amount = krw_balance * (percentage / 100) * (1 - self.config.TRANSACTION_FEE)
+        if self.order_slicer and amount >= self.config.SLICE_MIN_KRW:
+            return self._submit_sliced(self.market, "buy", amount, on_sliced)
+        # 호가가 얇아 예상 슬리피지가 한도를 넘으면 주문 금액을 줄임
+        amount = limit_buy_amount(self._orderbook(orderbook), amount, self.config.MAX_SLIPPAGE_BPS)
 
         if amount < self.config.MINIMUM_ORDER_AMOUNT:
             logger.warning("Insufficient funds for buy order")
             return False
 
-        result = self.upbit.buy_market_order("KRW-BTC", amount)
+        result = self.upbit.buy_market_order(self.market, amount)
         return bool(result)
 
-    def _execute_sell(self, percentage: float) -> bool:
+    def _execute_sell(self, percentage: float, current_price: Optional[float] = None, orderbook: Any = None,
+                      on_sliced: Optional[Callable[[ExecutionReport], None]] = None) -> bool:
         """Execute sell order"""
-        btc_balance = self.upbit.get_balance("KRW-BTC")
+        btc_balance = self.market_cache.get_balance(self.market)
         amount = btc_balance * (percentage / 100)
+        if current_price is None:
+            current_price = pyupbit.get_current_price(self.market)
+        if self.order_slicer and amount * current_price >= self.config.SLICE_MIN_KRW:
+            return self._submit_sliced(self.market, "sell", amount, on_sliced)
+        amount = limit_sell_volume(self._orderbook(orderbook), amount, self.config.MAX_SLIPPAGE_BPS)
 
-        if amount * pyupbit.get_current_price("KRW-BTC") < self.config.MINIMUM_ORDER_AMOUNT:
-            logger.warning("Insufficient BTC for sell order")
+        if amount * current_price < self.config.MINIMUM_ORDER_AMOUNT:
+            logger.warning(f"Insufficient {self.market} balance for sell order")
             return False
 
-        result = self.upbit.sell_market_order("KRW-BTC", amount)
-        return bool(result)
\ No newline at end of file
+        result = self.upbit.sell_market_order(self.market, amount)
+        return bool(result)
+
+    def _on_sliced_execution(self, report: ExecutionReport,
+                             on_sliced: Optional[Callable[[ExecutionReport], None]] = None):
+        """분할 주문이 끝나면 잔고/평균 매수가 다시 조회하고 결과 전달"""
+        self.market_cache.invalidate_account()
+        logger.info(f"Sliced order finished: {report.summary()}")
+        if report.state != "done":
+            # 남은 수량은 다시 내지 않음 (다음 사이클이 갱신된 잔고로 다시 판단)
+            logger.warning(f"[{report.market}] Sliced order {report.state}, "
+                           f"{1 - report.fill_ratio:.1%} of the requested amount was not filled")
+        try:
+            if on_sliced is not None:
+                on_sliced(report)
+        finally:
+            with self._sliced_lock:
+                self._sliced_markets.discard(report.market)
@@ -0,0 +1,148 @@
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from database_manager import DatabaseManager
+from utils.tracing import tracer
+
+logger = logging.getLogger("TradeJournal")
+
+DURABILITY_MODES = ("async", "sync")
+
+# durability별 SQLite synchronous 모드
+SYNCHRONOUS_MODES = {"async": "NORMAL", "sync": "FULL"}
+
+_STOP = object()
+
+
+class TradeJournal:
+    """
+    거래 기록 write-behind 저널.
+    submit()은 거래 데이터를 큐에 넣고 바로 반환하며, 백그라운드 스레드가 큐를 모아
+    하나의 트랜잭션으로 기록함 (JSON 직렬화도 백그라운드에서 처리).
+
+    Durability:
+        async: 큐에 넣으면 반환 (기본값). SQLite synchronous=NORMAL
+        sync:  커밋될 때까지 기다렸다가 반환. SQLite synchronous=FULL
+    """
+
+    def __init__(self, db_manager: DatabaseManager, durability: str = "async",
+                 max_queue: int = 1000, batch_size: int = 100, flush_interval: float = 0.5):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.db_manager = db_manager
+        self.durability = durability
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.failed = 0
+
+        if durability == "sync":
+            # 이미 열린 연결에도 적용되도록 DatabaseManager를 통해 변경
+            db_manager.set_synchronous(SYNCHRONOUS_MODES["sync"])
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer, name="trade-journal", daemon=True)
+        self._thread.start()
+
+    def submit(self, trade_data: Dict[str, Any]) -> bool:
+        """
+        거래 기록 요청. async 모드에서는 디스크 I/O를 기다리지 않음.
+
+        Returns:
+            sync 모드에서는 커밋 성공 여부, async 모드에서는 큐 등록 여부
+        """
+        if self._closed:
+            logger.warning("Trade journal is closed, writing synchronously")
+            return self.db_manager.log_trades([trade_data])
+
+        # 기록 시각은 큐에 넣는 시점 기준
+        trade_data = {**trade_data, "timestamp": trade_data.get("timestamp") or datetime.now()}
+        done = threading.Event() if self.durability == "sync" else None
+        entry = (trade_data, done)
+
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            logger.warning("Trade journal queue is full, waiting for the writer")
+            self._queue.put(entry)
+
+        if done is not None:
+            done.wait()
+            return getattr(done, "ok", False)
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """큐에 쌓인 거래가 모두 기록될 때까지 대기 (close() 이후에는 writer가 없으므로 바로 False)"""
+        if self._closed:
+            return False
+        marker = threading.Event()
+        self._queue.put((None, marker))
+        return marker.wait(timeout)
+
+    def close(self, timeout: float = 10.0):
+        """남은 거래를 모두 기록하고 writer 스레드 종료"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error("Trade journal writer did not finish in time")
+
+    def _writer(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch: List[Tuple[Optional[Dict[str, Any]], Optional[threading.Event]]] = []
+            stop = first is _STOP
+            if not stop:
+                batch.append(first)
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write_batch(batch)
+            if stop:
+                # 종료 요청 이후 들어온 항목까지 마저 기록
+                remaining = []
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not _STOP:
+                        remaining.append(item)
+                self._write_batch(remaining)
+                return
+
+    def _write_batch(self, batch: List[Tuple[Optional[Dict[str, Any]], Optional[threading.Event]]]):
+        trades = [trade for trade, _ in batch if trade is not None]
+        ok = True
+        if trades:
+            start = time.perf_counter()
+            with tracer.span("journal_write"):
+                ok = self.db_manager.log_trades(trades)
+            if ok:
+                self.written += len(trades)
+                logger.debug(f"Wrote {len(trades)} trades in {time.perf_counter() - start:.4f}s")
+            else:
+                self.failed += len(trades)
+
+        for _, done in batch:
+            if done is not None:
+                done.ok = ok
+                done.set()
@@ -0,0 +1,251 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from user_manager import User, UserManager
+from data_collector import DataCollector
+from trade_executor import TradeExecutor
+from order_slicer import ExecutionReport
+from ai_decision_maker import AIDecisionMaker
+from collection_stage import CollectionStage
+from config import Config
+from utils.logger import setup_logger
+from utils.tracing import traced
+
+if TYPE_CHECKING:
+    from async_runtime import AsyncRuntime
+
+logger = setup_logger("TradingEngine", "trading_engine.log")
+
+
+@dataclass
+class UserCycleResult:
+    """사용자 한 명의 거래 사이클 결과"""
+    user_id: str
+    decision: Dict[str, Any] = field(default_factory=dict)
+    executed: bool = False
+    sliced: bool = False  # 분할 주문을 제출함 (체결 결과는 끝난 뒤 로그로 남김)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+class TradingEngine:
+    """
+    다중 사용자 거래 엔진.
+    틱마다 실행 시점이 된 사용자를 모아 시장 데이터(시세/캔들/지표, 뉴스, 공포탐욕지수, 차트)를
+    한 번만 수집하고, 사용자별 잔고 조회 -> AI 결정 -> 주문은 스레드 풀에서 병렬로 실행함.
+    사용자마다 자신의 API 키로 만든 TradeExecutor를 사용하므로 계좌가 서로 섞이지 않음.
+    """
+
+    def __init__(self, user_manager: UserManager, data_collector: DataCollector,
+                 ai_decision_maker: AIDecisionMaker,
+                 executor_factory: Optional[Callable[[User], TradeExecutor]] = None,
+                 max_workers: int = Config.ENGINE_MAX_WORKERS,
+                 collection_stage: Optional[CollectionStage] = None):
+        self.user_manager = user_manager
+        self.data_collector = data_collector
+        self.ai_decision_maker = ai_decision_maker
+        # 주문 마켓은 공유 시세를 수집하는 마켓과 같아야 함
+        self.executor_factory = executor_factory or (
+            lambda user: TradeExecutor(user.api_key, user.secret_key, market=data_collector.market))
+        self.collection_stage = collection_stage or CollectionStage()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="user-cycle")
+
+        self._executors: Dict[str, TradeExecutor] = {}
+        self._executors_lock = threading.Lock()
+        self._next_run: Dict[str, float] = {}
+
+    def get_executor(self, user: User) -> TradeExecutor:
+        """사용자별 TradeExecutor (처음 요청 시 생성 후 재사용)"""
+        with self._executors_lock:
+            executor = self._executors.get(user.user_id)
+            if executor is None:
+                executor = self._executors[user.user_id] = self.executor_factory(user)
+            return executor
+
+    def due_users(self, now: Optional[float] = None) -> List[User]:
+        """실행 시점이 된 사용자 목록. 처음 보는 사용자는 바로 실행"""
+        now = time.monotonic() if now is None else now
+        return [
+            user for user_id, user in list(self.user_manager.users.items())
+            if self._next_run.get(user_id, now) <= now
+        ]
+
+    COLLECTION_TIMEOUTS = {
+        "market_data": Config.TRADING_DATA_TIMEOUT,
+        "news": Config.NEWS_TIMEOUT,
+        "fear_greed_index": Config.FEAR_GREED_TIMEOUT,
+        "chart_image": Config.CHART_TIMEOUT,
+    }
+    COLLECTION_DEFAULTS = {"market_data": {}, "news": [], "fear_greed_index": "Unknown"}
+
+    @traced()
+    def collect_market_data(self) -> Dict[str, Any]:
+        """모든 사용자가 공유하는 데이터 수집 (틱당 한 번)"""
+        collected = self.collection_stage.collect(
+            {
+                "market_data": self.data_collector.get_market_data,
+                "news": self.data_collector.fetch_google_news,
+                "fear_greed_index": self.data_collector.collect_fear_greed_index,
+                "chart_image": self.data_collector.capture_chart,
+            },
+            timeouts=self.COLLECTION_TIMEOUTS,
+            defaults=self.COLLECTION_DEFAULTS
+        )
+        logger.info(f"Market data collected in {collected.elapsed:.2f}s: {collected.format_timings()}")
+        return collected.values
+
+    @traced("collect_market_data")
+    async def collect_market_data_async(self, runtime: "AsyncRuntime") -> Dict[str, Any]:
+        """collect_market_data의 asyncio 버전 (차트는 browser 실행기, 시세/캔들은 io 실행기, 뉴스/지수는 비동기 HTTP)"""
+        collector = self.data_collector
+        collected = await runtime.collect(
+            {
+                "market_data": lambda: runtime.run_blocking(collector.get_market_data),
+                "news": lambda: collector.fetch_google_news_async(runtime.http),
+                "fear_greed_index": lambda: collector.collect_fear_greed_index_async(runtime.http),
+                "chart_image": lambda: runtime.run_blocking(collector.capture_chart, executor="browser"),
+            },
+            timeouts=self.COLLECTION_TIMEOUTS,
+            defaults=self.COLLECTION_DEFAULTS
+        )
+        logger.info(f"Market data collected in {collected.elapsed:.2f}s: {collected.format_timings()}")
+        return collected.values
+
+    @staticmethod
+    def _decision_inputs(shared: Dict[str, Any], market_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "news": shared.get("news"),
+            "fear_greed_index": shared.get("fear_greed_index"),
+            "chart_image": shared.get("chart_image"),
+            "technical_indicators": market_data.get("technical_summary", {}),
+            "trading_data": {
+                "daily": market_data.get("daily_data", []),
+                "hourly": market_data.get("hourly_data", []),
+            },
+        }
+
+    def _user_market_data(self, executor: TradeExecutor, shared: Dict[str, Any]) -> Dict[str, Any]:
+        market_data = dict(shared.get("market_data") or {})
+        market_data["investment_status"] = self.data_collector.get_investment_status(
+            executor.market_cache, market_data.get("current_price")
+        )
+        return market_data
+
+    def _execute(self, user: User, executor: TradeExecutor, result: UserCycleResult, market_data: Dict[str, Any]):
+        if result.decision.get("decision") in ["buy", "sell"]:
+            if executor.sliced_order_running(executor.market):
+                logger.info(f"[{user.user_id}] Sliced trade still running, skipping: {result.decision}")
+                return
+
+            def on_sliced(report: ExecutionReport):
+                logger.info(f"[{user.user_id}] Sliced trade finished: {result.decision} ({report.summary()})")
+
+            result.executed = executor.execute_trade(result.decision, market_data.get("current_price"),
+                                                     market_data.get("orderbook"), on_sliced=on_sliced)
+            result.sliced = not result.executed and executor.sliced_order_running(executor.market)
+            if result.sliced:
+                logger.info(f"[{user.user_id}] Sliced trade running: {result.decision}")
+            else:
+                logger.info(f"[{user.user_id}] Executed trade: {result.decision} (success={result.executed})")
+        else:
+            logger.info(f"[{user.user_id}] No trade executed (decision: hold).")
+
+    @traced("user_cycle")
+    def run_user_cycle(self, user: User, shared: Dict[str, Any]) -> UserCycleResult:
+        """공유 데이터에 사용자 계좌 상태를 붙여 결정 후 주문 실행"""
+        start = time.perf_counter()
+        result = UserCycleResult(user_id=user.user_id)
+        try:
+            executor = self.get_executor(user)
+            market_data = self._user_market_data(executor, shared)
+
+            result.decision = self.ai_decision_maker.get_decision(
+                user_preferences=user.gpt_preferences,
+                market_data=market_data,
+                additional_data=self._decision_inputs(shared, market_data)
+            )
+            self._execute(user, executor, result, market_data)
+        except Exception as e:
+            result.error = str(e)
+            logger.error(f"[{user.user_id}] Error in trading cycle: {e}")
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    @traced("user_cycle")
+    async def run_user_cycle_async(self, user: User, shared: Dict[str, Any],
+                                   runtime: "AsyncRuntime") -> UserCycleResult:
+        """run_user_cycle의 asyncio 버전 (잔고 조회/주문은 io 실행기, 결정은 비동기 클라이언트)"""
+        start = time.perf_counter()
+        result = UserCycleResult(user_id=user.user_id)
+        try:
+            executor = self.get_executor(user)
+            market_data = await runtime.run_blocking(self._user_market_data, executor, shared)
+
+            result.decision = await self.ai_decision_maker.get_decision_async(
+                user_preferences=user.gpt_preferences,
+                market_data=market_data,
+                additional_data=self._decision_inputs(shared, market_data)
+            )
+            await runtime.run_blocking(self._execute, user, executor, result, market_data)
+        except Exception as e:
+            result.error = str(e)
+            logger.error(f"[{user.user_id}] Error in trading cycle: {e}")
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    @traced("engine_cycle", root=True)
+    def run_users(self, users: List[User]) -> List[UserCycleResult]:
+        """공유 데이터를 한 번 수집해 주어진 사용자들에게 병렬로 전달"""
+        if not users:
+            return []
+        shared = self.collect_market_data()
+
+        futures = [self._pool.submit(self.run_user_cycle, user, shared) for user in users]
+        results = [future.result() for future in as_completed(futures)]
+        self._log_results(results)
+        return results
+
+    @staticmethod
+    def _log_results(results: List[UserCycleResult]):
+        failed = sum(1 for r in results if r.error)
+        slowest = max(r.elapsed for r in results)
+        logger.info(f"Finished cycle for {len(results)} users ({failed} failed, slowest {slowest:.2f}s)")
+
+    def _claim_due_users(self, now: float) -> List[User]:
+        users = self.due_users(now)
+        # 다음 실행 시각은 시작 시점 기준 (사이클 소요 시간만큼 밀리지 않도록)
+        for user in users:
+            self._next_run[user.user_id] = now + user.trading_interval * 3600
+        if users:
+            logger.info(f"Running trading cycle for {len(users)} users.")
+        return users
+
+    @traced("engine_cycle", root=True)
+    async def run_users_async(self, users: List[User], runtime: "AsyncRuntime") -> List[UserCycleResult]:
+        """run_users의 asyncio 버전. 사용자별 사이클은 사용자 키로 단일 실행 (이전 사이클이 진행 중이면 그 결과를 기다림)"""
+        if not users:
+            return []
+        shared = await self.collect_market_data_async(runtime)
+
+        results = await asyncio.gather(*(
+            runtime.flights.do(("user", user.user_id),
+                               lambda user=user: self.run_user_cycle_async(user, shared, runtime))
+            for user in users
+        ))
+        self._log_results(results)
+        return list(results)
+
+    async def tick_async(self, runtime: "AsyncRuntime", now: Optional[float] = None) -> List[UserCycleResult]:
+        """실행 시점이 된 사용자들의 사이클 실행 (겹치는 틱은 runtime.every의 key로 건너뜀)"""
+        users = self._claim_due_users(time.monotonic() if now is None else now)
+        if not users:
+            return []
+        return await self.run_users_async(users, runtime)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+        self.collection_stage.shutdown()
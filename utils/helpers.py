@@ -0,0 +1,63 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """
+    키별 만료 시간을 가진 스레드 안전 캐시.
+    같은 키를 여러 스레드가 동시에 요청하면 한 번만 로드함.
+    """
+
+    def __init__(self):
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _fresh(self, key: Hashable):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return True, entry[1]
+        return False, None
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: float) -> Any:
+        found, value = self._fresh(key)
+        if found:
+            self.hits += 1
+            return value
+
+        with self._key_lock(key):
+            # 다른 스레드가 먼저 로드했을 수 있음
+            found, value = self._fresh(key)
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            value = loader()
+            if value is not None:
+                self._data[key] = (time.monotonic() + ttl, value)
+            return value
+
+    def peek(self, key: Hashable) -> Any:
+        """만료되지 않은 값 (없으면 None, 로드하지 않음)"""
+        return self._fresh(key)[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        self._data[key] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, *keys: Hashable):
+        """키를 지정하지 않으면 전체 삭제"""
+        with self._lock:
+            if not keys:
+                self._data.clear()
+            for key in keys:
+                self._data.pop(key, None)
@@ -0,0 +1,339 @@
+"""
+가벼운 구간(span) 계측.
+
+- tracer.span("get_trading_data") / @traced("...")로 감싼 구간의 소요 시간을 단계별 HDR 방식 히스토그램에 기록
+- tracer.trace("trading_cycle")로 시작한 사이클 안의 구간은 한 줄 요약(단계별 시간)으로 로그에 남김
+  (contextvars로 전달되므로 CollectionStage 작업 스레드의 구간도 같은 사이클에 묶임)
+- MetricsServer가 /metrics 에서 Prometheus 텍스트 형식으로 노출하고, start_dump()는 주기적으로 로그에 요약을 씀
+
+구간 하나를 기록하는 비용은 수 마이크로초 (perf_counter_ns 두 번 + 버킷 카운트 증가)라서 초 단위 사이클에서는 무시할 수준.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger("Tracing")
+
+SUB_BUCKET_BITS = 7  # 버킷마다 128칸 -> 상대 오차 1/64 (약 1.6%)
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class LatencyHistogram:
+    """
+    HDR 방식 로그-선형 히스토그램 (마이크로초 단위 정수).
+    값 v는 상위 SUB_BUCKET_BITS 비트만 남겨 버킷에 넣으므로 크기와 관계없이 상대 오차가 일정하고,
+    1µs ~ 1시간 범위를 2천 개 정도의 카운터로 표현함.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max", "errors", "_lock")
+
+    def __init__(self):
+        self.counts: List[int] = []
+        self.count = 0
+        self.total = 0  # µs
+        self.min = 0
+        self.max = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index(value: int) -> int:
+        shift = max(0, value.bit_length() - SUB_BUCKET_BITS)
+        return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+    @staticmethod
+    def _value(index: int) -> int:
+        """버킷에 들어가는 가장 작은 값"""
+        half = 1 << (SUB_BUCKET_BITS - 1)
+        if index < (half << 1):
+            return index
+        shift = index // half - 1
+        return (index - shift * half) << shift
+
+    def record(self, micros: int, error: bool = False):
+        index = self._index(micros)
+        with self._lock:
+            if index >= len(self.counts):
+                self.counts.extend([0] * (index + 1 - len(self.counts)))
+            self.counts[index] += 1
+            if not self.count or micros < self.min:
+                self.min = micros
+            if micros > self.max:
+                self.max = micros
+            self.count += 1
+            self.total += micros
+            if error:
+                self.errors += 1
+
+    def quantile(self, q: float) -> int:
+        """q 분위수 (µs). 해당 버킷의 하한값이며 max를 넘지 않음"""
+        with self._lock:
+            if not self.count:
+                return 0
+            rank = max(1, int(q * self.count + 0.5))
+            seen = 0
+            for index, bucket in enumerate(self.counts):
+                seen += bucket
+                if seen >= rank:
+                    return min(self._value(index), self.max)
+            return self.max
+
+    def snapshot(self, quantiles: Iterable[float] = QUANTILES) -> Dict[str, float]:
+        """초 단위 요약"""
+        result = {f"p{int(q * 100)}": self.quantile(q) / 1e6 for q in quantiles}
+        with self._lock:
+            result.update(count=self.count, errors=self.errors, sum=self.total / 1e6,
+                          min=self.min / 1e6, max=self.max / 1e6)
+        return result
+
+
+@dataclass
+class CycleTrace:
+    """한 사이클 안에서 기록된 구간 (이름, 사이클 시작 기준 시작 시각, 소요 시간) 목록"""
+    name: str
+    start: int = field(default_factory=time.perf_counter_ns)
+    spans: List[Tuple[str, float, float]] = field(default_factory=list)
+
+    def format(self, elapsed: float) -> str:
+        parts = ", ".join(f"{name} {duration:.2f}s" for name, _, duration in sorted(self.spans, key=lambda span: span[1]))
+        return f"{self.name} {elapsed:.2f}s: {parts}" if parts else f"{self.name} {elapsed:.2f}s"
+
+
+_current_trace: contextvars.ContextVar[Optional[CycleTrace]] = contextvars.ContextVar("current_trace", default=None)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer: "Tracer", name: str):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self.tracer.record(self.name, (end - self.start) // 1000, error=exc_type is not None)
+        trace = _current_trace.get()
+        if trace is not None:
+            # list.append는 GIL 아래에서 원자적이라 작업 스레드에서 함께 써도 안전
+            trace.spans.append((self.name, (self.start - trace.start) / 1e9, (end - self.start) / 1e9))
+        return False
+
+
+class _Trace(_Span):
+    __slots__ = ("trace", "token", "log_threshold")
+
+    def __init__(self, tracer: "Tracer", name: str, log_threshold: float):
+        super().__init__(tracer, name)
+        self.log_threshold = log_threshold
+
+    def __enter__(self):
+        super().__enter__()
+        self.trace = CycleTrace(self.name, self.start)
+        self.token = _current_trace.set(self.trace)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_trace.reset(self.token)
+        super().__exit__(exc_type, exc, tb)
+        elapsed = (time.perf_counter_ns() - self.start) / 1e9
+        if elapsed >= self.log_threshold:
+            logger.info(f"Trace {self.trace.format(elapsed)}")
+        return False
+
+
+class Tracer:
+    """
+    Args:
+        enabled: False면 span/trace가 아무것도 하지 않음
+        namespace: Prometheus 지표 이름 접두어
+    """
+
+    def __init__(self, enabled: bool = True, namespace: str = "autotrade"):
+        self.enabled = enabled
+        self.namespace = namespace
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._dump_stop: Optional[threading.Event] = None
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def record(self, name: str, micros: int, error: bool = False):
+        self.histogram(name).record(micros, error)
+
+    def span(self, name: str):
+        """with tracer.span("name"): ... 구간 소요 시간 기록 (예외가 나면 errors도 증가)"""
+        return _Span(self, name) if self.enabled else _NOOP
+
+    def trace(self, name: str, log_threshold: float = 0.0):
+        """사이클 전체 구간. 안에서 기록된 구간을 모아 끝날 때 한 줄로 로그 (log_threshold초 이상일 때)"""
+        return _Trace(self, name, log_threshold) if self.enabled else _NOOP
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    # ---------------------------------------------------------------- 출력
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+        return {name: histogram.snapshot() for name, histogram in histograms}
+
+    def format_summary(self) -> str:
+        lines = [f"{'stage':<28}{'count':>8}{'errors':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"]
+        for name, stats in self.summary().items():
+            lines.append(f"{name:<28}{stats['count']:>8}{stats['errors']:>8}{stats['p50']:>9.3f}s"
+                         f"{stats['p90']:>9.3f}s{stats['p99']:>9.3f}s{stats['max']:>9.3f}s")
+        return "\n".join(lines)
+
+    def prometheus_text(self) -> str:
+        """Prometheus 텍스트 형식 (단계별 summary + 오류 카운터)"""
+        metric = f"{self.namespace}_stage_duration_seconds"
+        errors = f"{self.namespace}_stage_errors_total"
+        lines = [f"# HELP {metric} Duration of traced pipeline stages.", f"# TYPE {metric} summary"]
+        summary = self.summary()
+        for name, stats in summary.items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for q in QUANTILES:
+                lines.append(f'{metric}{{stage="{label}",quantile="{q}"}} {stats[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f'{metric}_sum{{stage="{label}"}} {stats["sum"]:.6f}')
+            lines.append(f'{metric}_count{{stage="{label}"}} {stats["count"]}')
+        lines += [f"# HELP {errors} Traced stages that raised.", f"# TYPE {errors} counter"]
+        for name, stats in summary.items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{errors}{{stage="{label}"}} {stats["errors"]}')
+        return "\n".join(lines) + "\n"
+
+    def start_dump(self, interval: float, log: Optional[logging.Logger] = None):
+        """interval초마다 단계별 요약을 로그에 씀"""
+        if self._dump_stop is not None or interval <= 0:
+            return
+        self._dump_stop = stop = threading.Event()
+        log = log or logger
+
+        def loop():
+            while not stop.wait(interval):
+                if self.histograms:
+                    log.info("Stage latency summary\n" + self.format_summary())
+
+        threading.Thread(target=loop, daemon=True, name="TraceDump").start()
+
+    def stop_dump(self):
+        if self._dump_stop is not None:
+            self._dump_stop.set()
+            self._dump_stop = None
+
+
+def traced(name: Optional[str] = None, root: bool = False, target: Optional[Tracer] = None) -> Callable:
+    """
+    함수 호출 시간을 기록하는 데코레이터 (이름을 생략하면 함수 이름, async 함수는 await가 끝날 때까지).
+    root=True면 tracer.trace()처럼 호출 안의 구간을 모아 한 줄로 로그함 (거래 사이클 등).
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                active = target or tracer
+                with active.trace(span_name) if root else active.span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            active = target or tracer
+            with active.trace(span_name) if root else active.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = self.server.tracer.prometheus_text().encode()  # type: ignore[attr-defined]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class MetricsServer:
+    """http://host:port/metrics 에서 tracer 지표를 제공 (로컬 Prometheus 수집용)"""
+
+    def __init__(self, port: int, host: str = "127.0.0.1", target: Optional[Tracer] = None):
+        self._server = _MetricsServer((host, port), _MetricsHandler)
+        self._server.tracer = target or tracer  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="MetricsServer")
+        self._thread.start()
+        logger.info(f"Serving metrics at {self.url}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# 모듈 전체가 공유하는 기본 tracer (TRACING_ENABLED=false면 끔)
+tracer = Tracer()
+
+
+def configure(enabled: bool = True, metrics_port: int = 0, dump_interval: float = 0.0,
+              log: Optional[logging.Logger] = None) -> Optional[MetricsServer]:
+    """설정값으로 기본 tracer를 켜고/끄고, 지표 서버와 주기적 요약을 시작. 지표 서버(없으면 None)"""
+    tracer.enabled = enabled
+    if not enabled:
+        return None
+    tracer.start_dump(dump_interval, log)
+    if metrics_port:
+        try:
+            return MetricsServer(metrics_port).start()
+        except OSError as e:
+            logger.error(f"Could not start metrics server on port {metrics_port}: {e}")
+    return None